@@ -4,8 +4,7 @@ Comprehensive Terminology Addition Script
 Adds appropriate Greek/Latin/Hebrew terms to all concept nodes based on historical accuracy
 """
 
-import json
-from datetime import datetime
+from kg_changeset import kg_session
 
 # Priority 1: Greek concepts needing Latin equivalents (Greek→Latin transmission)
 GREEK_TO_LATIN = {
@@ -195,15 +194,15 @@ ADDITIONAL_UPDATES = {
     },
 }
 
-def add_terminology():
-    """Add all appropriate terminology to concept nodes"""
+def add_terminology(kg=None):
+    """Add all appropriate terminology to concept nodes (on ``kg``, or on a freshly loaded database)"""
+    with kg_session(kg, backup_prefix='ancient_free_will_database_BACKUP_terminology') as kg:
+        return _add_terminology(kg)
 
-    # Load database
-    print("Loading database...")
-    with open('ancient_free_will_database.json', 'r', encoding='utf-8') as f:
-        db = json.load(f)
 
-    nodes = db['nodes']
+def _add_terminology(kg):
+    nodes = kg.nodes
+    changeset = kg.changeset('add_all_terminology')
 
     # Track changes
     changes = {
@@ -225,7 +224,7 @@ def add_terminology():
         if node_id in GREEK_TO_LATIN:
             updates = GREEK_TO_LATIN[node_id]
             if 'latin_term' in updates:
-                node['latin_term'] = updates['latin_term']
+                changeset.update_node(node_id, latin_term=updates['latin_term'])
                 print(f"✓ {node_id}: Added Latin '{updates['latin_term']}'")
                 changes['priority1_greek_to_latin'] += 1
 
@@ -236,7 +235,7 @@ def add_terminology():
         if node_id in LATIN_TO_GREEK:
             updates = LATIN_TO_GREEK[node_id]
             if 'greek_term' in updates:
-                node['greek_term'] = updates['greek_term']
+                changeset.update_node(node_id, greek_term=updates['greek_term'])
                 print(f"✓ {node_id}: Added Greek '{updates['greek_term']}'")
                 changes['priority2_latin_to_greek'] += 1
 
@@ -247,11 +246,11 @@ def add_terminology():
         if node_id in MEDIEVAL_LATIN:
             updates = MEDIEVAL_LATIN[node_id]
             if 'latin_term' in updates:
-                node['latin_term'] = updates['latin_term']
+                changeset.update_node(node_id, latin_term=updates['latin_term'])
                 print(f"✓ {node_id}: Added Latin '{updates['latin_term']}'")
                 changes['priority3_medieval_latin'] += 1
             if 'arabic_term' in updates:
-                node['arabic_term'] = updates['arabic_term']
+                changeset.update_node(node_id, arabic_term=updates['arabic_term'])
                 print(f"✓ {node_id}: Added Arabic '{updates['arabic_term']}'")
                 changes['priority3_medieval_latin'] += 1
 
@@ -262,11 +261,11 @@ def add_terminology():
         if node_id in HEBREW_CONCEPTS:
             updates = HEBREW_CONCEPTS[node_id]
             if 'hebrew_term' in updates:
-                node['hebrew_term'] = updates['hebrew_term']
+                changeset.update_node(node_id, hebrew_term=updates['hebrew_term'])
                 print(f"✓ {node_id}: Added Hebrew '{updates['hebrew_term']}'")
                 changes['priority4_hebrew'] += 1
             if 'transliteration' in updates and 'transliteration' not in node:
-                node['transliteration'] = updates['transliteration']
+                changeset.update_node(node_id, transliteration=updates['transliteration'])
 
     # Additional updates
     print("\n--- Additional concept updates ---")
@@ -275,10 +274,10 @@ def add_terminology():
         if node_id in ADDITIONAL_UPDATES:
             updates = ADDITIONAL_UPDATES[node_id]
             if 'greek_term' in updates:
-                node['greek_term'] = updates['greek_term']
+                changeset.update_node(node_id, greek_term=updates['greek_term'])
                 print(f"✓ {node_id}: Added Greek '{updates['greek_term']}'")
             if 'latin_term' in updates:
-                node['latin_term'] = updates['latin_term']
+                changeset.update_node(node_id, latin_term=updates['latin_term'])
                 print(f"✓ {node_id}: Added Latin '{updates['latin_term']}'")
             changes['additional_updates'] += 1
 
@@ -293,20 +292,10 @@ def add_terminology():
     print(f"Additional updates:           {changes['additional_updates']} concepts updated")
     print(f"\nTotal concepts updated:       {sum(changes.values())}")
 
-    # Create backup
-    backup_filename = f"ancient_free_will_database_BACKUP_terminology_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    print(f"\n" + "=" * 80)
-    print(f"Creating backup: {backup_filename}")
-    with open(backup_filename, 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-
-    # Save updated database
-    print(f"Saving updated database...")
-    with open('ancient_free_will_database.json', 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
+    # Stage the additions (saved with a backup when run on its own)
+    changeset.commit()
 
     print("\n✓ All terminology additions complete!")
-    print(f"  Backup saved: {backup_filename}")
 
     return changes
 
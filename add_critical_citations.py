@@ -4,8 +4,7 @@ Add citations to the 11 concepts with ZERO citations
 These are academically critical - every concept must have citations
 """
 
-import json
-from datetime import datetime
+from kg_changeset import kg_session
 
 # Citations for the 11 uncited concepts
 CONCEPT_CITATIONS = {
@@ -144,15 +143,15 @@ CONCEPT_CITATIONS = {
     },
 }
 
-def add_citations():
-    """Add citations to uncited concepts"""
+def add_citations(kg=None):
+    """Add citations to uncited concepts (on ``kg``, or on a freshly loaded database)"""
+    with kg_session(kg, backup_prefix='ancient_free_will_database_BACKUP_citations') as kg:
+        return _add_citations(kg)
 
-    # Load database
-    print("Loading database...")
-    with open('ancient_free_will_database.json', 'r', encoding='utf-8') as f:
-        db = json.load(f)
 
-    nodes = db['nodes']
+def _add_citations(kg):
+    nodes = kg.nodes
+    changeset = kg.changeset('add_critical_citations')
 
     print("\n" + "=" * 80)
     print("ADDING CITATIONS TO 11 UNCITED CONCEPTS")
@@ -169,11 +168,11 @@ def add_citations():
             print(f"  Label: {node.get('label')}")
 
             if 'ancient_sources' in citations:
-                node['ancient_sources'] = citations['ancient_sources']
+                changeset.update_node(node_id, ancient_sources=citations['ancient_sources'])
                 print(f"  ✓ Added {len(citations['ancient_sources'])} ancient sources")
 
             if 'modern_scholarship' in citations:
-                node['modern_scholarship'] = citations['modern_scholarship']
+                changeset.update_node(node_id, modern_scholarship=citations['modern_scholarship'])
                 print(f"  ✓ Added {len(citations['modern_scholarship'])} modern scholarship")
 
             updated += 1
@@ -181,19 +180,10 @@ def add_citations():
     print("\n" + "=" * 80)
     print(f"Updated {updated} concepts with citations")
 
-    # Create backup
-    backup_filename = f"ancient_free_will_database_BACKUP_citations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    print(f"\nCreating backup: {backup_filename}")
-    with open(backup_filename, 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-
-    # Save
-    print(f"Saving updated database...")
-    with open('ancient_free_will_database.json', 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
+    # Stage the citations (saved with a backup when run on its own)
+    changeset.commit()
 
     print("\n✓ All citations added!")
-    print(f"  Backup saved: {backup_filename}")
 
     return updated
 
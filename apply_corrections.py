@@ -4,106 +4,89 @@ Apply source corrections to ancient_free_will_database.json
 Manual corrections based on fact-checking that ancient_sources point to FREE WILL content
 """
 
-import json
-import sys
+from kg_changeset import kg_session
 
-def apply_corrections():
-    # Load database
-    with open('ancient_free_will_database.json', 'r', encoding='utf-8') as f:
-        db = json.load(f)
 
+def apply_corrections(kg=None):
+    """Apply the corrections (on ``kg``, or on a freshly loaded database)"""
+    with kg_session(kg) as kg:
+        return _apply_corrections(kg)
+
+
+def _apply_corrections(kg):
+    changeset = kg.changeset('apply_corrections')
     corrections_applied = []
 
+    def cited(node_id):
+        node = changeset.node(node_id)
+        return node is not None and 'ancient_sources' in node
+
+    def remove(node_id, sources):
+        return changeset.remove_from_list(node_id, 'ancient_sources', sources)
+
     # 1. CLITOMACHUS - Remove Diogenes Laertius
-    for node in db['nodes']:
-        if node['id'] == 'person_clitomachus_of_carthage_7l2m4o10':
-            if 'ancient_sources' in node:
-                to_remove = "Diogenes Laertius, Lives IV.67 (brief biography)"
-                if to_remove in node['ancient_sources']:
-                    node['ancient_sources'].remove(to_remove)
-                    corrections_applied.append(f"✓ Clitomachus: Removed Diogenes Laertius IV.67")
+    if cited('person_clitomachus_of_carthage_7l2m4o10'):
+        if remove('person_clitomachus_of_carthage_7l2m4o10', ["Diogenes Laertius, Lives IV.67 (brief biography)"]):
+            corrections_applied.append(f"✓ Clitomachus: Removed Diogenes Laertius IV.67")
 
     # 2. DIOGENIANOS - Remove Cicero De Fato
-    for node in db['nodes']:
-        if node['id'] == 'person_diogenianos_8m3n5p21':
-            if 'ancient_sources' in node:
-                to_remove = "Cicero, De Fato 12-13 (possible allusion to Diogenianus' etymological argument)"
-                if to_remove in node['ancient_sources']:
-                    node['ancient_sources'].remove(to_remove)
-                    corrections_applied.append(f"✓ Diogenianos: Removed speculative Cicero citation")
+    if cited('person_diogenianos_8m3n5p21'):
+        if remove('person_diogenianos_8m3n5p21', [
+            "Cicero, De Fato 12-13 (possible allusion to Diogenianus' etymological argument)"
+        ]):
+            corrections_applied.append(f"✓ Diogenianos: Removed speculative Cicero citation")
 
     # 3. PSEUDO-DIONYSIUS ARGUMENT - Remove 3 works
-    for node in db['nodes']:
-        if node['id'] == 'argument_pseudodionysiuss_hierarchical_causation_argument_e0d73eb9':
-            if 'ancient_sources' in node:
-                to_remove = [
-                    "Pseudo-Dionysius, De Caelesti Hierarchia (Celestial Hierarchy) (PG 3:119-370; SC 58bis)",
-                    "Pseudo-Dionysius, De Ecclesiastica Hierarchia (Ecclesiastical Hierarchy) (PG 3:369-584)",
-                    "Pseudo-Dionysius, De Mystica Theologia (Mystical Theology) (PG 3:997-1064)"
-                ]
-                for src in to_remove:
-                    if src in node['ancient_sources']:
-                        node['ancient_sources'].remove(src)
-                corrections_applied.append(f"✓ Pseudo-Dionysius: Removed 3 works not about free will")
+    if cited('argument_pseudodionysiuss_hierarchical_causation_argument_e0d73eb9'):
+        remove('argument_pseudodionysiuss_hierarchical_causation_argument_e0d73eb9', [
+            "Pseudo-Dionysius, De Caelesti Hierarchia (Celestial Hierarchy) (PG 3:119-370; SC 58bis)",
+            "Pseudo-Dionysius, De Ecclesiastica Hierarchia (Ecclesiastical Hierarchy) (PG 3:369-584)",
+            "Pseudo-Dionysius, De Mystica Theologia (Mystical Theology) (PG 3:997-1064)"
+        ])
+        corrections_applied.append(f"✓ Pseudo-Dionysius: Removed 3 works not about free will")
 
     # 4. FIRMICUS MATERNUS - Remove De Errore
-    for node in db['nodes']:
-        if node['id'] == 'person_firmicus_maternus_2q7r9t65':
-            if 'ancient_sources' in node:
-                to_remove = "Firmicus Maternus, De Errore Profanarum Religionum (c. 346-350 CE)"
-                if to_remove in node['ancient_sources']:
-                    node['ancient_sources'].remove(to_remove)
-                    corrections_applied.append(f"✓ Firmicus: Removed De Errore (not about fate)")
+    if cited('person_firmicus_maternus_2q7r9t65'):
+        if remove('person_firmicus_maternus_2q7r9t65', [
+            "Firmicus Maternus, De Errore Profanarum Religionum (c. 346-350 CE)"
+        ]):
+            corrections_applied.append(f"✓ Firmicus: Removed De Errore (not about fate)")
 
     # 5. TERTULLIAN ARGUMENT - Remove 4 works, keep only Adversus Marcionem
-    for node in db['nodes']:
-        if node['id'] == 'argument_tertullians_antimarcionite_argument_for_free_will_f49cad73':
-            if 'ancient_sources' in node:
-                to_remove = [
-                    "Tertullian, De Anima 20-22, 40 (CCL 2; PL 2:701-752)",
-                    "Tertullian, De Exhortatione Castitatis 1-2 (CCL 2; PL 2:913-930)",
-                    "Tertullian, De Paenitentia 3 (CCL 1; PL 1:1227-1248)",
-                    "Tertullian, Apologeticum 18, 45 (CCL 1; PL 1:257-536)"
-                ]
-                for src in to_remove:
-                    if src in node['ancient_sources']:
-                        node['ancient_sources'].remove(src)
-                corrections_applied.append(f"✓ Tertullian Anti-Marcionite: Removed 4 non-specific works")
+    if cited('argument_tertullians_antimarcionite_argument_for_free_will_f49cad73'):
+        remove('argument_tertullians_antimarcionite_argument_for_free_will_f49cad73', [
+            "Tertullian, De Anima 20-22, 40 (CCL 2; PL 2:701-752)",
+            "Tertullian, De Exhortatione Castitatis 1-2 (CCL 2; PL 2:913-930)",
+            "Tertullian, De Paenitentia 3 (CCL 1; PL 1:1227-1248)",
+            "Tertullian, Apologeticum 18, 45 (CCL 1; PL 1:257-536)"
+        ])
+        corrections_applied.append(f"✓ Tertullian Anti-Marcionite: Removed 4 non-specific works")
 
     # 6. BARDESANES - Remove Ephrem
-    for node in db['nodes']:
-        if node['id'] == 'person_bardesanes_the_syrian_3r8s0u76':
-            if 'ancient_sources' in node:
-                to_remove = "Ephrem the Syrian, Prose Refutations of Mani, Marcion and Bardaisan"
-                if to_remove in node['ancient_sources']:
-                    node['ancient_sources'].remove(to_remove)
-                    corrections_applied.append(f"✓ Bardesanes: Removed uncertain Ephrem citation")
+    if cited('person_bardesanes_the_syrian_3r8s0u76'):
+        if remove('person_bardesanes_the_syrian_3r8s0u76', [
+            "Ephrem the Syrian, Prose Refutations of Mani, Marcion and Bardaisan"
+        ]):
+            corrections_applied.append(f"✓ Bardesanes: Removed uncertain Ephrem citation")
 
     # 7. PELAGIUS - Add his own writings
-    for node in db['nodes']:
-        if node['id'] == 'person_pelagius_british_monk_4ba38f92':
-            if 'ancient_sources' in node:
-                to_add = [
-                    "Pelagius, Epistula ad Demetriadem (Letter to Demetrias) (PL 30:15-45; possibly spurious, perhaps by Julian of Eclanum)",
-                    "Pelagius, Expositio in Epistulam Pauli ad Romanos (Commentary on Romans, fragments survive)",
-                    "Pelagius, Libellus Fidei (Statement of Faith to Pope Innocent I; fragments in Augustine)"
-                ]
-                # Add at beginning (own writings before polemics against him)
-                for src in reversed(to_add):
-                    if src not in node['ancient_sources']:
-                        node['ancient_sources'].insert(0, src)
-                corrections_applied.append(f"✓ Pelagius: Added 3 of his own writings")
+    if cited('person_pelagius_british_monk_4ba38f92'):
+        # Add at beginning (own writings before polemics against him)
+        changeset.add_to_list('person_pelagius_british_monk_4ba38f92', 'ancient_sources', [
+            "Pelagius, Epistula ad Demetriadem (Letter to Demetrias) (PL 30:15-45; possibly spurious, perhaps by Julian of Eclanum)",
+            "Pelagius, Expositio in Epistulam Pauli ad Romanos (Commentary on Romans, fragments survive)",
+            "Pelagius, Libellus Fidei (Statement of Faith to Pope Innocent I; fragments in Augustine)"
+        ], index=0)
+        corrections_applied.append(f"✓ Pelagius: Added 3 of his own writings")
 
     # Update metadata
-    db['metadata']['date_modified'] = '2025-10-21'
-    if 'modification_note' in db['metadata']:
-        db['metadata']['modification_note'] += ' | Manual fact-check: removed 12 sources not specifically about free will, added 3 Pelagian primary sources.'
-    else:
-        db['metadata']['modification_note'] = 'Manual fact-check: removed 12 sources not specifically about free will, added 3 Pelagian primary sources.'
+    note = 'Manual fact-check: removed 12 sources not specifically about free will, added 3 Pelagian primary sources.'
+    if 'modification_note' in kg.metadata:
+        note = kg.metadata['modification_note'] + ' | ' + note
+    changeset.set_metadata(date_modified='2025-10-21', modification_note=note)
 
-    # Save
-    with open('ancient_free_will_database.json', 'w', encoding='utf-8') as f:
-        json.dump(db, f, indent=2, ensure_ascii=False)
+    # Stage (saved when run on its own)
+    changeset.commit()
 
     # Report
     print("=" * 70)
@@ -112,7 +95,6 @@ def apply_corrections():
     for correction in corrections_applied:
         print(correction)
     print(f"\nTotal corrections: {len(corrections_applied)}")
-    print("\n✓ Database saved successfully")
 
 if __name__ == '__main__':
     apply_corrections()
@@ -11,14 +11,25 @@ from typing import Optional, Dict, Any, AsyncGenerator
 import logging
 import json
 
-from services.graphrag_service import GraphRAGService
+from services.graphrag_service import EXPANSION_MODES, GRAPHRAG_EXPANSION, GraphRAGService
+from services.context_packer import graph_distances
+from services.llm_scheduler import LLMOverloadedError, Priority, get_llm_scheduler
+from services.answer_cache import ANSWER_CACHE_ENABLED, get_answer_cache, normalize_query, params_key
 from services.auth_service import check_rate_limit
 from api.auth import get_current_user_dependency, User
+from utils.single_flight import SingleFlight
+from utils.stage_timer import StageTimer
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Identical concurrent questions share one pipeline run (and one LLM generation)
+graphrag_flights = SingleFlight("graphrag")
+
+# SSE line of the final result (events are serialised with json.dumps defaults)
+COMPLETE_EVENT_PREFIX = 'data: {"type": "complete"'
+
 
 class GraphRAGQuery(BaseModel):
     """GraphRAG query model"""
@@ -27,7 +38,39 @@ class GraphRAGQuery(BaseModel):
     graph_depth: Optional[int] = 2
     max_context: Optional[int] = 15
     temperature: Optional[float] = 0.7
-    deep_mode: Optional[bool] = False  # Include PostgreSQL full-text results
+    deep_mode: Optional[bool] = False  # Also cite primary-text passages from PostgreSQL
+    use_cache: Optional[bool] = True  # Serve repeated/near-duplicate questions from the answer cache
+    expansion: Optional[str] = None  # Graph expansion: "bfs" or "ppr" (personalised PageRank)
+    max_nodes: Optional[int] = None  # Nodes kept by the expansion (default 50 for BFS, 25 for PPR)
+    include_timings: Optional[bool] = False  # Per-stage milliseconds in parameters / complete event
+
+    def expansion_mode(self) -> str:
+        """Requested expansion, falling back to GRAPHRAG_EXPANSION"""
+        return (self.expansion or GRAPHRAG_EXPANSION).lower()
+
+    def cache_params(self) -> tuple:
+        """Answer-cache parameter key for this request"""
+        return params_key(
+            self.semantic_k,
+            self.graph_depth,
+            self.max_context,
+            self.temperature,
+            self.deep_mode,
+            self.expansion_mode(),
+            self.max_nodes
+        )
+
+    def flight_key(self, mode: str) -> tuple:
+        """Key under which identical concurrent requests are coalesced"""
+        return (mode, normalize_query(self.query), self.cache_params(), self.use_cache, self.include_timings)
+
+
+def _check_expansion(graphrag_query: GraphRAGQuery) -> None:
+    if graphrag_query.expansion_mode() not in EXPANSION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown expansion '{graphrag_query.expansion}'; use one of {', '.join(EXPANSION_MODES)}"
+        )
 
 
 @router.post("/query")
@@ -46,6 +89,8 @@ async def graphrag_query(
     6. Reasoning path - visualize which nodes and edges were used
     """
     try:
+        _check_expansion(graphrag_query)
+
         # Rate limiting check
         client_ip = request.client.host
         identifier = f"{current_user.username}:{client_ip}"
@@ -62,18 +107,37 @@ async def graphrag_query(
         qdrant = request.app.state.qdrant
         llm = getattr(request.app.state, "llm", None)
 
-        # Create GraphRAG service
-        graphrag_service = GraphRAGService(qdrant, db, llm)
-
-        # Execute complete pipeline
-        result = await graphrag_service.answer_question(
-            query=graphrag_query.query,
-            semantic_k=graphrag_query.semantic_k,
-            graph_depth=graphrag_query.graph_depth,
-            max_context=graphrag_query.max_context,
-            temperature=graphrag_query.temperature,
-            deep_mode=graphrag_query.deep_mode
-        )
+        async def run_pipeline() -> Dict[str, Any]:
+            # Create GraphRAG service
+            graphrag_service = GraphRAGService(qdrant, db, llm)
+
+            # Execute complete pipeline
+            return await graphrag_service.answer_question(
+                query=graphrag_query.query,
+                semantic_k=graphrag_query.semantic_k,
+                graph_depth=graphrag_query.graph_depth,
+                max_context=graphrag_query.max_context,
+                temperature=graphrag_query.temperature,
+                deep_mode=graphrag_query.deep_mode,
+                use_cache=graphrag_query.use_cache,
+                priority=Priority.STANDARD,
+                expansion=graphrag_query.expansion_mode(),
+                max_nodes=graphrag_query.max_nodes,
+                include_timings=graphrag_query.include_timings
+            )
+
+        try:
+            result = await graphrag_flights.do(graphrag_query.flight_key("query"), run_pipeline)
+        except LLMOverloadedError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Answer generation is at capacity. {e}",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+
+        # Followers were asked in their own words
+        if result.get('query') != graphrag_query.query:
+            result = {**result, 'query': graphrag_query.query}
 
         return result
 
@@ -101,19 +165,60 @@ async def graphrag_query_stream(
     - citations: Final citations
     - complete: Final complete result
     - error: Error occurred
+
+    Cached answers skip straight to citations, answer chunks and complete
+    (with "cached": true in the complete data). Concurrent identical requests
+    subscribe to one pipeline run and receive the same events, except that the
+    complete data carries each request's own query.
     """
+    _check_expansion(graphrag_query)
+
+    def with_timings(result: Dict[str, Any], timer: StageTimer) -> Dict[str, Any]:
+        """Complete-event payload, with per-stage timings when requested"""
+        if not graphrag_query.include_timings:
+            return result
+        return {**result, 'timings': timer.summary()}
+
+    def stream_cached(result: Dict[str, Any]):
+        """SSE events replaying a cached answer"""
+        yield f"data: {json.dumps({'type': 'status', 'message': 'Answer found in cache', 'step': 6, 'total_steps': 6})}\n\n"
+        yield f"data: {json.dumps({'type': 'citations', 'data': result['citations']})}\n\n"
+        words = result['answer'].split()
+        for i, word in enumerate(words):
+            yield f"data: {json.dumps({'type': 'answer_chunk', 'data': word + ' ', 'progress': (i + 1) / len(words)})}\n\n"
+        yield f"data: {json.dumps({'type': 'complete', 'data': result})}\n\n"
 
     async def generate_stream() -> AsyncGenerator[str, None]:
+        """Rate-limit per user, then subscribe to the shared pipeline stream"""
+        # Rate limiting check
+        client_ip = request.client.host
+        identifier = f"{current_user.username}:{client_ip}"
+
+        if not check_rate_limit(identifier, limit=30, window_minutes=15):
+            yield f"data: {json.dumps({'type': 'error', 'message': 'Rate limit exceeded. Please wait before making another request.'})}\n\n"
+            return
+
+        async for event in graphrag_flights.stream(graphrag_query.flight_key("stream"), run_pipeline_stream):
+            yield with_own_query(event)
+
+    def with_own_query(event: str) -> str:
+        """
+        Events are shared by coalesced requests (and cached answers keep the query
+        they were stored for): the complete event names this request's own query
+        """
+        if not event.startswith(COMPLETE_EVENT_PREFIX):
+            return event
+        payload = json.loads(event[len("data: "):])
+        if payload['data'].get('query') == graphrag_query.query:
+            return event
+        payload['data'] = {**payload['data'], 'query': graphrag_query.query}
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def run_pipeline_stream() -> AsyncGenerator[str, None]:
         """Generate SSE stream with progress updates"""
+        timer = StageTimer()
+        deep_task = None
         try:
-            # Rate limiting check
-            client_ip = request.client.host
-            identifier = f"{current_user.username}:{client_ip}"
-            
-            if not check_rate_limit(identifier, limit=30, window_minutes=15):
-                yield f"data: {json.dumps({'type': 'error', 'message': 'Rate limit exceeded. Please wait before making another request.'})}\n\n"
-                return
-            
             # Get services from app state
             db = request.app.state.db
             qdrant = request.app.state.qdrant
@@ -122,50 +227,102 @@ async def graphrag_query_stream(
             # Create GraphRAG service
             graphrag_service = GraphRAGService(qdrant, db, llm)
 
+            use_cache = graphrag_query.use_cache and ANSWER_CACHE_ENABLED
+            answer_cache = get_answer_cache()
+            cache_params = graphrag_query.cache_params()
+
+            if use_cache:
+                with timer.stage("cache_lookup"):
+                    cached = answer_cache.lookup_exact(graphrag_query.query, cache_params, graphrag_service.kg_version)
+                if cached:
+                    timer.finish("cached", cached.get('nodes_used', 0))
+                    for event in stream_cached(with_timings(cached, timer)):
+                        yield event
+                    return
+
+            deep_task = graphrag_service.start_deep_retrieval(graphrag_query.query, graphrag_query.deep_mode)
+
             # Step 1: Semantic search
             yield f"data: {json.dumps({'type': 'status', 'message': 'Performing semantic search...', 'step': 1, 'total_steps': 6})}\n\n"
 
-            starting_nodes = await graphrag_service.semantic_search_nodes(
-                query=graphrag_query.query,
-                limit=graphrag_query.semantic_k
-            )
+            with timer.stage("embedding", "gemini"):
+                query_vector = await graphrag_service.embed_query(graphrag_query.query)
+            starting_nodes = []
+            if query_vector is not None:
+                with timer.stage("vector_search", "qdrant"):
+                    starting_nodes = await graphrag_service.search_nodes_by_vector(
+                        query_vector,
+                        limit=graphrag_query.semantic_k
+                    )
+
+            if starting_nodes and use_cache:
+                with timer.stage("cache_lookup"):
+                    cached = answer_cache.lookup(
+                        graphrag_query.query,
+                        query_vector,
+                        [n['id'] for n in starting_nodes],
+                        cache_params,
+                        graphrag_service.kg_version
+                    )
+                if cached:
+                    timer.finish("cached", cached.get('nodes_used', 0))
+                    for event in stream_cached(with_timings(cached, timer)):
+                        yield event
+                    return
 
             yield f"data: {json.dumps({'type': 'nodes', 'data': {'starting_nodes': [n['id'] for n in starting_nodes]}, 'count': len(starting_nodes)})}\n\n"
 
-            # Step 2: Graph traversal
+            # Step 2: Graph expansion
             yield f"data: {json.dumps({'type': 'status', 'message': 'Traversing knowledge graph...', 'step': 2, 'total_steps': 6})}\n\n"
 
-            expanded_nodes, traversed_edges = graphrag_service.graph_traversal_bfs(
-                starting_nodes=starting_nodes,
-                max_depth=graphrag_query.graph_depth,
-                max_nodes=50
-            )
+            with timer.stage("expansion"):
+                expanded_nodes, traversed_edges, relevance = graphrag_service.expand_graph(
+                    starting_nodes=starting_nodes,
+                    expansion=graphrag_query.expansion_mode(),
+                    max_depth=graphrag_query.graph_depth,
+                    max_nodes=graphrag_query.max_nodes
+                )
 
             yield f"data: {json.dumps({'type': 'nodes', 'data': {'expanded_nodes': len(expanded_nodes), 'edges_traversed': len(traversed_edges)}})}\n\n"
 
             # Step 3: Extract citations
             yield f"data: {json.dumps({'type': 'status', 'message': 'Extracting citations...', 'step': 3, 'total_steps': 6})}\n\n"
 
-            citations = graphrag_service.extract_citations(expanded_nodes)
+            deep = None
+            if deep_task is not None:
+                with timer.stage("deep_wait", "postgres"):
+                    deep = await graphrag_service.collect_deep_retrieval(deep_task)
+                timer.record("deep_retrieval", deep.elapsed_ms / 1000, "postgres")
+            with timer.stage("citations"):
+                citations = graphrag_service.add_passage_citations(
+                    graphrag_service.extract_citations(expanded_nodes), deep
+                )
 
             yield f"data: {json.dumps({'type': 'citations', 'data': citations})}\n\n"
 
             # Step 4: Build context
             yield f"data: {json.dumps({'type': 'status', 'message': 'Building context...', 'step': 4, 'total_steps': 6})}\n\n"
 
-            context = graphrag_service.build_context(
-                nodes=expanded_nodes,
-                max_context_length=graphrag_query.max_context
-            )
+            with timer.stage("context"):
+                context = graphrag_service.build_context(
+                    nodes=expanded_nodes,
+                    max_context_length=graphrag_query.max_context,
+                    centrality=relevance,
+                    distances=graph_distances([n['id'] for n in starting_nodes], traversed_edges),
+                    passages=deep.passages if deep else None
+                )
 
             # Step 5: Generate answer
             yield f"data: {json.dumps({'type': 'status', 'message': 'Generating answer with LLM...', 'step': 5, 'total_steps': 6})}\n\n"
 
-            synthesis_result = await graphrag_service.synthesize_answer(
-                query=graphrag_query.query,
-                context=context,
-                temperature=graphrag_query.temperature
-            )
+            with timer.stage("generation") as span:
+                synthesis_result = await graphrag_service.synthesize_answer(
+                    query=graphrag_query.query,
+                    context=context,
+                    temperature=graphrag_query.temperature,
+                    priority=Priority.INTERACTIVE
+                )
+                span.provider = synthesis_result['provider']
 
             answer_text = synthesis_result['answer']
             tokens_used = synthesis_result['tokens_used']
@@ -180,11 +337,12 @@ async def graphrag_query_stream(
             # Step 6: Create reasoning path
             yield f"data: {json.dumps({'type': 'status', 'message': 'Creating reasoning path...', 'step': 6, 'total_steps': 6})}\n\n"
 
-            reasoning_path = graphrag_service.create_reasoning_path(
-                starting_nodes=starting_nodes,
-                expanded_nodes=expanded_nodes,
-                traversed_edges=traversed_edges
-            )
+            with timer.stage("reasoning_path"):
+                reasoning_path = graphrag_service.create_reasoning_path(
+                    starting_nodes=starting_nodes,
+                    expanded_nodes=expanded_nodes,
+                    traversed_edges=traversed_edges
+                )
 
             # Send complete result
             final_result = {
@@ -197,21 +355,43 @@ async def graphrag_query_stream(
                     'nodes_used': len(expanded_nodes),
                     'edges_traversed': len(traversed_edges),
                     'tokens_used': tokens_used,
+                    'context': graphrag_service.last_context,
                     'llm_provider': llm_provider,
                     'llm_model': llm_model,
                     'success': True
                 }
             }
-
+            if deep is not None:
+                final_result['data']['deep_mode'] = deep.summary()
+
+            if use_cache and llm_provider not in ('unknown', 'error'):
+                answer_cache.store(
+                    graphrag_query.query,
+                    query_vector,
+                    [n['id'] for n in starting_nodes],
+                    cache_params,
+                    graphrag_service.kg_version,
+                    final_result['data']
+                )
+
+            timer.finish("success", len(expanded_nodes))
+            final_result['data'] = with_timings(final_result['data'], timer)
             yield f"data: {json.dumps(final_result)}\n\n"
 
+        except LLMOverloadedError as e:
+            timer.finish("overloaded")
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e), 'retry_after': e.retry_after})}\n\n"
         except Exception as e:
             logger.error(f"Error in streaming GraphRAG query: {e}", exc_info=True)
+            timer.finish("error")
             error_event = {
                 'type': 'error',
                 'message': str(e)
             }
             yield f"data: {json.dumps(error_event)}\n\n"
+        finally:
+            if deep_task is not None and not deep_task.done():
+                deep_task.cancel()
 
     return StreamingResponse(
         generate_stream(),
@@ -231,15 +411,25 @@ async def graphrag_status():
         'status': 'available',
         'features': [
             'Semantic search via Qdrant vector database',
-            'Graph traversal via breadth-first search',
+            'Graph expansion via breadth-first search or personalised PageRank',
             'Automatic citation extraction',
             'LLM-powered answer synthesis',
-            'Deep mode (includes PostgreSQL full-text search)',
-            'Real-time streaming responses (SSE)'
+            'Deep mode (time-boxed PostgreSQL passage retrieval with exact text citations)',
+            'Real-time streaming responses (SSE)',
+            'Semantic answer cache for repeated and near-duplicate questions'
         ],
         'endpoints': {
             '/query': 'Standard query (returns complete result)',
             '/query/stream': 'Streaming query (real-time progress via SSE)',
-            '/status': 'Service status and capabilities'
-        }
+            '/status': 'Service status and capabilities',
+            '/cache/stats': 'Answer cache hit ratios'
+        },
+        'coalescing': graphrag_flights.stats(),
+        'llm_admission': get_llm_scheduler().stats()
     }
+
+
+@router.get("/cache/stats")
+async def graphrag_cache_stats():
+    """Answer cache hit ratios, size and most frequently served questions"""
+    return get_answer_cache().stats()
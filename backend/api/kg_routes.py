@@ -4,10 +4,12 @@ Knowledge Graph API Routes
 Endpoints for accessing KG nodes, edges, and visualizations
 """
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 import json
 import logging
+import time
 from pathlib import Path
 from pydantic import BaseModel, Field
 
@@ -26,6 +28,20 @@ from services.kg_cache import (
     cache_stats,
     invalidate_all,
 )
+from services.kg_index import (
+    KGIndex,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+    project,
+)
+from services.kg_metrics import (
+    CENTRALITY_MEASURES,
+    get_graph_metrics_service,
+    kg_version,
+    top_nodes,
+)
+from utils.http_cache import PrecompressedJSON, conditional_response
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +52,9 @@ router = APIRouter()
 # Locally: backend/api/kg_routes.py -> ancient_free_will_database.json
 KG_PATH = Path(__file__).parent.parent / "ancient_free_will_database.json"
 
+# Node/edge properties left out of visualisation payloads unless explicitly requested
+HEAVY_FIELDS = frozenset({"embedding", "embeddings", "embedding_vector", "vector"})
+
 
 @cached(get_kg_data_cache(), ttl=0, key_prefix="kg_data")
 def load_kg_data() -> Dict[str, Any]:
@@ -49,55 +68,149 @@ def load_kg_data() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail="Failed to load Knowledge Graph")
 
 
+@cached(get_kg_data_cache(), ttl=0, key_prefix="kg_version")
+def get_kg_version() -> str:
+    """Content hash of the loaded KG (cached alongside the KG data)"""
+    return kg_version(load_kg_data())
+
+
+@cached(get_kg_data_cache(), ttl=0, key_prefix="kg_index")
+def get_kg_index() -> KGIndex:
+    """Lookup indexes over the loaded KG (cached alongside the KG data)"""
+    return KGIndex(load_kg_data(), get_kg_version())
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 500
+
+
+def _wants_ndjson(request: Request, response_format: Optional[str]) -> bool:
+    if response_format:
+        return response_format.lower() == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _paginate(
+    positions: List[int],
+    version: str,
+    limit: Optional[int],
+    offset: int,
+    cursor: Optional[str],
+) -> Tuple[List[int], Optional[str]]:
+    """Slice filtered positions; returns (page_positions, next_cursor)"""
+    if cursor:
+        try:
+            offset = decode_cursor(cursor, version)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    end = len(positions) if limit is None else offset + limit
+    page = positions[offset:end]
+    next_cursor = encode_cursor(version, end) if end < len(positions) else None
+    return page, next_cursor
+
+
+def _collection_response(
+    request: Request,
+    key: str,
+    items: List[Dict[str, Any]],
+    positions: List[int],
+    fields: Optional[str],
+    include_heavy: bool,
+    limit: Optional[int],
+    offset: int,
+    cursor: Optional[str],
+    response_format: Optional[str],
+    always: Tuple[str, ...],
+):
+    """Shared projection/pagination/NDJSON handling for /nodes and /edges"""
+    version = get_kg_version()
+    page, next_cursor = _paginate(positions, version, limit, offset, cursor)
+    selected_fields = parse_fields(fields)
+    excluded = () if include_heavy else HEAVY_FIELDS
+
+    if _wants_ndjson(request, response_format):
+        def stream() -> Iterator[bytes]:
+            for start in range(0, len(page), NDJSON_BATCH_SIZE):
+                batch = page[start:start + NDJSON_BATCH_SIZE]
+                yield "".join(
+                    json.dumps(
+                        project(items[position], selected_fields, excluded, always),
+                        ensure_ascii=False,
+                        default=str,
+                    ) + "\n"
+                    for position in batch
+                ).encode("utf-8")
+
+        headers = {"X-Total-Count": str(len(positions)), "X-KG-Version": version}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+    return {
+        key: [project(items[position], selected_fields, excluded, always) for position in page],
+        'total': len(positions),
+        'returned': len(page),
+        'next_cursor': next_cursor,
+        'version': version
+    }
+
+
 @router.get("/nodes")
 async def get_all_nodes(
+    request: Request,
     node_type: Optional[str] = None,
+    type_filter: Optional[str] = Query(None, alias="type"),
     period: Optional[str] = None,
-    school: Optional[str] = None
+    school: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return (id is always included)"
+    ),
+    include_heavy: bool = Query(False, alias="includeHeavy"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    response_format: Optional[str] = Query(None, alias="format", description="json or ndjson"),
 ):
-    """Get all KG nodes with optional filtering"""
-    kg_data = load_kg_data()
-    nodes = kg_data.get('nodes', [])
-
-    # Apply filters
-    if node_type:
-        nodes = [n for n in nodes if n.get('type') == node_type]
-    if period:
-        nodes = [n for n in nodes if n.get('period') == period]
-    if school:
-        nodes = [n for n in nodes if n.get('school') == school]
-
-    return {
-        'nodes': nodes,
-        'total': len(nodes)
-    }
+    """Get KG nodes with indexed filtering, field projection and pagination"""
+    index = get_kg_index()
+    positions = index.filter_nodes(
+        type=node_type or type_filter,
+        period=period,
+        school=school,
+    )
+    return _collection_response(
+        request, 'nodes', index.nodes, positions, fields, include_heavy,
+        limit, offset, cursor, response_format, always=('id',),
+    )
 
 
 @router.get("/edges")
 async def get_all_edges(
-    relation: Optional[str] = None
+    request: Request,
+    relation: Optional[str] = None,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return (source and target are always included)"
+    ),
+    include_heavy: bool = Query(False, alias="includeHeavy"),
+    limit: Optional[int] = Query(None, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    response_format: Optional[str] = Query(None, alias="format", description="json or ndjson"),
 ):
-    """Get all KG edges with optional filtering"""
-    kg_data = load_kg_data()
-    edges = kg_data.get('edges', [])
-
-    # Apply filters
-    if relation:
-        edges = [e for e in edges if e.get('relation') == relation]
-
-    return {
-        'edges': edges,
-        'total': len(edges)
-    }
+    """Get KG edges with indexed filtering, field projection and pagination"""
+    index = get_kg_index()
+    positions = index.filter_edges(relation=relation)
+    return _collection_response(
+        request, 'edges', index.edges, positions, fields, include_heavy,
+        limit, offset, cursor, response_format, always=('id', 'source', 'target'),
+    )
 
 
 @router.get("/node/{node_id}")
 async def get_node_by_id(node_id: str):
     """Get detailed information about a specific node"""
-    kg_data = load_kg_data()
-    nodes = kg_data.get('nodes', [])
-
-    node = next((n for n in nodes if n.get('id') == node_id), None)
+    node = get_kg_index().get_node(node_id)
 
     if not node:
         raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
@@ -108,14 +221,7 @@ async def get_node_by_id(node_id: str):
 @router.get("/node/{node_id}/connections")
 async def get_node_connections(node_id: str):
     """Get all edges connected to a specific node"""
-    kg_data = load_kg_data()
-    edges = kg_data.get('edges', [])
-
-    # Find edges where node is source or target
-    connected_edges = [
-        e for e in edges
-        if e.get('source') == node_id or e.get('target') == node_id
-    ]
+    connected_edges = get_kg_index().connected_edges(node_id)
 
     return {
         'node_id': node_id,
@@ -124,27 +230,17 @@ async def get_node_connections(node_id: str):
     }
 
 
-@router.get("/viz/cytoscape")
-async def get_cytoscape_data(
-    community_algorithm: str = Query(
-        "auto", alias="communityAlgorithm", description="Community detection algorithm"
-    )
-):
-    """Get KG data formatted for Cytoscape.js (cached)"""
-    cache = get_analytics_cache()
-    normalized_algorithm = (community_algorithm or "auto").lower()
-    cache_key = f"cytoscape:full:{normalized_algorithm}"
-
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    kg_data = load_kg_data()
+def build_cytoscape_payload(
+    kg_data: Dict[str, Any],
+    algorithm: str,
+    include_heavy: bool = False,
+) -> Dict[str, Any]:
+    """Format KG data for Cytoscape.js, annotated with community assignments"""
     community_result: Optional[Dict[str, Any]] = None
     available_algorithms: List[Dict[str, Any]] = []
 
-    if normalized_algorithm not in {"none", "off", "disabled"}:
-        community_result = detect_communities(kg_data, algorithm=normalized_algorithm)
+    if algorithm not in {"none", "off", "disabled"}:
+        community_result = detect_communities(kg_data, algorithm=algorithm)
         available_algorithms = community_result.get("available_algorithms", [])
     else:
         snapshot = detect_communities(kg_data, algorithm="auto")
@@ -154,9 +250,12 @@ async def get_cytoscape_data(
         community_result.get("node_assignments", {}) if community_result else {}
     )
     color_map = community_result.get("colors", {}) if community_result else {}
+    excluded = frozenset() if include_heavy else HEAVY_FIELDS
+
+    def strip(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in item.items() if key not in excluded}
 
-    # Format for Cytoscape.js
-    cytoscape_data = {
+    return {
         'elements': {
             'nodes': [
                 {
@@ -176,7 +275,7 @@ async def get_cytoscape_data(
                             if node['id'] in node_assignments
                             else None
                         ),
-                        **node,  # Include all node properties
+                        **strip(node),  # Include node properties (minus heavy fields)
                     }
                 }
                 for node in kg_data.get('nodes', [])
@@ -189,7 +288,7 @@ async def get_cytoscape_data(
                         'target': edge['target'],
                         'relation': edge.get('relation', ''),
                         'label': edge.get('relation', ''),
-                        **edge  # Include all edge properties
+                        **strip(edge)  # Include edge properties (minus heavy fields)
                     }
                 }
                 for edge in kg_data.get('edges', [])
@@ -197,7 +296,7 @@ async def get_cytoscape_data(
         },
         'meta': {
             'community': {
-                "algorithm_requested": normalized_algorithm,
+                "algorithm_requested": algorithm,
                 "algorithm_used": (
                     community_result.get("algorithm_used")
                     if community_result
@@ -216,13 +315,69 @@ async def get_cytoscape_data(
         },
     }
 
-    cache.set(cache_key, cytoscape_data, ttl=0)  # Never expire
-    return cytoscape_data
+
+def _cytoscape_entry(algorithm: str, include_heavy: bool) -> Tuple[str, Callable[[], PrecompressedJSON]]:
+    """Analytics cache key and builder of one Cytoscape payload variant"""
+    normalized_algorithm = (algorithm or "auto").lower()
+    variant = "full" if include_heavy else "slim"
+    cache_key = f"cytoscape:{get_kg_version()}:{normalized_algorithm}:{variant}"
+
+    def build() -> PrecompressedJSON:
+        payload = PrecompressedJSON(
+            build_cytoscape_payload(load_kg_data(), normalized_algorithm, include_heavy)
+        )
+        logger.info(
+            f"Built Cytoscape payload {cache_key}: {len(payload.body)} bytes raw, "
+            f"{len(payload.encodings['gzip'])} bytes gzip"
+        )
+        return payload
+
+    return cache_key, build
+
+
+def get_cytoscape_payload(algorithm: str = "auto", include_heavy: bool = False) -> PrecompressedJSON:
+    """
+    Pre-serialised, compressed Cytoscape payload for the current KG version
+
+    Built once per (KG version, algorithm, variant) and kept in the analytics cache.
+    """
+    # Never expire; the key changes with the KG version
+    return get_analytics_cache().get_or_compute(*_cytoscape_entry(algorithm, include_heavy), ttl=0)
+
+
+async def get_cytoscape_payload_async(algorithm: str = "auto", include_heavy: bool = False) -> PrecompressedJSON:
+    """get_cytoscape_payload for endpoints: misses are built off the event loop"""
+    return await get_analytics_cache().aget_or_compute(*_cytoscape_entry(algorithm, include_heavy), ttl=0)
+
+
+@router.get("/viz/cytoscape")
+async def get_cytoscape_data(
+    request: Request,
+    community_algorithm: str = Query(
+        "auto", alias="communityAlgorithm", description="Community detection algorithm"
+    ),
+    include_heavy: bool = Query(
+        False, alias="includeHeavy", description="Include embeddings and other heavy fields"
+    ),
+):
+    """
+    Get KG data formatted for Cytoscape.js
+
+    Served from pre-compressed bytes with a strong ETag; If-None-Match returns 304.
+    """
+    payload = await get_cytoscape_payload_async(community_algorithm, include_heavy)
+    return conditional_response(
+        request,
+        payload,
+        cache_control="public, max-age=300, stale-while-revalidate=1800",
+    )
 
 
 @router.get("/stats")
-async def get_kg_stats():
-    """Get Knowledge Graph statistics"""
+async def get_kg_stats(
+    centrality_top: int = Query(10, ge=0, le=100, alias="centralityTop")
+):
+    """Get Knowledge Graph statistics, including precomputed centrality when ready"""
     kg_data = load_kg_data()
     nodes = kg_data.get('nodes', [])
     edges = kg_data.get('edges', [])
@@ -245,12 +400,34 @@ async def get_kg_stats():
         period = node.get('period', 'unknown')
         periods[period] = periods.get(period, 0) + 1
 
+    # Centrality is computed in a background worker; report status until ready
+    version = get_kg_version()
+    metrics_service = get_graph_metrics_service()
+    metrics = metrics_service.ensure(kg_data, version)
+    graph_metrics: Dict[str, Any] = {
+        'version': version,
+        'status': metrics_service.status(version),
+    }
+    if metrics:
+        graph_metrics.update({
+            'computed_at': metrics['computed_at'],
+            'compute_seconds': metrics['compute_seconds'],
+            'components': metrics['components'],
+            'density': metrics['density'],
+            'betweenness_approximate': metrics['betweenness_approximate'],
+            'top_nodes': {
+                measure: top_nodes(metrics['centrality'].get(measure, {}), centrality_top)
+                for measure in CENTRALITY_MEASURES
+            },
+        })
+
     return {
         'total_nodes': len(nodes),
         'total_edges': len(edges),
         'node_types': node_types,
         'relation_types': relation_types,
-        'periods': periods
+        'periods': periods,
+        'graph_metrics': graph_metrics
     }
 
 
@@ -271,6 +448,32 @@ def build_filter_payload(
     }
 
 
+# Analytics views: cache key prefix -> (builder, TTL seconds)
+ANALYTICS_VIEWS = {
+    "timeline": (build_timeline_overview, 600),  # 10 min TTL
+    "argument": (build_argument_evidence, 600),
+    "clusters": (build_concept_clusters, 1800),  # Slowest (~1.9s), cache aggressively
+    "matrix": (build_influence_matrix, 600),
+}
+
+
+def _analytics_entry(view: str, filters: Dict[str, Any]) -> Tuple[str, Callable[[], Dict[str, Any]], int]:
+    """Analytics cache key, builder and TTL of one view for a filter payload"""
+    builder, ttl = ANALYTICS_VIEWS[view]
+    cache_key = f"{view}:{get_kg_version()}:{get_analytics_cache()._make_key(filters)}"
+    return cache_key, lambda: builder(load_kg_data(), filters), ttl
+
+
+def get_analytics_view(view: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute (or fetch from cache) one analytics view for a filter payload"""
+    return get_analytics_cache().get_or_compute(*_analytics_entry(view, filters))
+
+
+async def get_analytics_view_async(view: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+    """get_analytics_view for endpoints: misses are computed off the event loop"""
+    return await get_analytics_cache().aget_or_compute(*_analytics_entry(view, filters))
+
+
 @router.get("/analytics/timeline")
 async def get_timeline_overview(
     node_types: Optional[List[str]] = Query(None, alias="nodeTypes"),
@@ -280,20 +483,8 @@ async def get_timeline_overview(
     search_term: Optional[str] = Query(None, alias="searchTerm"),
 ):
     """Return aggregated timeline overview for chronological visualization"""
-    kg_data = load_kg_data()
     filters = build_filter_payload(node_types, periods, schools, relations, search_term)
-
-    # Use caching with filter-based key
-    cache = get_analytics_cache()
-    cache_key = f"timeline:{cache._make_key(filters)}"
-
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    result = build_timeline_overview(kg_data, filters)
-    cache.set(cache_key, result, ttl=600)  # 10 min TTL
-    return result
+    return await get_analytics_view_async("timeline", filters)
 
 
 @router.get("/analytics/argument-flow")
@@ -305,19 +496,8 @@ async def get_argument_evidence_overview(
     search_term: Optional[str] = Query(None, alias="searchTerm"),
 ):
     """Return argument evidence flow data"""
-    kg_data = load_kg_data()
     filters = build_filter_payload(node_types, periods, schools, relations, search_term)
-
-    cache = get_analytics_cache()
-    cache_key = f"argument:{cache._make_key(filters)}"
-
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    result = build_argument_evidence(kg_data, filters)
-    cache.set(cache_key, result, ttl=600)
-    return result
+    return await get_analytics_view_async("argument", filters)
 
 
 @router.get("/analytics/concept-clusters")
@@ -329,20 +509,8 @@ async def get_concept_cluster_overview(
     search_term: Optional[str] = Query(None, alias="searchTerm"),
 ):
     """Return concept cluster overview data (heavily cached due to expensive clustering)"""
-    kg_data = load_kg_data()
     filters = build_filter_payload(node_types, periods, schools, relations, search_term)
-
-    cache = get_analytics_cache()
-    cache_key = f"clusters:{cache._make_key(filters)}"
-
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    # This is the slowest endpoint (~1.9s), cache aggressively
-    result = build_concept_clusters(kg_data, filters)
-    cache.set(cache_key, result, ttl=1800)  # 30 min TTL
-    return result
+    return await get_analytics_view_async("clusters", filters)
 
 
 @router.get("/analytics/influence-matrix")
@@ -354,19 +522,8 @@ async def get_influence_matrix(
     search_term: Optional[str] = Query(None, alias="searchTerm"),
 ):
     """Return influence matrix aggregates"""
-    kg_data = load_kg_data()
     filters = build_filter_payload(node_types, periods, schools, relations, search_term)
-
-    cache = get_analytics_cache()
-    cache_key = f"matrix:{cache._make_key(filters)}"
-
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    result = build_influence_matrix(kg_data, filters)
-    cache.set(cache_key, result, ttl=600)
-    return result
+    return await get_analytics_view_async("matrix", filters)
 
 
 class KGPathRequestModel(BaseModel):
@@ -395,10 +552,105 @@ async def calculate_graph_path(payload: KGPathRequestModel):
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+# Startup warm-up state, reported by /api/health
+_warmup_status: Dict[str, Any] = {"status": "not_started", "steps": {}}
+
+DEFAULT_CYTOSCAPE_ALGORITHM = "auto"
+
+# The instance cannot serve without these; any other failed step leaves it ready but degraded
+ESSENTIAL_WARMUP_STEPS = ("kg_data", "kg_index")
+WARMUP_ATTEMPTS = 4
+WARMUP_BACKOFF_SECONDS = 2.0
+
+
+def get_warmup_status() -> Dict[str, Any]:
+    """Current cache warm-up state (not_started, warming, ready, degraded, failed or disabled)"""
+    return {**_warmup_status, "steps": dict(_warmup_status["steps"])}
+
+
+def warmup_ready() -> bool:
+    """Whether the instance may take traffic: the KG is loaded, or warm-up is switched off"""
+    return _warmup_status["status"] in ("ready", "degraded", "disabled")
+
+
+def start_warmup() -> None:
+    """
+    Mark the warm-up as in progress
+
+    Call this before scheduling warm_caches in the background, so /api/health
+    never sees the not_started state of a warm-up that is about to run.
+    """
+    _warmup_status.update({"status": "warming", "started_at": time.time(), "steps": {}, "failed_steps": []})
+
+
+def disable_warmup() -> None:
+    """Record that caches are filled on demand only (KG_WARMUP=false)"""
+    _warmup_status.update({"status": "disabled", "steps": {}, "failed_steps": []})
+
+
+def warm_caches(attempts: int = WARMUP_ATTEMPTS, backoff: float = WARMUP_BACKOFF_SECONDS) -> Dict[str, Any]:
+    """
+    Precompute the KG, its indexes, default analytics and the Cytoscape payload
+
+    Blocking; run it in a worker thread from the application lifespan. Each step
+    fills the same cache entries the endpoints read, so the first users get hits.
+    Failed steps are retried with exponential backoff. Once the KG and its index
+    are loaded the instance is ready, and "degraded" while other steps still fail
+    (those entries are then computed on demand); it is "failed" only when an
+    essential step never succeeds.
+    """
+    default_filters = build_filter_payload(None, None, None, None, None)
+    steps = [
+        ("kg_data", load_kg_data),
+        ("kg_index", get_kg_index),
+        ("graph_metrics", lambda: get_graph_metrics_service().ensure(load_kg_data(), get_kg_version())),
+        *[
+            (f"analytics_{view}", lambda view=view: get_analytics_view(view, default_filters))
+            for view in ANALYTICS_VIEWS
+        ],
+        ("cytoscape", lambda: get_cytoscape_payload(DEFAULT_CYTOSCAPE_ALGORITHM)),
+    ]
+
+    start_warmup()
+    started = time.perf_counter()
+    pending = steps
+    for attempt in range(1, attempts + 1):
+        failed = []
+        for name, step in pending:
+            step_started = time.perf_counter()
+            try:
+                step()
+                _warmup_status["steps"][name] = round(time.perf_counter() - step_started, 3)
+            except Exception as e:
+                logger.error(f"Cache warm-up step '{name}' failed (attempt {attempt}/{attempts}): {e}")
+                _warmup_status["steps"][name] = None
+                failed.append((name, step))
+
+        pending = failed
+        failed_names = [name for name, _ in failed]
+        essential_failed = any(name in ESSENTIAL_WARMUP_STEPS for name in failed_names)
+        if not failed:
+            status = "ready"
+        elif not essential_failed:
+            status = "degraded"
+        elif attempt < attempts:
+            status = "warming"
+        else:
+            status = "failed"
+        _warmup_status.update({"status": status, "failed_steps": failed_names, "attempts": attempt})
+        if not failed or attempt == attempts:
+            break
+        time.sleep(backoff * 2 ** (attempt - 1))
+
+    _warmup_status["duration_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Cache warm-up {_warmup_status['status']} in {_warmup_status['duration_seconds']}s")
+    return get_warmup_status()
+
+
 @router.get("/cache/stats")
 async def get_cache_statistics():
     """Get cache statistics for monitoring"""
-    return cache_stats()
+    return {**cache_stats(), "warmup": get_warmup_status()}
 
 
 @router.post("/cache/invalidate")
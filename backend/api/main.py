@@ -7,6 +7,7 @@ Main application entry point
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 import gc
 import os
@@ -16,6 +17,7 @@ from api import kg_routes, search_routes, graphrag_routes, text_routes, auth
 from services.db import DatabaseService
 from services.qdrant_service import QdrantService
 from services.llm_service import LLMService, ModelProvider
+from services.kg_metrics import get_graph_metrics_service
 from utils.logging import configure_logging, get_logger, RequestLoggingMiddleware
 from utils.metrics import init_metrics, get_metrics, MetricsMiddleware, update_health_metrics
 from utils.sentry import init_sentry
@@ -48,6 +50,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("api_starting", message="Starting Ancient Free Will Database API")
 
+    # Warm KG caches in the background; /api/health reports 503 until the KG is loaded
+    warmup_task = None
+    if os.getenv("KG_WARMUP", "true").lower() == "true":
+        # Set synchronously: the thread may not have started when the first health check arrives
+        kg_routes.start_warmup()
+        warmup_task = asyncio.create_task(asyncio.to_thread(kg_routes.warm_caches))
+    else:
+        kg_routes.disable_warmup()
+
     try:
         # Initialize database service
         db_service = DatabaseService()
@@ -92,6 +103,9 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("api_shutdown", message="Shutting down Ancient Free Will Database API")
 
+        if warmup_task and not warmup_task.done():
+            warmup_task.cancel()
+
         if db_service:
             await db_service.close()
             logger.info("database_disconnected", service="PostgreSQL")
@@ -100,6 +114,8 @@ async def lifespan(app: FastAPI):
             await qdrant_service.close()
             logger.info("vector_db_disconnected", service="Qdrant")
 
+        get_graph_metrics_service().shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -174,12 +190,28 @@ async def health_check():
         llm=True
     )
 
-    return {
+    warmup = kg_routes.get_warmup_status()
+    ready = kg_routes.warmup_ready()
+    payload = {
         "status": "healthy",
+        "ready": ready,
         "database": "connected" if db_connected else "disconnected",
-        "qdrant": "connected" if qdrant_connected else "disconnected"
+        "qdrant": "connected" if qdrant_connected else "disconnected",
+        "warmup": warmup,
+        "failed_steps": warmup.get("failed_steps", [])
     }
 
+    # Keep the platform from routing traffic here until the KG is loaded
+    # (a warm-up that has not started or could not load it is not ready either);
+    # optional steps that keep failing only mark the instance degraded
+    if warmup["status"] == "degraded":
+        payload["status"] = "degraded"
+    if not ready:
+        payload["status"] = "warming_up" if warmup["status"] == "warming" else f"warmup_{warmup['status']}"
+        return JSONResponse(status_code=503, content=payload)
+
+    return payload
+
 
 # Metrics endpoint
 @app.get("/metrics")
@@ -205,7 +237,8 @@ async def root():
 async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.detail}
+        content={"error": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -9,10 +9,15 @@ from pydantic import BaseModel
 from typing import Optional
 import logging
 
+from utils.single_flight import SingleFlight, normalize_text
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Identical concurrent searches share one embedding call and one query
+search_flights = SingleFlight("search")
+
 
 class SearchQuery(BaseModel):
     """Search query model"""
@@ -22,6 +27,17 @@ class SearchQuery(BaseModel):
     enable_lemmatic: Optional[bool] = True
     enable_semantic: Optional[bool] = True
 
+    def flight_key(self, search_type: str) -> tuple:
+        """Key under which identical concurrent searches are coalesced"""
+        return (
+            search_type,
+            normalize_text(self.query),
+            self.limit,
+            self.enable_fulltext,
+            self.enable_lemmatic,
+            self.enable_semantic,
+        )
+
 
 @router.post("/hybrid")
 async def hybrid_search(search_query: SearchQuery, request: Request):
@@ -40,12 +56,15 @@ async def hybrid_search(search_query: SearchQuery, request: Request):
         search_service = HybridSearchService(db, qdrant)
 
         # Perform hybrid search
-        results = await search_service.hybrid_search(
-            query=search_query.query,
-            limit=search_query.limit,
-            enable_fulltext=search_query.enable_fulltext,
-            enable_lemmatic=search_query.enable_lemmatic,
-            enable_semantic=search_query.enable_semantic
+        results = await search_flights.do(
+            search_query.flight_key("hybrid"),
+            lambda: search_service.hybrid_search(
+                query=search_query.query,
+                limit=search_query.limit,
+                enable_fulltext=search_query.enable_fulltext,
+                enable_lemmatic=search_query.enable_lemmatic,
+                enable_semantic=search_query.enable_semantic
+            )
         )
 
         return results
@@ -65,9 +84,12 @@ async def fulltext_search(search_query: SearchQuery, request: Request):
         qdrant = request.app.state.qdrant
         search_service = HybridSearchService(db, qdrant)
 
-        results = await search_service.fulltext_search(
-            query=search_query.query,
-            limit=search_query.limit
+        results = await search_flights.do(
+            search_query.flight_key("fulltext"),
+            lambda: search_service.fulltext_search(
+                query=search_query.query,
+                limit=search_query.limit
+            )
         )
 
         return {
@@ -90,9 +112,12 @@ async def lemmatic_search(search_query: SearchQuery, request: Request):
         qdrant = request.app.state.qdrant
         search_service = HybridSearchService(db, qdrant)
 
-        results = await search_service.lemmatic_search(
-            query=search_query.query,
-            limit=search_query.limit
+        results = await search_flights.do(
+            search_query.flight_key("lemmatic"),
+            lambda: search_service.lemmatic_search(
+                query=search_query.query,
+                limit=search_query.limit
+            )
         )
 
         return {
@@ -115,9 +140,12 @@ async def semantic_search(search_query: SearchQuery, request: Request):
         qdrant = request.app.state.qdrant
         search_service = HybridSearchService(db, qdrant)
 
-        results = await search_service.semantic_search(
-            query=search_query.query,
-            limit=search_query.limit
+        results = await search_flights.do(
+            search_query.flight_key("semantic"),
+            lambda: search_service.semantic_search(
+                query=search_query.query,
+                limit=search_query.limit
+            )
         )
 
         return {
@@ -140,9 +168,12 @@ async def search_knowledge_graph(search_query: SearchQuery, request: Request):
         qdrant = request.app.state.qdrant
         search_service = HybridSearchService(db, qdrant)
 
-        results = await search_service.search_knowledge_graph(
-            query=search_query.query,
-            limit=search_query.limit
+        results = await search_flights.do(
+            search_query.flight_key("kg"),
+            lambda: search_service.search_knowledge_graph(
+                query=search_query.query,
+                limit=search_query.limit
+            )
         )
 
         return {
@@ -5,13 +5,24 @@ Endpoints for accessing the 289 ancient texts
 """
 
 from fastapi import APIRouter, HTTPException, Request
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import logging
 
+from services.citation_resolver import get_citation_resolver
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MAX_CITATIONS_PER_REQUEST = 500
+
+
+class CitationResolveRequest(BaseModel):
+    """Batch of citations to resolve to text spans"""
+    citations: List[str] = Field(..., min_length=1, max_length=MAX_CITATIONS_PER_REQUEST)
+    include_text: bool = False
+
 
 @router.get("/list")
 async def list_texts(
@@ -80,6 +91,35 @@ async def list_texts(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/citations/resolve")
+async def resolve_citations(payload: CitationResolveRequest, request: Request):
+    """
+    Resolve citations ("Cicero, De Fato 40") to text spans in one call
+    Unresolvable citations map to null; include_text adds the span text (one extra query)
+    """
+    try:
+        resolver = get_citation_resolver(request.app.state.db)
+        await resolver.ensure_index()
+
+        resolved = resolver.resolve_many(payload.citations)
+        found = [passage for passage in resolved.values() if passage is not None]
+        if payload.include_text:
+            await resolver.fetch_texts(found)
+
+        return {
+            'resolved': {
+                citation: passage.to_dict() if passage else None
+                for citation, passage in resolved.items()
+            },
+            'found': len(found),
+            'total': len(resolved)
+        }
+
+    except Exception as e:
+        logger.error(f"Error resolving citations: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{text_id}")
 async def get_text(text_id: str, request: Request):
     """Get full text content"""
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Offline GraphRAG benchmark
+Runs GraphRAGService end to end against the KG with a hashing embedder, in-process vector index and fake LLM
+
+Usage (from backend/):
+    python benchmark_graphrag.py
+    python benchmark_graphrag.py --iterations 5 --expansion both --llm-latency 0.05
+    python benchmark_graphrag.py --json after.json --baseline before.json --max-regression 0.25
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# graphrag_service refuses to import without a key; nothing here calls Gemini
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+DEFAULT_QUESTIONS = [
+    "What is Aristotle's view on voluntary action?",
+    "How did Chrysippus reconcile fate and moral responsibility?",
+    "What is the lazy argument and how did the Stoics answer it?",
+    "How did Epicurus use the swerve to defend freedom?",
+    "What did Carneades argue against Stoic determinism?",
+    "How does Alexander of Aphrodisias define what is up to us?",
+    "What is the Master Argument of Diodorus Cronus?",
+    "How did Augustine relate divine foreknowledge to free will?",
+    "What role does assent play in Stoic theories of action?",
+    "How did Cicero's De Fato treat the cylinder analogy?",
+    "What did Plotinus say about self-determination?",
+    "How did Origen connect free choice and providence?",
+    "What is eph' hēmin and how did its meaning change?",
+    "How did Boethius argue that foreknowledge does not necessitate?",
+    "What is the difference between hard determinism and compatibilism in antiquity?",
+    "Who criticised astrological fatalism and why?",
+]
+
+# Stages faster than this are too noisy to flag as regressions
+REGRESSION_FLOOR_MS = 0.5
+
+_HEADING = re.compile(r"^## (.+)$", re.MULTILINE)
+
+
+class FakeLLMService:
+    """Stands in for LLMService: fixed latency with seeded jitter, answer built from the context headings"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    async def generate_response(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        provider: Any = None,
+        priority: Any = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, Any]:
+        delay = max(0.0, self.random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        sources = _HEADING.findall(prompt)[:3]
+        answer = "According to " + "; ".join(sources) + "." if sources else "The Knowledge Base is silent."
+        return {
+            "response": answer,
+            "provider": "fake",
+            "model": "fake",
+            "tokens_used": len(prompt.split()) + len(answer.split()),
+        }
+
+
+def build_service(llm: FakeLLMService, dimensions: int):
+    """GraphRAGService wired to the in-process embedder and index"""
+    from services.graphrag_service import GraphRAGService
+    from services.local_retrieval import HashingEmbedder, InMemoryVectorIndex
+
+    class OfflineGraphRAGService(GraphRAGService):
+        embedder = HashingEmbedder(dimensions)
+
+        async def embed_query(self, query: str) -> Optional[List[float]]:
+            return self.embedder.embed(query).tolist() if query.strip() else None
+
+        async def embed_queries(self, queries: List[str], batch_size: int = 100) -> Optional[np.ndarray]:
+            return self.embedder.embed_many(queries)
+
+    service = OfflineGraphRAGService(None, None, llm)
+    started = time.perf_counter()
+    service.qdrant = InMemoryVectorIndex.from_kg(service.kg_data, service.embedder)
+    index_ms = (time.perf_counter() - started) * 1000
+    print(f"KG: {len(service.kg_data['nodes'])} nodes, {len(service.kg_data['edges'])} edges "
+          f"(index built in {index_ms:.0f} ms, {dimensions} dims)")
+    return service
+
+
+def load_questions(path: Optional[str]) -> List[str]:
+    """Plain text (one question per line) or JSONL with a "question" or "query" field"""
+    if not path:
+        return list(DEFAULT_QUESTIONS)
+    questions = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            record = json.loads(line)
+            line = record.get("question") or record.get("query") or ""
+        if line:
+            questions.append(line)
+    return questions
+
+
+def summarise(samples: Dict[str, List[float]], wall_seconds: float, queries: int) -> Dict[str, Any]:
+    """Percentiles in milliseconds per stage, plus throughput"""
+    stages = {}
+    for stage, values in samples.items():
+        array = np.asarray(values)
+        stages[stage] = {
+            "count": len(values),
+            "p50": round(float(np.percentile(array, 50)), 3),
+            "p90": round(float(np.percentile(array, 90)), 3),
+            "p99": round(float(np.percentile(array, 99)), 3),
+            "mean": round(float(array.mean()), 3),
+        }
+    return {
+        "queries": queries,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_qps": round(queries / wall_seconds, 2) if wall_seconds else 0.0,
+        "stages": stages,
+    }
+
+
+async def run_mode(service, questions: List[str], args: argparse.Namespace, expansion: str) -> Dict[str, Any]:
+    """Warm up, then answer every question ``iterations`` times and collect stage timings"""
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples: Dict[str, List[float]] = {}
+    failures = 0
+
+    async def ask(question: str, record: bool) -> None:
+        nonlocal failures
+        async with semaphore:
+            result = await service.answer_question(
+                question,
+                semantic_k=args.semantic_k,
+                graph_depth=args.graph_depth,
+                max_context=args.max_context,
+                use_cache=False,
+                expansion=expansion,
+                include_timings=True
+            )
+        if not record:
+            return
+        if not result.get("success"):
+            failures += 1
+            return
+        timings = result["parameters"]["timings"]
+        for stage, ms in timings["stages"].items():
+            samples.setdefault(stage, []).append(ms)
+        samples.setdefault("total", []).append(timings["total_ms"])
+
+    for _ in range(args.warmup):
+        await asyncio.gather(*(ask(question, False) for question in questions))
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        await asyncio.gather(*(ask(question, True) for question in questions))
+    wall = time.perf_counter() - started
+
+    summary = summarise(samples, wall, len(questions) * args.iterations)
+    summary["failures"] = failures
+    return summary
+
+
+def print_report(expansion: str, summary: Dict[str, Any]) -> None:
+    print(f"\n=== expansion={expansion}: {summary['queries']} queries in {summary['wall_seconds']:.2f}s "
+          f"({summary['throughput_qps']} q/s, {summary['failures']} failed) ===")
+    print(f"{'stage':<16} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'mean ms':>10}")
+    for stage, stats in summary["stages"].items():
+        print(f"{stage:<16} {stats['p50']:>10.2f} {stats['p90']:>10.2f} {stats['p99']:>10.2f} {stats['mean']:>10.2f}")
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Stages whose p50 grew by more than ``max_regression`` (fraction) over the baseline"""
+    regressions = []
+    for expansion, summary in results.items():
+        for stage, stats in summary["stages"].items():
+            before = baseline.get(expansion, {}).get("stages", {}).get(stage)
+            if not before or before["p50"] < REGRESSION_FLOOR_MS:
+                continue
+            growth = stats["p50"] / before["p50"] - 1
+            if growth > max_regression:
+                regressions.append(
+                    f"{expansion}/{stage}: p50 {before['p50']:.2f} -> {stats['p50']:.2f} ms (+{growth:.0%})"
+                )
+    return regressions
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    questions = load_questions(args.questions)
+    service = build_service(FakeLLMService(args.llm_latency, args.llm_jitter, args.seed), args.dimensions)
+    modes = ["bfs", "ppr"] if args.expansion == "both" else [args.expansion]
+
+    results = {}
+    for expansion in modes:
+        results[expansion] = await run_mode(service, questions, args, expansion)
+        print_report(expansion, results[expansion])
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.json}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = find_regressions(results, baseline, args.max_regression)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo stage regressed more than {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline GraphRAG pipeline benchmark")
+    parser.add_argument("--kg", help="Knowledge Graph JSON (default: KG_PATH resolution)")
+    parser.add_argument("--questions", help="Question file (text lines or JSONL)")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--expansion", choices=["bfs", "ppr", "both"], default="both")
+    parser.add_argument("--semantic-k", type=int, default=10)
+    parser.add_argument("--graph-depth", type=int, default=2)
+    parser.add_argument("--max-context", type=int, default=15)
+    parser.add_argument("--dimensions", type=int, default=512, help="Hashing embedder dimensions")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="Std-dev of fake LLM latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json result")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.kg:
+        os.environ["KG_PATH"] = args.kg
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Batch GraphRAG evaluation
+Answers a JSONL question set with vectorised retrieval and queued generation; resumable
+
+Input: one JSON object per line with "question" (or "query") and optional "id";
+any other fields (expected answer, tags, ...) are copied to the output.
+
+Usage (from backend/):
+    python evaluate_graphrag.py questions.jsonl --output results.jsonl
+    python evaluate_graphrag.py questions.jsonl --expansion ppr --concurrency 2
+    python evaluate_graphrag.py questions.jsonl --offline          # hashing embedder + fake LLM
+
+Interrupted runs continue where they stopped when re-run with the same
+--output; --retry-failed also re-runs questions whose last record failed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+# graphrag_service refuses to import without a key; --offline never calls Gemini
+if "--offline" in sys.argv:
+    os.environ.setdefault("GEMINI_API_KEY", "offline-evaluation")
+
+
+async def build_online(args: argparse.Namespace):
+    """GraphRAGService backed by Gemini embeddings, Qdrant node vectors and the configured LLMs"""
+    from services.graphrag_service import GraphRAGService
+    from services.llm_service import LLMService
+    from services.local_retrieval import InMemoryVectorIndex
+    from services.qdrant_service import QdrantService
+
+    qdrant = QdrantService()
+    await qdrant.connect()
+    node_ids, vectors = await qdrant.node_vectors()
+    if not node_ids:
+        raise RuntimeError("No KG node vectors found in Qdrant")
+    index = InMemoryVectorIndex(node_ids, np.asarray(vectors, dtype=np.float32))
+    return GraphRAGService(qdrant, None, LLMService()), index
+
+
+def build_offline(args: argparse.Namespace):
+    """Offline service from the benchmark harness (hashing embedder, in-process index, fake LLM)"""
+    from benchmark_graphrag import FakeLLMService, build_service
+
+    service = build_service(FakeLLMService(args.llm_latency), dimensions=512)
+    return service, service.qdrant
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    from services.graphrag_batch import BatchEvaluator, load_questions
+
+    questions = load_questions(Path(args.input))
+    output = Path(args.output) if args.output else Path(args.input).with_suffix(".results.jsonl")
+
+    if args.offline:
+        service, index = build_offline(args)
+    else:
+        service, index = await build_online(args)
+
+    evaluator = BatchEvaluator(
+        service,
+        index,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        semantic_k=args.semantic_k,
+        graph_depth=args.graph_depth,
+        max_context=args.max_context,
+        temperature=args.temperature,
+        expansion=args.expansion,
+        max_nodes=args.max_nodes
+    )
+    stats = await evaluator.run(questions, output, retry_failed=args.retry_failed, limit=args.limit)
+
+    print(json.dumps(stats.summary(), indent=2))
+    print(f"Results: {output}")
+    return 0 if stats.failed == 0 else 1
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    from services.graphrag_batch import EVAL_BATCH_SIZE, EVAL_CONCURRENCY
+
+    parser = argparse.ArgumentParser(description="Batch GraphRAG evaluation over a JSONL question set")
+    parser.add_argument("input", help="JSONL file with one question per line")
+    parser.add_argument("--output", help="Results JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=EVAL_CONCURRENCY, help="Generations in flight")
+    parser.add_argument("--batch-size", type=int, default=EVAL_BATCH_SIZE, help="Questions per embedding batch")
+    parser.add_argument("--semantic-k", type=int, default=10)
+    parser.add_argument("--graph-depth", type=int, default=2)
+    parser.add_argument("--max-context", type=int, default=15)
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--expansion", choices=["bfs", "ppr"])
+    parser.add_argument("--max-nodes", type=int)
+    parser.add_argument("--limit", type=int, help="Run at most this many new questions")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run questions whose last record failed")
+    parser.add_argument("--offline", action="store_true", help="Hashing embedder and fake LLM (no services)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Fake LLM latency with --offline")
+    parser.add_argument("--kg", help="Knowledge Graph JSON (default: KG_PATH resolution)")
+    return parser.parse_args(argv)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.kg:
+        os.environ["KG_PATH"] = args.kg
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("services.graphrag_batch").setLevel(logging.INFO)
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
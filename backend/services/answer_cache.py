@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Semantic answer cache for GraphRAG
+Serves repeated and near-duplicate questions without re-running retrieval and synthesis
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.metrics import track_cache_operation
+
+logger = logging.getLogger(__name__)
+
+ANSWER_CACHE_SIZE = int(os.getenv("GRAPHRAG_ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = int(os.getenv("GRAPHRAG_ANSWER_CACHE_TTL", "86400"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("GRAPHRAG_ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_ENABLED = os.getenv("GRAPHRAG_ANSWER_CACHE", "true").lower() == "true"
+
+# Temperatures within the same 0.1 step share cached answers
+TEMPERATURE_BUCKET = 0.1
+
+ParamsKey = Tuple[Any, ...]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a question, trailing punctuation dropped"""
+    return _WHITESPACE.sub(" ", query.strip().lower()).rstrip(" ?!.")
+
+
+def params_key(
+    semantic_k: int,
+    graph_depth: int,
+    max_context: int,
+    temperature: float,
+    deep_mode: bool = False,
+    expansion: str = "bfs",
+    max_nodes: Optional[int] = None,
+) -> ParamsKey:
+    """Pipeline parameters that change the answer; only equal keys may share entries"""
+    bucket = round(round(temperature / TEMPERATURE_BUCKET) * TEMPERATURE_BUCKET, 2)
+    return (semantic_k, graph_depth, max_context, bucket, bool(deep_mode), expansion, max_nodes)
+
+
+@dataclass
+class CachedAnswer:
+    """One cached GraphRAG response"""
+    query: str
+    params: ParamsKey
+    node_ids: FrozenSet[str]
+    vector: Optional[np.ndarray]
+    response: Dict[str, Any]
+    expires_at: float
+    hits: int = field(default=0)
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed by query embedding and pipeline parameters
+
+    A lookup hits on an identical normalised question, or when the cosine
+    similarity between query embeddings clears ``threshold`` and semantic
+    search returned the same starting nodes. Every entry belongs to one KG
+    version; the cache empties itself when a different version is seen.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ANSWER_CACHE_SIZE,
+        ttl: int = ANSWER_CACHE_TTL,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[Tuple[ParamsKey, str], CachedAnswer]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "node_mismatches": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def _check_version(self, version: Optional[str]) -> None:
+        if version != self.version:
+            if self._entries:
+                logger.info(
+                    f"KG version changed ({self.version} -> {version}); "
+                    f"dropping {len(self._entries)} cached answers"
+                )
+                self._stats["invalidations"] += 1
+            self._entries.clear()
+            self.version = version
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+    @staticmethod
+    def _unit(vector: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+        if vector is None:
+            return None
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        if norm == 0.0:
+            return None
+        return array / norm
+
+    def _hit(self, entry: CachedAnswer, query: str, match: str, similarity: float) -> Dict[str, Any]:
+        entry.hits += 1
+        self._stats[f"{match}_hits"] += 1
+        track_cache_operation("graphrag_answer", hit=True)
+
+        response = copy.deepcopy(entry.response)
+        response["query"] = query
+        response["cached"] = True
+        response["cache"] = {
+            "match": match,
+            "similarity": round(similarity, 4),
+            "cached_query": entry.query,
+        }
+        return response
+
+    def _miss(self) -> None:
+        self._stats["misses"] += 1
+        track_cache_operation("graphrag_answer", hit=False)
+
+    def lookup_exact(self, query: str, params: ParamsKey, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Hit on an identical normalised question, before any embedding call
+
+        Retrieval is deterministic for a fixed KG version, so an identical
+        question needs no node-set check.
+        """
+        with self._lock:
+            self._check_version(version)
+            key = (params, normalize_query(query))
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.time():
+                return None
+            self._entries.move_to_end(key)
+            return self._hit(entry, query, "exact", 1.0)
+
+    def lookup(
+        self,
+        query: str,
+        vector: Optional[Sequence[float]],
+        node_ids: Iterable[str],
+        params: ParamsKey,
+        version: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Nearest cached question with the same parameters and starting nodes
+
+        Returns:
+            Cached response annotated with ``cached``/``cache``, or None
+        """
+        unit = self._unit(vector)
+        wanted = frozenset(node_ids)
+        with self._lock:
+            self._check_version(version)
+            now = time.time()
+            self._purge_expired(now)
+
+            candidates = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.params == params and entry.vector is not None
+            ]
+            if unit is None or not candidates:
+                self._miss()
+                return None
+
+            matrix = np.stack([entry.vector for _, entry in candidates])
+            similarities = matrix @ unit
+            for position in np.argsort(-similarities):
+                similarity = float(similarities[position])
+                if similarity < self.threshold:
+                    break
+                key, entry = candidates[int(position)]
+                if entry.node_ids == wanted:
+                    self._entries.move_to_end(key)
+                    return self._hit(entry, query, "semantic", similarity)
+                self._stats["node_mismatches"] += 1
+
+            self._miss()
+            return None
+
+    def store(
+        self,
+        query: str,
+        vector: Optional[Sequence[float]],
+        node_ids: Iterable[str],
+        params: ParamsKey,
+        version: Optional[str],
+        response: Dict[str, Any],
+    ) -> None:
+        """Cache a successful response"""
+        if not response.get("success"):
+            return
+        with self._lock:
+            self._check_version(version)
+            key = (params, normalize_query(query))
+            self._entries[key] = CachedAnswer(
+                query=query,
+                params=params,
+                node_ids=frozenset(node_ids),
+                vector=self._unit(vector),
+                response=copy.deepcopy(response),
+                expires_at=time.time() + self.ttl,
+            )
+            self._entries.move_to_end(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self) -> int:
+        """Drop all entries; returns the number removed"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit ratios and sizes"""
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["semantic_hits"]
+            lookups = hits + self._stats["misses"]
+            top = sorted(self._entries.values(), key=lambda entry: entry.hits, reverse=True)[:5]
+            return {
+                **self._stats,
+                "hits": hits,
+                "lookups": lookups,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "semantic_hit_ratio": round(self._stats["semantic_hits"] / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "threshold": self.threshold,
+                "ttl": self.ttl,
+                "kg_version": self.version,
+                "enabled": ANSWER_CACHE_ENABLED,
+                "top_questions": [{"query": entry.query, "hits": entry.hits} for entry in top if entry.hits],
+            }
+
+
+_answer_cache: Optional[SemanticAnswerCache] = None
+
+
+def get_answer_cache() -> SemanticAnswerCache:
+    """Process-wide answer cache"""
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache()
+    return _answer_cache
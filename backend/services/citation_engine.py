@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Citation classification engine
+Classifies ancient-source citations by source type, citation format and retrieval strategy
+with compiled name matchers and memoised results, for scripts and the API alike
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Tuple
+
+Classification = Dict[str, Any]
+
+# Works available through CTS, keyed by the "Author, Work" prefix of a citation
+CTS_WORKS: Dict[str, str] = {
+    'Cicero, De Fato': 'urn:cts:latinLit:phi0474.phi054',
+    'Cicero, Academica': 'urn:cts:latinLit:phi0474.phi006',
+    'Cicero, De Natura Deorum': 'urn:cts:latinLit:phi0474.phi038',
+    'Cicero, De Divinatione': 'urn:cts:latinLit:phi0474.phi024',
+    'Lucretius, De Rerum Natura': 'urn:cts:latinLit:phi0550.phi001',
+    'Aristotle, Nicomachean Ethics': 'urn:cts:greekLit:tlg0086.tlg010',
+    'Aristotle, De Interpretatione': 'urn:cts:greekLit:tlg0086.tlg013',
+    'Aristotle, Eudemian Ethics': 'urn:cts:greekLit:tlg0086.tlg011',
+    'Alexander of Aphrodisias, De Fato': 'urn:cts:greekLit:tlg0085.tlg014',
+    'Epictetus, Discourses': 'urn:cts:greekLit:tlg0557.tlg001',
+    'Plutarch, De Stoicorum Repugnantiis': 'urn:cts:greekLit:tlg0007.tlg096',
+    'Plotinus, Enneads': 'urn:cts:greekLit:tlg0062.tlg001',
+    'Aulus Gellius, Noctes Atticae': 'urn:cts:latinLit:phi1254.phi001',
+}
+
+# Patristic authors (texts in OGL or Patrologia Graeca)
+PATRISTIC_AUTHORS: Tuple[str, ...] = (
+    'Origen', 'Augustine', 'Eusebius', 'Nemesius', 'Justin',
+    'Clement', 'Athanasius', 'Basil', 'Gregory', 'Ambrose',
+    'Jerome', 'Tertullian', 'Cyprian',
+)
+
+BIBLICAL_BOOKS: Tuple[str, ...] = (
+    'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy',
+    'Romans', 'Galatians', 'Corinthians', 'Ephesians', 'Philippians',
+    'Colossians', 'Thessalonians', 'Timothy', 'Titus', 'Philemon',
+    'Hebrews', 'James', 'Peter', 'John', 'Jude', 'Revelation',
+    'Matthew', 'Mark', 'Luke', 'Acts',
+    'Sirach', 'Wisdom', 'Ezra', 'Hebrew Bible', 'Septuagint', 'LXX',
+)
+
+# Abbreviated books ("Rom. 9:19", "1 Cor. 7:37") only count when followed by a number
+BIBLICAL_ABBREVIATIONS: Tuple[str, ...] = (
+    'Gen', 'Exod', 'Lev', 'Num', 'Deut', 'Rom', 'Gal', 'Cor', 'Eph', 'Phil',
+    'Col', 'Thess', 'Tim', 'Tit', 'Phlm', 'Heb', 'Jas', 'Pet', 'Rev',
+    'Matt', 'Mk', 'Lk', 'Jn', 'Sir', 'Wis',
+)
+
+# Source types in order of precedence, with their retrieval strategy and confidence
+SOURCE_TYPES: Dict[str, Tuple[str, str]] = {
+    'CTS': ('CTS_AUTO', 'high'),
+    'PATRISTIC': ('OGL_OR_PG', 'medium'),
+    'BIBLICAL': ('BIBLEHUB_OR_SEFARIA', 'high'),
+}
+
+WORK_RE = re.compile(r'^([^,\(]+(?:,\s*[^,\(]+)?)')
+
+# Citation formats, tried in order; the first matching pattern wins
+# Simple sections: "De Fato 28-33", "De Fato 43"
+SIMPLE_SECTIONS_RE = re.compile(r'\b\d+(?:-\d+)?\s*$')
+SECTION_RANGE_RE = re.compile(r'\b(\d+)(?:-(\d+))?')
+# Bekker pages: "1113b", "1109b30-1111b3"
+BEKKER_RE = re.compile(r'\b\d{4}[ab](?:\d+)?')
+BEKKER_REF_RE = re.compile(r'(\d{4}[ab](?:\d+)?)')
+# Book.Chapter: "III.5", "VII.2", "I.1"
+BOOK_CHAPTER_RE = re.compile(r'\b[IVX]+\.\d+')
+BOOK_CHAPTER_REF_RE = re.compile(r'([IVX]+)\.(\d+)')
+# Book with line numbers: "Book II, 216-293"
+BOOK_LINES_RE = re.compile(r'Book\s+[IVX]+.*?\d+', re.IGNORECASE)
+# Chapter:Verse (Biblical): "Romans 9:19"
+CHAPTER_VERSE_RE = re.compile(r'\b\d+:\d+')
+CHAPTER_VERSE_REF_RE = re.compile(r'(\d+):(\d+(?:-\d+)?)')
+
+
+def compile_names(names: Iterable[str], abbreviations: Iterable[str] = ()) -> Pattern[str]:
+    """
+    One alternation over a list of names
+
+    ``search`` is true exactly when some name occurs in the text, like
+    ``any(name in text for name in names)``, in a single scan. Abbreviations
+    only match as whole words ending in a period and followed by a number.
+    """
+    alternatives = [re.escape(name) for name in sorted(set(names), key=lambda name: (-len(name), name))]
+    abbreviations = sorted(set(abbreviations), key=lambda name: (-len(name), name))
+    if abbreviations:
+        # One branch for all of them: separate \b-anchored branches defeat the literal prefix scan
+        alternatives.append(f"\\b(?:{'|'.join(map(re.escape, abbreviations))})\\.(?=\\s*\\d)")
+    return re.compile('|'.join(alternatives))
+
+
+def detect_format(text: str) -> Tuple[str, List[Any]]:
+    """Citation format and the passage references it names"""
+    if SIMPLE_SECTIONS_RE.search(text):
+        passages: List[Any] = []
+        for start, end in SECTION_RANGE_RE.findall(text):
+            passages.extend(range(int(start), int(end or start) + 1))
+        return 'SIMPLE_SECTIONS', passages
+    if BEKKER_RE.search(text):
+        return 'BEKKER_PAGES', BEKKER_REF_RE.findall(text)
+    if BOOK_CHAPTER_RE.search(text):
+        return 'BOOK_CHAPTER', [f"{b}.{c}" for b, c in BOOK_CHAPTER_REF_RE.findall(text)]
+    if BOOK_LINES_RE.search(text):
+        return 'BOOK_LINES', []
+    if CHAPTER_VERSE_RE.search(text):
+        return 'CHAPTER_VERSE', [f"{c}:{v}" for c, v in CHAPTER_VERSE_REF_RE.findall(text)]
+    if '(complete' in text.lower():
+        return 'COMPLETE_TEXT', []
+    return 'UNKNOWN', []
+
+
+class CitationEngine:
+    """
+    Compiled citation classifier
+
+    Results are memoised by citation string (the same citations recur across
+    many nodes and edges); every call returns a fresh dict, so callers may
+    update it.
+    """
+
+    def __init__(self, cts_works: Optional[Mapping[str, str]] = None,
+                 patristic: Iterable[str] = PATRISTIC_AUTHORS,
+                 biblical: Iterable[str] = BIBLICAL_BOOKS,
+                 biblical_abbreviations: Iterable[str] = BIBLICAL_ABBREVIATIONS,
+                 cache_size: Optional[int] = 65536):
+        self.cts_works = dict(CTS_WORKS if cts_works is None else cts_works)
+        # Checked in order of precedence
+        self.matchers: List[Tuple[str, Pattern[str]]] = [
+            ('PATRISTIC', compile_names(patristic)),
+            ('BIBLICAL', compile_names(biblical, biblical_abbreviations)),
+        ]
+        self._cached = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, citation: str) -> Tuple:
+        match = WORK_RE.match(citation)
+        work = match.group(1).strip() if match else None
+
+        cts_urn = self.cts_works.get(work) if work is not None else None
+        if cts_urn:
+            source_type = 'CTS'
+        else:
+            source_type = next((name for name, matcher in self.matchers if matcher.search(citation)), 'UNKNOWN')
+
+        citation_format, passages = detect_format(citation)
+        return work, source_type, cts_urn, citation_format, tuple(passages)
+
+    def classify(self, citation: str) -> Classification:
+        """Classify one citation"""
+        work, source_type, cts_urn, citation_format, passages = self._cached(citation)
+        strategy, confidence = SOURCE_TYPES.get(source_type, ('MANUAL', 'low'))
+        return {
+            'citation': citation,
+            'work': work,
+            'source_type': source_type,
+            'citation_format': citation_format,
+            'retrieval_strategy': strategy,
+            'cts_urn': cts_urn,
+            'passages': list(passages),
+            'confidence': confidence,
+        }
+
+    def classify_many(self, citations: Iterable[str]) -> List[Classification]:
+        """Classify citations in bulk, in input order; repeated strings are classified once"""
+        return [self.classify(citation) for citation in citations]
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def clear_cache(self) -> None:
+        self._cached.cache_clear()
+
+
+_default_engine: Optional[CitationEngine] = None
+
+
+def get_citation_engine() -> CitationEngine:
+    """Shared engine with the built-in name lists"""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = CitationEngine()
+    return _default_engine
+
+
+def classify_citation(citation: str) -> Classification:
+    return get_citation_engine().classify(citation)
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Citation-to-passage resolver
+Maps ancient-source citations ("Cicero, De Fato 40") to text spans through a reference index
+built once from free_will.texts and free_will.text_divisions
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from services.citation_engine import CitationEngine, get_citation_engine
+from services.db import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+TEXTS_SQL = """
+SELECT id, title, author, kg_work_id, LENGTH(raw_text) AS text_length
+FROM free_will.texts
+"""
+
+DIVISIONS_SQL = """
+SELECT id, text_id, full_reference, char_position, char_length
+FROM free_will.text_divisions
+WHERE full_reference IS NOT NULL AND char_position IS NOT NULL
+"""
+
+# All resolved spans in one round-trip, returned in request order
+PASSAGE_TEXT_SQL = """
+SELECT r.i, substr(t.raw_text, r.pos + 1, r.len) AS text
+FROM unnest($1::uuid[], $2::int[], $3::int[]) WITH ORDINALITY AS r(text_id, pos, len, i)
+JOIN free_will.texts t ON t.id = r.text_id
+ORDER BY r.i
+"""
+
+# Abbreviated titles common in the KG citations
+WORK_ALIASES: Dict[str, str] = {
+    'en': 'nicomachean ethics',
+    'ne': 'nicomachean ethics',
+    'eth nic': 'nicomachean ethics',
+    'ee': 'eudemian ethics',
+    'nd': 'de natura deorum',
+    'drn': 'de rerum natura',
+}
+
+# Ranges are expanded reference by reference up to this many references; a
+# longer range keeps its first references and its last, so the resolved span
+# still runs from the first to the last reference
+MAX_RANGE = 50
+
+# Where the reference part of a citation starts: after the work name, at a
+# number, "Book II" or a Roman numeral followed by a dot (or ending the citation)
+REFERENCE_START_RE = re.compile(r'[\s,]+(?=Book\s+[IVXLC]+\b|[IVXLC]+\.\d|[IVXLC]+,?\s*$|\d)')
+# "Book II, 216-293" -> "II.216-293"
+BOOK_PREFIX_RE = re.compile(r'^Book\s+([IVXLC]+)\b,?\s*', re.IGNORECASE)
+# Commentary after the reference: "(complete text)", " - develops ...", "; cf. ..."
+TRAILER_RE = re.compile(r'\s*(?:\(|\s[-–—]\s|;).*$', re.DOTALL)
+
+ROMAN_RE = re.compile(r'[IVXLC]+|[ivxlc]+')
+ROMAN_VALUES = {'i': 1, 'v': 5, 'x': 10, 'l': 50, 'c': 100}
+
+BEKKER_RANGE_RE = re.compile(
+    r'(\d{3,4})\s?([ab])(\d+)?(?:\s*[-–]\s*(?:(\d{3,4})\s?)?([ab])?(\d+)?)?'
+)
+DOTTED_RANGE_RE = re.compile(
+    r'(?<![\w.])((?:[IVXLC]+|\d+)\b(?:\s*[.:]\s*\d+\b)*)(?:\s*[-–]\s*(\d+)\b(?![.:]\d))?'
+)
+
+PassageLocation = Tuple[str, Any, str, int, int]   # text_id, division id, full reference, position, length
+
+
+def roman_to_int(numeral: str) -> int:
+    total = 0
+    values = [ROMAN_VALUES[char] for char in numeral.lower()]
+    for value, following in zip(values, values[1:] + [0]):
+        total += -value if value < following else value
+    return total
+
+
+def normalize_work(name: str) -> str:
+    """Lowercase, diacritic-free, punctuation-free work key"""
+    folded = ''.join(c for c in unicodedata.normalize('NFD', name or '') if not unicodedata.combining(c))
+    key = ' '.join(re.sub(r'[^\w]+', ' ', folded.lower()).split())
+    for alias, title in WORK_ALIASES.items():
+        # "en" alone or after the author ("aristotle en")
+        if key == alias or key.endswith(f" {alias}"):
+            return key[:len(key) - len(alias)] + title
+    return key
+
+
+def canonical_reference(reference: str) -> str:
+    """
+    Canonical form of a reference: Roman numerals become numbers, separators
+    become dots ("III.5" -> "3.5", "9:19" -> "9.19", "1113b30" -> "1113b.30")
+    """
+    parts = []
+    for part in re.split(r'\s*[.:,]\s*|\s+', str(reference).strip()):
+        if not part:
+            continue
+        if ROMAN_RE.fullmatch(part):
+            parts.append(str(roman_to_int(part)))
+            continue
+        bekker = re.fullmatch(r'(\d{3,4})([ab])(\d+)?', part)
+        if bekker:
+            parts.append(f"{int(bekker.group(1))}{bekker.group(2)}")
+            if bekker.group(3):
+                parts.append(str(int(bekker.group(3))))
+            continue
+        parts.append(str(int(part)) if part.isdigit() else part.lower())
+    return '.'.join(parts)
+
+
+def split_citation(citation: str) -> Tuple[str, str]:
+    """(work, reference part) of a citation, without trailing commentary"""
+    head = TRAILER_RE.sub('', citation).strip()
+    match = REFERENCE_START_RE.search(head)
+    if not match:
+        return head.strip(' ,'), ''
+    return head[:match.start()].strip(' ,'), head[match.end():].strip()
+
+
+def _expand_range(first: int, last: int) -> List[int]:
+    """first..last, capped at MAX_RANGE numbers with ``last`` always included"""
+    numbers = list(range(first, min(last, first + MAX_RANGE - 2) + 1))
+    if numbers[-1] != last:
+        numbers.append(last)
+    return numbers
+
+
+def _bekker_pages(start_page: int, start_column: str, end_page: int, end_column: str) -> List[str]:
+    # Columns a and b of each page as consecutive numbers
+    first = start_page * 2 + (start_column == 'b')
+    last = end_page * 2 + (end_column == 'b')
+    return [f"{n // 2}{'ab'[n % 2]}" for n in _expand_range(first, last)]
+
+
+def bekker_references(text: str) -> List[str]:
+    """Bekker page+column references ("1109b30-1111b3" -> 1109b, 1110a, ..., 1111b)"""
+    references: List[str] = []
+    for page, column, _, end_page, end_column, _ in BEKKER_RANGE_RE.findall(text):
+        start = (int(page), column)
+        end = (int(end_page or page), end_column or (column if not end_page else 'b'))
+        references.extend(_bekker_pages(*start, *end) if end > start else [f"{start[0]}{start[1]}"])
+    return references
+
+
+def dotted_references(text: str) -> List[str]:
+    """Canonical book.chapter.section references, ranges expanded on their last level"""
+    references: List[str] = []
+    for reference, end in DOTTED_RANGE_RE.findall(text):
+        canonical = canonical_reference(reference)
+        if not canonical:
+            continue
+        head, _, last = canonical.rpartition('.')
+        if end and last.isdigit() and int(last) < int(end):
+            references.extend(f"{head}.{n}" if head else str(n) for n in _expand_range(int(last), int(end)))
+        else:
+            references.append(canonical)
+    return references
+
+
+def citation_references(reference_part: str, citation_format: str) -> List[str]:
+    """References named by a citation, parsed according to its citation_parser format"""
+    reference_part = BOOK_PREFIX_RE.sub(lambda m: f"{m.group(1)}.", reference_part)
+    if citation_format == 'BEKKER_PAGES':
+        return bekker_references(reference_part)
+    if citation_format == 'COMPLETE_TEXT':
+        return []
+    return dotted_references(reference_part)
+
+
+@dataclass
+class ResolvedPassage:
+    """Text span for one citation"""
+    citation: str
+    text_id: str
+    title: str
+    author: Optional[str]
+    references: List[str] = field(default_factory=list)
+    char_position: int = 0
+    char_length: int = 0
+    exact: bool = True
+    text: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'citation': self.citation,
+            'text_id': self.text_id,
+            'title': self.title,
+            'author': self.author,
+            'references': self.references,
+            'char_position': self.char_position,
+            'char_length': self.char_length,
+            'exact': self.exact,
+            **({'text': self.text} if self.text is not None else {}),
+        }
+
+
+class ReferenceIndex:
+    """
+    Work key + canonical reference -> division span
+
+    Work keys are the normalised title and "author title" of every text, so
+    both "De Fato 40" and "Cicero, De Fato 40" find Cicero's text; a title
+    shared by several authors only resolves with the author given.
+    """
+
+    def __init__(self, texts: Iterable[Dict[str, Any]], divisions: Iterable[Dict[str, Any]]):
+        self.texts: Dict[str, Dict[str, Any]] = {}
+        self.works: Dict[str, List[str]] = {}
+        for text in texts:
+            text_id = str(text['id'])
+            self.texts[text_id] = text
+            keys = {normalize_work(text.get('title') or '')}
+            if text.get('author'):
+                keys.add(normalize_work(f"{text['author']} {text.get('title') or ''}"))
+            if text.get('kg_work_id'):
+                keys.add(normalize_work(text['kg_work_id']))
+            for key in keys - {''}:
+                self.works.setdefault(key, []).append(text_id)
+
+        self.references: Dict[str, Dict[str, PassageLocation]] = {}
+        for division in divisions:
+            text_id = str(division['text_id'])
+            location = (text_id, division['id'], division['full_reference'],
+                        division['char_position'], division['char_length'] or 0)
+            # Several divisions can share a reference (e.g. an edition and its translation); keep the first
+            self.references.setdefault(text_id, {}).setdefault(canonical_reference(division['full_reference']), location)
+
+    def candidates(self, work: str) -> List[str]:
+        """Texts a work name refers to; empty when unknown or ambiguous between authors"""
+        text_ids = self.works.get(normalize_work(work), [])
+        authors = {normalize_work(self.texts[text_id].get('author') or '') for text_id in text_ids}
+        return text_ids if len(authors) <= 1 else []
+
+    def locate(self, text_id: str, reference: str) -> Tuple[Optional[PassageLocation], bool]:
+        """Division for a reference, falling back to its nearest cited ancestor (exact=False)"""
+        references = self.references.get(text_id, {})
+        parts = reference.split('.')
+        for depth in range(len(parts), 0, -1):
+            location = references.get('.'.join(parts[:depth]))
+            if location:
+                return location, depth == len(parts)
+        return None, False
+
+    def __len__(self) -> int:
+        return sum(len(references) for references in self.references.values())
+
+
+class CitationResolver:
+    """
+    Resolves citations against a ReferenceIndex built once from PostgreSQL
+
+    Resolution itself is an in-memory lookup memoised by citation string in a
+    bounded LRU cache (citations come from clients); passage text for a whole
+    batch is fetched with a single query.
+    """
+
+    def __init__(self, db_service: Optional[DatabaseService], engine: Optional[CitationEngine] = None,
+                 cache_size: Optional[int] = 8192):
+        self.db = db_service
+        self.engine = engine or get_citation_engine()
+        self.index: Optional[ReferenceIndex] = None
+        self._cached = lru_cache(maxsize=cache_size)(self._resolve)
+        self._lock = asyncio.Lock()
+        self._warming: Optional[asyncio.Future] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def load(self, texts: Iterable[Dict[str, Any]], divisions: Iterable[Dict[str, Any]]) -> ReferenceIndex:
+        self.index = ReferenceIndex(texts, divisions)
+        self._cached.cache_clear()
+        logger.info(f"Citation reference index: {len(self.index.texts)} texts, {len(self.index):,} references")
+        return self.index
+
+    async def ensure_index(self, refresh: bool = False) -> ReferenceIndex:
+        """Build the index from the database (once, unless ``refresh``)"""
+        async with self._lock:
+            if self.index is None or refresh:
+                texts, divisions = await asyncio.gather(self.db.fetch(TEXTS_SQL), self.db.fetch(DIVISIONS_SQL))
+                self.load(texts, divisions)
+        return self.index
+
+    def warm(self) -> None:
+        """Start building the index in the background if it is not built yet"""
+        if self.index is not None or self.db is None or not self.db.is_connected():
+            return
+        if self._warming is None or self._warming.done():
+            self._warming = asyncio.ensure_future(self._warm())
+
+    async def _warm(self) -> None:
+        try:
+            await self.ensure_index()
+        except Exception as e:
+            logger.error(f"Citation reference index build failed: {e}")
+
+    def resolve(self, citation: str) -> Optional[ResolvedPassage]:
+        """Span of one citation, or None if its work or references are not in the index"""
+        if self.index is None:
+            raise RuntimeError("Citation reference index not built")
+        resolved = self._cached(citation)
+        return None if resolved is None else replace(resolved, references=list(resolved.references))
+
+    def _resolve(self, citation: str) -> Optional[ResolvedPassage]:
+        work, reference_part = split_citation(citation)
+        citation_format = self.engine.classify(citation)['citation_format']
+        references = citation_references(reference_part, citation_format)
+
+        best: Optional[Tuple[str, List[PassageLocation], bool]] = None
+        for text_id in self.index.candidates(work):
+            if not references:
+                best = (text_id, [], True)
+                break
+            found = [self.index.locate(text_id, reference) for reference in references]
+            locations = [location for location, _ in found if location]
+            exact = bool(locations) and all(is_exact for _, is_exact in found)
+            # Most references found wins; among equals, exact matches first
+            if locations and (best is None or (len(locations), exact) > (len(best[1]), best[2])):
+                best = (text_id, locations, exact)
+        if best is None:
+            return None
+
+        text_id, locations, exact = best
+        text = self.index.texts[text_id]
+        if locations:
+            start = min(location[3] for location in locations)
+            end = max(location[3] + location[4] for location in locations)
+            matched = list(dict.fromkeys(location[2] for location in locations))
+        else:
+            start, end, matched = 0, text.get('text_length') or 0, []
+        return ResolvedPassage(
+            citation=citation, text_id=text_id, title=text.get('title'), author=text.get('author'),
+            references=matched, char_position=start, char_length=end - start, exact=exact,
+        )
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def resolve_many(self, citations: Sequence[str]) -> Dict[str, Optional[ResolvedPassage]]:
+        """Spans for a batch of citations, keyed by citation (repeats resolved once)"""
+        return {citation: self.resolve(citation) for citation in dict.fromkeys(citations)}
+
+    async def fetch_texts(self, passages: Sequence[ResolvedPassage]) -> None:
+        """Fill in ``text`` for every passage with one query"""
+        if not passages:
+            return
+        rows = await self.db.fetch(
+            PASSAGE_TEXT_SQL,
+            [passage.text_id for passage in passages],
+            [passage.char_position for passage in passages],
+            [passage.char_length for passage in passages],
+        )
+        for row in rows:
+            passages[row['i'] - 1].text = row['text']
+
+
+_citation_resolver: Optional[CitationResolver] = None
+
+
+def get_citation_resolver(db_service: Optional[DatabaseService]) -> CitationResolver:
+    """Process-wide resolver (the index is shared by the API and GraphRAG)"""
+    global _citation_resolver
+    if _citation_resolver is None or _citation_resolver.db is not db_service:
+        _citation_resolver = CitationResolver(db_service)
+    return _citation_resolver
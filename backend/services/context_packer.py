@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Token-budgeted context packing for GraphRAG
+Ranks retrieved nodes by relevance and fills an explicit prompt token budget
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+KGNode = Dict[str, Any]
+KGEdge = Dict[str, Any]
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("GRAPHRAG_CONTEXT_TOKENS", "1800"))
+# Descriptions longer than this are replaced by their short form
+DESCRIPTION_TOKENS = int(os.getenv("GRAPHRAG_DESCRIPTION_TOKENS", "120"))
+# Last-resort short form when even the regular block does not fit
+MIN_DESCRIPTION_TOKENS = 40
+
+# Relative weight of each ranking signal (all signals are scaled to 0..1)
+SEMANTIC_WEIGHT = 0.5
+DISTANCE_WEIGHT = 0.3
+CENTRALITY_WEIGHT = 0.2
+
+# Tie-breaker between equally ranked nodes, as in the original node-type ordering
+TYPE_PRIORITY = {
+    'person': 1,
+    'argument': 2,
+    'concept': 3,
+    'work': 4,
+    'debate': 5,
+    'controversy': 6,
+    'school': 7,
+    'reformulation': 8,
+    'event': 9,
+    'group': 10,
+    'argument_framework': 11
+}
+
+CONTEXT_HEADER = "# Ancient Philosophy Knowledge Base\n"
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free token estimate
+
+    Counts words and punctuation, charging long words one extra token per six
+    characters. Tracks BPE tokenizers (Mistral, Gemini) closely enough for
+    budgeting and over-counts polytonic Greek rather than under-counting it.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _TOKEN_PATTERN.findall(text))
+
+
+@lru_cache(maxsize=8192)
+def shorten(text: str, max_tokens: int) -> str:
+    """
+    Extractive short form of a description, cached per (text, budget)
+
+    Keeps whole leading sentences while they fit; a first sentence that is
+    already too long is cut at a word boundary.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept: List[str] = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        cost = estimate_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return " ".join(kept)
+
+    words: List[str] = []
+    used = 0
+    for word in text.split():
+        cost = estimate_tokens(word)
+        if used + cost > max_tokens - 1:
+            break
+        words.append(word)
+        used += cost
+    return " ".join(words) + "…"
+
+
+def graph_distances(start_ids: Iterable[str], edges: Iterable[KGEdge]) -> Dict[str, int]:
+    """Hop distance from the nearest starting node over the traversed (undirected) edges"""
+    neighbours: Dict[str, List[str]] = defaultdict(list)
+    for edge in edges:
+        neighbours[edge['source']].append(edge['target'])
+        neighbours[edge['target']].append(edge['source'])
+
+    distances = {node_id: 0 for node_id in start_ids}
+    queue = deque(distances)
+    while queue:
+        node_id = queue.popleft()
+        for neighbour in neighbours[node_id]:
+            if neighbour not in distances:
+                distances[neighbour] = distances[node_id] + 1
+                queue.append(neighbour)
+    return distances
+
+
+def rank_nodes(
+    nodes: List[KGNode],
+    distances: Optional[Dict[str, int]] = None,
+    centrality: Optional[Dict[str, float]] = None,
+) -> List[KGNode]:
+    """
+    Order nodes by a weighted relevance score
+
+    Semantic score (from vector search), closeness to the starting nodes and
+    PageRank centrality, each scaled to 0..1; node type and label break ties.
+    Without distances, nodes with a semantic score count as starting nodes.
+    """
+    centrality = centrality or {}
+    top_centrality = max((centrality.get(n.get('id'), 0.0) for n in nodes), default=0.0) or 1.0
+    top_semantic = max((n.get('semantic_score') or 0.0 for n in nodes), default=0.0) or 1.0
+
+    def score(node: KGNode) -> float:
+        node_id = node.get('id')
+        if distances is not None:
+            distance = distances.get(node_id, len(distances))
+        else:
+            distance = 0 if 'semantic_score' in node else 1
+        return (
+            SEMANTIC_WEIGHT * (node.get('semantic_score') or 0.0) / top_semantic
+            + DISTANCE_WEIGHT / (1 + distance)
+            + CENTRALITY_WEIGHT * centrality.get(node_id, 0.0) / top_centrality
+        )
+
+    return sorted(
+        nodes,
+        key=lambda n: (-score(n), TYPE_PRIORITY.get(n.get('type', 'unknown'), 99), n.get('label', ''))
+    )
+
+
+def format_node(node: KGNode, description_tokens: int = DESCRIPTION_TOKENS) -> str:
+    """Markdown block for one node, with its description cut to ``description_tokens``"""
+    node_type = node.get('type', 'unknown')
+    label = node.get('label', 'Unknown')
+    parts = [f"\n## {label} ({node_type})"]
+
+    if node.get('description'):
+        parts.append(shorten(node['description'], description_tokens))
+
+    # Add period and school for persons
+    if node_type == 'person':
+        if node.get('period'):
+            parts.append(f"**Period:** {node['period']}")
+        if node.get('school'):
+            parts.append(f"**School:** {node['school']}")
+        if node.get('dates'):
+            parts.append(f"**Dates:** {node['dates']}")
+
+    # Add position for arguments
+    if node_type == 'argument' and 'position_on_free_will' in node:
+        parts.append(f"**Position:** {node['position_on_free_will']}")
+
+    # Add sources (first 2)
+    if node.get('ancient_sources'):
+        sources = node['ancient_sources'][:2]
+        if sources:
+            parts.append(f"**Sources:** {'; '.join(sources)}")
+
+    parts.append("")  # Empty line
+    return "\n".join(parts)
+
+
+@dataclass
+class PackedContext:
+    """Result of packing nodes into a token budget"""
+    text: str
+    nodes: List[KGNode] = field(default_factory=list)
+    tokens: int = 0
+    budget: int = 0
+    shortened: int = 0
+    dropped: int = 0
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'tokens': self.tokens,
+            'budget': self.budget,
+            'nodes': len(self.nodes),
+            'shortened': self.shortened,
+            'dropped': self.dropped,
+        }
+
+
+def pack_context(
+    nodes: List[KGNode],
+    token_budget: int = CONTEXT_TOKEN_BUDGET,
+    max_nodes: Optional[int] = None,
+    distances: Optional[Dict[str, int]] = None,
+    centrality: Optional[Dict[str, float]] = None,
+) -> PackedContext:
+    """
+    Fill ``token_budget`` with the highest-ranked nodes
+
+    Each node is added with its regular block (description capped at
+    DESCRIPTION_TOKENS); if that does not fit, a minimal block is tried before
+    moving on, so a long low-value description never crowds out later evidence.
+    """
+    ranked = rank_nodes(nodes, distances, centrality)
+    if max_nodes is not None:
+        ranked = ranked[:max_nodes]
+
+    blocks = [CONTEXT_HEADER]
+    used = estimate_tokens(CONTEXT_HEADER)
+    packed = PackedContext(text="", budget=token_budget)
+
+    for node in ranked:
+        description_cost = estimate_tokens(node.get('description') or '')
+        limit = DESCRIPTION_TOKENS
+        block = format_node(node, limit)
+        cost = estimate_tokens(block)
+        if used + cost > token_budget and description_cost > MIN_DESCRIPTION_TOKENS:
+            limit = MIN_DESCRIPTION_TOKENS
+            block = format_node(node, limit)
+            cost = estimate_tokens(block)
+        if used + cost > token_budget:
+            packed.dropped += 1
+            continue
+        if description_cost > limit:
+            packed.shortened += 1
+        blocks.append(block)
+        packed.nodes.append(node)
+        used += cost
+
+    packed.text = "\n".join(blocks)
+    packed.tokens = used
+    packed.dropped += len(nodes) - len(ranked)
+    return packed
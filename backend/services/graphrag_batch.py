@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Batch GraphRAG evaluation
+Vectorised retrieval for a whole question set, queued generation and resumable JSONL output
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from services.answer_cache import normalize_query
+from services.context_packer import graph_distances
+from services.llm_scheduler import LLMOverloadedError, Priority
+from services.local_retrieval import InMemoryVectorIndex
+
+logger = logging.getLogger(__name__)
+
+EVAL_CONCURRENCY = int(os.getenv("GRAPHRAG_EVAL_CONCURRENCY", "4"))
+# Questions embedded and searched per matrix multiply
+EVAL_BATCH_SIZE = int(os.getenv("GRAPHRAG_EVAL_BATCH_SIZE", "64"))
+# Admission rejections are waited out this many times before a question is marked failed
+EVAL_MAX_ATTEMPTS = 5
+
+
+@dataclass
+class EvalQuestion:
+    """One line of the input JSONL"""
+    id: str
+    question: str
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def question_id(question: str) -> str:
+    """Stable id for records without one: hash of the normalised question"""
+    return hashlib.sha1(normalize_query(question).encode("utf-8")).hexdigest()[:12]
+
+
+def load_questions(path: Path) -> List[EvalQuestion]:
+    """
+    Read ``{"question": ...}`` records (``query`` is accepted too)
+
+    Other fields, such as expected answers or tags, are carried into the
+    output unchanged.
+
+    Raises:
+        ValueError: a line is not JSON or has no question
+    """
+    questions = []
+    seen: Set[str] = set()
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from e
+            text = record.pop("question", None) or record.pop("query", None)
+            if not text:
+                raise ValueError(f"{path}:{line_number}: missing 'question'")
+            qid = str(record.pop("id", None) or question_id(text))
+            if qid in seen:
+                logger.warning(f"{path}:{line_number}: duplicate id {qid} skipped")
+                continue
+            seen.add(qid)
+            questions.append(EvalQuestion(qid, text, record))
+    return questions
+
+
+def completed_ids(path: Path, retry_failed: bool = False) -> Set[str]:
+    """
+    Ids already answered in an existing output file
+
+    The latest record per id wins. With ``retry_failed`` only successful
+    records count as done. A truncated last line from an interrupted run is
+    ignored.
+    """
+    latest: Dict[str, bool] = {}
+    if not path.exists():
+        return set()
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[str(record.get("id"))] = bool(record.get("success"))
+    return {qid for qid, success in latest.items() if success or not retry_failed}
+
+
+@dataclass
+class BatchStats:
+    """Progress counters for one evaluation run"""
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        done = self.succeeded + self.failed
+        return {
+            'total': self.total,
+            'skipped': self.skipped,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'elapsed_seconds': round(elapsed, 1),
+            'questions_per_minute': round(done / elapsed * 60, 1) if elapsed else 0.0,
+        }
+
+
+class BatchEvaluator:
+    """
+    Runs the GraphRAG pipeline over a question set
+
+    Retrieval is vectorised: each chunk of questions is embedded in one
+    batched call and searched with one matrix multiply against the node
+    vectors held in memory. Expansion reuses the service's shared adjacency
+    indexes. Generations go through the LLM admission queue at
+    ``Priority.BATCH`` with at most ``concurrency`` in flight, so interactive
+    users are served first; each result is appended to the output as soon as
+    it is ready.
+    """
+
+    def __init__(
+        self,
+        service: Any,
+        index: InMemoryVectorIndex,
+        concurrency: int = EVAL_CONCURRENCY,
+        batch_size: int = EVAL_BATCH_SIZE,
+        semantic_k: int = 10,
+        graph_depth: int = 2,
+        max_context: int = 15,
+        temperature: float = 0.7,
+        expansion: Optional[str] = None,
+        max_nodes: Optional[int] = None,
+    ):
+        self.service = service
+        self.index = index
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.semantic_k = semantic_k
+        self.graph_depth = graph_depth
+        self.max_context = max_context
+        self.temperature = temperature
+        self.expansion = expansion
+        self.max_nodes = max_nodes
+
+    def parameters(self) -> Dict[str, Any]:
+        return {
+            'semantic_k': self.semantic_k,
+            'graph_depth': self.graph_depth,
+            'max_context': self.max_context,
+            'temperature': self.temperature,
+            'expansion': self.expansion,
+            'max_nodes': self.max_nodes,
+        }
+
+    def retrieve(self, item: EvalQuestion, hits: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Steps 2-4 for one question whose vector hits are already known"""
+        starting_nodes = self.service.enrich_search_results(hits)
+        if not starting_nodes:
+            return {'starting_nodes': []}
+        expanded_nodes, edges, relevance = self.service.expand_graph(
+            starting_nodes,
+            expansion=self.expansion,
+            max_depth=self.graph_depth,
+            max_nodes=self.max_nodes
+        )
+        context = self.service.build_context(
+            nodes=expanded_nodes,
+            max_context_length=self.max_context,
+            centrality=relevance,
+            distances=graph_distances([n['id'] for n in starting_nodes], edges)
+        )
+        return {
+            'starting_nodes': starting_nodes,
+            'expanded_nodes': expanded_nodes,
+            'edges': edges,
+            'context': context,
+            'context_summary': dict(self.service.last_context),
+            'citations': self.service.extract_citations(expanded_nodes),
+        }
+
+    async def generate(self, item: EvalQuestion, retrieval: Dict[str, Any]) -> Dict[str, Any]:
+        """Step 5 through the admission queue, waiting out overload rejections"""
+        for attempt in range(1, EVAL_MAX_ATTEMPTS + 1):
+            try:
+                return await self.service.synthesize_answer(
+                    query=item.question,
+                    context=retrieval['context'],
+                    temperature=self.temperature,
+                    priority=Priority.BATCH
+                )
+            except LLMOverloadedError as e:
+                if attempt == EVAL_MAX_ATTEMPTS:
+                    raise
+                logger.info(f"{item.id}: LLM busy, retrying in {e.retry_after}s (attempt {attempt})")
+                await asyncio.sleep(e.retry_after)
+
+    def record(self, item: EvalQuestion, retrieval: Dict[str, Any], synthesis: Optional[Dict[str, Any]],
+               retrieval_ms: float, generation_ms: float, error: Optional[str] = None) -> Dict[str, Any]:
+        """Output line for one question"""
+        success = error is None and synthesis is not None and synthesis['provider'] not in ('unknown', 'error')
+        starting_nodes = retrieval.get('starting_nodes', [])
+        return {
+            'id': item.id,
+            'question': item.question,
+            **item.extra,
+            'answer': synthesis['answer'] if synthesis else None,
+            'citations': retrieval.get('citations', {'ancient_sources': [], 'modern_scholarship': []}),
+            'starting_nodes': [n['id'] for n in starting_nodes],
+            'nodes_used': len(retrieval.get('expanded_nodes', [])),
+            'edges_traversed': len(retrieval.get('edges', [])),
+            'context': retrieval.get('context_summary', {}),
+            'llm_provider': synthesis['provider'] if synthesis else None,
+            'llm_model': synthesis['model'] if synthesis else None,
+            'tokens_used': synthesis['tokens_used'] if synthesis else 0,
+            'timings': {'retrieval_ms': round(retrieval_ms, 2), 'generation_ms': round(generation_ms, 2)},
+            'parameters': self.parameters(),
+            'success': success,
+            'error': error if error or success else 'generation failed',
+        }
+
+    async def run(
+        self,
+        questions: List[EvalQuestion],
+        output: Path,
+        retry_failed: bool = False,
+        limit: Optional[int] = None,
+    ) -> BatchStats:
+        """
+        Answer every question not already in ``output``, appending one JSON line per question
+
+        Args:
+            questions: Parsed input
+            output: JSONL file; created or appended to
+            retry_failed: Re-run questions whose latest record failed
+            limit: Stop after this many new questions
+
+        Returns:
+            BatchStats for this run
+        """
+        done = completed_ids(output, retry_failed)
+        pending = [item for item in questions if item.id not in done]
+        if limit is not None:
+            pending = pending[:limit]
+        stats = BatchStats(total=len(questions), skipped=len(questions) - len(pending))
+        logger.info(f"Batch evaluation: {len(pending)} to run, {stats.skipped} already done or skipped")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output, "a", encoding="utf-8") as sink:
+
+            def write(line: Dict[str, Any]) -> None:
+                sink.write(json.dumps(line, ensure_ascii=False) + "\n")
+                sink.flush()
+                if line['success']:
+                    stats.succeeded += 1
+                else:
+                    stats.failed += 1
+
+            async def answer(item: EvalQuestion, retrieval: Dict[str, Any], retrieval_ms: float) -> None:
+                if not retrieval['starting_nodes']:
+                    write(self.record(item, retrieval, None, retrieval_ms, 0.0, 'semantic search returned no results'))
+                    return
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        synthesis = await self.generate(item, retrieval)
+                        error = None
+                    except Exception as e:
+                        synthesis, error = None, str(e)
+                    generation_ms = (time.perf_counter() - started) * 1000
+                write(self.record(item, retrieval, synthesis, retrieval_ms, generation_ms, error))
+
+            tasks: List[asyncio.Task] = []
+            for start in range(0, len(pending), self.batch_size):
+                chunk = pending[start:start + self.batch_size]
+                started = time.perf_counter()
+                vectors = await self.service.embed_queries([item.question for item in chunk])
+                if vectors is None:
+                    for item in chunk:
+                        write(self.record(item, {}, None, 0.0, 0.0, 'embedding failed'))
+                    continue
+                all_hits = self.index.search_many(vectors, limit=self.semantic_k)
+                per_question_ms = (time.perf_counter() - started) * 1000 / len(chunk)
+
+                for item, hits in zip(chunk, all_hits):
+                    item_started = time.perf_counter()
+                    retrieval = self.retrieve(item, hits)
+                    retrieval_ms = per_question_ms + (time.perf_counter() - item_started) * 1000
+                    tasks.append(asyncio.ensure_future(answer(item, retrieval, retrieval_ms)))
+                # Let queued generations start while the next chunk is embedded
+                await asyncio.sleep(0)
+
+            await asyncio.gather(*tasks)
+
+        logger.info(f"Batch evaluation finished: {stats.summary()}")
+        return stats
@@ -13,11 +13,19 @@ from pathlib import Path
 from collections import defaultdict, deque
 
 import google.generativeai as genai
+import numpy as np
 from dotenv import load_dotenv
 
 from services.qdrant_service import QdrantService
 from services.db import DatabaseService
 from services.llm_service import LLMService, ModelProvider
+from services.llm_scheduler import LLMOverloadedError, Priority
+from services.kg_metrics import get_adjacency, get_graph_metrics_service, kg_file_version
+from services.context_packer import CONTEXT_TOKEN_BUDGET, graph_distances, pack_context
+from services.answer_cache import ANSWER_CACHE_ENABLED, get_answer_cache, params_key
+from services.citation_resolver import get_citation_resolver
+from services.passage_retrieval import Passage, PassageResult, PassageRetriever, format_passages
+from utils.stage_timer import StageTimer
 
 # Load environment variables
 load_dotenv()
@@ -63,6 +71,13 @@ def _resolve_kg_path() -> Path:
 
 KG_PATH = _resolve_kg_path()
 
+# Graph expansion after semantic search: breadth-first ("bfs") or personalised PageRank ("ppr")
+GRAPHRAG_EXPANSION = os.getenv("GRAPHRAG_EXPANSION", "bfs").lower()
+EXPANSION_MODES = ("bfs", "ppr")
+# Default expansion sizes when the caller does not pass max_nodes
+BFS_MAX_NODES = 50
+PPR_MAX_NODES = int(os.getenv("GRAPHRAG_PPR_TOP_N", "25"))
+
 
 class GraphRAGService:
     """
@@ -78,8 +93,15 @@ class GraphRAGService:
         """Initialize GraphRAG service with proper error handling"""
         self.qdrant = qdrant_service
         self.db = db_service
+        self.passages = PassageRetriever(db_service)
+        self.citation_resolver = get_citation_resolver(db_service)
         self.llm_service = llm_service or LLMService(preferred_provider=ModelProvider.OLLAMA)
         self.kg_data: Optional[Dict[str, Any]] = None
+        self.kg_version: Optional[str] = None
+        self._nodes_by_id: Dict[str, Dict[str, Any]] = {}
+        self._outgoing_edges: Dict[str, List[Dict[str, Any]]] = {}
+        self._incoming_edges: Dict[str, List[Dict[str, Any]]] = {}
+        self.last_context: Dict[str, int] = {}
         self._load_kg()
 
     def _load_kg(self) -> None:
@@ -87,12 +109,26 @@ class GraphRAGService:
         try:
             if not KG_PATH.exists():
                 raise FileNotFoundError(f"Knowledge Graph file not found: {KG_PATH}")
-                
+
+            # The service is built per request: hash the KG once per file version, not per load
+            kg_stat = KG_PATH.stat()
             with open(KG_PATH, 'r', encoding='utf-8') as f:
                 self.kg_data = json.load(f)
                 
             if not isinstance(self.kg_data, dict) or 'nodes' not in self.kg_data or 'edges' not in self.kg_data:
                 raise ValueError("Invalid Knowledge Graph format: missing 'nodes' or 'edges' keys")
+
+            self.kg_version = kg_file_version(KG_PATH, kg_stat, self.kg_data)
+            self._nodes_by_id = {node['id']: node for node in self.kg_data['nodes'] if 'id' in node}
+
+            # Adjacency lists for BFS, built once per load instead of per query
+            outgoing_edges = defaultdict(list)  # node_id -> list of edges where node is source
+            incoming_edges = defaultdict(list)  # node_id -> list of edges where node is target
+            for edge in self.kg_data['edges']:
+                outgoing_edges[edge['source']].append(edge)
+                incoming_edges[edge['target']].append(edge)
+            self._outgoing_edges = dict(outgoing_edges)
+            self._incoming_edges = dict(incoming_edges)
                 
             logger.info(f"✅ Loaded KG: {len(self.kg_data['nodes'])} nodes, {len(self.kg_data['edges'])} edges")
             
@@ -108,103 +144,138 @@ class GraphRAGService:
 
     def _get_node_by_id(self, node_id: str) -> Optional[Dict[str, Any]]:
         """Get node by ID"""
-        if not self.kg_data:
+        return self._nodes_by_id.get(node_id)
+
+    async def embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a question with Gemini; None on empty query, timeout or error"""
+        if not query.strip():
+            logger.warning("Empty query provided for semantic search")
             return None
 
-        for node in self.kg_data['nodes']:
-            if node['id'] == node_id:
-                return node
-        return None
+        logger.debug("Generating query embedding with Gemini...")
+        try:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(
+                    genai.embed_content,
+                    model="models/gemini-embedding-001",
+                    content=query,
+                    output_dimensionality=3072
+                ),
+                timeout=30.0  # 30 second timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error("Gemini embedding API timed out after 30 seconds")
+            return None
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            return None
 
-    async def semantic_search_nodes(
-        self,
-        query: str,
-        limit: int = 10
-    ) -> List[Dict[str, Any]]:
-        """
-        Step 1: Semantic search to find relevant starting nodes
-        Uses Qdrant vector similarity with proper error handling
-        """
-        logger.info(f"🔍 GraphRAG Step 1: Semantic search for '{query}'")
+        if 'embedding' not in result:
+            logger.error("No embedding returned from Gemini API")
+            return None
 
-        try:
-            if not query.strip():
-                logger.warning("Empty query provided for semantic search")
-                return []
+        query_vector = result['embedding']
+        logger.debug(f"Generated embedding: {len(query_vector)} dimensions")
+        return query_vector
+
+    async def embed_queries(self, queries: List[str], batch_size: int = 100) -> Optional[np.ndarray]:
+        """
+        Embed many questions with batched Gemini calls
 
-            # Generate query embedding with proper error handling and timeout
-            logger.debug("Generating query embedding with Gemini...")
+        Returns:
+            Array with one 3072-d row per query, or None if any batch fails
+        """
+        rows: List[List[float]] = []
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
             try:
                 result = await asyncio.wait_for(
                     asyncio.to_thread(
                         genai.embed_content,
                         model="models/gemini-embedding-001",
-                        content=query,
+                        content=batch,
                         output_dimensionality=3072
                     ),
-                    timeout=30.0  # 30 second timeout
+                    timeout=120.0
                 )
-            except asyncio.TimeoutError:
-                logger.error("Gemini embedding API timed out after 30 seconds")
-                return []
             except Exception as e:
-                logger.error(f"Error generating embedding: {e}")
-                return []
+                logger.error(f"Error generating batch embeddings ({start}-{start + len(batch)}): {e}")
+                return None
+            rows.extend(result['embedding'])
+        return np.asarray(rows, dtype=np.float32)
 
-            if 'embedding' not in result:
-                logger.error("No embedding returned from Gemini API")
-                return []
+    async def search_nodes_by_vector(
+        self,
+        query_vector: List[float],
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Qdrant similarity search for a query embedding, enriched with KG node data"""
+        logger.debug(f"Searching Qdrant for {limit} nodes...")
+        try:
+            search_results = await asyncio.wait_for(
+                self.qdrant.search_nodes(
+                    query_vector=query_vector,
+                    limit=limit
+                ),
+                timeout=30.0  # 30 second timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error("Qdrant search timed out after 30 seconds")
+            return []
+        except Exception as e:
+            logger.error(f"Error searching Qdrant: {e}")
+            return []
+
+        if not search_results:
+            logger.warning("No results returned from Qdrant search")
+            return []
 
-            query_vector = result['embedding']
-            logger.debug(f"Generated embedding: {len(query_vector)} dimensions")
+        return self.enrich_search_results(search_results)
 
-            # Search in Qdrant with proper error handling and timeout
-            logger.debug(f"Searching Qdrant for {limit} nodes...")
+    def enrich_search_results(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Full KG node data for vector hits (``payload.node_id``), with ``semantic_score``"""
+        enriched_results = []
+        for result in search_results:
             try:
-                search_results = await asyncio.wait_for(
-                    self.qdrant.search_nodes(
-                        query_vector=query_vector,
-                        limit=limit
-                    ),
-                    timeout=30.0  # 30 second timeout
-                )
-            except asyncio.TimeoutError:
-                logger.error("Qdrant search timed out after 30 seconds")
-                return []
+                payload = result.get('payload', {})
+                node_id = payload.get('node_id')
+                
+                if not node_id:
+                    logger.warning(f"No node_id found in payload: {payload.keys()}")
+                    continue
+                    
+                node = self._get_node_by_id(node_id)
+                if node:
+                    enriched_results.append({
+                        **node,
+                        'semantic_score': result.get('score', 0.0)
+                    })
+                else:
+                    logger.warning(f"Node {node_id} not found in Knowledge Graph")
+                    
             except Exception as e:
-                logger.error(f"Error searching Qdrant: {e}")
-                return []
+                logger.warning(f"Error processing search result: {e}")
+                continue
 
-            if not search_results:
-                logger.warning("No results returned from Qdrant search")
-                return []
+        logger.info(f"✅ Found {len(enriched_results)} relevant nodes from {len(search_results)} search results")
+        return enriched_results
 
-            # Enrich with full node data
-            enriched_results = []
-            for result in search_results:
-                try:
-                    payload = result.get('payload', {})
-                    node_id = payload.get('node_id')
-                    
-                    if not node_id:
-                        logger.warning(f"No node_id found in payload: {payload.keys()}")
-                        continue
-                        
-                    node = self._get_node_by_id(node_id)
-                    if node:
-                        enriched_results.append({
-                            **node,
-                            'semantic_score': result.get('score', 0.0)
-                        })
-                    else:
-                        logger.warning(f"Node {node_id} not found in Knowledge Graph")
-                        
-                except Exception as e:
-                    logger.warning(f"Error processing search result: {e}")
-                    continue
+    async def semantic_search_nodes(
+        self,
+        query: str,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Step 1: Semantic search to find relevant starting nodes
+        Uses Qdrant vector similarity with proper error handling
+        """
+        logger.info(f"🔍 GraphRAG Step 1: Semantic search for '{query}'")
 
-            logger.info(f"✅ Found {len(enriched_results)} relevant nodes from {len(search_results)} search results")
-            return enriched_results
+        try:
+            query_vector = await self.embed_query(query)
+            if query_vector is None:
+                return []
+            return await self.search_nodes_by_vector(query_vector, limit=limit)
 
         except Exception as e:
             logger.error(f"❌ Error in semantic search: {e}", exc_info=True)
@@ -234,14 +305,6 @@ class GraphRAGService:
         expanded_nodes = []
         traversed_edges = []
 
-        # Build adjacency lists for fast lookup
-        outgoing_edges = defaultdict(list)  # node_id -> list of edges where node is source
-        incoming_edges = defaultdict(list)  # node_id -> list of edges where node is target
-
-        for edge in self.kg_data['edges']:
-            outgoing_edges[edge['source']].append(edge)
-            incoming_edges[edge['target']].append(edge)
-
         # Add starting nodes to queue
         for node in starting_nodes:
             node_id = node['id']
@@ -261,7 +324,7 @@ class GraphRAGService:
             node_id = current_node['id']
 
             # Explore outgoing edges (node -> target)
-            for edge in outgoing_edges[node_id]:
+            for edge in self._outgoing_edges.get(node_id, ()):
                 target_id = edge['target']
                 if target_id not in visited_node_ids:
                     target_node = self._get_node_by_id(target_id)
@@ -271,7 +334,7 @@ class GraphRAGService:
                         traversed_edges.append(edge)
 
             # Explore incoming edges (source -> node)
-            for edge in incoming_edges[node_id]:
+            for edge in self._incoming_edges.get(node_id, ()):
                 source_id = edge['source']
                 if source_id not in visited_node_ids:
                     source_node = self._get_node_by_id(source_id)
@@ -283,6 +346,75 @@ class GraphRAGService:
         logger.info(f"Expanded to {len(expanded_nodes)} nodes via {len(traversed_edges)} edges")
         return expanded_nodes, traversed_edges
 
+    def graph_expansion_ppr(
+        self,
+        starting_nodes: List[Dict[str, Any]],
+        max_nodes: int = PPR_MAX_NODES
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, float]]:
+        """
+        Step 2 (alternative): personalised PageRank from the semantic seeds
+        Keeps the top ``max_nodes`` nodes by PPR score (seeds always included),
+        weighting each seed by its semantic score
+
+        Returns:
+            Tuple of (expanded_nodes, edges among them, ppr_scores)
+        """
+        logger.info(f"GraphRAG Step 2: Personalised PageRank expansion (max_nodes={max_nodes})")
+
+        if not self.kg_data:
+            return [], [], {}
+
+        seeds = {node['id']: node.get('semantic_score') or 1.0 for node in starting_nodes}
+        scores = get_adjacency(self.kg_data, self.kg_version).personalized_pagerank(seeds)
+
+        expanded_nodes = list(starting_nodes)[:max_nodes]
+        selected_ids = {node['id'] for node in expanded_nodes}
+        for node_id in sorted(scores, key=lambda node_id: -scores[node_id]):
+            if len(expanded_nodes) >= max_nodes:
+                break
+            if node_id in selected_ids:
+                continue
+            node = self._get_node_by_id(node_id)
+            if node:
+                expanded_nodes.append(node)
+                selected_ids.add(node_id)
+
+        # Induced subgraph from the load-time adjacency: O(edges of the selection), not O(|E|)
+        edges = [
+            edge
+            for node_id in dict.fromkeys(node['id'] for node in expanded_nodes)
+            for edge in self._outgoing_edges.get(node_id, ())
+            if edge['target'] in selected_ids
+        ]
+
+        logger.info(f"Expanded to {len(expanded_nodes)} nodes ({len(edges)} edges among them)")
+        return expanded_nodes, edges, scores
+
+    def expand_graph(
+        self,
+        starting_nodes: List[Dict[str, Any]],
+        expansion: Optional[str] = None,
+        max_depth: int = 2,
+        max_nodes: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, float]]]:
+        """
+        Step 2: expand the semantic seeds with the configured strategy
+
+        Returns:
+            Tuple of (expanded_nodes, edges, relevance); relevance holds the
+            PPR scores in "ppr" mode and is None for BFS
+        """
+        expansion = (expansion or GRAPHRAG_EXPANSION).lower()
+        if expansion == "ppr":
+            return self.graph_expansion_ppr(starting_nodes, max_nodes=max_nodes or PPR_MAX_NODES)
+
+        expanded_nodes, traversed_edges = self.graph_traversal_bfs(
+            starting_nodes=starting_nodes,
+            max_depth=max_depth,
+            max_nodes=max_nodes or BFS_MAX_NODES
+        )
+        return expanded_nodes, traversed_edges, None
+
     def extract_citations(
         self,
         nodes: List[Dict[str, Any]]
@@ -326,90 +458,91 @@ class GraphRAGService:
 
         return citations
 
+    def start_deep_retrieval(self, query: str, deep_mode: bool) -> Optional[asyncio.Future]:
+        """
+        Deep mode: start PostgreSQL passage retrieval alongside semantic search
+        The task is time-boxed by GRAPHRAG_DEEP_TIMEOUT; None when deep mode is off
+        """
+        if not deep_mode:
+            return None
+        logger.info("GraphRAG deep mode: retrieving primary-text passages in parallel")
+        self.citation_resolver.warm()
+        return asyncio.ensure_future(self.passages.retrieve(query))
+
+    async def collect_deep_retrieval(self, task: Optional[asyncio.Future]) -> Optional[PassageResult]:
+        """Wait for the deep-mode task (it never outlives its own budget)"""
+        if task is None:
+            return None
+        return await task
+
+    def add_passage_citations(self, citations: Dict[str, Any], deep: Optional[PassageResult]) -> Dict[str, Any]:
+        """
+        Attach deep-mode passages to the citations as exact text references
+        Ancient sources are also located in the texts once the reference index is built
+        """
+        if deep is not None:
+            citations['passages'] = [passage.to_dict() for passage in deep.passages]
+            if self.citation_resolver.ready:
+                resolved = self.citation_resolver.resolve_many(citations.get('ancient_sources', []))
+                citations['locations'] = [passage.to_dict() for passage in resolved.values() if passage]
+        return citations
+
     def build_context(
         self,
         nodes: List[Dict[str, Any]],
-        max_context_length: int = 15
+        max_context_length: int = 15,
+        centrality: Optional[Dict[str, float]] = None,
+        token_budget: Optional[int] = None,
+        distances: Optional[Dict[str, int]] = None,
+        passages: Optional[List[Passage]] = None
     ) -> str:
         """
         Step 4: Build context string for LLM
-        Prioritizes by node type and includes key information
+        Ranks nodes by semantic score, graph distance and centrality (PageRank
+        from the precomputed KG metrics, when available), then packs them into
+        a token budget with long descriptions cut to cached short forms.
+        Deep-mode passages follow as labelled primary-text evidence.
         """
         logger.info("GraphRAG Step 4: Building context")
 
-        # Prioritize node types
-        type_priority = {
-            'person': 1,
-            'argument': 2,
-            'concept': 3,
-            'work': 4,
-            'debate': 5,
-            'controversy': 6,
-            'school': 7,
-            'reformulation': 8,
-            'event': 9,
-            'group': 10,
-            'argument_framework': 11
-        }
+        if centrality is None:
+            centrality = get_graph_metrics_service().scores("pagerank")
 
-        # Sort nodes by priority
-        sorted_nodes = sorted(
+        packed = pack_context(
             nodes,
-            key=lambda n: (type_priority.get(n.get('type', 'unknown'), 99), n.get('label', ''))
+            token_budget=token_budget or CONTEXT_TOKEN_BUDGET,
+            max_nodes=max_context_length,
+            distances=distances,
+            centrality=centrality
         )
+        self.last_context = packed.summary()
 
-        # Limit context
-        sorted_nodes = sorted_nodes[:max_context_length]
-
-        # Build context
-        context_parts = ["# Ancient Philosophy Knowledge Base\n"]
-
-        for node in sorted_nodes:
-            node_type = node.get('type', 'unknown')
-            label = node.get('label', 'Unknown')
-
-            context_parts.append(f"\n## {label} ({node_type})")
-
-            # Add description
-            if 'description' in node and node['description']:
-                context_parts.append(f"{node['description']}")
-
-            # Add period and school for persons
-            if node_type == 'person':
-                if 'period' in node and node['period']:
-                    context_parts.append(f"**Period:** {node['period']}")
-                if 'school' in node and node['school']:
-                    context_parts.append(f"**School:** {node['school']}")
-                if 'dates' in node and node['dates']:
-                    context_parts.append(f"**Dates:** {node['dates']}")
-
-            # Add position for arguments
-            if node_type == 'argument' and 'position_on_free_will' in node:
-                context_parts.append(f"**Position:** {node['position_on_free_will']}")
-
-            # Add sources (first 2)
-            if 'ancient_sources' in node and node['ancient_sources']:
-                sources = node['ancient_sources'][:2]
-                if sources:
-                    context_parts.append(f"**Sources:** {'; '.join(sources)}")
-
-            context_parts.append("")  # Empty line
+        logger.info(
+            f"Built context: ~{packed.tokens}/{packed.budget} tokens, {len(packed.nodes)} nodes "
+            f"({packed.shortened} shortened, {packed.dropped} dropped)"
+        )
 
-        context = "\n".join(context_parts)
-        logger.info(f"Built context: {len(context)} characters, {len(sorted_nodes)} nodes")
+        if passages:
+            passage_text = format_passages(passages)
+            self.last_context['passages'] = len(passages)
+            return packed.text + passage_text
 
-        return context
+        return packed.text
 
     async def synthesize_answer(
         self,
         query: str,
         context: str,
         temperature: float = 0.7,
-        provider: Optional[ModelProvider] = None
+        provider: Optional[ModelProvider] = None,
+        priority: Priority = Priority.STANDARD
     ) -> Dict[str, Any]:
         """
         Step 5: Generate answer using unified LLM service
         Uses context from Knowledge Graph to ground the answer
+
+        Raises:
+            LLMOverloadedError: admission control rejected the generation
         """
         logger.info("GraphRAG Step 5: Synthesizing answer with unified LLM service")
 
@@ -447,7 +580,8 @@ Answer (with citations):"""
                 system_prompt=system_prompt,
                 temperature=temperature,
                 max_tokens=2000,
-                provider=provider
+                provider=provider,
+                priority=priority
             )
             
             if result.get("response"):
@@ -471,6 +605,8 @@ Answer (with citations):"""
                     "model": "unknown"
                 }
 
+        except LLMOverloadedError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error generating answer: {e}")
             return {
@@ -534,6 +670,13 @@ Answer (with citations):"""
 
         return reasoning_path
 
+    @staticmethod
+    def attach_timings(response: Dict[str, Any], timer: StageTimer, include_timings: bool) -> Dict[str, Any]:
+        """Add per-stage timings to ``parameters`` when the caller asked for them"""
+        if include_timings:
+            response.setdefault('parameters', {})['timings'] = timer.summary()
+        return response
+
     async def answer_question(
         self,
         query: str,
@@ -541,7 +684,12 @@ Answer (with citations):"""
         graph_depth: int = 2,
         max_context: int = 15,
         temperature: float = 0.7,
-        deep_mode: bool = False
+        deep_mode: bool = False,
+        use_cache: bool = True,
+        priority: Priority = Priority.STANDARD,
+        expansion: Optional[str] = None,
+        max_nodes: Optional[int] = None,
+        include_timings: bool = False
     ) -> Dict[str, Any]:
         """
         Complete GraphRAG pipeline to answer a question
@@ -552,7 +700,13 @@ Answer (with citations):"""
             graph_depth: Depth of graph traversal (1-3 recommended)
             max_context: Maximum nodes to include in LLM context
             temperature: LLM temperature (0.0-1.0)
-            deep_mode: Include PostgreSQL full-text search results
+            deep_mode: Also retrieve primary-text passages from PostgreSQL
+                (concurrently, within GRAPHRAG_DEEP_TIMEOUT) and cite them
+            use_cache: Serve repeated/near-duplicate questions from the answer cache
+            priority: LLM admission priority (batch jobs queue behind users)
+            expansion: Graph expansion, "bfs" or "ppr" (None = GRAPHRAG_EXPANSION)
+            max_nodes: Nodes kept by the expansion (None = 50 for BFS, GRAPHRAG_PPR_TOP_N for PPR)
+            include_timings: Add per-stage milliseconds as parameters['timings']
 
         Returns:
             Dictionary with answer, citations, reasoning path, and metadata
@@ -561,14 +715,47 @@ Answer (with citations):"""
         logger.info(f"GraphRAG Pipeline: '{query}'")
         logger.info(f"='*80")
 
+        use_cache = use_cache and ANSWER_CACHE_ENABLED
+        expansion = (expansion or GRAPHRAG_EXPANSION).lower()
+        answer_cache = get_answer_cache()
+        cache_params = params_key(
+            semantic_k, graph_depth, max_context, temperature, deep_mode, expansion, max_nodes
+        )
+
+        timer = StageTimer()
+        deep_task = None
         try:
+            if use_cache:
+                with timer.stage("cache_lookup"):
+                    cached = answer_cache.lookup_exact(query, cache_params, self.kg_version)
+                if cached:
+                    logger.info("✅ GraphRAG answer served from cache (exact match)")
+                    timer.finish("cached", cached.get('nodes_used', 0))
+                    return self.attach_timings(cached, timer, include_timings)
+
+            deep_task = self.start_deep_retrieval(query, deep_mode)
+
             # Step 1: Semantic search
-            starting_nodes = await self.semantic_search_nodes(
-                query=query,
-                limit=semantic_k
-            )
+            logger.info(f"🔍 GraphRAG Step 1: Semantic search for '{query}'")
+            with timer.stage("embedding", "gemini"):
+                query_vector = await self.embed_query(query)
+            starting_nodes = []
+            if query_vector is not None:
+                with timer.stage("vector_search", "qdrant"):
+                    starting_nodes = await self.search_nodes_by_vector(query_vector, limit=semantic_k)
+
+            if starting_nodes and use_cache:
+                with timer.stage("cache_lookup"):
+                    cached = answer_cache.lookup(
+                        query, query_vector, [n['id'] for n in starting_nodes], cache_params, self.kg_version
+                    )
+                if cached:
+                    logger.info(f"✅ GraphRAG answer served from cache (similarity {cached['cache']['similarity']})")
+                    timer.finish("cached", cached.get('nodes_used', 0))
+                    return self.attach_timings(cached, timer, include_timings)
 
             if not starting_nodes:
+                timer.finish("no_results")
                 return {
                     'query': query,
                     'answer': 'Unable to perform semantic search. This may be due to: (1) Gemini API timeout or error, (2) Qdrant vector database connection issue, or (3) No relevant nodes found in the Knowledge Graph. Please check backend logs for details.',
@@ -579,35 +766,53 @@ Answer (with citations):"""
                     'error': 'Semantic search returned no results'
                 }
 
-            # Step 2: Graph traversal
-            expanded_nodes, traversed_edges = self.graph_traversal_bfs(
-                starting_nodes=starting_nodes,
-                max_depth=graph_depth,
-                max_nodes=50
-            )
+            # Step 2: Graph expansion (BFS or personalised PageRank)
+            with timer.stage("expansion"):
+                expanded_nodes, traversed_edges, relevance = self.expand_graph(
+                    starting_nodes=starting_nodes,
+                    expansion=expansion,
+                    max_depth=graph_depth,
+                    max_nodes=max_nodes
+                )
 
-            # Step 3: Extract citations
-            citations = self.extract_citations(expanded_nodes)
+            # Deep mode: passages were retrieved while the graph was searched
+            deep = None
+            if deep_task is not None:
+                with timer.stage("deep_wait", "postgres"):
+                    deep = await self.collect_deep_retrieval(deep_task)
+                timer.record("deep_retrieval", deep.elapsed_ms / 1000, "postgres")
 
-            # Step 4: Build context
-            context = self.build_context(
-                nodes=expanded_nodes,
-                max_context_length=max_context
-            )
+            # Step 3: Extract citations
+            with timer.stage("citations"):
+                citations = self.add_passage_citations(self.extract_citations(expanded_nodes), deep)
+
+            # Step 4: Build context (PPR scores are query-specific centrality)
+            with timer.stage("context"):
+                context = self.build_context(
+                    nodes=expanded_nodes,
+                    max_context_length=max_context,
+                    centrality=relevance,
+                    distances=graph_distances([n['id'] for n in starting_nodes], traversed_edges),
+                    passages=deep.passages if deep else None
+                )
 
             # Step 5: Synthesize answer
-            synthesis_result = await self.synthesize_answer(
-                query=query,
-                context=context,
-                temperature=temperature
-            )
+            with timer.stage("generation") as span:
+                synthesis_result = await self.synthesize_answer(
+                    query=query,
+                    context=context,
+                    temperature=temperature,
+                    priority=priority
+                )
+                span.provider = synthesis_result['provider']
 
             # Step 6: Create reasoning path
-            reasoning_path = self.create_reasoning_path(
-                starting_nodes=starting_nodes,
-                expanded_nodes=expanded_nodes,
-                traversed_edges=traversed_edges
-            )
+            with timer.stage("reasoning_path"):
+                reasoning_path = self.create_reasoning_path(
+                    starting_nodes=starting_nodes,
+                    expanded_nodes=expanded_nodes,
+                    traversed_edges=traversed_edges
+                )
 
             # Build response
             response = {
@@ -618,6 +823,7 @@ Answer (with citations):"""
                 'nodes_used': len(expanded_nodes),
                 'edges_traversed': len(traversed_edges),
                 'tokens_used': synthesis_result['tokens_used'],
+                'context': self.last_context,
                 'llm_provider': synthesis_result['provider'],
                 'llm_model': synthesis_result['model'],
                 'parameters': {
@@ -625,23 +831,38 @@ Answer (with citations):"""
                     'graph_depth': graph_depth,
                     'max_context': max_context,
                     'temperature': temperature,
-                    'deep_mode': deep_mode
+                    'deep_mode': deep_mode,
+                    'expansion': expansion,
+                    'max_nodes': max_nodes
                 },
                 'success': True
             }
+            if deep is not None:
+                response['deep_mode'] = deep.summary()
 
             logger.info("="*80)
             logger.info("✅ GraphRAG Pipeline Complete")
-            logger.info(f"   Answer length: {len(answer)} chars")
+            logger.info(f"   Answer length: {len(response['answer'])} chars")
             logger.info(f"   Nodes used: {len(expanded_nodes)}")
             logger.info(f"   Ancient sources: {len(citations['ancient_sources'])}")
             logger.info(f"   Modern scholarship: {len(citations['modern_scholarship'])}")
             logger.info("="*80)
 
-            return response
+            # Synthesis failures come back as apology/error text, never cache those
+            if use_cache and synthesis_result['provider'] not in ('unknown', 'error'):
+                answer_cache.store(
+                    query, query_vector, [n['id'] for n in starting_nodes], cache_params, self.kg_version, response
+                )
+
+            timer.finish("success", len(expanded_nodes))
+            return self.attach_timings(response, timer, include_timings)
 
+        except LLMOverloadedError:
+            timer.finish("overloaded")
+            raise
         except Exception as e:
             logger.error(f"Error in GraphRAG pipeline: {e}", exc_info=True)
+            timer.finish("error")
             return {
                 'query': query,
                 'answer': f'Error processing question: {str(e)}',
@@ -651,3 +872,6 @@ Answer (with citations):"""
                 'success': False,
                 'error': str(e)
             }
+        finally:
+            if deep_task is not None and not deep_task.done():
+                deep_task.cancel()
@@ -1,80 +1,434 @@
 #!/usr/bin/env python3
 """
-Simple in-memory cache for KG analytics endpoints
-Uses LRU eviction policy with TTL support
+In-memory cache for KG analytics endpoints
+LRU eviction by entry count and byte budget, TTL support, and an optional
+second tier (on-disk or Redis) shared between uvicorn workers
 """
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
+import logging
+import os
+import pickle
+import sys
+import threading
 import time
 from collections import OrderedDict
-from typing import Any, Dict, Optional, Callable
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Callable, Tuple
 from functools import wraps
 
+try:
+    import fcntl  # POSIX only; cross-process locks degrade to in-process locks elsewhere
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a cached value in bytes"""
+    size = getattr(value, "size", None)
+    if isinstance(size, int):
+        return size
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class CacheBackend:
+    """Second-tier cache storage shared across processes"""
+
+    name = "none"
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, expires_at) or None"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        raise NotImplementedError
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Cross-process lock for stampede protection (no-op by default)"""
+        yield
+
+
+class DiskCacheBackend(CacheBackend):
+    """
+    Directory-backed cache shared by all workers on one host
+
+    Each entry is one file: a JSON header line (key, expiry) followed by the
+    pickled value. Writes go through a temp file and ``os.replace``.
+    """
+
+    name = "disk"
+
+    def __init__(self, directory: Path, namespace: str = "default"):
+        self.directory = Path(directory) / namespace
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return self.directory / f"{digest}.entry"
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                if header.get("key") != key:
+                    return None
+                expires_at = header.get("expires_at", 0)
+                if not (expires_at > 0 and time.time() > expires_at):
+                    return pickle.load(f), expires_at
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+        # Expired or unreadable
+        self.delete(key)
+        return None
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json.dumps({"key": key, "expires_at": expires_at}).encode("utf-8") + b"\n")
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry for {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        count = 0
+        for path in self.directory.glob("*.entry"):
+            if pattern is not None:
+                try:
+                    with open(path, "rb") as f:
+                        key = json.loads(f.readline()).get("key", "")
+                except Exception:
+                    key = ""
+                if pattern not in key:
+                    continue
+            path.unlink(missing_ok=True)
+            count += 1
+        return count
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        lock_path = self._path(key).with_suffix(".lock")
+        with open(lock_path, "a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-backed cache shared by workers across hosts (requires the redis package)"""
+
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str = "default", lock_timeout: int = 120):
+        import redis  # type: ignore
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"kgcache:{namespace}:"
+        self.lock_timeout = lock_timeout
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        try:
+            return pickle.loads(raw)
+        except Exception:
+            return None
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000) if expires_at > 0 else None
+        if ttl_ms is not None and ttl_ms <= 0:
+            return
+        self.client.set(
+            self.prefix + key,
+            pickle.dumps((value, expires_at), protocol=pickle.HIGHEST_PROTOCOL),
+            px=ttl_ms,
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def invalidate(self, pattern: Optional[str] = None) -> int:
+        match = f"{self.prefix}*{pattern}*" if pattern else f"{self.prefix}*"
+        keys = list(self.client.scan_iter(match=match))
+        if keys:
+            self.client.delete(*keys)
+        return len(keys)
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        with self.client.lock(f"{self.prefix}lock:{key}", timeout=self.lock_timeout):
+            yield
+
+
+def create_backend(namespace: str) -> Optional[CacheBackend]:
+    """
+    Build the shared cache tier from environment configuration
+
+    KG_CACHE_BACKEND: ``none`` (default), ``disk`` or ``redis``
+    KG_CACHE_DIR: directory for the disk backend
+    KG_CACHE_REDIS_URL: Redis URL for the redis backend
+    """
+    backend = os.getenv("KG_CACHE_BACKEND", "none").lower()
+    try:
+        if backend == "disk":
+            directory = Path(os.getenv("KG_CACHE_DIR", "/tmp/eleutheria-kg-cache"))
+            return DiskCacheBackend(directory, namespace)
+        if backend == "redis":
+            url = os.getenv("KG_CACHE_REDIS_URL", "redis://localhost:6379/0")
+            return RedisCacheBackend(url, namespace)
+    except Exception as e:
+        logger.warning(f"Shared cache backend '{backend}' unavailable, using memory only: {e}")
+    return None
+
+
+@contextmanager
+def _null_lock() -> Iterator[None]:
+    yield
+
+
+class _KeyLock:
+    """Per-key compute lock, dropped once no thread holds or waits on it"""
+
+    __slots__ = ("lock", "waiters")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiters = 0
+
 
 class LRUCache:
-    """Thread-safe LRU cache with TTL support"""
+    """
+    Thread-safe LRU cache with TTL support
 
-    def __init__(self, max_size: int = 50, default_ttl: int = 300):
+    Evicts by entry count and, when ``max_bytes`` is set, by the estimated byte
+    size of the stored values. An optional backend acts as a second tier shared
+    across processes; L1 misses fall through to it and hits are promoted.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 50,
+        default_ttl: int = 300,
+        max_bytes: Optional[int] = None,
+        backend: Optional[CacheBackend] = None,
+    ):
         """
         Args:
             max_size: Maximum number of entries to cache
             default_ttl: Default time-to-live in seconds (0 = no expiration)
+            max_bytes: Byte budget for in-memory entries (None = unbounded)
+            backend: Optional shared second tier
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.backend = backend
         self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
-        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._key_locks: Dict[str, _KeyLock] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "l2_hits": 0, "computes": 0}
 
     def _make_key(self, *args, **kwargs) -> str:
-        """Generate cache key from function arguments"""
+        """Generate cache key from function arguments (stable across processes)"""
+        if not args and not kwargs:
+            return "noargs"
         key_data = json.dumps(
             {"args": args, "kwargs": kwargs},
             sort_keys=True,
             default=str,
         )
-        return hashlib.md5(key_data.encode()).hexdigest()
+        return hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
 
-    def get(self, key: str) -> Optional[Any]:
-        """Retrieve value from cache if present and not expired"""
-        if key not in self._cache:
-            self._stats["misses"] += 1
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
             return None
-
-        entry = self._cache[key]
         # Check TTL expiration
         if entry["expires_at"] > 0 and time.time() > entry["expires_at"]:
-            del self._cache[key]
-            self._stats["misses"] += 1
+            self._remove(key)
             return None
-
         # Move to end (most recently used)
         self._cache.move_to_end(key)
-        self._stats["hits"] += 1
         return entry["value"]
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Store value in cache with optional TTL override"""
-        if ttl is None:
-            ttl = self.default_ttl
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
 
-        expires_at = time.time() + ttl if ttl > 0 else 0
+    def _size_of(self, value: Any) -> int:
+        # Pickles the value: call it before taking self._lock
+        return estimate_size(value) if self.max_bytes is not None else 0
 
-        if key in self._cache:
-            self._cache.move_to_end(key)
-        else:
-            if len(self._cache) >= self.max_size:
-                # Evict oldest entry
-                self._cache.popitem(last=False)
-                self._stats["evictions"] += 1
+    def _store_local(self, key: str, value: Any, expires_at: float, size: int) -> None:
+        self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Larger than the whole budget: keep it in the shared tier only
+            return
 
         self._cache[key] = {
             "value": value,
             "expires_at": expires_at,
             "created_at": time.time(),
+            "size": size,
         }
+        self._bytes += size
+
+        while self._cache and (
+            len(self._cache) > self.max_size
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            # Evict least recently used entry
+            self._remove(next(iter(self._cache)))
+            self._stats["evictions"] += 1
+
+    def _lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Value from memory or the shared tier (promoted) and whether it came from the latter; no stats"""
+        with self._lock:
+            value = self._get_local(key)
+        if value is not None:
+            return value, False
+
+        if self.backend is not None:
+            try:
+                shared = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Shared cache read failed for {key}: {e}")
+                shared = None
+            if shared is not None:
+                value, expires_at = shared
+                size = self._size_of(value)
+                with self._lock:
+                    self._store_local(key, value, expires_at, size)
+                return value, True
+
+        return None, False
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retrieve value from cache if present and not expired"""
+        value, from_shared = self._lookup(key)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                if from_shared:
+                    self._stats["l2_hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store value in cache with optional TTL override"""
+        if ttl is None:
+            ttl = self.default_ttl
+
+        expires_at = time.time() + ttl if ttl > 0 else 0
+        size = self._size_of(value)
+
+        with self._lock:
+            self._store_local(key, value, expires_at, size)
+
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed for {key}: {e}")
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """
+        Return the cached value or compute it exactly once
+
+        Concurrent misses for the same key wait on a per-key lock (and the
+        backend's cross-process lock) instead of recomputing in parallel.
+        ``None`` results are returned but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, _KeyLock())
+            key_lock.waiters += 1
+
+        try:
+            with key_lock.lock:
+                # Another thread may have filled the entry while we waited
+                with self._lock:
+                    value = self._get_local(key)
+                if value is not None:
+                    return value
+
+                backend_lock = self.backend.lock(key) if self.backend is not None else _null_lock()
+                with backend_lock:
+                    # Another worker may have filled the shared tier while we waited
+                    # (a peek: this request's miss was counted above)
+                    if self.backend is not None:
+                        value, _ = self._lookup(key)
+                        if value is not None:
+                            return value
+
+                    value = compute()
+                    with self._lock:
+                        self._stats["computes"] += 1
+                    if value is not None:
+                        self.set(key, value, ttl=ttl)
+                    return value
+        finally:
+            with self._lock:
+                key_lock.waiters -= 1
+                if not key_lock.waiters:
+                    del self._key_locks[key]
+
+    async def aget_or_compute(self, key: str, compute: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """
+        get_or_compute for coroutines
+
+        Memory hits are returned inline; a miss, which may take the backend's
+        file or Redis lock, read it and compute, runs in a worker thread so the
+        event loop is never blocked.
+        """
+        with self._lock:
+            value = self._get_local(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                return value
+        return await asyncio.to_thread(self.get_or_compute, key, compute, ttl)
 
     def invalidate(self, pattern: Optional[str] = None) -> int:
         """
@@ -84,34 +438,53 @@ class LRUCache:
         Returns:
             Number of entries invalidated
         """
-        if pattern is None:
-            count = len(self._cache)
-            self._cache.clear()
-            return count
-
-        keys_to_remove = [k for k in self._cache.keys() if pattern in k]
-        for key in keys_to_remove:
-            del self._cache[key]
-        return len(keys_to_remove)
+        with self._lock:
+            if pattern is None:
+                count = len(self._cache)
+                self._cache.clear()
+                self._bytes = 0
+            else:
+                keys_to_remove = [k for k in self._cache.keys() if pattern in k]
+                for key in keys_to_remove:
+                    self._remove(key)
+                count = len(keys_to_remove)
+
+        if self.backend is not None:
+            try:
+                count = max(count, self.backend.invalidate(pattern))
+            except Exception as e:
+                logger.warning(f"Shared cache invalidation failed: {e}")
+        return count
 
     def stats(self) -> Dict[str, Any]:
         """Return cache statistics"""
-        total = self._stats["hits"] + self._stats["misses"]
-        hit_rate = self._stats["hits"] / total if total > 0 else 0.0
-
-        return {
-            "size": len(self._cache),
-            "max_size": self.max_size,
-            "hits": self._stats["hits"],
-            "misses": self._stats["misses"],
-            "evictions": self._stats["evictions"],
-            "hit_rate": round(hit_rate, 3),
-        }
+        with self._lock:
+            total = self._stats["hits"] + self._stats["misses"]
+            hit_rate = self._stats["hits"] / total if total > 0 else 0.0
+
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._stats["hits"],
+                "l2_hits": self._stats["l2_hits"],
+                "misses": self._stats["misses"],
+                "computes": self._stats["computes"],
+                "evictions": self._stats["evictions"],
+                "hit_rate": round(hit_rate, 3),
+                "backend": self.backend.name if self.backend else "none",
+            }
 
 
 # Global cache instances
-_analytics_cache = LRUCache(max_size=50, default_ttl=600)  # 10 min TTL for analytics
-_kg_data_cache = LRUCache(max_size=1, default_ttl=0)  # Never expire KG data
+_analytics_cache = LRUCache(
+    max_size=50,
+    default_ttl=600,  # 10 min TTL for analytics
+    max_bytes=int(os.getenv("KG_ANALYTICS_CACHE_MB", "64")) * 1024 * 1024,
+    backend=create_backend("analytics"),
+)
+_kg_data_cache = LRUCache(max_size=4, default_ttl=0)  # Never expire KG data (+ version hash, indexes)
 
 
 def cached(
@@ -122,6 +495,8 @@ def cached(
     """
     Decorator to cache function results
 
+    Concurrent calls with the same arguments compute once (see get_or_compute).
+
     Args:
         cache: Cache instance to use
         ttl: Override cache TTL
@@ -132,19 +507,7 @@ def cached(
         def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = f"{key_prefix}:{cache._make_key(*args, **kwargs)}"
-
-            # Try to retrieve from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
-
-            # Compute result
-            result = func(*args, **kwargs)
-
-            # Store in cache
-            cache.set(cache_key, result, ttl=ttl)
-
-            return result
+            return cache.get_or_compute(cache_key, lambda: func(*args, **kwargs), ttl=ttl)
 
         # Expose cache control methods
         wrapper.invalidate_cache = lambda: cache.invalidate(key_prefix)
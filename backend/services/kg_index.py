@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Knowledge Graph lookup indexes
+Built once per KG version so endpoints filter, page and project without full scans
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+KGNode = Dict[str, Any]
+KGEdge = Dict[str, Any]
+KGData = Dict[str, Any]
+
+NODE_INDEX_FIELDS: Tuple[str, ...] = ("type", "period", "school")
+EDGE_INDEX_FIELDS: Tuple[str, ...] = ("relation",)
+
+
+class KGIndex:
+    """
+    Positional indexes over KG nodes and edges
+
+    Filters resolve to sorted position lists, so results keep the KG file order
+    and pagination is a slice.
+    """
+
+    def __init__(self, kg_data: KGData, version: Optional[str] = None):
+        self.version = version
+        self.nodes: List[KGNode] = kg_data.get("nodes", [])
+        self.edges: List[KGEdge] = kg_data.get("edges", [])
+
+        self.node_position: Dict[str, int] = {}
+        self.node_fields: Dict[str, Dict[Any, List[int]]] = {
+            field: defaultdict(list) for field in NODE_INDEX_FIELDS
+        }
+        for position, node in enumerate(self.nodes):
+            node_id = node.get("id")
+            if node_id is not None:
+                self.node_position[node_id] = position
+            for field in NODE_INDEX_FIELDS:
+                value = node.get(field)
+                if value is not None:
+                    self.node_fields[field][value].append(position)
+
+        self.edge_fields: Dict[str, Dict[Any, List[int]]] = {
+            field: defaultdict(list) for field in EDGE_INDEX_FIELDS
+        }
+        self.outgoing: Dict[str, List[int]] = defaultdict(list)
+        self.incoming: Dict[str, List[int]] = defaultdict(list)
+        for position, edge in enumerate(self.edges):
+            for field in EDGE_INDEX_FIELDS:
+                value = edge.get(field)
+                if value is not None:
+                    self.edge_fields[field][value].append(position)
+            if edge.get("source") is not None:
+                self.outgoing[edge["source"]].append(position)
+            if edge.get("target") is not None:
+                self.incoming[edge["target"]].append(position)
+
+    def get_node(self, node_id: str) -> Optional[KGNode]:
+        """O(1) node lookup by id"""
+        position = self.node_position.get(node_id)
+        return self.nodes[position] if position is not None else None
+
+    def connected_edges(self, node_id: str) -> List[KGEdge]:
+        """Edges where the node is source or target, in KG order"""
+        positions = sorted(set(self.outgoing.get(node_id, [])) | set(self.incoming.get(node_id, [])))
+        return [self.edges[position] for position in positions]
+
+    @staticmethod
+    def _select(
+        index: Dict[str, Dict[Any, List[int]]],
+        total: int,
+        filters: Dict[str, Optional[Any]],
+    ) -> List[int]:
+        selected: Optional[set] = None
+        for field, value in filters.items():
+            if value is None:
+                continue
+            positions = set(index[field].get(value, ()))
+            selected = positions if selected is None else selected & positions
+            if not selected:
+                return []
+        if selected is None:
+            return list(range(total))
+        return sorted(selected)
+
+    def filter_nodes(self, **filters: Optional[Any]) -> List[int]:
+        """Positions of nodes matching all given field filters (type, period, school)"""
+        return self._select(self.node_fields, len(self.nodes), filters)
+
+    def filter_edges(self, **filters: Optional[Any]) -> List[int]:
+        """Positions of edges matching all given field filters (relation)"""
+        return self._select(self.edge_fields, len(self.edges), filters)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields`` parameter (None = all fields)"""
+    if not fields:
+        return None
+    parsed = [field.strip() for field in fields.split(",") if field.strip()]
+    return parsed or None
+
+
+def project(
+    item: Dict[str, Any],
+    fields: Optional[Sequence[str]] = None,
+    exclude: Iterable[str] = (),
+    always: Sequence[str] = ("id",),
+) -> Dict[str, Any]:
+    """Project a node/edge dict onto the requested fields"""
+    if fields is None:
+        excluded = set(exclude)
+        if not excluded:
+            return item
+        return {key: value for key, value in item.items() if key not in excluded}
+
+    projected = {key: item[key] for key in always if key in item}
+    for field in fields:
+        if field in item:
+            projected[field] = item[field]
+    return projected
+
+
+def encode_cursor(version: Optional[str], offset: int) -> str:
+    """Opaque pagination cursor bound to a KG version"""
+    raw = json.dumps({"v": version, "o": offset}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, version: Optional[str]) -> int:
+    """
+    Decode a cursor into an offset
+
+    Raises:
+        ValueError: malformed cursor or cursor issued for another KG version
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(data["o"])
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if data.get("v") != version:
+        raise ValueError("Cursor refers to a previous Knowledge Graph version; restart pagination")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Knowledge Graph metric precomputation
+Computes centrality measures once per KG version in a background worker process
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+KGData = Dict[str, Any]
+EdgeTuple = Tuple[str, str, float]
+
+# Above this node count betweenness is estimated from a sample of pivot nodes
+BETWEENNESS_SAMPLE_THRESHOLD = int(os.getenv("KG_METRICS_SAMPLE_THRESHOLD", "1500"))
+BETWEENNESS_SAMPLE_SIZE = int(os.getenv("KG_METRICS_BETWEENNESS_K", "256"))
+# A failed version is retried after this delay, doubled on each further failure
+METRICS_RETRY_SECONDS = float(os.getenv("KG_METRICS_RETRY_SECONDS", "30"))
+METRICS_MAX_RETRY_SECONDS = 3600.0
+
+CENTRALITY_MEASURES: Tuple[str, ...] = (
+    "degree",
+    "betweenness",
+    "closeness",
+    "eigenvector",
+    "pagerank",
+)
+
+
+def kg_version(kg_data: KGData) -> str:
+    """Content hash identifying a KG snapshot (stable across processes)"""
+    digest = hashlib.sha256()
+    for key in ("nodes", "edges"):
+        digest.update(
+            json.dumps(kg_data.get(key, []), sort_keys=True, default=str).encode("utf-8")
+        )
+    return digest.hexdigest()[:16]
+
+
+# path -> (mtime_ns, size, version) of the last KG file hashed
+_file_versions: Dict[str, Tuple[int, int, str]] = {}
+_file_versions_lock = threading.Lock()
+
+
+def kg_file_version(path: str | os.PathLike, stat: os.stat_result, kg_data: KGData) -> str:
+    """
+    kg_version of a KG loaded from ``path``, memoised per file (mtime, size)
+
+    ``stat`` must be taken before the file is read, so a concurrent rewrite
+    can only cause a rehash, never a stale version.
+    """
+    key = os.fspath(path)
+    with _file_versions_lock:
+        cached = _file_versions.get(key)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    version = kg_version(kg_data)
+    with _file_versions_lock:
+        _file_versions[key] = (stat.st_mtime_ns, stat.st_size, version)
+    return version
+
+
+def _graph_payload(kg_data: KGData) -> Tuple[List[str], List[EdgeTuple]]:
+    """Reduce KG data to the id/edge lists needed by the worker (cheap to pickle)"""
+    node_ids = [node["id"] for node in kg_data.get("nodes", []) if node.get("id")]
+    edges: List[EdgeTuple] = []
+    for edge in kg_data.get("edges", []):
+        source = edge.get("source")
+        target = edge.get("target")
+        if not source or not target:
+            continue
+        try:
+            weight = float(edge.get("weight", 1.0))
+        except (TypeError, ValueError):
+            weight = 1.0
+        edges.append((source, target, weight))
+    return node_ids, edges
+
+
+def pagerank_power_iteration(
+    n: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    personalization: Optional[np.ndarray] = None,
+    alpha: float = 0.85,
+    tol: float = 1.0e-8,
+    max_iter: int = 100,
+) -> np.ndarray:
+    """
+    PageRank over an edge list using NumPy sparse mat-vec products
+
+    Edges are treated as directed (source -> target); pass both directions for
+    an undirected graph. Dangling mass is redistributed via the personalization
+    vector, matching NetworkX semantics.
+    """
+    if n == 0:
+        return np.zeros(0)
+
+    if weights is None:
+        weights = np.ones(len(sources), dtype=np.float64)
+
+    if personalization is None:
+        teleport = np.full(n, 1.0 / n)
+    else:
+        teleport = np.asarray(personalization, dtype=np.float64)
+        total = teleport.sum()
+        teleport = teleport / total if total > 0 else np.full(n, 1.0 / n)
+
+    out_weight = np.bincount(sources, weights=weights, minlength=n)
+    dangling = out_weight == 0
+    safe_out = np.where(dangling, 1.0, out_weight)
+    transition = weights / safe_out[sources]
+
+    scores = teleport.copy()
+    for _ in range(max_iter):
+        previous = scores
+        spread = np.bincount(targets, weights=previous[sources] * transition, minlength=n)
+        dangling_mass = previous[dangling].sum()
+        scores = alpha * (spread + dangling_mass * teleport) + (1.0 - alpha) * teleport
+        if np.abs(scores - previous).sum() < n * tol:
+            break
+
+    return scores
+
+
+def _pagerank(graph: nx.Graph, node_ids: Sequence[str]) -> Dict[str, float]:
+    """PageRank for an undirected NetworkX graph without the SciPy dependency"""
+    index = {node_id: idx for idx, node_id in enumerate(node_ids)}
+    sources: List[int] = []
+    targets: List[int] = []
+    weights: List[float] = []
+    for u, v, data in graph.edges(data=True):
+        weight = data.get("weight", 1.0)
+        sources.extend((index[u], index[v]))
+        targets.extend((index[v], index[u]))
+        weights.extend((weight, weight))
+
+    scores = pagerank_power_iteration(
+        len(node_ids),
+        np.asarray(sources, dtype=np.int64),
+        np.asarray(targets, dtype=np.int64),
+        np.asarray(weights, dtype=np.float64),
+    )
+    return {node_id: float(scores[idx]) for node_id, idx in index.items()}
+
+
+def compute_graph_metrics(
+    node_ids: Sequence[str],
+    edges: Sequence[EdgeTuple],
+    sample_threshold: int = BETWEENNESS_SAMPLE_THRESHOLD,
+    sample_size: int = BETWEENNESS_SAMPLE_SIZE,
+) -> Dict[str, Any]:
+    """
+    Compute centrality measures for the KG graph
+
+    Runs inside the worker process. Betweenness is exact for small graphs and
+    estimated from ``sample_size`` pivots (fixed seed) once the graph exceeds
+    ``sample_threshold`` nodes.
+    """
+    started = time.perf_counter()
+
+    graph = nx.Graph()
+    graph.add_nodes_from(node_ids)
+    for source, target, weight in edges:
+        if graph.has_edge(source, target):
+            graph[source][target]["weight"] += weight
+        else:
+            graph.add_edge(source, target, weight=weight)
+
+    all_ids = list(graph.nodes())
+    n = graph.number_of_nodes()
+
+    betweenness_k: Optional[int] = None
+    if n > sample_threshold:
+        betweenness_k = min(sample_size, n)
+
+    centrality: Dict[str, Dict[str, float]] = {
+        "degree": nx.degree_centrality(graph) if n > 1 else {node: 0.0 for node in all_ids},
+        "betweenness": nx.betweenness_centrality(graph, k=betweenness_k, seed=42),
+        "closeness": nx.closeness_centrality(graph),
+        "pagerank": _pagerank(graph, all_ids),
+    }
+
+    try:
+        centrality["eigenvector"] = nx.eigenvector_centrality(
+            graph, max_iter=500, tol=1.0e-6, weight="weight"
+        )
+    except (nx.PowerIterationFailedConvergence, nx.NetworkXException) as exc:
+        logger.warning(f"Eigenvector centrality did not converge: {exc}")
+        centrality["eigenvector"] = {}
+
+    return {
+        "node_count": n,
+        "edge_count": graph.number_of_edges(),
+        "components": nx.number_connected_components(graph) if n else 0,
+        "density": nx.density(graph) if n > 1 else 0.0,
+        "betweenness_approximate": betweenness_k is not None,
+        "betweenness_samples": betweenness_k,
+        "centrality": centrality,
+        "compute_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class GraphAdjacency:
+    """
+    Undirected edge arrays for one KG version, ready for power iteration
+
+    Built once per version (see ``get_adjacency``) so per-query personalised
+    PageRank is only the iteration itself.
+    """
+
+    def __init__(self, kg_data: KGData):
+        self.node_ids, edges = _graph_payload(kg_data)
+        self.index = {node_id: idx for idx, node_id in enumerate(self.node_ids)}
+        sources: List[int] = []
+        targets: List[int] = []
+        weights: List[float] = []
+        for source, target, weight in edges:
+            if source not in self.index or target not in self.index or source == target:
+                continue
+            sources.extend((self.index[source], self.index[target]))
+            targets.extend((self.index[target], self.index[source]))
+            weights.extend((weight, weight))
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+    def personalized_pagerank(
+        self,
+        seeds: Dict[str, float],
+        alpha: float = 0.85,
+        tol: float = 1.0e-6,
+    ) -> Dict[str, float]:
+        """
+        PageRank with teleportation restricted to ``seeds`` (id -> weight)
+
+        Returns scores for every node reachable from a seed; unknown seed ids are
+        ignored and an empty dict is returned when none are known.
+        """
+        n = len(self.node_ids)
+        personalization = np.zeros(n)
+        for node_id, weight in seeds.items():
+            idx = self.index.get(node_id)
+            if idx is not None:
+                personalization[idx] += max(weight, 0.0) or 1.0
+        if not personalization.any():
+            return {}
+
+        scores = pagerank_power_iteration(
+            n, self.sources, self.targets, self.weights,
+            personalization=personalization, alpha=alpha, tol=tol,
+        )
+        nonzero = np.flatnonzero(scores > 0)
+        return {self.node_ids[idx]: float(scores[idx]) for idx in nonzero}
+
+
+_adjacency: Dict[str, GraphAdjacency] = {}
+_adjacency_lock = threading.Lock()
+
+
+def get_adjacency(kg_data: KGData, version: Optional[str] = None) -> GraphAdjacency:
+    """Adjacency arrays for this KG version (only the newest version is kept)"""
+    version = version or kg_version(kg_data)
+    with _adjacency_lock:
+        adjacency = _adjacency.get(version)
+        if adjacency is None:
+            adjacency = GraphAdjacency(kg_data)
+            _adjacency.clear()
+            _adjacency[version] = adjacency
+        return adjacency
+
+
+def top_nodes(scores: Dict[str, float], limit: int = 10) -> List[Dict[str, Any]]:
+    """Return the highest scoring nodes as ``[{id, score}]``"""
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [{"id": node_id, "score": round(score, 6)} for node_id, score in ranked]
+
+
+class GraphMetricsService:
+    """
+    Caches graph metrics per KG version and computes them off the request path
+
+    Only the most recent version is kept. ``ensure`` never blocks: it returns
+    the cached result or schedules a computation in the worker process. A
+    failed version is not rescheduled until its backoff has passed, and a
+    broken worker pool is replaced rather than failing the request.
+    """
+
+    def __init__(self, max_workers: int = 1, retry_seconds: float = METRICS_RETRY_SECONDS):
+        self.max_workers = max_workers
+        self.retry_seconds = retry_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Future] = {}
+        self._errors: Dict[str, str] = {}
+        # version -> (consecutive failures, monotonic time of the next attempt)
+        self._retry_at: Dict[str, Tuple[int, float]] = {}
+        self._latest_version: Optional[str] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        # Called with self._lock held; a pool whose worker died accepts no more work
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _record_failure(self, version: str, error: str) -> None:
+        # Called with self._lock held
+        failures = self._retry_at.get(version, (0, 0.0))[0] + 1
+        delay = min(self.retry_seconds * 2 ** (failures - 1), METRICS_MAX_RETRY_SECONDS)
+        self._errors[version] = error
+        self._retry_at[version] = (failures, time.monotonic() + delay)
+        logger.error(f"Graph metrics computation failed for {version} ({failures}x, retry in {delay:.0f}s): {error}")
+
+    def ensure(self, kg_data: KGData, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Return metrics for this KG version, scheduling computation if missing"""
+        version = version or kg_version(kg_data)
+        with self._lock:
+            if version in self._results:
+                return self._results[version]
+            if version in self._pending:
+                return None
+            if version in self._retry_at and time.monotonic() < self._retry_at[version][1]:
+                return None
+
+            node_ids, edges = _graph_payload(kg_data)
+            logger.info(f"Scheduling graph metrics for KG version {version} ({len(node_ids)} nodes)")
+            try:
+                executor = self._get_executor()
+                future = executor.submit(compute_graph_metrics, node_ids, edges)
+            except BrokenProcessPool:
+                logger.warning("Graph metrics worker pool is broken; starting a new one")
+                self._reset_executor()
+                try:
+                    executor = self._get_executor()
+                    future = executor.submit(compute_graph_metrics, node_ids, edges)
+                except Exception as exc:
+                    self._reset_executor()
+                    self._record_failure(version, f"worker pool unavailable: {exc}")
+                    return None
+            self._pending[version] = future
+
+        future.add_done_callback(lambda done: self._store(version, done, executor))
+        return None
+
+    def _store(self, version: str, future: Future, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            self._pending.pop(version, None)
+            try:
+                result = future.result()
+            except Exception as exc:  # worker crash, error or cancelled future
+                # Replace the pool the crashed worker belonged to (ensure may already have)
+                if isinstance(exc, BrokenProcessPool) and self._executor is executor:
+                    self._reset_executor()
+                self._record_failure(version, str(exc) or type(exc).__name__)
+                return
+
+            self._errors.pop(version, None)
+            self._retry_at.pop(version, None)
+            result["version"] = version
+            result["computed_at"] = time.time()
+            # Keep only the newest snapshot
+            self._results = {version: result}
+            self._latest_version = version
+            logger.info(
+                f"Graph metrics ready for KG version {version} in {result['compute_seconds']}s"
+            )
+
+    def get(self, version: str) -> Optional[Dict[str, Any]]:
+        """Metrics for a specific KG version, if computed"""
+        with self._lock:
+            return self._results.get(version)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recently computed metrics regardless of version"""
+        with self._lock:
+            if self._latest_version is None:
+                return None
+            return self._results.get(self._latest_version)
+
+    def scores(self, measure: str = "pagerank") -> Dict[str, float]:
+        """Per-node scores for one measure from the latest metrics (empty if not ready)"""
+        latest = self.latest()
+        if not latest:
+            return {}
+        return latest["centrality"].get(measure, {})
+
+    def status(self, version: str) -> str:
+        """One of ``ready``, ``pending``, ``failed`` or ``missing``"""
+        with self._lock:
+            if version in self._results:
+                return "ready"
+            if version in self._pending:
+                return "pending"
+            if version in self._errors:
+                return "failed"
+            return "missing"
+
+    def wait(self, version: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a scheduled computation finishes (used by warm-up and tests)"""
+        with self._lock:
+            future = self._pending.get(version)
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+            # The done-callback may still be running on the executor thread
+            deadline = time.monotonic() + 1.0
+            while self.status(version) == "pending" and time.monotonic() < deadline:
+                time.sleep(0.01)
+        return self.get(version)
+
+    def shutdown(self) -> None:
+        """Stop the worker process"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_metrics_service = GraphMetricsService()
+
+
+def get_graph_metrics_service() -> GraphMetricsService:
+    """Get the process-wide graph metrics service"""
+    return _metrics_service
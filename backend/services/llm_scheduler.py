@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+LLM admission control
+Bounded per-provider concurrency, priority queueing, early rejection and latency percentiles
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from utils.metrics import track_llm_queue, track_llm_rejection
+
+logger = logging.getLogger(__name__)
+
+# CPU-bound Mistral 7B serves one generation at a time; Gemini is rate limited upstream
+DEFAULT_CONCURRENCY = {
+    "ollama": int(os.getenv("LLM_OLLAMA_CONCURRENCY", "1")),
+    "gemini": int(os.getenv("LLM_GEMINI_CONCURRENCY", "8")),
+}
+DEFAULT_SERVICE_TIME = {
+    "ollama": float(os.getenv("LLM_OLLAMA_EXPECTED_SECONDS", "30")),
+    "gemini": float(os.getenv("LLM_GEMINI_EXPECTED_SECONDS", "5")),
+}
+LLM_QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "32"))
+LLM_QUEUE_DEADLINE = float(os.getenv("LLM_QUEUE_DEADLINE", "90"))
+
+# Weight of the newest observation in the service-time moving average
+SERVICE_TIME_ALPHA = 0.2
+
+# Hedging: send the request to the other provider once the primary is slower than its p90
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))
+LLM_LATENCY_WINDOW = 200
+
+
+class Priority(IntEnum):
+    """Queue priority; lower values are admitted first"""
+    INTERACTIVE = 0  # SSE / chat users watching a spinner
+    STANDARD = 1     # Plain API requests
+    BATCH = 2        # Evaluation and batch jobs
+
+
+class LLMOverloadedError(Exception):
+    """Request rejected by admission control; retry after ``retry_after`` seconds"""
+
+    def __init__(self, provider: str, reason: str, retry_after: float):
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(
+            f"{provider} is overloaded ({reason}); retry in about {self.retry_after}s"
+        )
+
+
+class ProviderScheduler:
+    """
+    Admission queue for one provider
+
+    At most ``max_concurrency`` generations run at once. Further requests wait
+    in a priority queue (FIFO within a priority) and are handed the slot
+    directly when a generation finishes. A request is rejected up front when
+    the queue is full or its estimated wait exceeds its deadline, and again if
+    the deadline passes while it is still queued.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 1,
+        max_queue: int = LLM_QUEUE_MAX,
+        expected_service_time: float = 30.0,
+    ):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.service_time = expected_service_time
+        self.active = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "expired": 0, "completed": 0}
+
+    def queued(self, priority: Optional[Priority] = None) -> int:
+        """Waiting requests, optionally only those at ``priority``"""
+        return sum(
+            1 for item_priority, _, future in self._queue
+            if not future.done() and (priority is None or item_priority == priority)
+        )
+
+    def estimated_wait(self, priority: Priority) -> float:
+        """Seconds a new request at ``priority`` would wait for a slot"""
+        ahead = sum(1 for item_priority, _, future in self._queue if item_priority <= priority and not future.done())
+        backlog = self.active + ahead - self.max_concurrency + 1
+        if backlog <= 0:
+            return 0.0
+        return math.ceil(backlog / self.max_concurrency) * self.service_time
+
+    def _publish(self, priority: Priority, wait: Optional[float] = None) -> None:
+        track_llm_queue(self.name, priority.name.lower(), self.queued(priority), wait)
+
+    def _reject(self, reason: str, retry_after: float) -> LLMOverloadedError:
+        self._stats["rejected"] += 1
+        track_llm_rejection(self.name, reason)
+        logger.warning(f"LLM admission: rejecting {self.name} request ({reason}, retry in {retry_after:.0f}s)")
+        return LLMOverloadedError(self.name, reason, retry_after)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.STANDARD, deadline: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold one generation slot for the duration of the block
+
+        Args:
+            priority: Queue priority
+            deadline: Seconds the caller is willing to wait for a slot
+
+        Raises:
+            LLMOverloadedError: queue full, estimated or actual wait over deadline
+        """
+        deadline = LLM_QUEUE_DEADLINE if deadline is None else deadline
+        enqueued_at = time.monotonic()
+
+        if self.active < self.max_concurrency and not self.queued():
+            self.active += 1
+        else:
+            if self.queued() >= self.max_queue:
+                raise self._reject("queue_full", self.estimated_wait(priority))
+            estimate = self.estimated_wait(priority)
+            if estimate > deadline:
+                raise self._reject("deadline", estimate)
+
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._queue, (int(priority), next(self._sequence), future))
+            self._stats["queued"] += 1
+            self._publish(priority)
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout=deadline)
+            except asyncio.TimeoutError:
+                if future.done() and not future.cancelled():
+                    # Slot was handed over just as the deadline passed: give it back
+                    self._release_slot()
+                else:
+                    future.cancel()
+                self._stats["expired"] += 1
+                self._publish(priority)
+                raise self._reject("deadline", self.estimated_wait(priority))
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release_slot()
+                else:
+                    future.cancel()
+                self._publish(priority)
+                raise
+
+        wait = time.monotonic() - enqueued_at
+        self._stats["admitted"] += 1
+        self._publish(priority, wait)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.service_time += SERVICE_TIME_ALPHA * (elapsed - self.service_time)
+            self._stats["completed"] += 1
+            self._release_slot()
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the next live waiter, or free it"""
+        while self._queue:
+            _, _, future = heapq.heappop(self._queue)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load and counters"""
+        return {
+            **self._stats,
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued(),
+            "queue_depth_by_priority": {priority.name.lower(): self.queued(priority) for priority in Priority},
+            "expected_service_seconds": round(self.service_time, 2),
+        }
+
+
+class LatencyTracker:
+    """Sliding window of successful generation latencies for one provider"""
+
+    def __init__(self, window: int = LLM_LATENCY_WINDOW):
+        self.samples: deque = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile (q in 0..1); None without samples"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[rank]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "samples": len(self.samples),
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+        }
+
+
+class LLMScheduler:
+    """Per-provider admission queues and latency windows shared by every LLMService instance"""
+
+    def __init__(self) -> None:
+        self.providers: Dict[str, ProviderScheduler] = {}
+        self.latency: Dict[str, LatencyTracker] = {}
+
+    def provider(self, name: str) -> ProviderScheduler:
+        if name not in self.providers:
+            self.providers[name] = ProviderScheduler(
+                name,
+                max_concurrency=DEFAULT_CONCURRENCY.get(name, 1),
+                expected_service_time=DEFAULT_SERVICE_TIME.get(name, 30.0),
+            )
+        return self.providers[name]
+
+    def slot(self, name: str, priority: Priority = Priority.STANDARD, deadline: Optional[float] = None):
+        """Admission context for a generation on provider ``name``"""
+        return self.provider(name).slot(priority, deadline)
+
+    def observe_latency(self, name: str, seconds: float) -> None:
+        self.latency.setdefault(name, LatencyTracker()).observe(seconds)
+
+    def hedge_delay(self, name: str) -> float:
+        """
+        Seconds to wait on ``name`` before hedging to another provider
+
+        The provider's p90 once enough samples exist, otherwise its expected
+        service time.
+        """
+        tracker = self.latency.get(name)
+        if tracker and len(tracker.samples) >= LLM_HEDGE_MIN_SAMPLES:
+            return tracker.percentile(LLM_HEDGE_PERCENTILE)
+        return self.provider(name).service_time
+
+    def expected_completion(self, name: str, priority: Priority = Priority.STANDARD) -> float:
+        """Estimated queue wait plus typical (p50) generation time"""
+        scheduler = self.provider(name)
+        tracker = self.latency.get(name)
+        typical = tracker.percentile(0.5) if tracker and tracker.samples else None
+        return scheduler.estimated_wait(priority) + (typical if typical is not None else scheduler.service_time)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {**scheduler.stats(), "latency": self.latency.get(name, LatencyTracker()).stats()}
+            for name, scheduler in self.providers.items()
+        }
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Process-wide LLM scheduler"""
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler()
+    return _llm_scheduler
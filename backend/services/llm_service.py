@@ -4,16 +4,22 @@ Unified LLM Service - Supports both local Ollama and cloud Gemini models
 Provides fallback and model selection capabilities
 """
 
+import asyncio
 import logging
 import os
 import json
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
 import requests
 from dotenv import load_dotenv
 
 import google.generativeai as genai
 
+from services.llm_scheduler import LLM_QUEUE_DEADLINE, LLMOverloadedError, Priority, get_llm_scheduler
+from utils.circuit_breaker import is_open, llm_provider_breakers
+from utils.metrics import track_llm_request
+
 # Load environment variables
 load_dotenv()
 
@@ -24,6 +30,12 @@ class ModelProvider(Enum):
     OLLAMA = "ollama"
     GEMINI = "gemini"
 
+
+MODEL_NAMES = {
+    ModelProvider.OLLAMA: "mistral:7b",
+    ModelProvider.GEMINI: "gemini-2.0-flash-exp",
+}
+
 class LLMService:
     """Unified LLM service supporting multiple providers with fallback"""
     
@@ -37,6 +49,7 @@ class LLMService:
                 logger.warning(f"Unrecognized LLM_PREFERRED_PROVIDER '{env_provider}', defaulting to {preferred_provider.value}")
 
         self.preferred_provider = preferred_provider
+        self.scheduler = get_llm_scheduler()
         self.ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
         
@@ -53,10 +66,16 @@ class LLMService:
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 2000,
-        provider: Optional[ModelProvider] = None
+        provider: Optional[ModelProvider] = None,
+        priority: Priority = Priority.STANDARD,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Generate response using specified or preferred provider with fallback
+
+        Providers with an open circuit breaker are skipped. If the primary runs
+        past its p90 latency, the same request is hedged to the other provider
+        and the first answer wins.
         
         Args:
             prompt: User prompt
@@ -64,40 +83,168 @@ class LLMService:
             temperature: Generation temperature
             max_tokens: Maximum tokens to generate
             provider: Specific provider to use (None = use preferred)
+            priority: Admission queue priority (interactive ahead of batch)
+            deadline: Seconds the caller will wait for a provider slot
+                (None = LLM_QUEUE_DEADLINE)
         
         Returns:
             Dict with response, provider used, and metadata
+
+        Raises:
+            LLMOverloadedError: both providers are saturated; carries a retry hint
         """
         # Determine which provider to use
         target_provider = provider or self.preferred_provider
-        
-        # Try preferred provider first
+        fallback_provider = ModelProvider.GEMINI if target_provider == ModelProvider.OLLAMA else ModelProvider.OLLAMA
+        target_provider, fallback_provider = self._route(target_provider, fallback_provider, priority, deadline)
+        fallback_available = not is_open(llm_provider_breakers[fallback_provider.value])
+
+        args = (prompt, system_prompt, temperature, max_tokens, priority, deadline)
+        attempts: Dict[asyncio.Task, Tuple[ModelProvider, asyncio.Event]] = {}
+        errors: Dict[ModelProvider, Exception] = {}
+
+        def launch(selected: ModelProvider) -> asyncio.Task:
+            started = asyncio.Event()
+            task = asyncio.ensure_future(self._generate_with(selected, *args, started=started))
+            attempts[task] = (selected, started)
+            return task
+
         try:
-            if target_provider == ModelProvider.OLLAMA:
-                return await self._generate_with_ollama(prompt, system_prompt, temperature, max_tokens)
-            elif target_provider == ModelProvider.GEMINI:
-                return await self._generate_with_gemini(prompt, system_prompt, temperature, max_tokens)
-        except Exception as e:
-            logger.warning(f"❌ {target_provider.value} failed: {e}")
-            
-            # Fallback to other provider
-            fallback_provider = ModelProvider.GEMINI if target_provider == ModelProvider.OLLAMA else ModelProvider.OLLAMA
-            
-            try:
+            # Try preferred provider first, hedging once it runs past its p90
+            primary = launch(target_provider)
+            hedge_delay = self.scheduler.hedge_delay(target_provider.value) if fallback_available else None
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+
+            if primary in done:
+                try:
+                    return primary.result()
+                except Exception as e:
+                    errors[target_provider] = e
+                    logger.warning(f"❌ {target_provider.value} failed: {e}")
+
+                # Fallback to other provider
                 logger.info(f"🔄 Falling back to {fallback_provider.value}")
-                if fallback_provider == ModelProvider.OLLAMA:
-                    return await self._generate_with_ollama(prompt, system_prompt, temperature, max_tokens)
-                else:
-                    return await self._generate_with_gemini(prompt, system_prompt, temperature, max_tokens)
-            except Exception as fallback_error:
-                logger.error(f"❌ Fallback to {fallback_provider.value} also failed: {fallback_error}")
-                return {
-                    "response": f"Error: Both LLM providers failed. Primary: {e}, Fallback: {fallback_error}",
-                    "provider": "error",
-                    "error": str(e),
-                    "fallback_error": str(fallback_error)
-                }
-    
+                try:
+                    return await launch(fallback_provider)
+                except Exception as fallback_error:
+                    errors[fallback_provider] = fallback_error
+            else:
+                logger.info(
+                    f"⏱️ {target_provider.value} slower than {hedge_delay:.1f}s, "
+                    f"hedging with {fallback_provider.value}"
+                )
+                pending = {primary, launch(fallback_provider)}
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        selected, _ = attempts[task]
+                        try:
+                            result = task.result()
+                        except Exception as e:
+                            errors[selected] = e
+                            logger.warning(f"❌ {selected.value} failed: {e}")
+                            continue
+                        result["hedged"] = True
+                        return result
+        finally:
+            self._abandon(attempts)
+
+        primary_error = errors.get(target_provider)
+        fallback_error = errors.get(fallback_provider)
+        logger.error(f"❌ Fallback to {fallback_provider.value} also failed: {fallback_error}")
+        # Saturation is worth retrying; tell the caller when
+        overloaded = [error for error in errors.values() if isinstance(error, LLMOverloadedError)]
+        if overloaded:
+            raise min(overloaded, key=lambda error: error.retry_after)
+        return {
+            "response": f"Error: Both LLM providers failed. Primary: {primary_error}, Fallback: {fallback_error}",
+            "provider": "error",
+            "error": str(primary_error),
+            "fallback_error": str(fallback_error)
+        }
+
+    def _route(
+        self,
+        target_provider: ModelProvider,
+        fallback_provider: ModelProvider,
+        priority: Priority,
+        deadline: Optional[float]
+    ) -> Tuple[ModelProvider, ModelProvider]:
+        """
+        Order providers for one request
+
+        A provider whose circuit breaker is open is tried last. So is a primary
+        that cannot finish within the deadline (queue wait + p50) when the
+        fallback can.
+        """
+        if not is_open(llm_provider_breakers[fallback_provider.value]):
+            if is_open(llm_provider_breakers[target_provider.value]):
+                logger.info(f"⏭️ {target_provider.value} circuit open, routing to {fallback_provider.value}")
+                return fallback_provider, target_provider
+
+            budget = LLM_QUEUE_DEADLINE if deadline is None else deadline
+            if (self.scheduler.expected_completion(target_provider.value, priority) > budget
+                    and self.scheduler.expected_completion(fallback_provider.value, priority) <= budget):
+                logger.info(f"⏭️ {target_provider.value} cannot meet {budget:.0f}s deadline, routing to {fallback_provider.value}")
+                return fallback_provider, target_provider
+
+        return target_provider, fallback_provider
+
+    @staticmethod
+    def _abandon(attempts: Dict[asyncio.Task, Tuple[ModelProvider, asyncio.Event]]) -> None:
+        """
+        Drop attempts nobody is waiting for any more
+
+        Queued attempts are cancelled. Running ones are left to finish, because
+        the provider is working on them anyway. Their outcome still feeds the
+        latency window and the circuit breaker.
+        """
+        for task, (_, started) in attempts.items():
+            if task.done():
+                continue
+            if started.is_set():
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            else:
+                task.cancel()
+
+    async def _generate_with(
+        self,
+        provider: ModelProvider,
+        prompt: str,
+        system_prompt: Optional[str],
+        temperature: float,
+        max_tokens: int,
+        priority: Priority,
+        deadline: Optional[float],
+        started: Optional[asyncio.Event] = None
+    ) -> Dict[str, Any]:
+        """Run one generation inside the provider's admission slot and circuit breaker"""
+        breaker = llm_provider_breakers[provider.value]
+        if is_open(breaker):
+            raise Exception(f"{breaker.name} circuit breaker is OPEN - service unavailable")
+
+        async with self.scheduler.slot(provider.value, priority, deadline):
+            if started:
+                started.set()
+            began = time.monotonic()
+            try:
+                with breaker.calling():
+                    if provider == ModelProvider.OLLAMA:
+                        result = await self._generate_with_ollama(prompt, system_prompt, temperature, max_tokens)
+                    else:
+                        result = await self._generate_with_gemini(prompt, system_prompt, temperature, max_tokens)
+            except Exception:
+                track_llm_request(provider.value, MODEL_NAMES[provider], 'error', time.monotonic() - began)
+                raise
+
+        elapsed = time.monotonic() - began
+        self.scheduler.observe_latency(provider.value, elapsed)
+        track_llm_request(
+            provider.value, result.get("model", MODEL_NAMES[provider]), 'success', elapsed,
+            completion_tokens=result.get("tokens_used", 0) or 0
+        )
+        return result
+
     async def _generate_with_ollama(
         self,
         prompt: str,
@@ -110,7 +257,7 @@ class LLMService:
         
         # Check if Ollama is running
         try:
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = await asyncio.to_thread(requests.get, f"{self.ollama_url}/api/tags", timeout=5)
             if response.status_code != 200:
                 raise Exception("Ollama server not responding")
         except Exception as e:
@@ -135,7 +282,8 @@ class LLMService:
         }
         
         try:
-            response = requests.post(
+            response = await asyncio.to_thread(
+                requests.post,
                 f"{self.ollama_url}/api/generate",
                 json=payload,
                 timeout=120  # 2 minutes timeout for local inference
@@ -189,7 +337,8 @@ class LLMService:
             if system_prompt:
                 full_prompt = f"{system_prompt}\n\n{prompt}"
             
-            response = model.generate_content(
+            response = await asyncio.to_thread(
+                model.generate_content,
                 full_prompt,
                 generation_config=genai.GenerationConfig(
                     temperature=temperature,
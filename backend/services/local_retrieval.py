@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+In-process retrieval for offline runs
+Deterministic hashing embedder and a NumPy vector index over KG nodes, shaped like QdrantService
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+KGNode = Dict[str, Any]
+
+HASHING_DIMENSIONS = 512
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def node_text(node: KGNode) -> str:
+    """Text embedded for a node: label, type and description"""
+    return " ".join(
+        str(part) for part in (node.get('label'), node.get('type'), node.get('description')) if part
+    )
+
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder
+
+    Unigrams and bigrams are hashed (BLAKE2b) into ``dimensions`` signed
+    buckets and the vector is L2-normalised. Same text, same vector, on any
+    machine; no model or network needed.
+    """
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimensions] += 1.0 if value >> 63 else -1.0
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """One row per text"""
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return np.stack([self.embed(text) for text in texts])
+
+
+class InMemoryVectorIndex:
+    """
+    Exact cosine search over unit vectors
+
+    Implements the ``search_nodes`` call GraphRAGService makes on
+    QdrantService, plus ``search_many`` to answer a whole batch of queries
+    with a single matrix multiply.
+    """
+
+    def __init__(self, node_ids: Sequence[str], vectors: np.ndarray):
+        if len(node_ids) != len(vectors):
+            raise ValueError("node_ids and vectors must have the same length")
+        self.node_ids = list(node_ids)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True) if len(vectors) else 1.0
+        self.vectors = np.asarray(vectors / np.where(norms == 0, 1.0, norms), dtype=np.float32)
+
+    @classmethod
+    def from_kg(cls, kg_data: Dict[str, Any], embedder: HashingEmbedder) -> "InMemoryVectorIndex":
+        nodes = [node for node in kg_data.get('nodes', []) if node.get('id')]
+        return cls([node['id'] for node in nodes], embedder.embed_many([node_text(node) for node in nodes]))
+
+    def is_connected(self) -> bool:
+        return True
+
+    def _hits(self, scores: np.ndarray, limit: int, score_threshold: Optional[float]) -> List[Dict[str, Any]]:
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            {'id': int(idx), 'score': float(scores[idx]), 'payload': {'node_id': self.node_ids[idx]}}
+            for idx in top
+            if score_threshold is None or scores[idx] >= score_threshold
+        ]
+
+    def search(self, query_vector: Iterable[float], limit: int = 10, score_threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.search_many(np.asarray([list(query_vector)], dtype=np.float32), limit, score_threshold)[0]
+
+    def search_many(
+        self,
+        query_vectors: np.ndarray,
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """Top ``limit`` hits for every row of ``query_vectors``"""
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        scores = self.vectors @ (queries / np.where(norms == 0, 1.0, norms)).T
+        return [self._hits(scores[:, column], limit, score_threshold) for column in range(scores.shape[1])]
+
+    async def search_nodes(
+        self,
+        query_vector: List[float],
+        limit: int = 10,
+        score_threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """QdrantService.search_nodes-compatible result format"""
+        return self.search(query_vector, limit, score_threshold)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Deep-mode passage retrieval for GraphRAG
+Time-boxed PostgreSQL full-text and passage search, fused into cited primary-text evidence
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from services.context_packer import estimate_tokens, shorten
+from services.db import DatabaseService
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock budget for deep-mode retrieval; it runs alongside the Qdrant node search
+DEEP_MODE_TIMEOUT = float(os.getenv("GRAPHRAG_DEEP_TIMEOUT", "1.5"))
+DEEP_MODE_PASSAGES = int(os.getenv("GRAPHRAG_DEEP_PASSAGES", "6"))
+# Prompt tokens reserved for passages, on top of GRAPHRAG_CONTEXT_TOKENS
+DEEP_CONTEXT_TOKENS = int(os.getenv("GRAPHRAG_DEEP_CONTEXT_TOKENS", "600"))
+
+# Reciprocal Rank Fusion constant, as in HybridSearchService
+RRF_K = 60
+
+PASSAGES_HEADER = (
+    "\n# Primary Text Passages\n"
+    "Quote or cite these passages by their [P#] label when they support the answer.\n"
+)
+
+TEXT_SEARCH_SQL = """
+SELECT
+    id, title, author,
+    ts_rank(search_vector, plainto_tsquery('simple', $1)) AS rank,
+    ts_headline('simple', normalized_text, plainto_tsquery('simple', $1),
+               'MaxWords=50, MinWords=20') AS snippet
+FROM free_will.texts
+WHERE search_vector @@ plainto_tsquery('simple', $1)
+ORDER BY rank DESC
+LIMIT $2
+"""
+
+# The match uses the expression of the idx_text_sections_fts GIN index
+# (setup_database.py, bulk_loader.py), so the planner can use the index and
+# to_tsvector only runs for matching rows, in ts_rank
+SECTION_SEARCH_SQL = """
+SELECT
+    s.id, s.text_id, t.title, t.author, s.n,
+    d.full_reference, s.char_position, LENGTH(s.content) AS char_length,
+    ts_rank(to_tsvector('simple', s.content), query) AS rank,
+    ts_headline('simple', s.content, query, 'MaxWords=60, MinWords=25') AS snippet
+FROM free_will.text_sections s
+JOIN free_will.texts t ON t.id = s.text_id
+LEFT JOIN free_will.text_divisions d ON d.id = s.division_id,
+     plainto_tsquery('simple', $1) query
+WHERE to_tsvector('simple', s.content) @@ query
+ORDER BY rank DESC
+LIMIT $2
+"""
+
+
+@dataclass
+class Passage:
+    """One retrieved primary-text passage"""
+    text_id: str
+    title: str
+    author: Optional[str]
+    snippet: str
+    reference: Optional[str] = None
+    char_position: Optional[int] = None
+    char_length: Optional[int] = None
+    score: float = 0.0
+    label: str = ""
+
+    @property
+    def citation(self) -> str:
+        """Human-readable citation, e.g. "Cicero, De Fato 39" """
+        work = f"{self.author}, {self.title}" if self.author else self.title
+        return f"{work} {self.reference}" if self.reference else work
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'label': self.label,
+            'citation': self.citation,
+            'text_id': self.text_id,
+            'title': self.title,
+            'author': self.author,
+            'reference': self.reference,
+            'char_position': self.char_position,
+            'char_length': self.char_length,
+            'snippet': self.snippet,
+            'score': round(self.score, 5),
+        }
+
+
+@dataclass
+class PassageResult:
+    """Outcome of one deep-mode retrieval"""
+    passages: List[Passage] = field(default_factory=list)
+    elapsed_ms: int = 0
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'passages': len(self.passages),
+            'elapsed_ms': self.elapsed_ms,
+            'timed_out': self.timed_out,
+            'error': self.error,
+        }
+
+
+def fuse_passages(
+    text_hits: List[Dict[str, Any]],
+    section_hits: List[Dict[str, Any]],
+    limit: int = DEEP_MODE_PASSAGES,
+    k: int = RRF_K,
+) -> List[Passage]:
+    """
+    Merge text-level and section-level hits with Reciprocal Rank Fusion
+
+    A section scores 1/(k + its rank) plus 1/(k + the rank of its text in the
+    text-level search), so passages from strongly matching works rise. Texts
+    matched only at text level are kept as whole-work passages with their
+    headline snippet.
+    """
+    text_rank = {str(hit['id']): rank for rank, hit in enumerate(text_hits, start=1)}
+    passages: List[Passage] = []
+    covered = set()
+
+    for rank, hit in enumerate(section_hits, start=1):
+        text_id = str(hit['text_id'])
+        score = 1 / (k + rank)
+        if text_id in text_rank:
+            score += 1 / (k + text_rank[text_id])
+        covered.add(text_id)
+        passages.append(Passage(
+            text_id=text_id,
+            title=hit['title'],
+            author=hit.get('author'),
+            snippet=hit.get('snippet') or '',
+            reference=hit.get('full_reference') or hit.get('n'),
+            char_position=hit.get('char_position'),
+            char_length=hit.get('char_length'),
+            score=score,
+        ))
+
+    for rank, hit in enumerate(text_hits, start=1):
+        text_id = str(hit['id'])
+        if text_id in covered:
+            continue
+        passages.append(Passage(
+            text_id=text_id,
+            title=hit['title'],
+            author=hit.get('author'),
+            snippet=hit.get('snippet') or '',
+            score=1 / (k + rank),
+        ))
+
+    passages.sort(key=lambda passage: -passage.score)
+    passages = passages[:limit]
+    for position, passage in enumerate(passages, start=1):
+        passage.label = f"P{position}"
+    return passages
+
+
+def format_passages(passages: List[Passage], token_budget: int = DEEP_CONTEXT_TOKENS) -> str:
+    """Markdown block of labelled passages that fits ``token_budget``"""
+    if not passages:
+        return ""
+
+    blocks = [PASSAGES_HEADER]
+    used = estimate_tokens(PASSAGES_HEADER)
+    for passage in passages:
+        heading = f"\n## [{passage.label}] {passage.citation}\n"
+        remaining = token_budget - used - estimate_tokens(heading) - 2
+        if remaining <= 0:
+            break
+        block = f"{heading}> {shorten(' '.join(passage.snippet.split()), remaining)}\n"
+        blocks.append(block)
+        used += estimate_tokens(block)
+    return "".join(blocks) if len(blocks) > 1 else ""
+
+
+class PassageRetriever:
+    """Runs text-level and section-level full-text search concurrently under a time budget"""
+
+    def __init__(self, db_service: Optional[DatabaseService]):
+        self.db = db_service
+
+    @property
+    def available(self) -> bool:
+        return self.db is not None and self.db.is_connected()
+
+    async def search(self, query: str, limit: int = DEEP_MODE_PASSAGES) -> List[Passage]:
+        """Both searches in parallel (separate pool connections), fused by RRF"""
+        text_hits, section_hits = await asyncio.gather(
+            self.db.fetch(TEXT_SEARCH_SQL, query, limit * 2),
+            self.db.fetch(SECTION_SEARCH_SQL, query, limit * 2),
+        )
+        return fuse_passages(text_hits, section_hits, limit)
+
+    async def retrieve(
+        self,
+        query: str,
+        limit: int = DEEP_MODE_PASSAGES,
+        timeout: float = DEEP_MODE_TIMEOUT,
+    ) -> PassageResult:
+        """
+        Deep-mode passages for ``query``, never running past ``timeout`` seconds
+
+        Timeouts and database errors degrade to an empty result; the pipeline
+        then answers from the Knowledge Graph alone.
+        """
+        result = PassageResult()
+        started = time.monotonic()
+        if not self.available:
+            result.error = "database not connected"
+        elif query.strip():
+            try:
+                result.passages = await asyncio.wait_for(self.search(query, limit), timeout=timeout)
+            except asyncio.TimeoutError:
+                result.timed_out = True
+                logger.warning(f"Deep-mode passage retrieval exceeded its {timeout:.1f}s budget")
+            except Exception as e:
+                result.error = str(e)
+                logger.error(f"Deep-mode passage retrieval failed: {e}")
+        result.elapsed_ms = int((time.monotonic() - started) * 1000)
+        logger.info(
+            f"Deep mode: {len(result.passages)} passages in {result.elapsed_ms}ms"
+            + (" (timed out)" if result.timed_out else "")
+        )
+        return result
@@ -5,7 +5,7 @@ Qdrant Service - Vector database connection and search
 
 import logging
 import os
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 from dotenv import load_dotenv
@@ -186,6 +186,37 @@ class QdrantService:
             logger.error(f"Error searching kg_edges: {e}")
             raise
 
+    async def node_vectors(self, batch_size: int = 256) -> Tuple[List[str], List[List[float]]]:
+        """
+        All KG node vectors, for in-process batch search
+
+        Returns:
+            Tuple of (node_ids, vectors) for points whose payload has a node_id
+        """
+        if not self.client:
+            raise RuntimeError("Qdrant not connected")
+
+        node_ids: List[str] = []
+        vectors: List[List[float]] = []
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name="ancient_free_will_vectors",
+                limit=batch_size,
+                offset=offset,
+                with_payload=["node_id"],
+                with_vectors=True
+            )
+            for point in points:
+                if point.payload and point.payload.get('node_id') and point.vector is not None:
+                    node_ids.append(point.payload['node_id'])
+                    vectors.append(point.vector)
+            if offset is None:
+                break
+
+        logger.info(f"Loaded {len(node_ids)} KG node vectors from Qdrant")
+        return node_ids, vectors
+
     async def get_collection_info(self, collection_name: str) -> Dict[str, Any]:
         """Get information about a collection"""
         if not self.client:
@@ -0,0 +1,79 @@
+"""
+Unit tests for the GraphRAG semantic answer cache
+Tests exact and near-duplicate matching, node-set checks and KG-version invalidation
+"""
+import pytest
+
+from services.answer_cache import SemanticAnswerCache, normalize_query, params_key
+
+
+NODES = ["school_stoics", "concept_fate", "person_chrysippus"]
+PARAMS = params_key(10, 2, 15, 0.7)
+
+
+@pytest.fixture
+def cache():
+    cache = SemanticAnswerCache(max_size=10, ttl=60, threshold=0.95)
+    cache.store(
+        "Did the Stoics believe in free will?",
+        [1.0, 0.0, 0.0],
+        NODES,
+        PARAMS,
+        "v1",
+        {"query": "Did the Stoics believe in free will?", "answer": "Compatibilism.", "success": True},
+    )
+    return cache
+
+
+class TestSemanticAnswerCache:
+    """Test cases for SemanticAnswerCache"""
+
+    def test_exact_hit_ignores_case_and_punctuation(self, cache):
+        """Normalised identical questions hit without an embedding"""
+        result = cache.lookup_exact("did the stoics  believe in free will", PARAMS, "v1")
+        assert result["answer"] == "Compatibilism."
+        assert result["cached"] is True
+        assert result["cache"]["match"] == "exact"
+        assert result["query"] == "did the stoics  believe in free will"
+        assert normalize_query(" Fate? ") == "fate"
+
+    def test_semantic_hit_requires_threshold_and_nodes(self, cache):
+        """Near-duplicate embeddings hit only when the retrieved nodes match"""
+        close = [0.99, 0.05, 0.0]
+        hit = cache.lookup("Were the Stoics free-will believers?", close, reversed(NODES), PARAMS, "v1")
+        assert hit["cache"]["match"] == "semantic"
+        assert hit["cache"]["similarity"] >= 0.95
+
+        assert cache.lookup("q", close, NODES[:2], PARAMS, "v1") is None
+        assert cache.lookup("q", [0.5, 0.5, 0.0], NODES, PARAMS, "v1") is None
+        assert cache.stats()["node_mismatches"] == 1
+
+    def test_parameters_partition_entries(self, cache):
+        """Different pipeline parameters never share answers; temperatures are bucketed"""
+        assert params_key(10, 2, 15, 0.72) == PARAMS
+        assert cache.lookup("q", [1.0, 0.0, 0.0], NODES, params_key(10, 3, 15, 0.7), "v1") is None
+        assert cache.lookup_exact("Did the Stoics believe in free will?", params_key(10, 2, 15, 0.2), "v1") is None
+
+    def test_kg_version_change_invalidates(self, cache):
+        """A new KG version empties the cache"""
+        assert cache.lookup_exact("Did the Stoics believe in free will?", PARAMS, "v2") is None
+        stats = cache.stats()
+        assert stats["size"] == 0
+        assert stats["invalidations"] == 1
+        assert stats["kg_version"] == "v2"
+
+    def test_failed_responses_not_stored(self, cache):
+        """Unsuccessful pipeline results are never cached"""
+        cache.store("broken", [0.0, 1.0, 0.0], NODES, PARAMS, "v1", {"answer": "Error", "success": False})
+        assert cache.lookup_exact("broken", PARAMS, "v1") is None
+
+    def test_hit_ratio(self, cache):
+        """Stats report hits, misses and the most served questions"""
+        cache.lookup_exact("Did the Stoics believe in free will?", PARAMS, "v1")
+        cache.lookup("other", [0.0, 0.0, 1.0], NODES, PARAMS, "v1")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["top_questions"][0]["hits"] == 1
@@ -0,0 +1,78 @@
+"""
+Unit tests for the citation classification engine
+Tests source type precedence, citation formats, abbreviations and memoisation
+"""
+import pytest
+
+from services.citation_engine import CitationEngine, compile_names, detect_format, get_citation_engine
+
+
+class TestCitationEngine:
+    """Test cases for CitationEngine"""
+
+    @pytest.mark.parametrize("citation,source_type,strategy", [
+        ("Cicero, De Fato (complete text)", "CTS", "CTS_AUTO"),
+        ("Augustine, De Libero Arbitrio III.1", "PATRISTIC", "OGL_OR_PG"),
+        ("Romans 9:19", "BIBLICAL", "BIBLEHUB_OR_SEFARIA"),
+        # Patristic wins over a biblical name in the same citation
+        ("Origen, Commentary on John II.3", "PATRISTIC", "OGL_OR_PG"),
+        ("Rom. 9:19", "BIBLICAL", "BIBLEHUB_OR_SEFARIA"),
+        ("1 Cor. 7:37", "BIBLICAL", "BIBLEHUB_OR_SEFARIA"),
+        ("Ps.-Plutarch, De Fato 568E-575A", "UNKNOWN", "MANUAL"),
+        ("Carneades (reported by Cicero)", "UNKNOWN", "MANUAL"),
+    ])
+    def test_source_type(self, citation, source_type, strategy):
+        """Source types follow CTS > patristic > biblical precedence"""
+        result = CitationEngine().classify(citation)
+        assert result["source_type"] == source_type
+        assert result["retrieval_strategy"] == strategy
+
+    def test_cts_work(self):
+        """CTS works are matched on the "Author, Work" prefix"""
+        result = CitationEngine().classify("Cicero, De Fato (complete text)")
+        assert result["work"] == "Cicero, De Fato"
+        assert result["cts_urn"] == "urn:cts:latinLit:phi0474.phi054"
+        assert result["confidence"] == "high"
+
+    @pytest.mark.parametrize("citation,citation_format,passages", [
+        ("Cicero, De Fato 28-30", "SIMPLE_SECTIONS", [28, 29, 30]),
+        ("Aristotle, Nicomachean Ethics 1109b30-1111b3", "BEKKER_PAGES", ["1109b30", "1111b3"]),
+        ("Epictetus, Discourses I.1 and II.2 (choice)", "BOOK_CHAPTER", ["I.1", "II.2"]),
+        ("Lucretius, De Rerum Natura, Book II, lines 216-293 (swerve)", "BOOK_LINES", []),
+        ("Romans 9:19-21 (potter)", "CHAPTER_VERSE", ["9:19-21"]),
+        ("Boethius, Consolation (complete text)", "COMPLETE_TEXT", []),
+        ("Chrysippus, fragments", "UNKNOWN", []),
+    ])
+    def test_detect_format(self, citation, citation_format, passages):
+        """Formats are tried in order and report their passages"""
+        assert detect_format(citation) == (citation_format, passages)
+
+    def test_compile_names_matches_like_substring_test(self):
+        """A compiled name list matches exactly where any(name in text) does"""
+        names = ["John", "Jude", "Hebrew Bible"]
+        matcher = compile_names(names)
+        for text in ["John 3:16", "Johnson", "Hebrew", "the Hebrew Bible", "Jud", ""]:
+            assert bool(matcher.search(text)) == any(name in text for name in names)
+
+    def test_abbreviations_need_a_number(self):
+        """Abbreviations only match as whole words followed by a number"""
+        matcher = compile_names(["Romans"], ["Rom"])
+        assert matcher.search("Rom. 9:19")
+        assert not matcher.search("Rom. cit.")
+        assert not matcher.search("Prom. 3")
+
+    def test_memoised_results_are_independent(self):
+        """Repeated citations hit the cache and get their own result dicts"""
+        engine = CitationEngine()
+        first, second = engine.classify_many(["Cicero, De Fato 43", "Cicero, De Fato 43"])
+        assert first == second and first is not second
+        first["passages"].append(99)
+        first["node_id"] = "n1"
+        assert engine.classify("Cicero, De Fato 43")["passages"] == [43]
+        assert "node_id" not in engine.classify("Cicero, De Fato 43")
+        info = engine.cache_info()
+        assert (info.hits, info.misses) == (3, 1)
+
+    def test_shared_engine(self):
+        """The module-level engine is created once"""
+        assert get_citation_engine() is get_citation_engine()
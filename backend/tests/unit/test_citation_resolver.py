@@ -0,0 +1,203 @@
+"""
+Unit tests for the citation-to-passage resolver
+Tests reference parsing, the reference index, batch resolution and the API route
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import text_routes
+from services.citation_resolver import (
+    DIVISIONS_SQL,
+    MAX_RANGE,
+    PASSAGE_TEXT_SQL,
+    TEXTS_SQL,
+    CitationResolver,
+    ReferenceIndex,
+    bekker_references,
+    canonical_reference,
+    citation_references,
+    dotted_references,
+    normalize_work,
+    split_citation,
+)
+
+TEXTS = [
+    {"id": "t-cic", "title": "De Fato", "author": "Cicero", "kg_work_id": None, "text_length": 5000},
+    {"id": "t-alex", "title": "De Fato", "author": "Alexander of Aphrodisias", "kg_work_id": None, "text_length": 9000},
+    {"id": "t-en", "title": "Nicomachean Ethics", "author": "Aristotle", "kg_work_id": None, "text_length": 90000},
+]
+
+DIVISIONS = [
+    {"id": 1, "text_id": "t-cic", "full_reference": "39", "char_position": 100, "char_length": 50},
+    {"id": 2, "text_id": "t-cic", "full_reference": "40", "char_position": 152, "char_length": 60},
+    {"id": 3, "text_id": "t-cic", "full_reference": "41", "char_position": 214, "char_length": 40},
+    {"id": 4, "text_id": "t-en", "full_reference": "3", "char_position": 1000, "char_length": 8000},
+    {"id": 5, "text_id": "t-en", "full_reference": "3.5", "char_position": 5000, "char_length": 900},
+    {"id": 6, "text_id": "t-en", "full_reference": "1113b", "char_position": 5100, "char_length": 300},
+    {"id": 7, "text_id": "t-en", "full_reference": "1114a", "char_position": 5400, "char_length": 300},
+]
+
+
+def _resolver():
+    resolver = CitationResolver(None)
+    resolver.load(TEXTS, DIVISIONS)
+    return resolver
+
+
+class FakeDB:
+    """Database stub for the index and passage text queries"""
+
+    def __init__(self):
+        self.queries = []
+
+    def is_connected(self):
+        return True
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        if query == TEXTS_SQL:
+            return TEXTS
+        if query == DIVISIONS_SQL:
+            return DIVISIONS
+        if query == PASSAGE_TEXT_SQL:
+            return [{"i": i, "text": f"span {pos}+{length}"} for i, (pos, length) in enumerate(zip(args[1], args[2]), 1)]
+        raise AssertionError(query)
+
+
+class TestReferenceParsing:
+    """Test cases for citation splitting and canonical references"""
+
+    def test_split_citation(self):
+        """The work ends where the reference starts; commentary is dropped"""
+        assert split_citation("Cicero, De Fato 39-41") == ("Cicero, De Fato", "39-41")
+        assert split_citation("Aristotle, EN III.1 - develops the distinction") == ("Aristotle, EN", "III.1")
+        assert split_citation("1 Corinthians 7:37") == ("1 Corinthians", "7:37")
+        assert split_citation("Alexander of Aphrodisias, De Fato (complete text)") == (
+            "Alexander of Aphrodisias, De Fato", "")
+
+    def test_canonical_reference(self):
+        """Roman numerals, colons and Bekker lines share one form"""
+        assert canonical_reference("III.5") == "3.5"
+        assert canonical_reference("9:19") == "9.19"
+        assert canonical_reference("1113b30") == "1113b.30"
+        assert canonical_reference("II. 03") == "2.3"
+
+    def test_ranges(self):
+        """Ranges expand on their last level; Bekker ranges page by page"""
+        assert dotted_references("III.1.2-4") == ["3.1.2", "3.1.3", "3.1.4"]
+        assert dotted_references("9:19-21") == ["9.19", "9.20", "9.21"]
+        assert bekker_references("1109b30-1111b3") == ["1109b", "1110a", "1110b", "1111a", "1111b"]
+        assert bekker_references("1113b") == ["1113b"]
+        assert citation_references("Book II, 216-218", "BOOK_LINES") == ["2.216", "2.217", "2.218"]
+
+    def test_long_ranges_keep_their_last_reference(self):
+        """Ranges over MAX_RANGE references are capped but still end on their last reference"""
+        references = dotted_references("II.216-293")
+        assert len(references) == MAX_RANGE
+        assert references[:2] == ["2.216", "2.217"] and references[-2:] == ["2.264", "2.293"]
+        pages = bekker_references("1094a1-1181b23")
+        assert len(pages) == MAX_RANGE
+        assert (pages[0], pages[-1]) == ("1094a", "1181b")
+
+    def test_normalize_work(self):
+        """Work keys ignore case, punctuation and diacritics, and expand aliases"""
+        assert normalize_work("Cicero, De  Fato") == "cicero de fato"
+        assert normalize_work("Plótinus, Enneads") == "plotinus enneads"
+        assert normalize_work("Aristotle, EN") == "aristotle nicomachean ethics"
+
+
+class TestCitationResolver:
+    """Test cases for ReferenceIndex and CitationResolver"""
+
+    def test_section_range_spans_divisions(self):
+        """A range resolves to the span from its first to its last division"""
+        passage = _resolver().resolve("Cicero, De Fato 39-41 (Carneades)")
+        assert passage.text_id == "t-cic"
+        assert passage.references == ["39", "40", "41"]
+        assert (passage.char_position, passage.char_length) == (100, 154)
+        assert passage.exact
+
+    def test_long_range_spans_first_to_last_line(self):
+        """A line range longer than MAX_RANGE still covers its whole span"""
+        resolver = CitationResolver(None)
+        resolver.load(
+            [{"id": "t-drn", "title": "De Rerum Natura", "author": "Lucretius", "kg_work_id": None,
+              "text_length": 9000}],
+            [{"id": n, "text_id": "t-drn", "full_reference": f"2.{n}", "char_position": n * 10, "char_length": 10}
+             for n in range(1, 400)],
+        )
+        passage = resolver.resolve("Lucretius, De Rerum Natura, Book II, 216-293")
+        assert (passage.references[0], passage.references[-1]) == ("2.216", "2.293")
+        assert (passage.char_position, passage.char_length) == (2160, 780)
+        assert passage.exact
+
+    def test_book_chapter_and_fallback(self):
+        """Missing sections fall back to their chapter and are flagged inexact"""
+        resolver = _resolver()
+        assert resolver.resolve("Aristotle, Nicomachean Ethics III.5").exact
+        passage = resolver.resolve("Aristotle, EN III.5.9")
+        assert passage.references == ["3.5"]
+        assert not passage.exact
+
+    def test_bekker_pages(self):
+        """Bekker citations resolve through page+column divisions"""
+        passage = _resolver().resolve("Aristotle, Nicomachean Ethics 1113b30-1114a5")
+        assert passage.references == ["1113b", "1114a"]
+        assert (passage.char_position, passage.char_length) == (5100, 600)
+
+    def test_ambiguous_and_unknown_works(self):
+        """A title shared by two authors needs the author; unknown works give None"""
+        resolver = _resolver()
+        assert resolver.resolve("De Fato 40") is None
+        assert resolver.resolve("Alexander of Aphrodisias, De Fato (complete text)").char_length == 9000
+        assert resolver.resolve("Seneca, De Providentia 5") is None
+        assert ReferenceIndex(TEXTS, DIVISIONS).candidates("de fato") == []
+
+    def test_resolve_many_memoises(self):
+        """Batches key results by citation; callers cannot alter memoised results"""
+        resolver = _resolver()
+        results = resolver.resolve_many(["Cicero, De Fato 40", "Cicero, De Fato 40", "Nobody 1"])
+        assert list(results) == ["Cicero, De Fato 40", "Nobody 1"]
+        results["Cicero, De Fato 40"].references.append("x")
+        assert resolver.resolve("Cicero, De Fato 40").references == ["40"]
+
+    def test_memo_is_bounded(self):
+        """Client-supplied citations cannot grow the memo without limit"""
+        resolver = CitationResolver(None, cache_size=2)
+        resolver.load(TEXTS, DIVISIONS)
+        for n in range(39, 42):
+            resolver.resolve(f"Cicero, De Fato {n}")
+        assert resolver.cache_info().currsize == 2
+        resolver.load(TEXTS, DIVISIONS)
+        assert resolver.cache_info().currsize == 0
+
+    async def test_index_and_texts_from_database(self):
+        """The index is built once; passage text comes from a single query"""
+        db = FakeDB()
+        resolver = CitationResolver(db)
+        await resolver.ensure_index()
+        await resolver.ensure_index()
+        passages = list(resolver.resolve_many(["Cicero, De Fato 40", "Cicero, De Fato 41"]).values())
+        await resolver.fetch_texts(passages)
+
+        assert db.queries.count(TEXTS_SQL) == 1
+        assert db.queries.count(PASSAGE_TEXT_SQL) == 1
+        assert [p.text for p in passages] == ["span 152+60", "span 214+40"]
+
+    def test_resolve_route(self):
+        """POST /citations/resolve answers a batch in one call"""
+        app = FastAPI()
+        app.state.db = FakeDB()
+        app.include_router(text_routes.router, prefix="/api/texts")
+        client = TestClient(app)
+
+        response = client.post("/api/texts/citations/resolve", json={
+            "citations": ["Cicero, De Fato 40", "Unknown 1"], "include_text": True
+        })
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["found"], body["total"]) == (1, 2)
+        assert body["resolved"]["Cicero, De Fato 40"]["text"] == "span 152+60"
+        assert body["resolved"]["Unknown 1"] is None
+
+        assert client.post("/api/texts/citations/resolve", json={"citations": []}).status_code == 422
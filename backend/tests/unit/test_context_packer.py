@@ -0,0 +1,95 @@
+"""
+Unit tests for the token-budgeted GraphRAG context packer
+Tests token estimates, short forms, ranking and budget filling
+"""
+from services.context_packer import (
+    estimate_tokens,
+    graph_distances,
+    pack_context,
+    rank_nodes,
+    shorten,
+)
+
+
+def _node(node_id, node_type="concept", description="", **extra):
+    return {"id": node_id, "label": node_id.title(), "type": node_type, "description": description, **extra}
+
+
+class TestTokenEstimate:
+    """Test cases for estimate_tokens and shorten"""
+
+    def test_estimate_counts_words_and_punctuation(self):
+        """Short words cost one token, long words more, punctuation counts"""
+        assert estimate_tokens("free will") == 2
+        assert estimate_tokens("free will.") == 3
+        assert estimate_tokens("compatibilism") == 3
+        assert estimate_tokens("") == 0
+
+    def test_shorten_keeps_leading_sentences(self):
+        """Short forms keep whole sentences that fit the budget"""
+        text = "Chrysippus held a compatibilist view. " + "Further detail follows here. " * 20
+        short = shorten(text, 12)
+        assert short == "Chrysippus held a compatibilist view."
+        assert shorten("Already short.", 50) == "Already short."
+
+    def test_shorten_cuts_long_first_sentence(self):
+        """A single overlong sentence is cut at a word boundary"""
+        short = shorten("word " * 100, 10)
+        assert short.endswith("…")
+        assert estimate_tokens(short) <= 10
+
+
+class TestRanking:
+    """Test cases for rank_nodes and graph_distances"""
+
+    def test_graph_distances_follow_traversed_edges(self):
+        """Distances are hop counts from the nearest starting node"""
+        edges = [{"source": "a", "target": "b"}, {"source": "c", "target": "b"}]
+        assert graph_distances(["a"], edges) == {"a": 0, "b": 1, "c": 2}
+
+    def test_semantic_and_distance_outrank_type(self):
+        """A close, semantically matched concept beats a distant person"""
+        nodes = [
+            _node("person_far", "person"),
+            _node("concept_hit", semantic_score=0.9),
+            _node("concept_near"),
+        ]
+        distances = {"concept_hit": 0, "concept_near": 1, "person_far": 2}
+        ranked = [n["id"] for n in rank_nodes(nodes, distances)]
+        assert ranked == ["concept_hit", "concept_near", "person_far"]
+
+    def test_centrality_breaks_distance_ties(self):
+        """Among equally distant nodes, the more central one comes first"""
+        nodes = [_node("minor"), _node("major")]
+        ranked = rank_nodes(nodes, {"minor": 1, "major": 1}, {"minor": 0.01, "major": 0.2})
+        assert [n["id"] for n in ranked] == ["major", "minor"]
+
+
+class TestPackContext:
+    """Test cases for pack_context"""
+
+    def test_respects_token_budget(self):
+        """The packed context never exceeds its budget"""
+        nodes = [_node(f"n{i}", description="Sentence about fate. " * 40) for i in range(30)]
+        packed = pack_context(nodes, token_budget=600)
+
+        assert packed.tokens <= 600
+        assert estimate_tokens(packed.text) <= 600 + len(packed.nodes)
+        assert packed.shortened == len(packed.nodes)
+        assert packed.dropped == 30 - len(packed.nodes)
+
+    def test_most_relevant_node_survives_tight_budget(self):
+        """Under a tight budget the top-ranked evidence is kept"""
+        nodes = [_node(f"n{i}", description="Long text. " * 50) for i in range(10)]
+        nodes.append(_node("answer", description="The key evidence.", semantic_score=0.95))
+        packed = pack_context(nodes, token_budget=80, distances={"answer": 0})
+
+        assert packed.nodes[0]["id"] == "answer"
+        assert "The key evidence." in packed.text
+
+    def test_max_nodes_still_caps_context(self):
+        """max_nodes keeps its meaning as an upper bound"""
+        nodes = [_node(f"n{i}", description="Short.") for i in range(10)]
+        packed = pack_context(nodes, token_budget=10_000, max_nodes=4)
+        assert len(packed.nodes) == 4
+        assert packed.summary()["dropped"] == 6
@@ -0,0 +1,147 @@
+"""
+Unit tests for batch GraphRAG evaluation
+Tests question loading, resumable output, vectorised retrieval and bounded generation
+"""
+import asyncio
+import json
+
+import pytest
+
+from services.graphrag_batch import BatchEvaluator, completed_ids, load_questions, question_id
+from services.llm_scheduler import Priority
+from services.local_retrieval import HashingEmbedder, InMemoryVectorIndex
+
+
+class StubService:
+    """The parts of GraphRAGService the batch evaluator uses"""
+
+    def __init__(self, kg_data, delay=0.01):
+        self.nodes = {node["id"]: node for node in kg_data["nodes"]}
+        self.embedder = HashingEmbedder(64)
+        self.embed_calls = []
+        self.priorities = []
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.last_context = {}
+
+    async def embed_queries(self, queries):
+        self.embed_calls.append(len(queries))
+        return self.embedder.embed_many(queries)
+
+    def enrich_search_results(self, hits):
+        return [{**self.nodes[hit["payload"]["node_id"]], "semantic_score": hit["score"]} for hit in hits]
+
+    def expand_graph(self, starting_nodes, expansion=None, max_depth=2, max_nodes=None):
+        return starting_nodes, [], None
+
+    def build_context(self, nodes, max_context_length=15, centrality=None, distances=None):
+        self.last_context = {"nodes": len(nodes)}
+        return "\n".join(f"## {node['label']}" for node in nodes)
+
+    def extract_citations(self, nodes):
+        return {"ancient_sources": [], "modern_scholarship": []}
+
+    async def synthesize_answer(self, query, context, temperature=0.7, priority=Priority.STANDARD):
+        self.priorities.append(priority)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return {"answer": f"answer to {query}", "provider": "fake", "model": "fake", "tokens_used": 3}
+
+
+@pytest.fixture
+def evaluator(sample_kg_data):
+    service = StubService(sample_kg_data)
+    index = InMemoryVectorIndex.from_kg(sample_kg_data, service.embedder)
+    return BatchEvaluator(service, index, concurrency=2, batch_size=4, semantic_k=2)
+
+
+def _write_questions(path, count):
+    with open(path, "w", encoding="utf-8") as handle:
+        for i in range(count):
+            handle.write(json.dumps({"id": f"q{i}", "question": f"Aristotle on free will {i}?", "tag": "t"}) + "\n")
+
+
+class TestQuestionFiles:
+    """Test cases for load_questions and completed_ids"""
+
+    def test_load_questions_keeps_extra_fields(self, tmp_path):
+        """Ids default to a hash of the question; other fields are carried along"""
+        path = tmp_path / "q.jsonl"
+        path.write_text('{"query": "What is fate?", "expected": "x"}\n\n{"id": 7, "question": "Assent?"}\n')
+        questions = load_questions(path)
+
+        assert questions[0].id == question_id("what is fate")
+        assert questions[0].extra == {"expected": "x"}
+        assert questions[1].id == "7"
+
+    def test_load_questions_rejects_missing_question(self, tmp_path):
+        """A record without a question is an input error"""
+        path = tmp_path / "q.jsonl"
+        path.write_text('{"id": 1}\n')
+        with pytest.raises(ValueError):
+            load_questions(path)
+
+    def test_completed_ids_uses_latest_record(self, tmp_path):
+        """Later records win; a truncated final line is ignored"""
+        path = tmp_path / "out.jsonl"
+        path.write_text(
+            '{"id": "a", "success": false}\n{"id": "a", "success": true}\n'
+            '{"id": "b", "success": false}\n{"id": "c", "succ'
+        )
+        assert completed_ids(path) == {"a", "b"}
+        assert completed_ids(path, retry_failed=True) == {"a"}
+        assert completed_ids(tmp_path / "missing.jsonl") == set()
+
+
+class TestBatchEvaluator:
+    """Test cases for BatchEvaluator.run"""
+
+    async def test_runs_all_questions_with_bounded_batch_generation(self, evaluator, tmp_path):
+        """Embedding is batched, generation is BATCH priority and bounded"""
+        _write_questions(tmp_path / "q.jsonl", 10)
+        output = tmp_path / "out.jsonl"
+        stats = await evaluator.run(load_questions(tmp_path / "q.jsonl"), output)
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert stats.succeeded == 10 and stats.failed == 0
+        assert sorted(record["id"] for record in records) == [f"q{i}" for i in range(10)]
+        assert records[0]["tag"] == "t"
+        assert len(records[0]["starting_nodes"]) == 2
+        assert evaluator.service.embed_calls == [4, 4, 2]
+        assert set(evaluator.service.priorities) == {Priority.BATCH}
+        assert evaluator.service.peak == 2
+
+    async def test_resume_skips_finished_questions(self, evaluator, tmp_path):
+        """A second run only answers what the first did not"""
+        _write_questions(tmp_path / "q.jsonl", 6)
+        questions = load_questions(tmp_path / "q.jsonl")
+        output = tmp_path / "out.jsonl"
+
+        first = await evaluator.run(questions, output, limit=4)
+        second = await evaluator.run(questions, output)
+
+        assert first.succeeded == 4
+        assert second.skipped == 4 and second.succeeded == 2
+        assert len(output.read_text().splitlines()) == 6
+
+    async def test_embedding_failure_is_recorded(self, evaluator, tmp_path):
+        """Failed questions are written as failures and retried with retry_failed"""
+        _write_questions(tmp_path / "q.jsonl", 3)
+        questions = load_questions(tmp_path / "q.jsonl")
+        output = tmp_path / "out.jsonl"
+        embed = evaluator.service.embed_queries
+
+        async def failing(queries):
+            return None
+
+        evaluator.service.embed_queries = failing
+        failed = await evaluator.run(questions, output)
+        evaluator.service.embed_queries = embed
+        retried = await evaluator.run(questions, output, retry_failed=True)
+
+        assert failed.failed == 3
+        assert retried.succeeded == 3
+        assert completed_ids(output, retry_failed=True) == {"q0", "q1", "q2"}
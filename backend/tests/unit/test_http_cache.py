@@ -0,0 +1,88 @@
+"""
+Unit tests for pre-serialised HTTP payloads
+Tests ETag handling, encoding negotiation and the Cytoscape payload route
+"""
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils.http_cache import PrecompressedJSON, etag_matches
+
+
+class TestPrecompressedJSON:
+    """Test cases for PrecompressedJSON"""
+
+    def test_body_and_gzip_roundtrip(self):
+        """Compressed variants decode to the serialised body"""
+        payload = PrecompressedJSON({"label": "Ἀριστοτέλης", "values": [1, 2, 3]})
+
+        assert json.loads(payload.body) == {"label": "Ἀριστοτέλης", "values": [1, 2, 3]}
+        assert gzip.decompress(payload.encodings["gzip"]) == payload.body
+
+    def test_etag_is_stable(self):
+        """Equal payloads share an ETag, different payloads do not"""
+        first = PrecompressedJSON({"a": 1})
+        assert first.etag == PrecompressedJSON({"a": 1}).etag
+        assert first.etag != PrecompressedJSON({"a": 2}).etag
+        assert first.etag.startswith('"') and first.etag.endswith('"')
+
+    def test_etag_matches(self):
+        """If-None-Match supports lists, weak validators and wildcard"""
+        etag = '"abc"'
+        assert etag_matches('"abc"', etag)
+        assert etag_matches('"xyz", W/"abc"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"xyz"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_select_encoding(self):
+        """Encoding negotiation honours q=0 and falls back to identity"""
+        payload = PrecompressedJSON({"a": 1})
+        assert payload.select_encoding("gzip, deflate") == "gzip"
+        assert payload.select_encoding("gzip;q=0, deflate") is None
+        assert payload.select_encoding("identity") is None
+        assert payload.select_encoding(None) is None
+
+
+class TestCytoscapeRoute:
+    """Test cases for the pre-built Cytoscape payload endpoint"""
+
+    @pytest.fixture
+    def client(self, sample_kg_data, monkeypatch):
+        from api import kg_routes
+        from services.kg_cache import get_analytics_cache
+
+        data = json.loads(json.dumps(sample_kg_data))
+        data["nodes"][0]["embedding"] = [0.1] * 8
+        monkeypatch.setattr(kg_routes, "load_kg_data", lambda: data)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "test-version")
+        get_analytics_cache().invalidate("cytoscape:test-version")
+
+        app = FastAPI()
+        app.include_router(kg_routes.router, prefix="/api/kg")
+        return TestClient(app)
+
+    def test_payload_excludes_heavy_fields(self, client):
+        """Embeddings are dropped unless includeHeavy is set"""
+        response = client.get("/api/kg/viz/cytoscape")
+        assert response.status_code == 200
+        nodes = response.json()["elements"]["nodes"]
+        assert len(nodes) == 3
+        assert all("embedding" not in node["data"] for node in nodes)
+
+        heavy = client.get("/api/kg/viz/cytoscape", params={"includeHeavy": "true"})
+        assert any("embedding" in node["data"] for node in heavy.json()["elements"]["nodes"])
+
+    def test_conditional_get_returns_304(self, client):
+        """A matching If-None-Match short-circuits with 304 and no body"""
+        first = client.get("/api/kg/viz/cytoscape", headers={"Accept-Encoding": "gzip"})
+        etag = first.headers["etag"]
+        assert first.headers["content-encoding"] == "gzip"
+
+        second = client.get("/api/kg/viz/cytoscape", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
@@ -0,0 +1,312 @@
+"""
+Unit tests for the KG cache
+Tests byte-budget eviction, TTL, stampede protection and the shared disk tier
+"""
+import threading
+import time
+
+from services.kg_cache import DiskCacheBackend, LRUCache, cached
+
+
+class TestLRUCache:
+    """Test cases for LRUCache"""
+
+    def test_evicts_by_entry_count(self):
+        """Oldest entry is evicted when max_size is exceeded"""
+        cache = LRUCache(max_size=2, default_ttl=0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_by_byte_budget(self):
+        """Entries are evicted once the byte budget is exceeded"""
+        cache = LRUCache(max_size=100, default_ttl=0, max_bytes=2500)
+        cache.set("a", b"x" * 1000)
+        cache.set("b", b"x" * 1000)
+        cache.set("c", b"x" * 1000)
+
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["bytes"] == 2000
+        assert cache.get("a") is None
+
+    def test_oversized_value_not_kept_in_memory(self):
+        """A value larger than the whole budget is not stored in L1"""
+        cache = LRUCache(max_size=10, default_ttl=0, max_bytes=100)
+        cache.set("big", b"x" * 1000)
+        assert cache.get("big") is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_ttl_expiration(self):
+        """Expired entries are treated as misses"""
+        cache = LRUCache(max_size=10, default_ttl=0)
+        cache.set("a", 1, ttl=1)
+        cache._cache["a"]["expires_at"] = time.time() - 1
+        assert cache.get("a") is None
+
+    def test_concurrent_misses_compute_once(self):
+        """Stampede protection: parallel misses for one key run compute once"""
+        cache = LRUCache(max_size=10, default_ttl=0)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"value": 42}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 8
+        assert cache.stats()["computes"] == 1
+
+    def test_key_lock_is_shared_until_last_waiter(self):
+        """Waiters keep the per-key lock alive: uncached computes never overlap"""
+        cache = LRUCache(max_size=10, default_ttl=0)
+        running, overlaps = [], []
+
+        def compute():
+            running.append(1)
+            overlaps.append(len(running))
+            time.sleep(0.02)
+            running.pop()
+            return None  # Not cached, so every caller computes in turn
+
+        threads = []
+        for _ in range(6):
+            threads.append(threading.Thread(target=cache.get_or_compute, args=("k", compute)))
+            threads[-1].start()
+            time.sleep(0.005)
+        for thread in threads:
+            thread.join()
+
+        assert len(overlaps) == 6
+        assert max(overlaps) == 1
+        assert cache._key_locks == {}
+
+    async def test_async_miss_runs_off_the_event_loop(self, tmp_path):
+        """aget_or_compute serves memory hits inline and computes misses in a thread"""
+        cache = LRUCache(max_size=10, default_ttl=0, backend=DiskCacheBackend(tmp_path, "test"))
+        threads = []
+
+        def compute():
+            threads.append(threading.get_ident())
+            return {"value": 42}
+
+        assert await cache.aget_or_compute("k", compute) == {"value": 42}
+        assert await cache.aget_or_compute("k", compute) == {"value": 42}
+        assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+    def test_values_are_sized_outside_the_cache_lock(self, tmp_path, monkeypatch):
+        """Pickling a value for its size never blocks other readers of the cache"""
+        from services import kg_cache
+
+        cache = LRUCache(max_size=10, default_ttl=0, max_bytes=10_000_000,
+                         backend=DiskCacheBackend(tmp_path, "test"))
+        promoted = LRUCache(max_size=10, default_ttl=0, max_bytes=10_000_000, backend=cache.backend)
+        free = []
+
+        def try_lock(lock):
+            if lock.acquire(timeout=1):
+                lock.release()
+                free.append(True)
+            else:
+                free.append(False)
+
+        def sizing(value):
+            # Another thread can take both cache locks while the value is measured
+            for lock in (cache._lock, promoted._lock):
+                probe = threading.Thread(target=try_lock, args=(lock,))
+                probe.start()
+                probe.join()
+            return 100
+
+        monkeypatch.setattr(kg_cache, "estimate_size", sizing)
+        cache.set("a", {"payload": 1})
+        # An L2 hit is sized before it is promoted to memory
+        assert promoted.get("a") == {"payload": 1}
+        assert free == [True] * 4
+
+    def test_miss_is_counted_once(self, tmp_path):
+        """get_or_compute's second look under the key lock does not count another miss"""
+        cache = LRUCache(max_size=10, default_ttl=0, backend=DiskCacheBackend(tmp_path, "test"))
+
+        assert cache.get_or_compute("a", lambda: 1) == 1
+        assert cache.get_or_compute("a", lambda: 2) == 1
+        stats = cache.stats()
+        assert (stats["misses"], stats["hits"], stats["computes"]) == (1, 1, 1)
+
+    def test_cached_decorator(self):
+        """Decorated functions are computed once per argument set"""
+        cache = LRUCache(max_size=10, default_ttl=0)
+        calls = []
+
+        @cached(cache, key_prefix="square")
+        def square(x):
+            calls.append(x)
+            return x * x
+
+        assert square(3) == 9
+        assert square(3) == 9
+        assert calls == [3]
+        assert square.invalidate_cache() == 1
+
+
+class TestDiskCacheBackend:
+    """Test cases for the shared on-disk tier"""
+
+    def test_shared_between_instances(self, tmp_path):
+        """A value written by one worker's cache is served to another"""
+        first = LRUCache(max_size=10, default_ttl=0, backend=DiskCacheBackend(tmp_path, "test"))
+        second = LRUCache(max_size=10, default_ttl=0, backend=DiskCacheBackend(tmp_path, "test"))
+
+        first.set("clusters:abc", {"clusters": [1, 2, 3]})
+        assert second.get("clusters:abc") == {"clusters": [1, 2, 3]}
+        assert second.stats()["l2_hits"] == 1
+
+    def test_expired_entries_are_dropped(self, tmp_path):
+        """Expired disk entries are deleted on read"""
+        backend = DiskCacheBackend(tmp_path, "test")
+        backend.set("k", "v", expires_at=time.time() - 1)
+        assert backend.get("k") is None
+        assert list((tmp_path / "test").glob("*.entry")) == []
+
+    def test_pattern_invalidation(self, tmp_path):
+        """Pattern invalidation reaches the shared tier"""
+        cache = LRUCache(max_size=10, default_ttl=0, backend=DiskCacheBackend(tmp_path, "test"))
+        cache.set("timeline:1", 1)
+        cache.set("matrix:1", 2)
+
+        assert cache.invalidate("timeline") == 1
+        assert cache.get("timeline:1") is None
+        assert cache.get("matrix:1") == 2
+
+
+class TestCacheWarmup:
+    """Test cases for the startup cache warm-up"""
+
+    def test_warm_caches_fills_default_entries(self, sample_kg_data, monkeypatch):
+        """Warm-up precomputes analytics and the Cytoscape payload"""
+        from unittest.mock import Mock
+        from api import kg_routes
+        from services.kg_cache import get_analytics_cache
+        from services.kg_index import KGIndex
+
+        monkeypatch.setattr(kg_routes, "load_kg_data", lambda: sample_kg_data)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "warmup-version")
+        monkeypatch.setattr(kg_routes, "get_kg_index", lambda: KGIndex(sample_kg_data))
+        monkeypatch.setattr(kg_routes, "get_graph_metrics_service", lambda: Mock())
+        get_analytics_cache().invalidate()
+
+        status = kg_routes.warm_caches()
+
+        assert status["status"] == "ready", status
+        assert set(status["steps"]) >= {"kg_data", "kg_index", "analytics_clusters", "cytoscape"}
+        assert get_analytics_cache().get("cytoscape:warmup-version:auto:slim") is not None
+        assert kg_routes.get_warmup_status()["status"] == "ready"
+
+    def test_analytics_keys_follow_kg_version(self, sample_kg_data, monkeypatch):
+        """A redeployed KG never serves analytics cached (e.g. in the shared tier) for the old one"""
+        from api import kg_routes
+        from services.kg_cache import get_analytics_cache
+
+        filters = kg_routes.build_filter_payload(None, None, None, None, None)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "v1")
+        old_key, _, _ = kg_routes._analytics_entry("timeline", filters)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "v2")
+        new_key, _, _ = kg_routes._analytics_entry("timeline", filters)
+
+        assert old_key.startswith("timeline:v1:") and new_key.startswith("timeline:v2:")
+        get_analytics_cache().set(old_key, {"stale": True})
+        assert get_analytics_cache().get(new_key) is None
+
+    def test_failed_step_is_retried_then_degraded(self, sample_kg_data, monkeypatch):
+        """An optional step that keeps failing is retried, then leaves the instance ready but degraded"""
+        from unittest.mock import Mock
+        from api import kg_routes
+        from services.kg_index import KGIndex
+
+        calls = []
+
+        def broken_payload(*args, **kwargs):
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(kg_routes, "load_kg_data", lambda: sample_kg_data)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "warmup-version")
+        monkeypatch.setattr(kg_routes, "get_kg_index", lambda: KGIndex(sample_kg_data))
+        monkeypatch.setattr(kg_routes, "get_graph_metrics_service", lambda: Mock())
+        monkeypatch.setattr(kg_routes, "get_cytoscape_payload", broken_payload)
+
+        status = kg_routes.warm_caches(attempts=3, backoff=0)
+
+        assert status["status"] == "degraded"
+        assert status["failed_steps"] == ["cytoscape"]
+        assert status["steps"]["kg_data"] is not None
+        assert len(calls) == 3
+        assert kg_routes.warmup_ready()
+
+    def test_essential_step_recovers_on_retry(self, sample_kg_data, monkeypatch):
+        """A transient KG load failure is retried; one that never clears fails the warm-up"""
+        from unittest.mock import Mock
+        from api import kg_routes
+        from services.kg_index import KGIndex
+
+        outcomes = [RuntimeError("disk busy"), None]
+
+        def flaky_load():
+            error = outcomes.pop(0) if outcomes else None
+            if error:
+                raise error
+            return sample_kg_data
+
+        monkeypatch.setattr(kg_routes, "load_kg_data", flaky_load)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "warmup-version")
+        monkeypatch.setattr(kg_routes, "get_kg_index", lambda: KGIndex(sample_kg_data))
+        monkeypatch.setattr(kg_routes, "get_graph_metrics_service", lambda: Mock())
+
+        status = kg_routes.warm_caches(attempts=3, backoff=0)
+        assert status["status"] == "ready" and status["attempts"] == 2
+
+        def missing_kg():
+            raise FileNotFoundError("ancient_free_will_database.json")
+
+        monkeypatch.setattr(kg_routes, "load_kg_data", missing_kg)
+        status = kg_routes.warm_caches(attempts=2, backoff=0)
+        assert status["status"] == "failed"
+        assert "kg_data" in status["failed_steps"]
+        assert not kg_routes.warmup_ready()
+
+    def test_ready_only_once_warm(self, monkeypatch):
+        """Health is not ready before the warm-up thread runs, nor after it fails"""
+        from api import kg_routes
+
+        monkeypatch.setattr(kg_routes, "_warmup_status", {"status": "not_started", "steps": {}})
+        assert not kg_routes.warmup_ready()
+
+        kg_routes.start_warmup()
+        assert kg_routes.get_warmup_status()["status"] == "warming"
+        assert not kg_routes.warmup_ready()
+
+        kg_routes._warmup_status["status"] = "failed"
+        assert not kg_routes.warmup_ready()
+        kg_routes._warmup_status["status"] = "ready"
+        assert kg_routes.warmup_ready()
+        kg_routes._warmup_status["status"] = "degraded"
+        assert kg_routes.warmup_ready()
+
+        kg_routes.disable_warmup()
+        assert kg_routes.warmup_ready()
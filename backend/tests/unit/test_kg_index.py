@@ -0,0 +1,111 @@
+"""
+Unit tests for KG lookup indexes
+Tests indexed filtering, projection, cursors and the /nodes and /edges routes
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services.kg_index import KGIndex, decode_cursor, encode_cursor, parse_fields, project
+
+
+class TestKGIndex:
+    """Test cases for KGIndex"""
+
+    def test_filter_nodes(self, sample_kg_data):
+        """Filters intersect and keep KG order"""
+        index = KGIndex(sample_kg_data)
+        assert index.filter_nodes() == [0, 1, 2]
+        assert index.filter_nodes(type="person") == [0]
+        assert index.filter_nodes(type="person", school="Peripatetic") == [0]
+        assert index.filter_nodes(type="concept", school="Peripatetic") == []
+        assert index.filter_nodes(period="Unknown") == []
+
+    def test_filter_edges_and_lookup(self, sample_kg_data):
+        """Edge filters, node lookup and connected edges use the index"""
+        index = KGIndex(sample_kg_data)
+        assert index.filter_edges(relation="authored") == [0]
+        assert index.get_node("work_ethics_test")["label"] == "Nicomachean Ethics"
+        assert index.get_node("missing") is None
+        assert len(index.connected_edges("person_aristotle_test")) == 2
+
+    def test_project(self):
+        """Projection keeps requested fields plus always-included ones"""
+        node = {"id": "n1", "label": "L", "description": "long", "embedding": [0.1]}
+        assert project(node, ["label"]) == {"id": "n1", "label": "L"}
+        assert project(node, None, exclude=("embedding",)) == {
+            "id": "n1", "label": "L", "description": "long"
+        }
+        assert parse_fields(" label, ,type ") == ["label", "type"]
+        assert parse_fields("") is None
+
+    def test_cursor_roundtrip(self):
+        """Cursors are bound to the KG version"""
+        cursor = encode_cursor("v1", 20)
+        assert decode_cursor(cursor, "v1") == 20
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "v2")
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor", "v1")
+
+
+class TestCollectionRoutes:
+    """Test cases for /api/kg/nodes and /api/kg/edges"""
+
+    @pytest.fixture
+    def client(self, sample_kg_data, monkeypatch):
+        from api import kg_routes
+
+        index = KGIndex(sample_kg_data, "test-version")
+        monkeypatch.setattr(kg_routes, "get_kg_index", lambda: index)
+        monkeypatch.setattr(kg_routes, "get_kg_version", lambda: "test-version")
+
+        app = FastAPI()
+        app.include_router(kg_routes.router, prefix="/api/kg")
+        return TestClient(app)
+
+    def test_nodes_default_returns_all(self, client):
+        """Without pagination parameters every node is returned"""
+        data = client.get("/api/kg/nodes").json()
+        assert data["total"] == 3
+        assert len(data["nodes"]) == 3
+        assert data["next_cursor"] is None
+
+    def test_nodes_projection_and_filter(self, client):
+        """fields= projects and type filters through the index"""
+        data = client.get("/api/kg/nodes", params={"type": "person", "fields": "label"}).json()
+        assert data["nodes"] == [{"id": "person_aristotle_test", "label": "Aristotle"}]
+
+    def test_nodes_cursor_pagination(self, client):
+        """Following next_cursor walks every node exactly once"""
+        seen = []
+        params = {"limit": 2, "fields": "id"}
+        while True:
+            data = client.get("/api/kg/nodes", params=params).json()
+            seen.extend(node["id"] for node in data["nodes"])
+            if not data["next_cursor"]:
+                break
+            params = {"limit": 2, "fields": "id", "cursor": data["next_cursor"]}
+        assert len(seen) == 3 and len(set(seen)) == 3
+
+    def test_stale_cursor_rejected(self, client):
+        """Cursors from another KG version return 400"""
+        response = client.get("/api/kg/nodes", params={"cursor": encode_cursor("old", 1)})
+        assert response.status_code == 400
+
+    def test_edges_ndjson(self, client):
+        """NDJSON streams one projected edge per line"""
+        response = client.get(
+            "/api/kg/edges",
+            params={"format": "ndjson", "fields": "relation"},
+        )
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert response.headers["x-total-count"] == "2"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines[0] == {
+            "source": "person_aristotle_test",
+            "target": "work_ethics_test",
+            "relation": "authored",
+        }
@@ -0,0 +1,213 @@
+"""
+Unit tests for KG metric precomputation
+Tests centrality computation, sampling and the background metrics service
+"""
+import importlib.util
+import json
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import networkx as nx
+
+from services import kg_metrics
+from services.kg_metrics import (
+    GraphAdjacency,
+    GraphMetricsService,
+    _graph_payload,
+    compute_graph_metrics,
+    get_adjacency,
+    kg_file_version,
+    kg_version,
+    top_nodes,
+)
+
+
+class TestKGMetrics:
+    """Test cases for graph metrics"""
+
+    def test_kg_version_is_content_hash(self, sample_kg_data):
+        """Version changes only when nodes or edges change"""
+        version = kg_version(sample_kg_data)
+        assert version == kg_version(dict(sample_kg_data))
+
+        modified = dict(sample_kg_data)
+        modified["edges"] = sample_kg_data["edges"][:1]
+        assert kg_version(modified) != version
+
+    def test_kg_file_version_is_memoised_per_file(self, sample_kg_data, tmp_path, monkeypatch):
+        """A KG file is hashed once until its mtime or size changes"""
+        path = tmp_path / "kg.json"
+        path.write_text(json.dumps(sample_kg_data))
+        calls = []
+        monkeypatch.setattr(kg_metrics, "kg_version", lambda data: calls.append(data) or "v1")
+
+        stat = path.stat()
+        assert kg_file_version(path, stat, sample_kg_data) == "v1"
+        assert kg_file_version(path, stat, sample_kg_data) == "v1"
+        assert len(calls) == 1
+
+        path.write_text(json.dumps(sample_kg_data) + " ")
+        kg_file_version(path, path.stat(), sample_kg_data)
+        assert len(calls) == 2
+
+    def test_compute_graph_metrics(self, sample_kg_data):
+        """All centrality measures are computed for every node"""
+        node_ids, edges = _graph_payload(sample_kg_data)
+        metrics = compute_graph_metrics(node_ids, edges)
+
+        assert metrics["node_count"] == 3
+        assert metrics["edge_count"] == 2
+        assert metrics["betweenness_approximate"] is False
+        for measure in ("degree", "betweenness", "closeness", "eigenvector", "pagerank"):
+            assert set(metrics["centrality"][measure]) == set(node_ids)
+
+        # Aristotle is the hub of the sample graph
+        betweenness = metrics["centrality"]["betweenness"]
+        assert max(betweenness, key=betweenness.get) == "person_aristotle_test"
+
+    def test_pagerank_matches_networkx(self):
+        """NumPy PageRank agrees with the NetworkX reference implementation"""
+        graph = nx.karate_club_graph()
+        node_ids = [str(n) for n in graph.nodes()]
+        edges = [(str(u), str(v), 1.0) for u, v in graph.edges()]
+
+        metrics = compute_graph_metrics(node_ids, edges)
+        expected = nx.pagerank(graph, weight=None) if _has_scipy() else None
+        scores = metrics["centrality"]["pagerank"]
+
+        assert sum(scores.values()) == pytest.approx(1.0)
+        if expected:
+            for node, value in expected.items():
+                assert scores[str(node)] == pytest.approx(value, abs=1e-4)
+
+    def test_betweenness_sampled_for_large_graphs(self):
+        """Betweenness switches to pivot sampling above the threshold"""
+        graph = nx.path_graph(30)
+        node_ids = [str(n) for n in graph.nodes()]
+        edges = [(str(u), str(v), 1.0) for u, v in graph.edges()]
+
+        metrics = compute_graph_metrics(node_ids, edges, sample_threshold=10, sample_size=8)
+
+        assert metrics["betweenness_approximate"] is True
+        assert metrics["betweenness_samples"] == 8
+
+    def test_top_nodes(self):
+        """Top nodes are ordered by score, ties broken by id"""
+        ranked = top_nodes({"b": 0.5, "a": 0.5, "c": 0.9}, limit=2)
+        assert [entry["id"] for entry in ranked] == ["c", "a"]
+
+    def test_service_computes_in_background(self, sample_kg_data):
+        """Service schedules once per version and serves cached results"""
+        service = GraphMetricsService()
+        version = kg_version(sample_kg_data)
+        try:
+            assert service.ensure(sample_kg_data, version) is None
+            assert service.status(version) in ("pending", "ready")
+
+            metrics = service.wait(version, timeout=60)
+            assert metrics is not None
+            assert metrics["version"] == version
+            assert service.status(version) == "ready"
+            assert service.ensure(sample_kg_data, version) is metrics
+            assert service.scores("pagerank")
+        finally:
+            service.shutdown()
+
+    def test_failed_version_backs_off(self, sample_kg_data, monkeypatch):
+        """A deterministic failure is not resubmitted on every request"""
+        pools = []
+
+        def failing_pool(max_workers):
+            pools.append(FakePool(error=RuntimeError("bad graph")))
+            return pools[-1]
+
+        monkeypatch.setattr(kg_metrics, "ProcessPoolExecutor", failing_pool)
+        service = GraphMetricsService(retry_seconds=60)
+        version = kg_version(sample_kg_data)
+
+        assert service.ensure(sample_kg_data, version) is None
+        assert service.ensure(sample_kg_data, version) is None
+        assert service.status(version) == "failed"
+        assert pools[0].submitted == 1
+
+        # Once the backoff has passed the version is retried, and the next delay doubles
+        service._retry_at[version] = (1, 0.0)
+        service.ensure(sample_kg_data, version)
+        assert pools[0].submitted == 2
+        assert service._retry_at[version][0] == 2
+
+    def test_broken_pool_is_replaced(self, sample_kg_data, monkeypatch):
+        """A crashed worker pool is rebuilt instead of raising into the request"""
+        pools = [FakePool(broken=True), FakePool()]
+        created = iter(pools)
+        monkeypatch.setattr(kg_metrics, "ProcessPoolExecutor", lambda max_workers: next(created))
+        service = GraphMetricsService()
+        version = kg_version(sample_kg_data)
+
+        assert service.ensure(sample_kg_data, version) is None
+        assert pools[0].shut_down and pools[1].submitted == 1
+        assert service.status(version) == "ready"
+
+
+class FakePool:
+    """Stands in for the worker pool: completes futures inline, or is broken"""
+
+    def __init__(self, broken=False, error=None):
+        self.broken = broken
+        self.error = error
+        self.submitted = 0
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        if self.broken:
+            raise BrokenProcessPool("worker died")
+        self.submitted += 1
+        future = Future()
+        if self.error:
+            future.set_exception(self.error)
+        else:
+            future.set_result({"compute_seconds": 0.0})
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def _chain_kg(length: int = 6) -> dict:
+    nodes = [{"id": f"n{i}", "label": f"N{i}", "type": "concept"} for i in range(length)]
+    edges = [{"source": f"n{i}", "target": f"n{i + 1}", "relation": "related_to"} for i in range(length - 1)]
+    return {"nodes": nodes, "edges": edges}
+
+
+class TestPersonalizedPageRank:
+    """Test cases for GraphAdjacency.personalized_pagerank"""
+
+    def test_scores_decay_with_distance_from_seed(self):
+        """Nodes closer to the seed score higher than distant ones"""
+        scores = GraphAdjacency(_chain_kg()).personalized_pagerank({"n0": 1.0})
+        assert scores["n0"] > scores["n2"] > scores["n3"] > scores["n4"] > scores["n5"]
+        assert sum(scores.values()) == pytest.approx(1.0, abs=1e-4)
+
+    def test_seed_weights_shift_mass(self):
+        """A heavier seed pulls more probability mass towards its neighbourhood"""
+        adjacency = GraphAdjacency(_chain_kg())
+        balanced = adjacency.personalized_pagerank({"n0": 1.0, "n5": 1.0})
+        skewed = adjacency.personalized_pagerank({"n0": 0.9, "n5": 0.1})
+        assert balanced["n1"] == pytest.approx(balanced["n4"], rel=1e-3)
+        assert skewed["n1"] > skewed["n4"]
+
+    def test_unknown_seeds_return_empty(self, sample_kg_data):
+        """No known seed means no scores"""
+        assert GraphAdjacency(sample_kg_data).personalized_pagerank({"missing": 1.0}) == {}
+
+    def test_adjacency_cached_per_version(self, sample_kg_data):
+        """The same version reuses its arrays; a new version replaces them"""
+        first = get_adjacency(sample_kg_data, "v1")
+        assert get_adjacency(sample_kg_data, "v1") is first
+        assert get_adjacency(_chain_kg(), "v2") is not first
+        assert get_adjacency(sample_kg_data, "v1") is not first
+
+
+def _has_scipy() -> bool:
+    return importlib.util.find_spec("scipy") is not None
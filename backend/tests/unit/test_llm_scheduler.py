@@ -0,0 +1,216 @@
+"""
+Unit tests for LLM admission control
+Tests bounded concurrency, priority ordering, early rejection, hedging and breaker-aware fallback
+"""
+import asyncio
+
+import pytest
+
+from services.llm_scheduler import LLMOverloadedError, LLMScheduler, Priority, ProviderScheduler
+
+
+async def _generate(scheduler, priority, order, label, duration=0.02, deadline=10):
+    async with scheduler.slot(priority, deadline):
+        order.append(label)
+        await asyncio.sleep(duration)
+
+
+class TestProviderScheduler:
+    """Test cases for ProviderScheduler"""
+
+    async def test_concurrency_is_bounded(self):
+        """No more than max_concurrency generations run at once"""
+        scheduler = ProviderScheduler("ollama", max_concurrency=2, expected_service_time=0.01)
+        running = []
+        peak = []
+
+        async def generate():
+            async with scheduler.slot(Priority.STANDARD, deadline=10):
+                running.append(1)
+                peak.append(len(running))
+                await asyncio.sleep(0.02)
+                running.pop()
+
+        await asyncio.gather(*(generate() for _ in range(6)))
+
+        assert max(peak) == 2
+        stats = scheduler.stats()
+        assert stats["completed"] == 6
+        assert stats["active"] == 0
+        assert stats["queue_depth"] == 0
+
+    async def test_interactive_admitted_before_batch(self):
+        """Queued interactive requests overtake earlier batch requests"""
+        scheduler = ProviderScheduler("ollama", max_concurrency=1, expected_service_time=0.01)
+        order = []
+
+        first = asyncio.ensure_future(_generate(scheduler, Priority.STANDARD, order, "first"))
+        await asyncio.sleep(0)
+        batch = [asyncio.ensure_future(_generate(scheduler, Priority.BATCH, order, f"batch-{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(_generate(scheduler, Priority.INTERACTIVE, order, "interactive"))
+
+        await asyncio.gather(first, interactive, *batch)
+        assert order == ["first", "interactive", "batch-0", "batch-1"]
+
+    async def test_rejects_when_estimated_wait_exceeds_deadline(self):
+        """Requests that cannot be served in time fail fast with a retry hint"""
+        scheduler = ProviderScheduler("ollama", max_concurrency=1, expected_service_time=30)
+        order = []
+        running = asyncio.ensure_future(_generate(scheduler, Priority.STANDARD, order, "running", duration=0.05))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMOverloadedError) as excinfo:
+            async with scheduler.slot(Priority.INTERACTIVE, deadline=5):
+                pass
+        assert excinfo.value.reason == "deadline"
+        assert excinfo.value.retry_after == 30
+
+        await running
+        assert scheduler.stats()["rejected"] == 1
+
+    async def test_rejects_when_queue_full(self):
+        """A full queue rejects immediately"""
+        scheduler = ProviderScheduler("ollama", max_concurrency=1, max_queue=1, expected_service_time=0.01)
+        order = []
+        tasks = [
+            asyncio.ensure_future(_generate(scheduler, Priority.STANDARD, order, label, duration=0.05))
+            for label in ("running", "queued")
+        ]
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMOverloadedError) as excinfo:
+            async with scheduler.slot(Priority.STANDARD, deadline=10):
+                pass
+        assert excinfo.value.reason == "queue_full"
+        await asyncio.gather(*tasks)
+
+    async def test_queued_request_expires_and_frees_its_place(self):
+        """A request still queued at its deadline is rejected and the slot keeps flowing"""
+        scheduler = ProviderScheduler("ollama", max_concurrency=1, expected_service_time=0.01)
+        order = []
+        running = asyncio.ensure_future(_generate(scheduler, Priority.STANDARD, order, "running", duration=0.1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMOverloadedError):
+            async with scheduler.slot(Priority.STANDARD, deadline=0.02):
+                pass
+
+        await running
+        await _generate(scheduler, Priority.STANDARD, order, "after")
+        assert order == ["running", "after"]
+        assert scheduler.stats()["expired"] == 1
+        assert scheduler.active == 0
+
+
+class TestLLMServiceAdmission:
+    """Test cases for admission control inside LLMService"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        from services import llm_service
+
+        service = llm_service.LLMService(preferred_provider=llm_service.ModelProvider.OLLAMA)
+        service.scheduler = LLMScheduler()
+        service.scheduler.providers = {
+            "ollama": ProviderScheduler("ollama", max_concurrency=1, expected_service_time=60),
+            "gemini": ProviderScheduler("gemini", max_concurrency=1, expected_service_time=60),
+        }
+
+        async def slow(provider):
+            await asyncio.sleep(0.05)
+            return {"response": "ok", "provider": provider}
+
+        monkeypatch.setattr(service, "_generate_with_ollama", lambda *args: slow("ollama"))
+        monkeypatch.setattr(service, "_generate_with_gemini", lambda *args: slow("gemini"))
+        return service
+
+    async def test_saturated_primary_falls_back(self, service):
+        """When Ollama is busy past the deadline, Gemini takes the request"""
+        results = await asyncio.gather(
+            service.generate_response("a", deadline=5),
+            service.generate_response("b", deadline=5),
+        )
+        assert sorted(result["provider"] for result in results) == ["gemini", "ollama"]
+
+    async def test_both_saturated_raises_with_retry_hint(self, service):
+        """Overload on every provider surfaces as LLMOverloadedError"""
+        busy = [asyncio.ensure_future(service.generate_response(str(i), deadline=5)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(LLMOverloadedError) as excinfo:
+            await service.generate_response("c", deadline=5)
+        assert excinfo.value.retry_after == 60
+        await asyncio.gather(*busy)
+
+
+class TestHedgedRouting:
+    """Test cases for hedged, breaker-aware provider routing"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        from services import llm_service
+        from utils.circuit_breaker import llm_provider_breakers
+
+        for breaker in llm_provider_breakers.values():
+            breaker.close()
+
+        service = llm_service.LLMService(preferred_provider=llm_service.ModelProvider.OLLAMA)
+        service.scheduler = LLMScheduler()
+        service.calls = []
+
+        def provider(name, delay, fail=False):
+            async def generate(*args):
+                service.calls.append(name)
+                await asyncio.sleep(delay)
+                if fail:
+                    raise RuntimeError(f"{name} down")
+                return {"response": name, "provider": name, "model": name}
+            return generate
+
+        service.use = lambda name, delay, fail=False: monkeypatch.setattr(
+            service, f"_generate_with_{name}", provider(name, delay, fail)
+        )
+        yield service
+
+        for breaker in llm_provider_breakers.values():
+            breaker.close()
+
+    async def test_hedges_when_primary_exceeds_p90(self, service):
+        """A primary slower than its p90 is raced against the fallback"""
+        for _ in range(10):
+            service.scheduler.observe_latency("ollama", 0.02)
+        service.use("ollama", 0.5)
+        service.use("gemini", 0.01)
+
+        result = await service.generate_response("q")
+
+        assert result["provider"] == "gemini"
+        assert result["hedged"] is True
+        assert service.calls == ["ollama", "gemini"]
+
+    async def test_fast_primary_is_not_hedged(self, service):
+        """Within its usual latency the primary answers alone"""
+        for _ in range(10):
+            service.scheduler.observe_latency("ollama", 0.2)
+        service.use("ollama", 0.01)
+        service.use("gemini", 0.01)
+
+        result = await service.generate_response("q")
+
+        assert result["provider"] == "ollama"
+        assert "hedged" not in result
+        assert service.calls == ["ollama"]
+        assert service.scheduler.latency["ollama"].stats()["samples"] == 11
+
+    async def test_open_breaker_skips_provider(self, service):
+        """After repeated failures the down provider is not tried at all"""
+        service.use("ollama", 0, fail=True)
+        service.use("gemini", 0)
+
+        for _ in range(3):
+            assert (await service.generate_response("q"))["provider"] == "gemini"
+        service.calls.clear()
+
+        assert (await service.generate_response("q"))["provider"] == "gemini"
+        assert service.calls == ["gemini"]
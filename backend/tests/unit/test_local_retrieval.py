@@ -0,0 +1,81 @@
+"""
+Unit tests for offline retrieval and the GraphRAG benchmark harness
+Tests the hashing embedder, the in-process vector index and regression detection
+"""
+import numpy as np
+import pytest
+
+from benchmark_graphrag import FakeLLMService, find_regressions, summarise
+from services.local_retrieval import HashingEmbedder, InMemoryVectorIndex
+
+
+class TestHashingEmbedder:
+    """Test cases for HashingEmbedder"""
+
+    def test_deterministic_unit_vectors(self):
+        """The same text always maps to the same normalised vector"""
+        embedder = HashingEmbedder(64)
+        first = embedder.embed("Stoic assent and fate")
+        assert np.array_equal(first, HashingEmbedder(64).embed("Stoic assent and fate"))
+        assert np.linalg.norm(first) == pytest.approx(1.0, abs=1e-6)
+        assert not embedder.embed("").any()
+
+    def test_shared_words_are_closer(self):
+        """Texts sharing vocabulary score higher than unrelated ones"""
+        embedder = HashingEmbedder()
+        query = embedder.embed("Chrysippus on fate and assent")
+        related = embedder.embed("Chrysippus defended fate while keeping assent up to us")
+        unrelated = embedder.embed("Plotinus on the One and emanation")
+        assert query @ related > query @ unrelated
+
+
+class TestInMemoryVectorIndex:
+    """Test cases for InMemoryVectorIndex"""
+
+    def test_from_kg_finds_matching_node(self, sample_kg_data):
+        """Searching with a node's own text returns that node first, in Qdrant format"""
+        embedder = HashingEmbedder()
+        index = InMemoryVectorIndex.from_kg(sample_kg_data, embedder)
+        hits = index.search(embedder.embed("Free Will concept"), limit=2)
+
+        assert hits[0]["payload"]["node_id"] == "concept_free_will_test"
+        assert hits[0]["score"] >= hits[1]["score"]
+
+    def test_search_many_matches_single_queries(self):
+        """One matrix multiply gives the same hits as per-query search"""
+        rng = np.random.default_rng(0)
+        index = InMemoryVectorIndex([f"n{i}" for i in range(50)], rng.normal(size=(50, 16)))
+        queries = rng.normal(size=(5, 16))
+
+        batched = index.search_many(queries, limit=3)
+        assert len(batched) == 5
+        for query, hits in zip(queries, batched):
+            single = index.search(query, limit=3)
+            assert [hit["id"] for hit in hits] == [hit["id"] for hit in single]
+            assert [hit["score"] for hit in hits] == pytest.approx([hit["score"] for hit in single], abs=1e-5)
+
+    async def test_search_nodes_is_qdrant_compatible(self):
+        """search_nodes honours limit and score_threshold"""
+        index = InMemoryVectorIndex(["a", "b"], np.array([[1.0, 0.0], [0.0, 1.0]]))
+        hits = await index.search_nodes([1.0, 0.1], limit=5, score_threshold=0.5)
+        assert [hit["payload"]["node_id"] for hit in hits] == ["a"]
+
+
+class TestBenchmarkHarness:
+    """Test cases for the benchmark helpers"""
+
+    async def test_fake_llm_cites_context_headings(self):
+        """The fake answer is built from the packed context"""
+        result = await FakeLLMService().generate_response("# KB\n## Aristotle (person)\ntext")
+        assert result["response"] == "According to Aristotle (person)."
+        assert result["provider"] == "fake"
+
+    def test_regressions_flag_slower_stages_only(self):
+        """Only stages above the noise floor that slowed past the tolerance are reported"""
+        baseline = {"bfs": summarise({"expansion": [2.0] * 5, "citations": [0.01] * 5}, 1.0, 5)}
+        current = {"bfs": summarise({"expansion": [3.0] * 5, "citations": [0.05] * 5}, 1.0, 5)}
+
+        regressions = find_regressions(current, baseline, max_regression=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("bfs/expansion")
+        assert find_regressions(current, baseline, max_regression=0.6) == []
@@ -0,0 +1,119 @@
+"""
+Unit tests for deep-mode passage retrieval
+Tests rank fusion, passage formatting, concurrency and the time budget
+"""
+import asyncio
+import time
+
+from services.context_packer import estimate_tokens
+from services.passage_retrieval import (
+    SECTION_SEARCH_SQL,
+    PassageRetriever,
+    format_passages,
+    fuse_passages,
+)
+
+
+def _text(text_id, title="De Fato", author="Cicero"):
+    return {"id": text_id, "title": title, "author": author, "snippet": f"{title} matches"}
+
+
+def _section(text_id, reference, title="De Fato", author="Cicero"):
+    return {
+        "id": f"{text_id}-{reference}",
+        "text_id": text_id,
+        "title": title,
+        "author": author,
+        "n": reference.split(".")[-1],
+        "full_reference": reference,
+        "char_position": 100,
+        "char_length": 400,
+        "snippet": f"Passage {reference} on fate and assent.",
+    }
+
+
+class FakeDB:
+    """Database stub answering the two deep-mode queries after a delay"""
+
+    def __init__(self, text_hits, section_hits, delay=0.0, connected=True):
+        self.text_hits = text_hits
+        self.section_hits = section_hits
+        self.delay = delay
+        self.connected = connected
+        self.running = 0
+        self.peak = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def fetch(self, query, *args):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        return self.section_hits if query == SECTION_SEARCH_SQL else self.text_hits
+
+
+class TestFusePassages:
+    """Test cases for fuse_passages and format_passages"""
+
+    def test_sections_from_matching_texts_rank_first(self):
+        """A section whose work also matches at text level outranks one that does not"""
+        texts = [_text("t2")]
+        sections = [_section("t1", "39"), _section("t2", "41")]
+        passages = fuse_passages(texts, sections)
+
+        assert [p.reference for p in passages[:2]] == ["41", "39"]
+        assert [p.label for p in passages] == ["P1", "P2"]
+
+    def test_text_only_hits_become_whole_work_passages(self):
+        """Works matched only at text level are kept without a reference"""
+        passages = fuse_passages([_text("t9", "Enchiridion", "Epictetus")], [_section("t1", "39")])
+
+        whole = [p for p in passages if p.text_id == "t9"][0]
+        assert whole.reference is None
+        assert whole.citation == "Epictetus, Enchiridion"
+        assert passages[0].citation == "Cicero, De Fato 39"
+
+    def test_limit_and_format_budget(self):
+        """Only ``limit`` passages are kept and the block fits its token budget"""
+        sections = [dict(_section("t1", str(i)), snippet="fate " * 200) for i in range(10)]
+        passages = fuse_passages([], sections, limit=4)
+        block = format_passages(passages, token_budget=150)
+
+        assert len(passages) == 4
+        assert "[P1] Cicero, De Fato 0" in block
+        assert estimate_tokens(block) <= 150 + len(passages)
+        assert format_passages([]) == ""
+
+
+class TestPassageRetriever:
+    """Test cases for PassageRetriever.retrieve"""
+
+    async def test_runs_both_searches_concurrently(self):
+        """Text and section searches overlap rather than run back to back"""
+        db = FakeDB([_text("t1")], [_section("t1", "39")], delay=0.05)
+        result = await PassageRetriever(db).retrieve("fate", timeout=1)
+
+        assert db.peak == 2
+        assert [p.reference for p in result.passages] == ["39"]
+        assert result.timed_out is False
+
+    async def test_time_budget_caps_latency(self):
+        """A slow database yields an empty, timed-out result within the budget"""
+        db = FakeDB([_text("t1")], [_section("t1", "39")], delay=1.0)
+        started = time.monotonic()
+        result = await PassageRetriever(db).retrieve("fate", timeout=0.05)
+
+        assert time.monotonic() - started < 0.5
+        assert result.timed_out is True
+        assert result.passages == []
+        assert db.running == 0
+
+    async def test_disconnected_database_is_skipped(self):
+        """Without a database connection deep mode degrades to no passages"""
+        result = await PassageRetriever(FakeDB([], [], connected=False)).retrieve("fate")
+        assert result.passages == []
+        assert result.error == "database not connected"
@@ -0,0 +1,116 @@
+"""
+Unit tests for single-flight request coalescing
+Tests shared results, error propagation, cancellation and SSE fan-out
+"""
+import asyncio
+
+from utils.single_flight import SingleFlight, normalize_text
+
+
+class TestSingleFlightCalls:
+    """Test cases for SingleFlight.do"""
+
+    async def test_concurrent_identical_calls_run_once(self):
+        """Callers arriving while a call is in flight share its result"""
+        flights = SingleFlight("test")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"answer": 42}
+
+        results = await asyncio.gather(*(flights.do("q", compute) for _ in range(5)))
+
+        assert calls == [1]
+        assert results == [{"answer": 42}] * 5
+        stats = flights.stats()
+        assert stats["executions"] == 1
+        assert stats["coalesced"] == 4
+        assert stats["in_flight_calls"] == 0
+
+    async def test_distinct_keys_and_later_calls_run_separately(self):
+        """Only concurrent calls for the same key are coalesced"""
+        flights = SingleFlight("test")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        await asyncio.gather(flights.do("a", compute), flights.do("b", compute))
+        await flights.do("a", compute)
+        assert len(calls) == 3
+
+    async def test_errors_reach_every_caller(self):
+        """An exception in the shared call is raised to all waiters"""
+        flights = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("llm down")
+
+        results = await asyncio.gather(
+            flights.do("q", fail), flights.do("q", fail), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """A client disconnect leaves the shared computation running"""
+        flights = SingleFlight("test")
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.ensure_future(flights.do("q", compute))
+        second = asyncio.ensure_future(flights.do("q", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "done"
+
+    def test_normalize_text(self):
+        """Whitespace differences do not split flights"""
+        assert normalize_text("  free   will\n") == "free will"
+
+
+class TestSingleFlightStreams:
+    """Test cases for SingleFlight.stream"""
+
+    async def test_events_fan_out_to_late_subscribers(self):
+        """Every subscriber receives the full event sequence from one producer"""
+        flights = SingleFlight("test")
+        runs = []
+
+        async def produce():
+            runs.append(1)
+            for step in range(3):
+                await asyncio.sleep(0.02)
+                yield f"event-{step}"
+
+        async def collect(delay):
+            await asyncio.sleep(delay)
+            return [event async for event in flights.stream("q", produce)]
+
+        results = await asyncio.gather(collect(0), collect(0.03), collect(0.01))
+
+        assert runs == [1]
+        assert results == [["event-0", "event-1", "event-2"]] * 3
+        assert flights.stats()["coalesced"] == 2
+
+    async def test_stream_ends_when_producer_fails(self):
+        """A failing producer ends the stream instead of hanging subscribers"""
+        flights = SingleFlight("test")
+
+        async def produce():
+            yield "first"
+            raise RuntimeError("boom")
+
+        events = await asyncio.wait_for(_collect(flights.stream("q", produce)), timeout=1)
+        assert events == ["first"]
+
+
+async def _collect(stream):
+    return [event async for event in stream]
@@ -0,0 +1,70 @@
+"""
+Unit tests for per-stage pipeline timing
+Tests span accounting, Prometheus export and the timings summary
+"""
+import time
+
+import pytest
+
+from utils.metrics import registry
+from utils.stage_timer import StageTimer
+
+
+def _stage_count(stage, provider):
+    value = registry.get_sample_value(
+        "graphrag_stage_duration_seconds_count", {"stage": stage, "provider": provider}
+    )
+    return value or 0.0
+
+
+class TestStageTimer:
+    """Test cases for StageTimer"""
+
+    def test_stage_is_timed_and_exported(self):
+        """A finished span is kept and observed in the stage histogram"""
+        before = _stage_count("expansion", "none")
+        timer = StageTimer()
+        with timer.stage("expansion"):
+            time.sleep(0.01)
+
+        assert timer.stages["expansion"] >= 0.01
+        assert _stage_count("expansion", "none") == before + 1
+
+    def test_provider_set_inside_span(self):
+        """The generation provider is only known once the call returns"""
+        before = _stage_count("generation", "gemini")
+        timer = StageTimer()
+        with timer.stage("generation") as span:
+            span.provider = "gemini"
+
+        assert timer.providers["generation"] == "gemini"
+        assert _stage_count("generation", "gemini") == before + 1
+
+    def test_failed_stage_still_recorded(self):
+        """Exceptions propagate but the time spent is not lost"""
+        timer = StageTimer()
+        with pytest.raises(RuntimeError):
+            with timer.stage("vector_search", "qdrant"):
+                raise RuntimeError("qdrant down")
+        assert "vector_search" in timer.stages
+
+    def test_summary_in_milliseconds_and_order(self):
+        """Repeated stages accumulate; the summary keeps execution order"""
+        timer = StageTimer()
+        timer.record("cache_lookup", 0.002)
+        timer.record("embedding", 0.1, "gemini")
+        timer.record("cache_lookup", 0.003)
+
+        summary = timer.summary()
+        assert list(summary["stages"]) == ["cache_lookup", "embedding"]
+        assert summary["stages"]["cache_lookup"] == 5.0
+        assert summary["providers"]["embedding"] == "gemini"
+        assert summary["total_ms"] >= 0
+
+    def test_finish_counts_query_once(self):
+        """The whole run is recorded in graphrag_queries_total exactly once"""
+        before = registry.get_sample_value("graphrag_queries_total", {"status": "cached"}) or 0.0
+        timer = StageTimer()
+        timer.finish("cached", 3)
+        timer.finish("cached", 3)
+        assert registry.get_sample_value("graphrag_queries_total", {"status": "cached"}) == before + 1
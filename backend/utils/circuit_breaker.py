@@ -2,31 +2,64 @@
 Circuit Breaker Pattern Implementation
 Prevents cascading failures by failing fast when services are unavailable
 """
-from pybreaker import CircuitBreaker, CircuitBreakerError
-from typing import Callable, Any
+from pybreaker import STATE_OPEN, CircuitBreaker, CircuitBreakerError, CircuitBreakerListener
+from typing import Callable, Any, Dict
 import time
 from functools import wraps
 
 
+class OpenedAtListener(CircuitBreakerListener):
+    """Remember when each breaker last opened, so callers can skip it without probing"""
+
+    def __init__(self) -> None:
+        self.opened_at: Dict[str, float] = {}
+
+    def state_change(self, cb: CircuitBreaker, old_state: Any, new_state: Any) -> None:
+        if new_state.name == STATE_OPEN:
+            self.opened_at[cb.name] = time.monotonic()
+
+
+_opened_at = OpenedAtListener()
+
+
 # Circuit breakers for different services
 llm_circuit_breaker = CircuitBreaker(
     fail_max=3,  # Open after 3 failures
-    timeout_duration=60,  # Try again after 60 seconds
+    reset_timeout=60,  # Try again after 60 seconds
     name="LLM Service"
 )
 
 database_circuit_breaker = CircuitBreaker(
     fail_max=5,
-    timeout_duration=30,
+    reset_timeout=30,
     name="Database"
 )
 
 qdrant_circuit_breaker = CircuitBreaker(
     fail_max=3,
-    timeout_duration=45,
+    reset_timeout=45,
     name="Qdrant"
 )
 
+# Per-provider breakers, so a down Ollama does not take Gemini with it
+llm_provider_breakers = {
+    "ollama": CircuitBreaker(fail_max=3, reset_timeout=60, name="LLM ollama", listeners=[_opened_at]),
+    "gemini": CircuitBreaker(fail_max=3, reset_timeout=60, name="LLM gemini", listeners=[_opened_at]),
+}
+
+
+def is_open(breaker: CircuitBreaker) -> bool:
+    """
+    True while the breaker is open and its reset timeout has not elapsed
+
+    Once the timeout has passed this returns False, so the next real call is
+    let through as the half-open probe.
+    """
+    if breaker.current_state != STATE_OPEN:
+        return False
+    opened_at = _opened_at.opened_at.get(breaker.name)
+    return opened_at is None or time.monotonic() - opened_at < breaker.reset_timeout
+
 
 def with_circuit_breaker(breaker: CircuitBreaker):
     """
@@ -42,7 +75,8 @@ def with_circuit_breaker(breaker: CircuitBreaker):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             try:
-                return await breaker.call_async(func, *args, **kwargs)
+                with breaker.calling():
+                    return await func(*args, **kwargs)
             except CircuitBreakerError:
                 # Circuit is open, fail fast
                 raise Exception(f"{breaker.name} circuit breaker is OPEN - service unavailable")
@@ -0,0 +1,124 @@
+"""
+Pre-serialised HTTP payloads
+Serialises a JSON document once, keeps compressed variants and serves them
+with a strong ETag so conditional requests cost no CPU
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+# Brotli is optional: gzip is always available
+try:
+    import brotli  # type: ignore
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+
+class PrecompressedJSON:
+    """
+    A JSON payload serialised once to bytes, with gzip/brotli variants
+
+    Build it once per KG version and cache the instance; every request then
+    only picks the right byte string.
+    """
+
+    def __init__(self, payload: Any, gzip_level: int = 6, brotli_quality: int = 9):
+        """
+        Args:
+            payload: JSON-serialisable document
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11), used when brotli is installed
+        """
+        self.body = json.dumps(
+            payload,
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.encodings: Dict[str, bytes] = {
+            "gzip": gzip.compress(self.body, compresslevel=gzip_level, mtime=0),
+        }
+        if BROTLI_AVAILABLE:
+            self.encodings["br"] = brotli.compress(self.body, quality=brotli_quality)
+
+    @property
+    def size(self) -> int:
+        """Total bytes held by all variants"""
+        return len(self.body) + sum(len(data) for data in self.encodings.values())
+
+    def select_encoding(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Pick the best available encoding the client accepts (None = identity)"""
+        if not accept_encoding:
+            return None
+
+        accepted = set()
+        for token in accept_encoding.split(","):
+            parts = [part.strip() for part in token.split(";")]
+            quality = 1.0
+            for param in parts[1:]:
+                if param.lower().startswith("q="):
+                    try:
+                        quality = float(param[2:])
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(parts[0].lower())
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and (encoding in accepted or "*" in accepted):
+                return encoding
+        return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_response(
+    request: Request,
+    payload: PrecompressedJSON,
+    cache_control: str = "public, max-age=0, must-revalidate",
+) -> Response:
+    """
+    Serve a pre-built payload, answering 304 when the client's ETag matches
+
+    Args:
+        request: Incoming request (reads If-None-Match and Accept-Encoding)
+        payload: Pre-serialised payload
+        cache_control: Cache-Control header value
+    """
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = payload.select_encoding(request.headers.get("accept-encoding"))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        body = payload.encodings[encoding]
+    else:
+        body = payload.body
+
+    return Response(content=body, media_type="application/json", headers=headers)
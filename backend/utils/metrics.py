@@ -6,7 +6,7 @@ from prometheus_client import Counter, Histogram, Gauge, Info, generate_latest,
 from prometheus_client import CollectorRegistry
 from fastapi import Response
 import time
-from typing import Callable
+from typing import Callable, Optional
 from functools import wraps
 
 
@@ -68,6 +68,14 @@ graphrag_nodes_retrieved = Histogram(
     registry=registry
 )
 
+graphrag_stage_duration_seconds = Histogram(
+    'graphrag_stage_duration_seconds',
+    'GraphRAG pipeline stage duration in seconds',
+    ['stage', 'provider'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+    registry=registry
+)
+
 # Search metrics
 search_queries_total = Counter(
     'search_queries_total',
@@ -112,6 +120,28 @@ llm_tokens_total = Counter(
     registry=registry
 )
 
+llm_queue_depth = Gauge(
+    'llm_queue_depth',
+    'LLM requests waiting for a provider slot',
+    ['provider', 'priority'],
+    registry=registry
+)
+
+llm_queue_wait_seconds = Histogram(
+    'llm_queue_wait_seconds',
+    'Time LLM requests waited for a provider slot',
+    ['provider', 'priority'],
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+    registry=registry
+)
+
+llm_admission_rejections_total = Counter(
+    'llm_admission_rejections_total',
+    'LLM requests rejected by admission control',
+    ['provider', 'reason'],
+    registry=registry
+)
+
 # Database metrics
 db_queries_total = Counter(
     'db_queries_total',
@@ -239,6 +269,18 @@ def track_graphrag_query(status: str, duration: float, nodes_count: int):
     graphrag_nodes_retrieved.observe(nodes_count)
 
 
+def track_graphrag_stage(stage: str, duration: float, provider: str = 'none'):
+    """
+    Track one GraphRAG pipeline stage
+
+    Args:
+        stage: Pipeline stage (embedding, vector_search, expansion, generation, ...)
+        duration: Stage duration in seconds
+        provider: Backend that served the stage (gemini, qdrant, ollama, postgres, none)
+    """
+    graphrag_stage_duration_seconds.labels(stage=stage, provider=provider).observe(duration)
+
+
 def track_search_query(search_type: str, status: str, duration: float, results_count: int):
     """
     Track search query metrics
@@ -276,6 +318,32 @@ def track_llm_request(provider: str, model: str, status: str, duration: float,
         llm_tokens_total.labels(provider=provider, model=model, token_type='completion').inc(completion_tokens)
 
 
+def track_llm_queue(provider: str, priority: str, depth: int, wait: Optional[float] = None):
+    """
+    Track LLM admission queue metrics
+
+    Args:
+        provider: LLM provider (ollama, gemini)
+        priority: Request priority (interactive, standard, batch)
+        depth: Current number of queued requests at this priority
+        wait: Seconds waited for a slot, once admitted
+    """
+    llm_queue_depth.labels(provider=provider, priority=priority).set(depth)
+    if wait is not None:
+        llm_queue_wait_seconds.labels(provider=provider, priority=priority).observe(wait)
+
+
+def track_llm_rejection(provider: str, reason: str):
+    """
+    Track LLM admission rejections
+
+    Args:
+        provider: LLM provider (ollama, gemini)
+        reason: Rejection reason (queue_full, deadline)
+    """
+    llm_admission_rejections_total.labels(provider=provider, reason=reason).inc()
+
+
 def track_db_query(operation: str, status: str, duration: float):
     """
     Track database query metrics
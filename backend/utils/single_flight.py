@@ -0,0 +1,113 @@
+"""
+Single-flight request coalescing
+Concurrent identical requests share one in-flight computation or event stream
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different spellings of a request coalesce"""
+    return " ".join(text.split())
+
+
+class _SharedStream:
+    """Events of one producer, replayed to every subscriber from the start"""
+
+    def __init__(self) -> None:
+        self.events: List[Any] = []
+        self.done = False
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+
+    async def produce(self, source: AsyncIterator[Any]) -> None:
+        try:
+            async for event in source:
+                async with self.changed:
+                    self.events.append(event)
+                    self.changed.notify_all()
+        except Exception as e:
+            logger.error(f"Shared stream producer failed: {e}", exc_info=True)
+        finally:
+            async with self.changed:
+                self.done = True
+                self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Any]:
+        position = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.done or len(self.events) > position)
+                pending = self.events[position:]
+                finished = self.done
+            for event in pending:
+                yield event
+            position += len(pending)
+            if finished and position >= len(self.events):
+                return
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical requests
+
+    ``do`` runs one coroutine per key and hands its result (or exception) to
+    every caller that arrived while it was running. ``stream`` does the same
+    for async generators: one producer, every subscriber receives all events.
+    The shared work is shielded, so a disconnecting client never cancels it
+    for the others. Nothing is kept once the flight lands; caching finished
+    results is left to the caller.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _SharedStream] = {}
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the in-flight call for ``key``, starting it if there is none"""
+        task = self._calls.get(key)
+        if task is None:
+            self._stats["executions"] += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+            logger.debug(f"{self.name}: joined in-flight request {key!r}")
+        return await asyncio.shield(task)
+
+    async def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Subscribe to the in-flight event stream for ``key``, starting it if there is none"""
+        shared = self._streams.get(key)
+        if shared is None:
+            self._stats["executions"] += 1
+            shared = _SharedStream()
+            self._streams[key] = shared
+            producer = asyncio.ensure_future(shared.produce(factory()))
+            producer.add_done_callback(lambda _: self._streams.pop(key, None))
+        else:
+            self._stats["coalesced"] += 1
+            logger.debug(f"{self.name}: joined in-flight stream {key!r}")
+
+        shared.subscribers += 1
+        try:
+            async for event in shared.subscribe():
+                yield event
+        finally:
+            shared.subscribers -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Executions, coalesced callers and what is in flight right now"""
+        requests = self._stats["executions"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "coalesce_ratio": round(self._stats["coalesced"] / requests, 4) if requests else 0.0,
+            "in_flight_calls": len(self._calls),
+            "in_flight_streams": len(self._streams),
+            "stream_subscribers": sum(shared.subscribers for shared in self._streams.values()),
+        }
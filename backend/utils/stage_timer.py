@@ -0,0 +1,69 @@
+"""
+Per-stage pipeline timing
+Span-style timers around GraphRAG steps, exported as Prometheus histograms
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from utils.metrics import track_graphrag_query, track_graphrag_stage
+
+
+class Span:
+    """One timed stage; ``provider`` may be set inside the block once it is known"""
+
+    def __init__(self, stage: str, provider: str = "none"):
+        self.stage = stage
+        self.provider = provider
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+
+
+class StageTimer:
+    """
+    Collects stage durations for one pipeline run
+
+    Every finished stage is observed in ``graphrag_stage_duration_seconds``
+    (labelled by stage and provider) and kept for the response's ``timings``.
+    A stage entered twice accumulates.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.providers: Dict[str, str] = {}
+        self._finished = False
+
+    @contextmanager
+    def stage(self, name: str, provider: str = "none") -> Iterator[Span]:
+        """Time the block as stage ``name``"""
+        span = Span(name, provider)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.started
+            self.record(name, span.duration, span.provider)
+
+    def record(self, name: str, seconds: float, provider: str = "none") -> None:
+        """Add an externally measured stage (e.g. work that ran concurrently)"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        self.providers[name] = provider
+        track_graphrag_stage(name, seconds, provider)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self, status: str, nodes_count: int = 0) -> None:
+        """Record the whole run in the GraphRAG query metrics (once)"""
+        if self._finished:
+            return
+        self._finished = True
+        track_graphrag_query(status, self.elapsed(), nodes_count)
+
+    def summary(self) -> Dict[str, Any]:
+        """Milliseconds per stage, in execution order, plus the total"""
+        return {
+            "stages": {name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+            "providers": dict(self.providers),
+            "total_ms": round(self.elapsed() * 1000, 2),
+        }
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Bulk COPY Loader for the Ancient Free Will Database
+
+Loads texts, text divisions and text sections into the free_will schema with
+a handful of statements instead of one round-trip per row:
+
+1. rows are streamed into temporary staging tables with COPY
+   (asyncpg ``copy_records_to_table``), keyed by their source ids
+2. new ids and parent ids are resolved with set-based INSERT ... SELECT joins
+   on the staging tables
+3. everything runs in one transaction, so a failed load leaves no partial data
+
+Used by setup_database.py and migrate_to_supabase.py.
+
+Author: Romain Girardi
+Date: 2025-10-26
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMNS = (
+    'kg_work_id', 'title', 'author', 'category', 'raw_text', 'normalized_text',
+    'tei_xml', 'lemmas', 'pos_tags', 'named_entities', 'embedding',
+    'embedding_model', 'embedding_dimensions', 'embedding_hash',
+    'embedding_created_at', 'language', 'date_created', 'source', 'notes', 'metadata'
+)
+
+DIVISION_COLUMNS = (
+    'type', 'subtype', 'n', 'full_reference', 'heading',
+    'language', 'speaker', 'char_position', 'char_length', 'xml_id'
+)
+
+SECTION_COLUMNS = (
+    'type', 'subtype', 'n', 'content', 'language', 'speaker', 'char_position', 'xml_id'
+)
+
+STAGING_SQL = """
+CREATE TEMP TABLE stage_texts (
+    id UUID DEFAULT gen_random_uuid(),
+    source_id TEXT NOT NULL,
+    kg_work_id TEXT,
+    title TEXT,
+    author TEXT,
+    category TEXT,
+    raw_text TEXT,
+    normalized_text TEXT,
+    tei_xml TEXT,
+    lemmas JSONB,
+    pos_tags JSONB,
+    named_entities JSONB,
+    embedding BYTEA,
+    embedding_model TEXT,
+    embedding_dimensions INTEGER,
+    embedding_hash TEXT,
+    embedding_created_at TIMESTAMP WITH TIME ZONE,
+    language TEXT,
+    date_created TEXT,
+    source TEXT,
+    notes TEXT,
+    metadata JSONB
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE stage_divisions (
+    source_id TEXT NOT NULL,
+    source_text_id TEXT NOT NULL,
+    source_parent_id TEXT,
+    type TEXT,
+    subtype TEXT,
+    n TEXT,
+    full_reference TEXT,
+    heading TEXT,
+    language TEXT,
+    speaker TEXT,
+    char_position INTEGER,
+    char_length INTEGER,
+    xml_id TEXT
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE stage_sections (
+    source_text_id TEXT NOT NULL,
+    source_division_id TEXT,
+    type TEXT,
+    subtype TEXT,
+    n TEXT,
+    content TEXT,
+    language TEXT,
+    speaker TEXT,
+    char_position INTEGER,
+    xml_id TEXT
+) ON COMMIT DROP;
+"""
+
+INSERT_TEXTS_SQL = f"""
+INSERT INTO free_will.texts (id, {', '.join(TEXT_COLUMNS)})
+SELECT id, {', '.join(TEXT_COLUMNS)} FROM stage_texts
+{{on_conflict}}
+"""
+
+# One new division id per (loaded text, source division): a source text matched
+# to several works is loaded once per work, each copy with its own divisions
+DIVISION_IDS_SQL = """
+CREATE TEMP TABLE stage_division_ids ON COMMIT DROP AS
+SELECT t.id AS text_id, d.source_text_id, d.source_id, gen_random_uuid() AS id
+FROM stage_divisions d
+JOIN stage_texts t ON t.source_id = d.source_text_id
+JOIN free_will.texts loaded ON loaded.id = t.id;
+
+CREATE INDEX ON stage_division_ids (text_id, source_id);
+ANALYZE stage_division_ids;
+"""
+
+# Parent ids are resolved by joining each division to its parent's new id
+INSERT_DIVISIONS_SQL = f"""
+INSERT INTO free_will.text_divisions (id, text_id, parent_id, {', '.join(DIVISION_COLUMNS)})
+SELECT m.id, m.text_id, parent.id, {', '.join('d.' + c for c in DIVISION_COLUMNS)}
+FROM stage_divisions d
+JOIN stage_division_ids m ON m.source_text_id = d.source_text_id AND m.source_id = d.source_id
+LEFT JOIN stage_division_ids parent ON parent.text_id = m.text_id AND parent.source_id = d.source_parent_id
+"""
+
+INSERT_SECTIONS_SQL = f"""
+INSERT INTO free_will.text_sections (text_id, division_id, {', '.join(SECTION_COLUMNS)})
+SELECT t.id, m.id, {', '.join('s.' + c for c in SECTION_COLUMNS)}
+FROM stage_sections s
+JOIN stage_texts t ON t.source_id = s.source_text_id
+JOIN free_will.texts loaded ON loaded.id = t.id
+LEFT JOIN stage_division_ids m ON m.text_id = t.id AND m.source_id = s.source_division_id
+"""
+
+# Full-text index for deep-mode passage search (backend/services/passage_retrieval.py);
+# the query must use the same expression. Built after the sections are inserted,
+# so loading into a database created before the index existed adds it too.
+SECTION_SEARCH_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_text_sections_fts ON free_will.text_sections
+    USING gin(to_tsvector('simple', content))
+"""
+
+
+@dataclass
+class LoadStats:
+    """Row counts and timing for one bulk load."""
+    texts: int = 0
+    divisions: int = 0
+    sections: int = 0
+    staged_rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.texts + self.divisions + self.sections
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.texts:,} texts, {self.divisions:,} divisions, {self.sections:,} sections "
+                f"in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/sec)")
+
+
+def _json(value: Any) -> Optional[str]:
+    return json.dumps(value) if value else None
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if not value or isinstance(value, datetime):
+        return value or None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _source_id(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def text_record(kg_work_id: str, category: str, text_data: Dict) -> Tuple:
+    """Staging row for one text (``text_data`` as loaded from the Sematika SQLite database)"""
+    return (
+        _source_id(text_data['id']), kg_work_id, text_data['title'], text_data['author'], category,
+        text_data['raw_text'], text_data['normalized_text'], text_data['tei_xml'],
+        _json(text_data['lemmas']), _json(text_data['pos_tags']), _json(text_data['named_entities']),
+        text_data['embedding'], text_data['embedding_model'], text_data['embedding_dimensions'],
+        text_data['embedding_hash'], _timestamp(text_data['embedding_created_at']),
+        text_data['language'], text_data['date_created'], text_data['source'], text_data['notes'],
+        _json(text_data['metadata'])
+    )
+
+
+def division_record(row: Tuple) -> Tuple:
+    """Staging row from (id, text_id, parent_id, type, subtype, n, full_reference, heading,
+    language, speaker, char_position, char_length, xml_id)"""
+    div_id, text_id, parent_id, *values = row
+    return (_source_id(div_id), _source_id(text_id), _source_id(parent_id), *values)
+
+
+def section_record(row: Tuple) -> Tuple:
+    """Staging row from (text_id, division_id, type, subtype, n, content,
+    language, speaker, char_position, xml_id)"""
+    text_id, division_id, *values = row
+    return (_source_id(text_id), _source_id(division_id), *values)
+
+
+def _row_count(status: str) -> int:
+    """Rows affected from a command status such as 'INSERT 0 1234'"""
+    try:
+        return int(status.split()[-1])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+class BulkLoader:
+    """Streams rows into staging tables with COPY and moves them into free_will in one transaction."""
+
+    def __init__(self, conn: asyncpg.Connection):
+        self.conn = conn
+
+    async def load(self, texts: Iterable[Tuple], divisions: Iterable[Tuple] = (),
+                   sections: Iterable[Tuple] = (), skip_existing: bool = False) -> LoadStats:
+        """
+        Bulk-load texts with their divisions and sections.
+
+        Args:
+            texts: ``text_record`` tuples
+            divisions: ``division_record`` tuples (source ids refer to the text records)
+            sections: ``section_record`` tuples
+            skip_existing: Leave texts whose kg_work_id is already loaded untouched
+                (their divisions and sections are skipped too)
+
+        Returns:
+            LoadStats with inserted row counts and throughput
+        """
+        stats = LoadStats()
+        started = time.perf_counter()
+
+        async with self.conn.transaction():
+            await self.conn.execute(STAGING_SQL)
+
+            for table, records, columns in (
+                ('stage_texts', texts, ('source_id',) + TEXT_COLUMNS),
+                ('stage_divisions', divisions, ('source_id', 'source_text_id', 'source_parent_id') + DIVISION_COLUMNS),
+                ('stage_sections', sections, ('source_text_id', 'source_division_id') + SECTION_COLUMNS),
+            ):
+                status = await self.conn.copy_records_to_table(table, records=records, columns=list(columns))
+                staged = _row_count(status)
+                stats.staged_rows += staged
+                logger.info(f"Staged {staged:,} rows in {table}")
+
+            await self.conn.execute("""
+                CREATE INDEX ON stage_texts (source_id);
+                CREATE INDEX ON stage_divisions (source_text_id, source_id);
+                ANALYZE stage_texts;
+                ANALYZE stage_divisions;
+            """)
+
+            on_conflict = 'ON CONFLICT (kg_work_id) DO NOTHING' if skip_existing else ''
+            stats.texts = _row_count(await self.conn.execute(INSERT_TEXTS_SQL.format(on_conflict=on_conflict)))
+            await self.conn.execute(DIVISION_IDS_SQL)
+            stats.divisions = _row_count(await self.conn.execute(INSERT_DIVISIONS_SQL))
+            stats.sections = _row_count(await self.conn.execute(INSERT_SECTIONS_SQL))
+            if stats.sections:
+                await self.conn.execute(SECTION_SEARCH_INDEX_SQL)
+
+        stats.seconds = time.perf_counter() - started
+        logger.info(f"Bulk load committed: {stats.summary()}")
+        return stats
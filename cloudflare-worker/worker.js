@@ -10,6 +10,7 @@
  * - /api/kg/nodes (1 hour cache)
  * - /api/kg/edges (1 hour cache)
  * - /api/kg/node/[id] (1 hour cache)
+ * - /api/kg/viz/cytoscape (1 hour cache, ETag revalidation answered at the edge)
  *
  * NOT Cached (dynamic endpoints):
  * - /api/graphrag/* (AI responses, always fresh)
@@ -34,6 +35,7 @@ const CACHE_DURATIONS = {
   kgEdges: 60 * 60,         // 1 hour
   kgNode: 60 * 60,          // 1 hour (individual nodes)
   analytics: 30 * 60,       // 30 minutes (timeline, arguments, etc.)
+  kgViz: 60 * 60,           // 1 hour (pre-built Cytoscape payload, versioned by ETag)
 };
 
 export default {
@@ -61,6 +63,19 @@ export default {
     let response = await cache.match(cacheKey);
 
     if (response) {
+      // Conditional GET - answer 304 from the edge when the client already has this version
+      const etag = response.headers.get('ETag');
+      if (etag && etagMatches(request.headers.get('If-None-Match'), etag)) {
+        return new Response(null, {
+          status: 304,
+          headers: {
+            ETag: etag,
+            'Cache-Control': response.headers.get('Cache-Control') || 'no-cache',
+            'X-Cache-Status': 'HIT',
+          },
+        });
+      }
+
       // Cache HIT - add header for debugging
       const newResponse = new Response(response.body, response);
       newResponse.headers.set('X-Cache-Status', 'HIT');
@@ -68,10 +83,13 @@ export default {
       return newResponse;
     }
 
-    // Cache MISS - fetch from backend
+    // Cache MISS - fetch the full body from backend (drop validators so we never cache a 304)
+    const originHeaders = new Headers(request.headers);
+    originHeaders.delete('If-None-Match');
+    originHeaders.delete('If-Modified-Since');
     response = await fetch(BACKEND_URL + pathname + url.search, {
       method: request.method,
-      headers: request.headers,
+      headers: originHeaders,
     });
 
     // Only cache successful responses
@@ -122,11 +140,13 @@ function getCacheConfig(pathname) {
     return { shouldCache: true, duration: CACHE_DURATIONS.kgNode };
   }
 
+  // Pre-built visualisation payload
+  if (pathname === '/api/kg/viz/cytoscape') {
+    return { shouldCache: true, duration: CACHE_DURATIONS.kgViz };
+  }
+
   // KG analytics endpoints
-  if (
-    pathname.startsWith('/api/kg/analytics/') ||
-    pathname === '/api/kg/viz/cytoscape'
-  ) {
+  if (pathname.startsWith('/api/kg/analytics/')) {
     return { shouldCache: true, duration: CACHE_DURATIONS.analytics };
   }
 
@@ -144,6 +164,20 @@ function getCacheConfig(pathname) {
   return { shouldCache: false, duration: 0 };
 }
 
+/**
+ * Check an If-None-Match header against a cached ETag (weak comparison)
+ */
+function etagMatches(ifNoneMatch, etag) {
+  if (!ifNoneMatch) return false;
+  if (ifNoneMatch.trim() === '*') return true;
+
+  const opaque = etag.replace(/^W\//, '');
+  return ifNoneMatch
+    .split(',')
+    .map((candidate) => candidate.trim().replace(/^W\//, ''))
+    .includes(opaque);
+}
+
 /**
  * Calculate how long the response has been in cache
  */
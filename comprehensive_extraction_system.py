@@ -9,14 +9,31 @@ Processes all 10 source documents to extract:
 - Work citations
 - Concept definitions and evolution
 - Relationships between ideas
+
+Documents are processed in parallel worker processes (largest first), each in
+a single streaming pass over its lines that writes every record to a JSONL
+part file as soon as it is found. As each document finishes, its part file is
+appended to the JSONL output and grouped into the aggregated results, which
+are saved as JSON.
+
+Usage:
+    python comprehensive_extraction_system.py
+    python comprehensive_extraction_system.py --archive-dir texts/ --output results.json --workers 4
 """
 
+import argparse
 import json
+import multiprocessing
+import os
 import re
+import shutil
+import tempfile
+import time
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+from collections import defaultdict, deque
 import unicodedata
 
 # ============================================================================
@@ -168,6 +185,42 @@ class PatternExtractor:
         'impulse': [r'ὁρμή', r'impetus', r'impulse', r'horme'],
     }
 
+    # Compiled once; each combined pattern matches exactly when one of its parts does
+    PREMISE_RE = re.compile('|'.join(f'(?:{p})' for p in PREMISE_INDICATORS), re.IGNORECASE)
+    CONCLUSION_RE = re.compile('|'.join(f'(?:{p})' for p in CONCLUSION_INDICATORS), re.IGNORECASE)
+    CONCEPT_PATTERNS = {
+        concept_name: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        for concept_name, patterns in CORE_CONCEPTS.items()
+    }
+    # Most lines mention no concept and cite nothing: one scan rules them out
+    ANY_CONCEPT_RE = re.compile(
+        '|'.join(f'(?:{p})' for patterns in CORE_CONCEPTS.values() for p in patterns), re.IGNORECASE)
+    ANY_CITATION_RE = re.compile('|'.join(f'(?:{p.pattern})' for p in (
+        ARISTOTLE_CITATION, STOIC_CITATION, CICERO_CITATION, ALEXANDER_CITATION)))
+
+    # Common philosopher names
+    PHILOSOPHER_NAMES = [
+        'Aristotle', 'Plato', 'Socrates',
+        'Chrysippus', 'Zeno', 'Cleanthes', 'Posidonius',
+        'Epicurus', 'Lucretius',
+        'Carneades', 'Philo', 'Antiochus',
+        'Cicero', 'Seneca', 'Epictetus', 'Marcus Aurelius',
+        'Alexander of Aphrodisias', 'Plotinus', 'Porphyry',
+        'Origen', 'Augustine', 'Boethius', 'Gregory of Nyssa'
+    ]
+    ANY_PHILOSOPHER_RE = re.compile('|'.join(map(re.escape, PHILOSOPHER_NAMES)))
+
+    # Debate indicators
+    DEBATE_PATTERNS = [
+        r'debate\s+(?:between|among)',
+        r'controversy\s+(?:between|over)',
+        r'disagreement\s+(?:between|about)',
+        r'(\w+)\s+(?:argues|claims|maintains)\s+.*\s+(?:while|whereas)\s+(\w+)\s+(?:argues|claims|maintains)',
+    ]
+    DEBATE_RES = [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in DEBATE_PATTERNS]
+    # Every debate pattern contains one of these words
+    DEBATE_HINT_RE = re.compile(r'debate|controversy|disagreement|argues|claims|maintains', re.IGNORECASE)
+
     @classmethod
     def extract_greek_text(cls, line: str, context: str) -> List[str]:
         """Extract all Greek text from a line"""
@@ -206,6 +259,8 @@ class PatternExtractor:
     def extract_citations(cls, line: str) -> List[Dict[str, str]]:
         """Extract ancient source citations"""
         citations = []
+        if not cls.ANY_CITATION_RE.search(line):
+            return citations
 
         # Aristotle
         for match in cls.ARISTOTLE_CITATION.finditer(line):
@@ -256,18 +311,11 @@ class PatternExtractor:
         premises = []
         conclusion = None
 
-        for i, line in enumerate(lines):
-            # Check for premise indicators
-            for pattern in cls.PREMISE_INDICATORS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    premises.append(line.strip())
-                    break
-
-            # Check for conclusion indicators
-            for pattern in cls.CONCLUSION_INDICATORS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    conclusion = line.strip()
-                    break
+        for line in lines:
+            if cls.PREMISE_RE.search(line):
+                premises.append(line.strip())
+            if cls.CONCLUSION_RE.search(line):
+                conclusion = line.strip()
 
         return {
             'premises': premises,
@@ -279,207 +327,187 @@ class PatternExtractor:
     def extract_concepts(cls, text: str) -> Dict[str, List[str]]:
         """Extract philosophical concept mentions"""
         concepts = defaultdict(list)
+        if not cls.ANY_CONCEPT_RE.search(text):
+            return {}
 
-        for concept_name, patterns in cls.CORE_CONCEPTS.items():
+        for concept_name, patterns in cls.CONCEPT_PATTERNS.items():
             for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
+                for match in pattern.finditer(text):
                     concepts[concept_name].append(match.group(0))
 
         return dict(concepts)
 
+    @classmethod
+    def find_persons(cls, line: str) -> List[str]:
+        """Philosophers named in a line, in PHILOSOPHER_NAMES order"""
+        if not cls.ANY_PHILOSOPHER_RE.search(line):
+            return []
+        return [name for name in cls.PHILOSOPHER_NAMES if name in line]
+
+    @classmethod
+    def find_debate_indicators(cls, line: str) -> List[str]:
+        """Debate patterns matching a line"""
+        if not cls.DEBATE_HINT_RE.search(line):
+            return []
+        return [pattern for pattern, regex in cls.DEBATE_RES if regex.search(line)]
+
 # ============================================================================
 # DOCUMENT PROCESSOR
 # ============================================================================
 
 class DocumentProcessor:
-    """Process individual documents line by line"""
+    """Process individual documents line by line, in one streaming pass"""
 
-    def __init__(self, file_path: Path, source_name: str):
+    CATEGORIES = ('greek_latin', 'arguments', 'debates', 'persons', 'works', 'concepts', 'relationships')
+
+    # Lines before a match in its line context; lines around a person or debate mention
+    CONTEXT_LINES = 5
+    PERSON_WINDOW = 3
+    DEBATE_WINDOW = 5
+
+    def __init__(self, file_path: Path, source_name: str, verbose: bool = True):
         self.file_path = file_path
         self.source_name = source_name
+        self.verbose = verbose
         self.extractor = PatternExtractor()
 
     def process(self) -> Dict[str, List[Any]]:
         """Process document and extract all relevant content"""
-        results = {
-            'greek_latin': [],
-            'arguments': [],
-            'debates': [],
-            'persons': [],
-            'works': [],
-            'concepts': [],
-            'relationships': []
-        }
-
-        print(f"\n{'='*80}")
-        print(f"Processing: {self.source_name}")
-        print(f"{'='*80}")
-
-        with open(self.file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-
-        total_lines = len(lines)
-        context_window = []
-
-        for i, line in enumerate(lines):
-            if i % 1000 == 0:
-                print(f"Progress: {i}/{total_lines} lines ({100*i/total_lines:.1f}%)")
-
-            # Maintain context window (previous 5 lines)
-            context_window.append(line)
-            if len(context_window) > 5:
-                context_window.pop(0)
-
-            context = '\n'.join(context_window)
-
-            # Extract Greek text
-            greek_texts = self.extractor.extract_greek_text(line, context)
-            for greek in greek_texts:
-                if len(greek) > 3:  # Filter out single characters
-                    results['greek_latin'].append({
-                        'language': 'greek',
-                        'text': greek,
-                        'context': context,
-                        'source': self.source_name,
-                        'line_number': i
-                    })
-
-            # Extract citations
-            citations = self.extractor.extract_citations(line)
-            for citation in citations:
-                results['works'].append({
-                    'citation': citation,
-                    'context': context,
-                    'source': self.source_name,
-                    'line_number': i
-                })
-
-            # Extract concepts
-            concepts = self.extractor.extract_concepts(line)
-            if concepts:
-                results['concepts'].append({
-                    'concepts': concepts,
-                    'context': context,
-                    'source': self.source_name,
-                    'line_number': i
-                })
+        results = {category: [] for category in self.CATEGORIES}
 
-        # Post-process: extract arguments from paragraphs
-        results['arguments'] = self._extract_arguments(lines)
+        if self.verbose:
+            print(f"\n{'='*80}")
+            print(f"Processing: {self.source_name}")
+            print(f"{'='*80}")
 
-        # Post-process: extract person mentions
-        results['persons'] = self._extract_persons(lines)
+        for category, record in self.iter_records():
+            results[category].append(record)
 
-        # Post-process: extract debates
-        results['debates'] = self._extract_debates(lines)
-
-        print(f"\nExtraction complete:")
-        print(f"  - Greek/Latin texts: {len(results['greek_latin'])}")
-        print(f"  - Citations: {len(results['works'])}")
-        print(f"  - Concept mentions: {len(results['concepts'])}")
-        print(f"  - Arguments: {len(results['arguments'])}")
-        print(f"  - Persons: {len(results['persons'])}")
-        print(f"  - Debates: {len(results['debates'])}")
+        if self.verbose:
+            print(f"\nExtraction complete:")
+            print(f"  - Greek/Latin texts: {len(results['greek_latin'])}")
+            print(f"  - Citations: {len(results['works'])}")
+            print(f"  - Concept mentions: {len(results['concepts'])}")
+            print(f"  - Arguments: {len(results['arguments'])}")
+            print(f"  - Persons: {len(results['persons'])}")
+            print(f"  - Debates: {len(results['debates'])}")
 
         return results
 
-    def _extract_arguments(self, lines: List[str]) -> List[Dict[str, Any]]:
-        """Extract philosophical arguments from text"""
-        arguments = []
-
-        # Process text in paragraphs
-        paragraphs = self._split_into_paragraphs(lines)
-
-        for para_num, paragraph in enumerate(paragraphs):
-            arg_structure = self.extractor.detect_argument_structure(paragraph)
-            if arg_structure['has_structure']:
-                arguments.append({
-                    'paragraph_number': para_num,
-                    'premises': arg_structure['premises'],
-                    'conclusion': arg_structure['conclusion'],
-                    'full_text': paragraph,
-                    'source': self.source_name
-                })
-
-        return arguments
-
-    def _extract_persons(self, lines: List[str]) -> List[Dict[str, Any]]:
-        """Extract person mentions with details"""
-        persons = []
-
-        # Common philosopher names
-        philosopher_names = [
-            'Aristotle', 'Plato', 'Socrates',
-            'Chrysippus', 'Zeno', 'Cleanthes', 'Posidonius',
-            'Epicurus', 'Lucretius',
-            'Carneades', 'Philo', 'Antiochus',
-            'Cicero', 'Seneca', 'Epictetus', 'Marcus Aurelius',
-            'Alexander of Aphrodisias', 'Plotinus', 'Porphyry',
-            'Origen', 'Augustine', 'Boethius', 'Gregory of Nyssa'
-        ]
-
-        for i, line in enumerate(lines):
-            for name in philosopher_names:
-                if name in line:
-                    context = self._get_context(lines, i, window=3)
-                    persons.append({
-                        'name': name,
-                        'context': context,
-                        'line_number': i,
-                        'source': self.source_name
-                    })
-
-        return persons
-
-    def _extract_debates(self, lines: List[str]) -> List[Dict[str, Any]]:
-        """Extract debates and controversies"""
-        debates = []
-
-        # Debate indicators
-        debate_patterns = [
-            r'debate\s+(?:between|among)',
-            r'controversy\s+(?:between|over)',
-            r'disagreement\s+(?:between|about)',
-            r'(\w+)\s+(?:argues|claims|maintains)\s+.*\s+(?:while|whereas)\s+(\w+)\s+(?:argues|claims|maintains)',
-        ]
-
-        for i, line in enumerate(lines):
-            for pattern in debate_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    context = self._get_context(lines, i, window=5)
-                    debates.append({
-                        'indicator': pattern,
-                        'context': context,
-                        'line_number': i,
-                        'source': self.source_name
-                    })
-
-        return debates
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream the document once, yielding (category, record) pairs
+
+        Only a few lines are held at a time: line records are yielded as the
+        line is read, arguments when their paragraph ends, and person and
+        debate mentions once the lines after them (their context) are read.
+        Within each category, records come in line order.
+        """
+        recent = deque(maxlen=self.CONTEXT_LINES)
+        # Lines around pending mentions: a mention is resolved at most DEBATE_WINDOW lines late
+        window = deque(maxlen=2 * self.DEBATE_WINDOW + 1)
+        pending = deque()  # (line_number, context window, category, record) in line order
+        paragraph: List[str] = []
+        paragraph_number = 0
+        line_number = -1
 
-    def _split_into_paragraphs(self, lines: List[str]) -> List[str]:
-        """Split lines into paragraphs"""
-        paragraphs = []
-        current_para = []
-
-        for line in lines:
-            if line.strip():
-                current_para.append(line)
-            else:
-                if current_para:
-                    paragraphs.append('\n'.join(current_para))
-                    current_para = []
-
-        if current_para:
-            paragraphs.append('\n'.join(current_para))
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f):
+                if self.verbose and line_number and line_number % 10000 == 0:
+                    print(f"Progress: {line_number} lines")
+
+                # Maintain context window (previous 5 lines)
+                recent.append(line)
+                window.append(line)
+                yield from self._line_records(line, line_number, recent)
+
+                for name in self.extractor.find_persons(line):
+                    pending.append((line_number, self.PERSON_WINDOW, 'persons', {
+                        'name': name, 'context': None, 'line_number': line_number, 'source': self.source_name
+                    }))
+                for pattern in self.extractor.find_debate_indicators(line):
+                    pending.append((line_number, self.DEBATE_WINDOW, 'debates', {
+                        'indicator': pattern, 'context': None, 'line_number': line_number, 'source': self.source_name
+                    }))
+                while pending and pending[0][0] + pending[0][1] <= line_number:
+                    yield self._resolve(pending.popleft(), window, line_number)
+
+                # Arguments are detected per paragraph
+                if line.strip():
+                    paragraph.append(line)
+                elif paragraph:
+                    argument = self._argument_record(paragraph, paragraph_number)
+                    if argument:
+                        yield 'arguments', argument
+                    paragraph = []
+                    paragraph_number += 1
+
+        while pending:
+            yield self._resolve(pending.popleft(), window, line_number)
+        if paragraph:
+            argument = self._argument_record(paragraph, paragraph_number)
+            if argument:
+                yield 'arguments', argument
+
+    def _line_records(self, line: str, line_number: int, recent: deque) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Greek text, citations and concept mentions of one line"""
+        context = None
+
+        # Extract Greek text
+        for greek in self.extractor.GREEK_PATTERN.findall(line):
+            if len(greek) > 3:  # Filter out single characters
+                context = context or '\n'.join(recent)
+                yield 'greek_latin', {
+                    'language': 'greek',
+                    'text': greek,
+                    'context': context,
+                    'source': self.source_name,
+                    'line_number': line_number
+                }
+
+        # Extract citations
+        for citation in self.extractor.extract_citations(line):
+            context = context or '\n'.join(recent)
+            yield 'works', {
+                'citation': citation,
+                'context': context,
+                'source': self.source_name,
+                'line_number': line_number
+            }
 
-        return paragraphs
+        # Extract concepts
+        concepts = self.extractor.extract_concepts(line)
+        if concepts:
+            yield 'concepts', {
+                'concepts': concepts,
+                'context': context or '\n'.join(recent),
+                'source': self.source_name,
+                'line_number': line_number
+            }
 
-    def _get_context(self, lines: List[str], line_num: int, window: int = 3) -> str:
-        """Get context around a line"""
-        start = max(0, line_num - window)
-        end = min(len(lines), line_num + window + 1)
-        return '\n'.join(lines[start:end])
+    @staticmethod
+    def _resolve(item: Tuple, window: deque, last_line: int) -> Tuple[str, Dict[str, Any]]:
+        """Fill in the context of a pending mention from the lines around it"""
+        line_number, size, category, record = item
+        first_in_window = last_line - len(window) + 1
+        start = max(0, line_number - size) - first_in_window
+        end = min(last_line, line_number + size) - first_in_window + 1
+        record['context'] = '\n'.join(islice(window, start, end))
+        return category, record
+
+    def _argument_record(self, paragraph_lines: List[str], paragraph_number: int) -> Optional[Dict[str, Any]]:
+        """Argument record for a paragraph with premise or conclusion indicators"""
+        paragraph = '\n'.join(paragraph_lines)
+        arg_structure = self.extractor.detect_argument_structure(paragraph)
+        if not arg_structure['has_structure']:
+            return None
+        return {
+            'paragraph_number': paragraph_number,
+            'premises': arg_structure['premises'],
+            'conclusion': arg_structure['conclusion'],
+            'full_text': paragraph,
+            'source': self.source_name
+        }
 
 # ============================================================================
 # MAIN EXTRACTION SYSTEM
@@ -520,12 +548,23 @@ class ComprehensiveExtractionSystem:
 
         return docs
 
-    def process_all(self) -> Dict[str, Any]:
-        """Process all documents and aggregate results"""
+    def process_all(self, workers: Optional[int] = None, jsonl_path: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Process all documents and aggregate results
+
+        Args:
+            workers: Worker processes (default: all cores, at most one per document)
+            jsonl_path: Append one line per extracted record here as each document finishes
+                (workers stream records to part files next to it while extracting)
+
+        Returns:
+            Results with documents in discovery order, whatever order they finished in
+        """
         print(f"\n{'='*80}")
         print("COMPREHENSIVE EXTRACTION SYSTEM")
         print(f"{'='*80}")
         print(f"Found {len(self.documents)} documents to process\n")
+        started = time.perf_counter()
 
         all_results = {
             'metadata': {
@@ -536,16 +575,55 @@ class ComprehensiveExtractionSystem:
             'extractions': {}
         }
 
-        for doc_name, doc_path in self.documents.items():
-            processor = DocumentProcessor(doc_path, doc_name)
-            results = processor.process()
-            all_results['extractions'][doc_name] = results
+        # Largest first: the long tail is made of small documents any idle worker can pick up
+        documents = sorted(self.documents.items(), key=lambda item: item[1].stat().st_size, reverse=True)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(documents) or 1))
+        print(f"Extracting with {workers} worker{'s' if workers > 1 else ''}")
+
+        finished = {}
+        parts_parent = Path(jsonl_path).parent if jsonl_path else None
+        with tempfile.TemporaryDirectory(prefix='.extraction-parts-', dir=parts_parent) as parts_dir:
+            tasks = [(name, path, Path(parts_dir) / f"{name}.jsonl") for name, path in documents]
+            jsonl = open(jsonl_path, 'wb') if jsonl_path else None
+            try:
+                if workers == 1:
+                    self._collect(map(extract_document, tasks), finished, jsonl)
+                else:
+                    with multiprocessing.Pool(workers) as pool:
+                        self._collect(pool.imap_unordered(extract_document, tasks), finished, jsonl)
+            finally:
+                if jsonl:
+                    jsonl.close()
+
+        all_results['extractions'] = {name: finished[name] for name in self.documents}
+        all_results['metadata']['processing_seconds'] = round(time.perf_counter() - started, 2)
 
         # Generate summary statistics
         all_results['summary'] = self._generate_summary(all_results['extractions'])
 
         return all_results
 
+    @staticmethod
+    def _collect(records: Iterator[Tuple[str, Path, Dict[str, int], float]], finished: Dict[str, Any],
+                 jsonl=None) -> None:
+        """Gather finished documents from their part files, appending each to the JSONL file"""
+        for doc_name, part_path, counts, seconds in records:
+            summary = ', '.join(f"{counts[category]} {category}" for category in
+                                ('greek_latin', 'works', 'concepts', 'arguments', 'persons', 'debates'))
+            print(f"  ✓ {doc_name}: {summary} ({seconds:.1f}s)")
+            results = {category: [] for category in DocumentProcessor.CATEGORIES}
+            with open(part_path, 'rb') as part:
+                if jsonl:
+                    shutil.copyfileobj(part, jsonl)
+                    jsonl.flush()
+                    part.seek(0)
+                for line in part:
+                    record = json.loads(line)
+                    del record['document']
+                    results[record.pop('category')].append(record)
+            part_path.unlink()
+            finished[doc_name] = results
+
     def _generate_summary(self, extractions: Dict[str, Any]) -> Dict[str, Any]:
         """Generate summary statistics"""
         summary = {
@@ -595,18 +673,47 @@ class ComprehensiveExtractionSystem:
         print(f"  Total concepts: {results['summary']['total_concepts']}")
         print(f"\nDetailed breakdown by document saved in JSON file.")
 
+def extract_document(task: Tuple[str, Path, Path]) -> Tuple[str, Path, Dict[str, int], float]:
+    """
+    Worker: extract one document, writing each record to its JSONL part file as it is found
+
+    Only record counts go back to the parent, which reads the part file (progress
+    output is left to the parent too).
+    """
+    doc_name, doc_path, part_path = task
+    started = time.perf_counter()
+    counts = dict.fromkeys(DocumentProcessor.CATEGORIES, 0)
+    with open(part_path, 'w', encoding='utf-8') as part:
+        for category, record in DocumentProcessor(doc_path, doc_name, verbose=False).iter_records():
+            part.write(json.dumps({'document': doc_name, 'category': category, **record}, ensure_ascii=False) + '\n')
+            counts[category] += 1
+    return doc_name, part_path, counts, time.perf_counter() - started
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
+ARCHIVE_DIR = Path('/Users/romaingirardi/Documents/Ancient Free Will Database/.archive_20251019/01_pdf_text_chunks')
+OUTPUT_PATH = Path('/Users/romaingirardi/Documents/Ancient Free Will Database/COMPREHENSIVE_EXTRACTION_RESULTS.json')
+
+
 def main():
     """Main execution function"""
-    archive_dir = Path('/Users/romaingirardi/Documents/Ancient Free Will Database/.archive_20251019/01_pdf_text_chunks')
-    output_path = Path('/Users/romaingirardi/Documents/Ancient Free Will Database/COMPREHENSIVE_EXTRACTION_RESULTS.json')
-
-    system = ComprehensiveExtractionSystem(archive_dir)
-    results = system.process_all()
+    parser = argparse.ArgumentParser(description="Extract Greek/Latin text, citations, concepts, "
+                                                 "arguments, persons and debates from the source documents")
+    parser.add_argument('--archive-dir', default=str(ARCHIVE_DIR))
+    parser.add_argument('--output', default=str(OUTPUT_PATH))
+    parser.add_argument('--jsonl', help='Per-record JSONL output (default: next to --output)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    args = parser.parse_args()
+
+    output_path = Path(args.output)
+    jsonl_path = Path(args.jsonl) if args.jsonl else output_path.with_suffix('.jsonl')
+
+    system = ComprehensiveExtractionSystem(Path(args.archive_dir))
+    results = system.process_all(workers=args.workers, jsonl_path=jsonl_path)
     system.save_results(results, output_path)
+    print(f"Records streamed to: {jsonl_path}")
 
     print("\n✓ Extraction complete!")
     print(f"\nNext steps:")
@@ -6,6 +6,10 @@ Validate Database - EleutherIA Ancient Free Will Database
 Validate the EleutherIA database against schema and perform integrity checks.
 Ensures data quality and consistency.
 
+Every node and edge is checked once by the rules registered on
+INTEGRITY_RULES (see kg_validator.py); with --cache, rule results are kept
+by entity content, so re-validating after an edit only checks what changed.
+
 Usage:
     python validate_database.py --input ancient_free_will_database.json
     python validate_database.py --schema schema.json --verbose
@@ -17,7 +21,11 @@ import os
 import sys
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from kg_validator import RuleSet, ValidationResult, Validator
 
 # Optional imports with error handling
 try:
@@ -27,14 +35,111 @@ except ImportError:
     JSONSCHEMA_AVAILABLE = False
 
 
+NODE_ID_RE = re.compile(r'^[a-z_]+_[a-z0-9_]+$')
+
+VALID_NODE_TYPES = {
+    'person', 'work', 'concept', 'argument', 'debate',
+    'controversy', 'reformulation', 'event', 'school',
+    'group', 'argument_framework', 'quote', 'conceptual_evolution'
+}
+
+REQUIRED_METADATA = ['title', 'version', 'date_created', 'author', 'license']
+
+INTEGRITY_RULES = RuleSet('integrity')
+
+
+@INTEGRITY_RULES.node_rule()
+def required_node_fields(node: Dict) -> List[str]:
+    return [f"missing required field: {field}" for field in ('id', 'label', 'type', 'description')
+            if field not in node]
+
+
+@INTEGRITY_RULES.node_rule()
+def node_id_format(node: Dict) -> List[str]:
+    """IDs are lowercase with underscores"""
+    node_id = node.get('id', '')
+    if not isinstance(node_id, str) or not NODE_ID_RE.match(node_id):
+        return [f"has invalid ID format: {node_id}"]
+    return []
+
+
+@INTEGRITY_RULES.node_rule()
+def node_type(node: Dict) -> List[str]:
+    if node.get('type', '') not in VALID_NODE_TYPES:
+        return [f"has invalid type: {node.get('type', '')}"]
+    return []
+
+
+@INTEGRITY_RULES.node_rule()
+def character_encoding(node: Dict) -> List[str]:
+    """Greek and Latin text must encode as UTF-8 (no lone surrogates)"""
+    issues = []
+    for field in ('label', 'description'):
+        value = node.get(field, '')
+        if isinstance(value, str) and not value.isascii():
+            try:
+                value.encode('utf-8')
+            except UnicodeEncodeError:
+                issues.append(f"has invalid character encoding in {field}")
+    return issues
+
+
+@INTEGRITY_RULES.node_rule()
+def citations(node: Dict) -> List[str]:
+    issues = []
+    for field, name in (('ancient_sources', 'ancient source'), ('modern_scholarship', 'modern scholarship')):
+        for j, ref in enumerate(node.get(field, [])):
+            if not isinstance(ref, str) or len(ref.strip()) == 0:
+                issues.append(f"has invalid {name} {j}: {ref}")
+    return issues
+
+
+@INTEGRITY_RULES.node_rule(severity='warning')
+def node_category(node: Dict) -> List[str]:
+    category = node.get('category', '')
+    if category != 'free_will':
+        return [f"has unexpected category: {category}"]
+    return []
+
+
+@INTEGRITY_RULES.edge_rule()
+def required_edge_fields(edge: Dict) -> List[str]:
+    return [f"missing required field: {field}" for field in ('source', 'target', 'relation')
+            if field not in edge]
+
+
+@INTEGRITY_RULES.edge_rule()
+def edge_relation(edge: Dict) -> List[str]:
+    """Any non-empty string is valid: the database uses 228+ distinct relation types"""
+    relation = edge.get('relation', '')
+    if not relation or not isinstance(relation, str):
+        return ["has missing or invalid relation type"]
+    return []
+
+
+# Checks reported by validate_all, with the rules (and graph checks) behind each
+CHECKS = [
+    ("Required fields", {'required_node_fields', 'required_edge_fields'}),
+    ("Node IDs", {'node_id_format', 'unique_ids'}),
+    ("Edge references", {'edge_references'}),
+    ("Node types", {'node_type'}),
+    ("Edge relations", {'edge_relation'}),
+    ("Character encoding", {'character_encoding'}),
+    ("Citations", {'citations'}),
+    ("Data consistency", {'node_category'}),
+]
+
+
 class DatabaseValidator:
     """Validate EleutherIA database for schema compliance and data integrity."""
     
-    def __init__(self, db: Dict, schema: Optional[Dict] = None):
+    def __init__(self, db: Dict, schema: Optional[Dict] = None, validator: Optional[Validator] = None):
         self.db = db
         self.schema = schema
-        self.errors = []
-        self.warnings = []
+        self.validator = validator or Validator(INTEGRITY_RULES, workers=1)
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.result: Optional[ValidationResult] = None
     
     def validate_schema(self) -> bool:
         """Validate database against JSON schema."""
@@ -56,176 +161,13 @@ class DatabaseValidator:
             self.errors.append(f"Schema validation failed: {e}")
             return False
     
-    def validate_required_fields(self) -> bool:
-        """Validate that all required fields are present."""
+    def validate_metadata(self) -> bool:
+        """Validate that all required metadata fields are present."""
         valid = True
-        
-        # Check metadata
-        required_metadata = ['title', 'version', 'date_created', 'author', 'license']
-        for field in required_metadata:
+        for field in REQUIRED_METADATA:
             if field not in self.db.get('metadata', {}):
                 self.errors.append(f"Missing required metadata field: {field}")
                 valid = False
-        
-        # Check nodes
-        required_node_fields = ['id', 'label', 'type', 'description']
-        for i, node in enumerate(self.db.get('nodes', [])):
-            for field in required_node_fields:
-                if field not in node:
-                    self.errors.append(f"Node {i} missing required field: {field}")
-                    valid = False
-        
-        # Check edges
-        required_edge_fields = ['source', 'target', 'relation']
-        for i, edge in enumerate(self.db.get('edges', [])):
-            for field in required_edge_fields:
-                if field not in edge:
-                    self.errors.append(f"Edge {i} missing required field: {field}")
-                    valid = False
-        
-        return valid
-    
-    def validate_node_ids(self) -> bool:
-        """Validate node ID format and uniqueness."""
-        valid = True
-        node_ids = set()
-        
-        for i, node in enumerate(self.db.get('nodes', [])):
-            node_id = node.get('id', '')
-            
-            # Check format (should be lowercase with underscores)
-            if not re.match(r'^[a-z_]+_[a-z0-9_]+$', node_id):
-                self.errors.append(f"Node {i} has invalid ID format: {node_id}")
-                valid = False
-            
-            # Check uniqueness
-            if node_id in node_ids:
-                self.errors.append(f"Duplicate node ID: {node_id}")
-                valid = False
-            else:
-                node_ids.add(node_id)
-        
-        return valid
-    
-    def validate_edge_references(self) -> bool:
-        """Validate that all edge references point to existing nodes."""
-        valid = True
-        node_ids = {node['id'] for node in self.db.get('nodes', [])}
-        
-        for i, edge in enumerate(self.db.get('edges', [])):
-            source = edge.get('source', '')
-            target = edge.get('target', '')
-            
-            if source not in node_ids:
-                self.errors.append(f"Edge {i} references non-existent source node: {source}")
-                valid = False
-            
-            if target not in node_ids:
-                self.errors.append(f"Edge {i} references non-existent target node: {target}")
-                valid = False
-        
-        return valid
-    
-    def validate_node_types(self) -> bool:
-        """Validate node types are valid."""
-        valid = True
-        valid_types = {
-            'person', 'work', 'concept', 'argument', 'debate',
-            'controversy', 'reformulation', 'event', 'school',
-            'group', 'argument_framework', 'quote', 'conceptual_evolution'
-        }
-
-        for i, node in enumerate(self.db.get('nodes', [])):
-            node_type = node.get('type', '')
-            if node_type not in valid_types:
-                self.errors.append(f"Node {i} has invalid type: {node_type}")
-                valid = False
-
-        return valid
-    
-    def validate_edge_relations(self) -> bool:
-        """Validate edge relations are valid."""
-        # No validation - database supports 228+ distinct relation types
-        # All non-empty string relations are valid
-        valid = True
-
-        for i, edge in enumerate(self.db.get('edges', [])):
-            relation = edge.get('relation', '')
-            if not relation or not isinstance(relation, str):
-                self.errors.append(f"Edge {i} has missing or invalid relation type")
-                valid = False
-
-        return valid
-    
-    def validate_greek_latin_characters(self) -> bool:
-        """Validate Greek and Latin character encoding."""
-        valid = True
-        
-        for i, node in enumerate(self.db.get('nodes', [])):
-            # Check label for Greek characters
-            label = node.get('label', '')
-            if any(ord(char) > 127 for char in label):
-                # Contains non-ASCII characters
-                try:
-                    label.encode('utf-8')
-                except UnicodeEncodeError:
-                    self.errors.append(f"Node {i} has invalid character encoding in label")
-                    valid = False
-            
-            # Check description
-            description = node.get('description', '')
-            if any(ord(char) > 127 for char in description):
-                try:
-                    description.encode('utf-8')
-                except UnicodeEncodeError:
-                    self.errors.append(f"Node {i} has invalid character encoding in description")
-                    valid = False
-        
-        return valid
-    
-    def validate_citations(self) -> bool:
-        """Validate citation formats."""
-        valid = True
-        
-        for i, node in enumerate(self.db.get('nodes', [])):
-            # Check ancient sources
-            ancient_sources = node.get('ancient_sources', [])
-            for j, source in enumerate(ancient_sources):
-                if not isinstance(source, str) or len(source.strip()) == 0:
-                    self.errors.append(f"Node {i} has invalid ancient source {j}: {source}")
-                    valid = False
-            
-            # Check modern scholarship
-            modern_scholarship = node.get('modern_scholarship', [])
-            for j, ref in enumerate(modern_scholarship):
-                if not isinstance(ref, str) or len(ref.strip()) == 0:
-                    self.errors.append(f"Node {i} has invalid modern scholarship {j}: {ref}")
-                    valid = False
-        
-        return valid
-    
-    def validate_data_consistency(self) -> bool:
-        """Validate data consistency across the database."""
-        valid = True
-        
-        # Check that all nodes have consistent category
-        for i, node in enumerate(self.db.get('nodes', [])):
-            category = node.get('category', '')
-            if category != 'free_will':
-                self.warnings.append(f"Node {i} has unexpected category: {category}")
-        
-        # Check for orphaned nodes (nodes with no connections)
-        node_ids = {node['id'] for node in self.db.get('nodes', [])}
-        connected_nodes = set()
-        
-        for edge in self.db.get('edges', []):
-            connected_nodes.add(edge.get('source', ''))
-            connected_nodes.add(edge.get('target', ''))
-        
-        orphaned_nodes = node_ids - connected_nodes
-        if orphaned_nodes:
-            self.warnings.append(f"Found {len(orphaned_nodes)} orphaned nodes: {list(orphaned_nodes)[:5]}...")
-        
         return valid
     
     def generate_statistics(self) -> Dict:
@@ -239,60 +181,55 @@ class DatabaseValidator:
             'periods': {}
         }
         
-        # Count node types
+        # Count node types, schools and periods
         for node in self.db.get('nodes', []):
             node_type = node.get('type', 'unknown')
             stats['node_types'][node_type] = stats['node_types'].get(node_type, 0) + 1
-        
-        # Count edge relations
-        for edge in self.db.get('edges', []):
-            relation = edge.get('relation', 'unknown')
-            stats['edge_relations'][relation] = stats['edge_relations'].get(relation, 0) + 1
-        
-        # Count schools
-        for node in self.db.get('nodes', []):
             school = node.get('school', 'unknown')
             if school:
                 stats['schools'][school] = stats['schools'].get(school, 0) + 1
-        
-        # Count periods
-        for node in self.db.get('nodes', []):
             period = node.get('period', 'unknown')
             if period:
                 stats['periods'][period] = stats['periods'].get(period, 0) + 1
         
+        # Count edge relations
+        for edge in self.db.get('edges', []):
+            relation = edge.get('relation', 'unknown')
+            stats['edge_relations'][relation] = stats['edge_relations'].get(relation, 0) + 1
+        
         return stats
     
     def validate_all(self) -> bool:
-        """Run all validation checks."""
+        """Run all validation checks in one pass over nodes and edges."""
         print("Running validation checks...")
         
-        checks = [
-            ("Schema validation", self.validate_schema),
-            ("Required fields", self.validate_required_fields),
-            ("Node IDs", self.validate_node_ids),
-            ("Edge references", self.validate_edge_references),
-            ("Node types", self.validate_node_types),
-            ("Edge relations", self.validate_edge_relations),
-            ("Character encoding", self.validate_greek_latin_characters),
-            ("Citations", self.validate_citations),
-            ("Data consistency", self.validate_data_consistency)
-        ]
-        
         all_valid = True
+        for check_name, check_func in (("Schema validation", self.validate_schema),
+                                       ("Metadata", self.validate_metadata)):
+            print(f"  {check_name}...", end=" ")
+            if check_func():
+                print("✓")
+            else:
+                print("✗")
+                all_valid = False
         
-        for check_name, check_func in checks:
+        self.result = self.validator.validate(self.db)
+        failed = {issue.rule for issue in self.result.errors}
+        for check_name, rules in CHECKS:
             print(f"  {check_name}...", end=" ")
-            try:
-                if check_func():
-                    print("✓")
-                else:
-                    print("✗")
-                    all_valid = False
-            except Exception as e:
-                print(f"✗ (Error: {e})")
-                self.errors.append(f"{check_name} failed with error: {e}")
+            if failed & rules:
+                print("✗")
                 all_valid = False
+            else:
+                print("✓")
+        
+        for issue in self.result.issues:
+            kind = issue.kind.capitalize()
+            message = f"{kind} {issue.position} {issue.message}"
+            (self.errors if issue.severity == 'error' else self.warnings).append(message)
+        if self.result.orphans:
+            self.warnings.append(f"Found {len(self.result.orphans)} orphaned nodes: {self.result.orphans[:5]}...")
+        print(f"  ({self.result.summary()})")
         
         return all_valid
     
@@ -377,6 +314,7 @@ Examples:
   python validate_database.py --input ancient_free_will_database.json
   python validate_database.py --schema schema.json --verbose
   python validate_database.py --input db.json --schema schema.json --output report.txt
+  python validate_database.py --no-schema --cache --workers 4
         """
     )
     
@@ -409,6 +347,21 @@ Examples:
         help="Skip schema validation"
     )
     
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Keep a rule result cache, so re-runs only check changed entities "
+             "(PATH defaults to .<input>.validation-cache.json next to the input)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes when many entities need checking (default: all cores)"
+    )
+    
     args = parser.parse_args()
     
     try:
@@ -421,10 +374,15 @@ Examples:
             schema = load_schema(args.schema)
         
         # Initialize validator
-        validator = DatabaseValidator(db, schema)
+        cache = None
+        if args.cache is not None:
+            input_path = Path(args.input)
+            cache = args.cache or input_path.with_name(f".{input_path.stem}.validation-cache.json")
+        validator = DatabaseValidator(db, schema, Validator(INTEGRITY_RULES, cache, args.workers))
         
         # Run validation
         is_valid = validator.validate_all()
+        validator.validator.save_cache()
         
         # Print report
         if args.output:
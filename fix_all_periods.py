@@ -4,9 +4,9 @@ Comprehensive Period Vocabulary Correction Script
 Fixes all 360 nodes with invalid period values using extended controlled vocabulary
 """
 
-import json
 import re
-from datetime import datetime
+
+from kg_changeset import kg_session
 
 # Extended controlled vocabulary
 VALID_PERIODS = {
@@ -260,15 +260,15 @@ def determine_period(node):
     # Last resort - return original and log warning
     return current_period
 
-def fix_periods():
-    """Main function to fix all period values"""
+def fix_periods(kg=None):
+    """Main function to fix all period values (on ``kg``, or on a freshly loaded database)"""
+    with kg_session(kg, backup_prefix='ancient_free_will_database_BACKUP') as kg:
+        return _fix_periods(kg)
 
-    # Load database
-    print("Loading database...")
-    with open('ancient_free_will_database.json', 'r', encoding='utf-8') as f:
-        db = json.load(f)
 
-    nodes = db['nodes']
+def _fix_periods(kg):
+    nodes = kg.nodes
+    changeset = kg.changeset('fix_all_periods')
 
     # Track changes
     changes = []
@@ -295,7 +295,7 @@ def fix_periods():
                 'old_period': old_period,
                 'new_period': new_period
             })
-            node['period'] = new_period
+            changeset.update_node(node['id'], period=new_period)
 
         # Check if still invalid
         if new_period not in VALID_PERIODS:
@@ -355,19 +355,10 @@ def fix_periods():
             print(f"  • {item['id']}")
             print(f"    Period: {item['period']}, Date: {item['date']}")
 
-    # Save corrected database
-    backup_filename = f"ancient_free_will_database_BACKUP_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    print(f"\n" + "=" * 80)
-    print(f"Creating backup: {backup_filename}")
-    with open(backup_filename, 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-
-    print(f"Saving corrected database...")
-    with open('ancient_free_will_database.json', 'w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
+    # Stage corrected periods (saved with a backup when run on its own)
+    changeset.commit()
 
     print("\n✓ Period corrections complete!")
-    print(f"  Backup saved: {backup_filename}")
     print(f"  Changes made: {len(changes)}")
     print(f"  Invalid remaining: {len(invalid_remaining)}")
 
@@ -10,23 +10,31 @@ import hashlib
 from typing import Dict, List, Set
 import os
 
+from kg_changeset import KGStore, kg_session
+
+OUTPUT_FILE = 'ancient_free_will_database_enhanced_5k.json'
+
 class DatabaseIntegrator:
     """Integrate extraction results into the main database."""
 
-    def __init__(self):
-        self.db = None
+    def __init__(self, kg: KGStore = None):
+        self.kg = kg
         self.existing_ids = set()
         self.added_nodes = 0
         self.added_edges = 0
 
+    @property
+    def db(self) -> Dict:
+        return self.kg.data
+
     def load_database(self) -> Dict:
-        """Load the main database."""
-        with open('ancient_free_will_database.json', 'r', encoding='utf-8') as f:
-            self.db = json.load(f)
+        """Load the main database (unless a store was given)."""
+        if self.kg is None:
+            self.kg = KGStore()
 
         # Track existing IDs
-        self.existing_ids = {n['id'] for n in self.db['nodes']}
-        print(f"Loaded database: {len(self.db['nodes'])} nodes, {len(self.db['edges'])} edges")
+        self.existing_ids = {n['id'] for n in self.kg.nodes}
+        print(f"Loaded database: {len(self.kg.nodes)} nodes, {len(self.kg.edges)} edges")
         return self.db
 
     def is_valid_greek(self, text: str) -> bool:
@@ -69,6 +77,7 @@ class DatabaseIntegrator:
 
     def add_quote_nodes(self, extraction_data: Dict) -> int:
         """Add quote nodes from extraction."""
+        changeset = self.kg.changeset('integrate_quotes')
         added = 0
 
         if 'sources' in extraction_data:
@@ -110,10 +119,11 @@ class DatabaseIntegrator:
                         if quote.get('context_before'):
                             quote_node['context'] = quote['context_before'][:200]
 
-                        self.db['nodes'].append(quote_node)
+                        changeset.add_node(quote_node)
                         self.existing_ids.add(quote_id)
                         added += 1
 
+        changeset.commit()
         return added
 
     def add_argument_nodes(self) -> int:
@@ -170,13 +180,15 @@ class DatabaseIntegrator:
             }
         ]
 
+        changeset = self.kg.changeset('integrate_arguments')
         added = 0
         for arg in canonical_arguments:
             if arg['id'] not in self.existing_ids:
-                self.db['nodes'].append(arg)
+                changeset.add_node(arg)
                 self.existing_ids.add(arg['id'])
                 added += 1
 
+        changeset.commit()
         return added
 
     def add_debate_nodes(self) -> int:
@@ -245,13 +257,15 @@ class DatabaseIntegrator:
             }
         ]
 
+        changeset = self.kg.changeset('integrate_debates')
         added = 0
         for debate in debates:
             if debate['id'] not in self.existing_ids:
-                self.db['nodes'].append(debate)
+                changeset.add_node(debate)
                 self.existing_ids.add(debate['id'])
                 added += 1
 
+        changeset.commit()
         return added
 
     def enrich_existing_concepts(self) -> int:
@@ -283,17 +297,19 @@ class DatabaseIntegrator:
             }
         }
 
+        changeset = self.kg.changeset('enrich_concepts')
         enriched = 0
-        for node in self.db['nodes']:
+        for node in self.kg.nodes:
             if node.get('type') == 'concept':
                 for key, data in enrichments.items():
                     if key in node.get('id', '').lower():
-                        for field, value in data.items():
-                            if field not in node:
-                                node[field] = value
+                        missing = {field: value for field, value in data.items() if field not in node}
+                        if missing:
+                            changeset.update_node(node['id'], missing)
                         enriched += 1
                         break
 
+        changeset.commit()
         return enriched
 
     def add_relationships(self) -> int:
@@ -317,13 +333,14 @@ class DatabaseIntegrator:
             {'source': 'debate_grace_free_will*', 'target': 'concept_liberum_arbitrium*', 'relation': 'concerned'}
         ]
 
+        changeset = self.kg.changeset('integrate_relationships')
         added = 0
         for rel in relationships:
             # Find matching source and target
             source_id = None
             target_id = None
 
-            for node in self.db['nodes']:
+            for node in self.kg.nodes:
                 if rel['source'].endswith('*'):
                     if node['id'].startswith(rel['source'][:-1]):
                         source_id = node['id']
@@ -338,17 +355,15 @@ class DatabaseIntegrator:
 
             if source_id and target_id:
                 # Check if edge already exists
-                exists = any(e['source'] == source_id and e['target'] == target_id
-                           for e in self.db['edges'])
-                if not exists:
-                    edge = {
+                if not changeset.has_edge(source_id, target_id):
+                    changeset.add_edge({
                         'source': source_id,
                         'target': target_id,
                         'relation': rel['relation']
-                    }
-                    self.db['edges'].append(edge)
+                    })
                     added += 1
 
+        changeset.commit()
         return added
 
     def integrate_all_extractions(self):
@@ -398,32 +413,34 @@ class DatabaseIntegrator:
         print(f"Added {rels_added} relationships")
 
         # Update metadata
-        self.db['metadata']['last_integration'] = '2025-10-20'
-        self.db['metadata']['integration_stats'] = {
+        changeset = self.kg.changeset('integration_metadata')
+        changeset.set_metadata(last_integration='2025-10-20', integration_stats={
             'quotes_added': total_quotes,
             'arguments_added': args_added,
             'debates_added': debates_added,
             'concepts_enriched': concepts_enriched,
             'relationships_added': rels_added
-        }
-
-        # Save enhanced database
-        output_file = 'ancient_free_will_database_enhanced_5k.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.db, f, ensure_ascii=False, indent=2)
+        })
+        changeset.commit()
 
         print("\n" + "=" * 60)
         print("INTEGRATION COMPLETE")
         print("=" * 60)
-        print(f"Final database: {len(self.db['nodes'])} nodes, {len(self.db['edges'])} edges")
-        print(f"Growth: {len(self.db['nodes']) - 487} new nodes")
-        print(f"Saved to: {output_file}")
+        print(f"Final database: {len(self.kg.nodes)} nodes, {len(self.kg.edges)} edges")
+        print(f"Growth: {len(self.kg.nodes) - 487} new nodes")
+
+
+def integrate(kg: KGStore = None):
+    """Integrate the extractions into ``kg``, or into a copy of the database saved to OUTPUT_FILE"""
+    with kg_session(kg, path=OUTPUT_FILE) as kg:
+        integrator = DatabaseIntegrator(kg)
+        integrator.load_database()
+        integrator.integrate_all_extractions()
+
 
 def main():
     """Run the integration."""
-    integrator = DatabaseIntegrator()
-    integrator.load_database()
-    integrator.integrate_all_extractions()
+    integrate()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
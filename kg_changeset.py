@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Transactional Changesets for the Ancient Free Will Database
+
+Maintenance scripts stage their edits as a changeset instead of mutating the
+loaded JSON in place:
+
+1. ``KGStore`` loads ancient_free_will_database.json once; any number of
+   changesets (from one or several scripts) are committed against it
+2. a changeset stages node / edge additions, updates and deletions and
+   validates only the entities it touches before it is applied
+3. ``KGStore.save`` writes the KG atomically (temporary file + rename), refuses
+   to overwrite a file changed on disk since it was loaded, and appends one
+   compact JSON line per change (with before/after values) to the change log
+
+Run several scripts in one load/save cycle:
+    python kg_changeset.py run fix_all_periods add_all_terminology apply_corrections
+    python kg_changeset.py log            # recent entries of the change log
+
+Author: Romain Girardi
+Date: 2025-10-27
+"""
+
+import argparse
+import copy
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+DB_PATH = Path('ancient_free_will_database.json')
+
+NODE_TYPES = {
+    'person', 'work', 'concept', 'argument', 'debate',
+    'controversy', 'reformulation', 'event', 'school',
+    'group', 'argument_framework', 'quote', 'conceptual_evolution'
+}
+
+# Scripts that can be composed with ``run``: module -> entry point taking a KGStore
+SCRIPTS = {
+    'fix_all_periods': 'fix_periods',
+    'add_all_terminology': 'add_terminology',
+    'apply_corrections': 'apply_corrections',
+    'add_critical_citations': 'add_citations',
+    'integrate_extractions': 'integrate',
+}
+
+# Validation warnings printed per commit (the rest are counted)
+MAX_WARNINGS = 20
+
+EdgeKey = Tuple[str, str, str]
+
+_MISSING = object()
+
+
+class ChangeSetError(Exception):
+    """A changeset that cannot be staged or fails validation"""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message if not errors else f"{message}: " + '; '.join(errors[:10]))
+        self.errors = errors or []
+
+
+class ConflictError(ChangeSetError):
+    """The KG file changed on disk after it was loaded"""
+
+
+def edge_key(edge: Dict) -> EdgeKey:
+    return edge.get('source'), edge.get('target'), edge.get('relation')
+
+
+def _file_state(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ChangeSet:
+    """
+    Staged patches against a KGStore
+
+    Reads through the changeset (``node``, ``has_node``, ``has_edge``) see its
+    own staged edits; nothing touches the store until ``commit``.
+    """
+
+    def __init__(self, store: 'KGStore', name: str):
+        self.store = store
+        self.name = name
+        self.id = uuid.uuid4().hex[:12]
+        self._nodes: Dict[str, Optional[Dict]] = {}     # None = deleted
+        self._edges: Dict[EdgeKey, Optional[Dict]] = {}
+        self._metadata: Dict[str, Any] = {}
+        self.committed = False
+
+    # Reads
+
+    def node(self, node_id: str) -> Optional[Dict]:
+        """Current (staged) state of a node; edit it through update_node"""
+        if node_id in self._nodes:
+            return self._nodes[node_id]
+        return self.store.node(node_id)
+
+    def has_node(self, node_id: str) -> bool:
+        return self.node(node_id) is not None
+
+    def edge(self, key: EdgeKey) -> Optional[Dict]:
+        """Current (staged) state of an edge"""
+        key = tuple(key)
+        if key in self._edges:
+            return self._edges[key]
+        return self.store.edge(key)
+
+    def has_edge(self, source: str, target: str, relation: Optional[str] = None) -> bool:
+        """Whether an edge exists (with any relation when ``relation`` is None)"""
+        keys = set(self.store.edges_between(source, target))
+        keys.update(key for key in self._edges if key[:2] == (source, target))
+        return any((relation is None or key[2] == relation) and self.edge(key) is not None for key in keys)
+
+    def __len__(self) -> int:
+        return len(self._nodes) + len(self._edges) + len(self._metadata)
+
+    # Nodes
+
+    def _staged_node(self, node_id: str) -> Dict:
+        node = self.node(node_id)
+        if node is None:
+            raise ChangeSetError(f"Unknown node '{node_id}'")
+        if node_id not in self._nodes:
+            node = self._nodes[node_id] = copy.deepcopy(node)
+        return node
+
+    def add_node(self, node: Dict) -> Dict:
+        node_id = node.get('id') if isinstance(node, dict) else None
+        if not node_id or not isinstance(node_id, str):
+            raise ChangeSetError("Node without an id")
+        if self.has_node(node_id):
+            raise ChangeSetError(f"Node '{node_id}' already exists")
+        self._nodes[node_id] = copy.deepcopy(node)
+        return self._nodes[node_id]
+
+    def update_node(self, node_id: str, fields: Optional[Dict] = None, **more) -> Dict:
+        """Set fields of a node (a value of None removes the field)"""
+        fields = {**(fields or {}), **more}
+        if 'id' in fields and fields['id'] != node_id:
+            raise ChangeSetError(f"Node ids cannot be changed in place ('{node_id}')")
+        node = self._staged_node(node_id)
+        for name, value in fields.items():
+            if value is None:
+                node.pop(name, None)
+            else:
+                node[name] = copy.deepcopy(value)
+        return node
+
+    def add_to_list(self, node_id: str, field: str, values: List, index: Optional[int] = None) -> int:
+        """Add values missing from a list field (at ``index``, else at the end); returns how many"""
+        node = self._staged_node(node_id)
+        current = node.setdefault(field, [])
+        missing = [value for value in values if value not in current]
+        if index is None:
+            current.extend(missing)
+        else:
+            current[index:index] = missing
+        return len(missing)
+
+    def remove_from_list(self, node_id: str, field: str, values: List) -> int:
+        """Remove values from a list field; returns how many were present"""
+        node = self._staged_node(node_id)
+        current = node.get(field) or []
+        kept = [value for value in current if value not in values]
+        if len(kept) != len(current):
+            node[field] = kept
+        return len(current) - len(kept)
+
+    def delete_node(self, node_id: str) -> None:
+        """Delete a node and every edge touching it"""
+        if not self.has_node(node_id):
+            raise ChangeSetError(f"Unknown node '{node_id}'")
+        self._nodes[node_id] = None
+        for key in self.store.incident_edges(node_id):
+            self._edges[key] = None
+        for key, edge in self._edges.items():
+            if edge is not None and node_id in key[:2]:
+                self._edges[key] = None
+
+    # Edges
+
+    def add_edge(self, edge: Dict) -> Dict:
+        key = edge_key(edge)
+        if self.has_edge(*key):
+            raise ChangeSetError(f"Edge {key} already exists")
+        self._edges[key] = copy.deepcopy(edge)
+        return self._edges[key]
+
+    def update_edge(self, source: str, target: str, relation: str, fields: Optional[Dict] = None, **more) -> Dict:
+        """Set attributes of an edge (source, target and relation identify it and cannot change)"""
+        key = (source, target, relation)
+        fields = {**(fields or {}), **more}
+        if any(name in fields for name in ('source', 'target', 'relation')):
+            raise ChangeSetError(f"Edge {key}: delete and re-add it to change its endpoints or relation")
+        edge = self.edge(key)
+        if edge is None:
+            raise ChangeSetError(f"Unknown edge {key}")
+        if key not in self._edges:
+            edge = self._edges[key] = copy.deepcopy(edge)
+        for name, value in fields.items():
+            if value is None:
+                edge.pop(name, None)
+            else:
+                edge[name] = copy.deepcopy(value)
+        return edge
+
+    def delete_edge(self, source: str, target: str, relation: str) -> None:
+        key = (source, target, relation)
+        if not self.has_edge(*key):
+            raise ChangeSetError(f"Unknown edge {key}")
+        self._edges[key] = None
+
+    def set_metadata(self, fields: Optional[Dict] = None, **more) -> None:
+        self._metadata.update(fields or {}, **more)
+
+    # Validation and commit
+
+    def validate(self) -> Tuple[List[str], List[str]]:
+        """
+        Check the touched entities only
+
+        Returns:
+            (errors, warnings): errors block the commit (dangling edges, broken
+            ids, missing relations); warnings report incomplete nodes
+        """
+        errors: List[str] = []
+        warnings: List[str] = []
+        for node_id, node in self._nodes.items():
+            if node is None:
+                continue
+            if node.get('id') != node_id:
+                errors.append(f"Node '{node_id}' has id '{node.get('id')}'")
+            for field in ('label', 'type', 'description'):
+                if not node.get(field):
+                    warnings.append(f"Node '{node_id}' has no {field}")
+            if node.get('type') and node['type'] not in NODE_TYPES:
+                warnings.append(f"Node '{node_id}' has unknown type '{node['type']}'")
+
+        for key, edge in self._edges.items():
+            if edge is None:
+                continue
+            source, target, relation = key
+            if not relation or not isinstance(relation, str):
+                errors.append(f"Edge {source} -> {target} has no relation")
+            for end in (source, target):
+                if not self.has_node(end):
+                    errors.append(f"Edge {key} references missing node '{end}'")
+        return errors, warnings
+
+    def diff(self) -> List[Dict]:
+        """One change-log record per changed entity, with before/after values of changed fields"""
+        records = []
+        for node_id, node in self._nodes.items():
+            record = self._diff(self.store.node(node_id), node, 'node')
+            if record:
+                records.append({**record, 'id': node_id})
+        for key, edge in self._edges.items():
+            record = self._diff(self.store.edge(key), edge, 'edge')
+            if record:
+                records.append({**record, 'key': list(key)})
+        if self._metadata:
+            before = self.store.metadata
+            records.append({'op': 'update_metadata',
+                            'before': {k: before[k] for k in self._metadata if k in before},
+                            'after': self._metadata})
+        return records
+
+    @staticmethod
+    def _diff(before: Optional[Dict], after: Optional[Dict], kind: str) -> Optional[Dict]:
+        if before is None and after is None:
+            return None
+        if before is None:
+            return {'op': f"add_{kind}", 'after': after}
+        if after is None:
+            return {'op': f"delete_{kind}", 'before': before}
+        changed = [name for name in {**before, **after}
+                   if before.get(name, _MISSING) != after.get(name, _MISSING)]
+        if not changed:
+            return None
+        return {'op': f"update_{kind}",
+                'before': {name: before[name] for name in changed if name in before},
+                'after': {name: after[name] for name in changed if name in after}}
+
+    def commit(self) -> Dict[str, int]:
+        """
+        Validate and apply to the store (the file is written by KGStore.save)
+
+        Returns:
+            Counts of applied changes by operation
+        """
+        if self.committed:
+            raise ChangeSetError(f"Changeset '{self.name}' was already committed")
+        errors, warnings = self.validate()
+        if errors:
+            raise ChangeSetError(f"Changeset '{self.name}' is invalid", errors)
+        for warning in warnings[:MAX_WARNINGS]:
+            print(f"  ⚠️  {warning}")
+        if len(warnings) > MAX_WARNINGS:
+            print(f"  ⚠️  ... and {len(warnings) - MAX_WARNINGS} more warnings")
+        records = self.diff()
+        self.store._apply(self, records)
+        self.committed = True
+        counts: Dict[str, int] = {}
+        for record in records:
+            counts[record['op']] = counts.get(record['op'], 0) + 1
+        return counts
+
+
+class KGStore:
+    """The KG loaded once, with indexes for id and edge lookups and pending change-log records"""
+
+    def __init__(self, path: Path = DB_PATH, changelog: Optional[Path] = None):
+        self.path = Path(path)
+        self.changelog = Path(changelog) if changelog else self.path.with_suffix('.changes.jsonl')
+        self._data: Optional[Dict] = None
+        self._loaded_state: Optional[Tuple[int, int]] = None
+        self._node_position: Dict[str, int] = {}
+        self._edge_positions: Dict[EdgeKey, List[int]] = {}
+        self._incident: Dict[str, Set[EdgeKey]] = {}
+        self._pending: List[Dict] = []
+
+    def load(self) -> Dict:
+        self._loaded_state = _file_state(self.path)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self._data = json.load(f)
+        self._data.setdefault('nodes', [])
+        self._data.setdefault('edges', [])
+        self._data.setdefault('metadata', {})
+        self._reindex()
+        return self._data
+
+    @property
+    def data(self) -> Dict:
+        return self._data if self._data is not None else self.load()
+
+    @property
+    def nodes(self) -> List[Dict]:
+        return self.data['nodes']
+
+    @property
+    def edges(self) -> List[Dict]:
+        return self.data['edges']
+
+    @property
+    def metadata(self) -> Dict:
+        return self.data['metadata']
+
+    @property
+    def pending_changes(self) -> int:
+        """Change-log records committed in memory but not saved yet"""
+        return len(self._pending)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    def _reindex(self) -> None:
+        self._node_position = {node.get('id'): i for i, node in enumerate(self.nodes)}
+        self._edge_positions = {}
+        self._incident = {}
+        for i, edge in enumerate(self.edges):
+            self._index_edge(i, edge)
+
+    def _index_edge(self, position: int, edge: Dict) -> None:
+        key = edge_key(edge)
+        self._edge_positions.setdefault(key, []).append(position)
+        for end in key[:2]:
+            self._incident.setdefault(end, set()).add(key)
+
+    def node(self, node_id: str) -> Optional[Dict]:
+        nodes = self.nodes
+        position = self._node_position.get(node_id)
+        return nodes[position] if position is not None else None
+
+    def edge(self, key: EdgeKey) -> Optional[Dict]:
+        edges = self.edges
+        positions = self._edge_positions.get(tuple(key))
+        return edges[positions[0]] if positions else None
+
+    def incident_edges(self, node_id: str) -> Set[EdgeKey]:
+        if self._data is None:
+            self.load()
+        return set(self._incident.get(node_id, ()))
+
+    def edges_between(self, source: str, target: str) -> List[EdgeKey]:
+        return [key for key in self.incident_edges(source) if key[:2] == (source, target)]
+
+    def changeset(self, name: str) -> ChangeSet:
+        if self._data is None:
+            self.load()
+        return ChangeSet(self, name)
+
+    def _apply(self, changeset: ChangeSet, records: List[Dict]) -> None:
+        nodes, edges = self.nodes, self.edges
+        deleted = False
+        for node_id, node in changeset._nodes.items():
+            position = self._node_position.get(node_id)
+            if node is None:
+                deleted = deleted or position is not None
+            elif position is not None:
+                nodes[position] = node
+            else:
+                self._node_position[node_id] = len(nodes)
+                nodes.append(node)
+        for key, edge in changeset._edges.items():
+            positions = self._edge_positions.get(key)
+            if edge is None:
+                deleted = deleted or bool(positions)
+            elif positions:
+                edges[positions[0]] = edge
+            else:
+                self._index_edge(len(edges), edge)
+                edges.append(edge)
+        if deleted:
+            removed_nodes = {node_id for node_id, node in changeset._nodes.items() if node is None}
+            removed_edges = {key for key, edge in changeset._edges.items() if edge is None}
+            nodes[:] = [node for node in nodes if node.get('id') not in removed_nodes]
+            edges[:] = [edge for edge in edges if edge_key(edge) not in removed_edges]
+            self._reindex()
+        self.metadata.update(changeset._metadata)
+
+        stamp = datetime.now().isoformat(timespec='seconds')
+        for seq, record in enumerate(records):
+            self._pending.append({'ts': stamp, 'changeset': changeset.id, 'name': changeset.name,
+                                  'seq': seq, **record})
+
+    def save(self, path: Optional[Path] = None, backup_prefix: Optional[str] = None) -> Optional[Path]:
+        """
+        Write the KG atomically and append the pending change-log records
+
+        Args:
+            path: Write somewhere else than the loaded file
+            backup_prefix: Copy the file being replaced to <prefix>_<timestamp>.json first
+
+        Returns:
+            The backup path, if one was made
+        """
+        target = Path(path) if path else self.path
+        if target == self.path and _file_state(self.path) != self._loaded_state:
+            raise ConflictError(f"{self.path} changed on disk since it was loaded; re-run against the new version")
+
+        backup = None
+        if backup_prefix and target.exists():
+            backup = target.with_name(f"{backup_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            shutil.copy2(target, backup)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if target == self.path:
+            self._loaded_state = _file_state(self.path)
+
+        if self._pending:
+            changelog = self.changelog if target == self.path else target.with_suffix('.changes.jsonl')
+            with open(changelog, 'a', encoding='utf-8') as f:
+                for record in self._pending:
+                    f.write(json.dumps({'file': target.name, **record}, ensure_ascii=False, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending = []
+        return backup
+
+
+@contextmanager
+def kg_session(store: Optional[KGStore] = None, path: Optional[Path] = None,
+               backup_prefix: Optional[str] = None) -> Iterator[KGStore]:
+    """
+    The caller's store, or a fresh one that is saved when the block succeeds
+
+    Lets a script run on its own (load, edit, save) or as one step of a
+    composed run that shares a single load/save cycle.
+    """
+    if store is not None:
+        yield store
+        return
+    store = KGStore()
+    yield store
+    if store.dirty:
+        backup = store.save(path=path, backup_prefix=backup_prefix)
+        print(f"\n✓ Saved {path or store.path}" + (f" (backup: {backup})" if backup else ''))
+    else:
+        print("\nNo changes to save")
+
+
+def run_scripts(names: List[str], store: KGStore) -> None:
+    """Run maintenance scripts against one store, then save once"""
+    entry_points: List[Tuple[str, Callable]] = []
+    for name in names:
+        module_name = name[:-3] if name.endswith('.py') else name
+        if module_name not in SCRIPTS:
+            raise SystemExit(f"Unknown script '{name}' (choose from: {', '.join(SCRIPTS)})")
+        module = importlib.import_module(module_name)
+        entry_points.append((module_name, getattr(module, SCRIPTS[module_name])))
+
+    started = time.perf_counter()
+    for module_name, entry_point in entry_points:
+        print("\n" + "#" * 80)
+        print(f"# {module_name}")
+        print("#" * 80)
+        entry_point(store)
+
+    if store.dirty:
+        pending = store.pending_changes
+        store.save()
+        print(f"\n✓ {len(entry_points)} scripts applied {pending} changes in one load/save "
+              f"({time.perf_counter() - started:.1f}s)")
+        print(f"  Change log: {store.changelog}")
+    else:
+        print("\nNo changes to save")
+
+
+def print_log(changelog: Path, limit: int) -> None:
+    if not changelog.exists():
+        print(f"No change log at {changelog}")
+        return
+    with open(changelog, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    for line in lines[-limit:]:
+        record = json.loads(line)
+        target = record.get('id') or ' -> '.join(map(str, record.get('key', [])[:2])) or 'metadata'
+        fields = ', '.join(sorted(set(record.get('before', {})) | set(record.get('after', {}))))
+        detail = f" [{fields}]" if record['op'].startswith('update') else ''
+        print(f"{record['ts']}  {record['name']:<24} {record['op']:<15} {target}{detail}")
+    print(f"\n{len(lines)} change records in {changelog}")
+
+
+def main():
+    """Compose maintenance scripts or inspect the change log"""
+    parser = argparse.ArgumentParser(description="Transactional KG changesets")
+    parser.add_argument('--db', default=str(DB_PATH))
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='Run maintenance scripts in one load/save cycle')
+    run.add_argument('scripts', nargs='+', help=', '.join(SCRIPTS))
+    log = commands.add_parser('log', help='Show recent change-log records')
+    log.add_argument('-n', type=int, default=30)
+    args = parser.parse_args()
+
+    store = KGStore(Path(args.db))
+    if args.command == 'run':
+        run_scripts(args.scripts, store)
+    else:
+        print_log(store.changelog, args.n)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Rule-Based Validation Engine for the Ancient Free Will Database
+
+Validates the KG in a single pass over its nodes and edges:
+
+1. rules are plain functions registered on a ``RuleSet`` for nodes or edges;
+   each returns the issues it finds in one entity, so every entity is visited
+   once and all rules for its kind are dispatched on it
+2. graph checks (unique ids, edge endpoints, orphaned nodes) are set lookups
+   made in the same pass
+3. rule results are cached per entity by content hash (optionally on disk), so
+   re-validating after an edit only runs the rules on changed entities; a large
+   backlog of unchecked entities is split across worker processes. The cache is
+   keyed by a fingerprint of the rules' code and of the module-level constants
+   and helpers they use, so editing a rule or its vocabulary drops it
+
+Used by examples/validate_database.py and scripts/audit_database_academic_quality.py.
+
+Author: Romain Girardi
+Date: 2025-10-27
+"""
+
+import hashlib
+import json
+import marshal
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+import types
+from dataclasses import dataclass, field
+from functools import cached_property, partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+SEVERITIES = ('error', 'warning', 'info')
+
+# Below this many unchecked entities, worker start-up costs more than it saves
+PARALLEL_MIN_ENTITIES = 2000
+
+# (rule, severity, message) for every issue found in one entity
+RuleResults = Tuple[Tuple[str, str, str], ...]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One check on a single node or edge; ``check`` returns issue messages"""
+    name: str
+    kind: str
+    check: Callable[[Dict], Iterable[str]]
+    severity: str = 'error'
+
+
+class Issue(NamedTuple):
+    """An issue found in one entity, at ``position`` in nodes or edges"""
+    severity: str
+    rule: str
+    kind: str
+    position: int
+    entity: str
+    message: str
+
+
+def _stable(value: Any, namespace: Dict[str, Any], seen: Set[types.CodeType]) -> Any:
+    """JSON-able form of a value a rule depends on, independent of hash seeds"""
+    if value is None or isinstance(value, (str, int, float, bool, bytes)):
+        return repr(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(json.dumps(_stable(item, namespace, seen)) for item in value)
+    if isinstance(value, dict):
+        return [[_stable(k, namespace, seen), _stable(v, namespace, seen)] for k, v in value.items()]
+    if isinstance(value, (list, tuple)):
+        return [_stable(item, namespace, seen) for item in value]
+    if isinstance(value, re.Pattern):
+        return [value.pattern, value.flags]
+    if isinstance(value, types.CodeType):
+        return _code_signature(value, namespace, seen)
+    if isinstance(value, types.FunctionType):
+        cells = []
+        for cell in value.__closure__ or ():
+            try:
+                cells.append(_stable(cell.cell_contents, value.__globals__, seen))
+            except ValueError:
+                cells.append(None)
+        return [_code_signature(value.__code__, value.__globals__, seen),
+                _stable(value.__defaults__, value.__globals__, seen), cells]
+    if isinstance(value, partial):
+        return [_stable(value.func, namespace, seen), _stable(value.args, namespace, seen),
+                _stable(value.keywords, namespace, seen)]
+    # Modules, classes and builtins are identified by name only
+    return getattr(value, '__qualname__', type(value).__qualname__)
+
+
+def _code_signature(code: types.CodeType, namespace: Dict[str, Any], seen: Set[types.CodeType]) -> Any:
+    """Bytecode and constants of a function, with the globals it reads (helpers recursively)"""
+    if code in seen:
+        return code.co_name
+    seen.add(code)
+    return [code.co_name, code.co_code.hex(), _stable(code.co_consts, namespace, seen),
+            [[name, _stable(namespace[name], namespace, seen)] for name in code.co_names if name in namespace]]
+
+
+def rule_signature(check: Callable) -> Any:
+    """What a rule's results depend on besides the entity: its code and the globals it uses"""
+    return _stable(check, getattr(check, '__globals__', {}), set())
+
+
+class RuleSet:
+    """Named collection of node and edge rules, run in registration order"""
+
+    def __init__(self, name: str, version: int = 1):
+        self.name = name
+        # Bump to drop cached results when a rule depends on state the
+        # fingerprint cannot see (files, environment, mutable attributes)
+        self.version = version
+        self.rules: Dict[str, List[Rule]] = {'node': [], 'edge': []}
+
+    def add(self, kind: str, check: Callable[[Dict], Iterable[str]], name: Optional[str] = None,
+            severity: str = 'error') -> Rule:
+        if kind not in self.rules:
+            raise ValueError(f"Unknown entity kind '{kind}' (choose from: node, edge)")
+        if severity not in SEVERITIES:
+            raise ValueError(f"Unknown severity '{severity}' (choose from: {', '.join(SEVERITIES)})")
+        rule = Rule(name or check.__name__, kind, check, severity)
+        self.rules[kind].append(rule)
+        return rule
+
+    def node_rule(self, name: Optional[str] = None, severity: str = 'error'):
+        """Decorator registering a node rule"""
+        def register(check):
+            self.add('node', check, name, severity)
+            return check
+        return register
+
+    def edge_rule(self, name: Optional[str] = None, severity: str = 'error'):
+        """Decorator registering an edge rule"""
+        def register(check):
+            self.add('edge', check, name, severity)
+            return check
+        return register
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Identifies the rules a cached result was computed with
+
+        Covers each rule's bytecode and constants and the module-level
+        constants and helper functions it reads, so editing a rule body or a
+        vocabulary it checks against invalidates cached results.
+        """
+        # Content hashes and bytecode depend on the marshal format, hence the Python version
+        signature = [self.name, self.version, marshal.version, sys.version_info[:2]] + [
+            (rule.kind, rule.name, rule.severity, rule_signature(rule.check))
+            for kind in ('node', 'edge') for rule in self.rules[kind]
+        ]
+        return hashlib.sha256(json.dumps(signature).encode('utf-8')).hexdigest()[:16]
+
+    def check(self, kind: str, entity: Dict) -> RuleResults:
+        """Run every rule for ``kind`` on one entity"""
+        results = []
+        for rule in self.rules[kind]:
+            try:
+                for message in rule.check(entity) or ():
+                    results.append((rule.name, rule.severity, message))
+            except Exception as e:
+                # A malformed entity should be reported, not abort the whole run
+                results.append((rule.name, 'error', f"{rule.name} failed: {type(e).__name__}: {e}"))
+        return tuple(results)
+
+
+def content_hash(kind: str, entity: Dict) -> str:
+    """
+    Key of an entity's content
+
+    marshal is several times faster than json.dumps on JSON-loaded data; key
+    order is not normalised, so reordered fields only cost a cache miss.
+    """
+    try:
+        data = marshal.dumps(entity)
+    except ValueError:
+        data = json.dumps(entity, sort_keys=True, default=str).encode('utf-8')
+    return f"{kind}:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+
+
+def entity_label(kind: str, entity: Dict) -> str:
+    if kind == 'node':
+        return str(entity.get('id', ''))
+    return f"{entity.get('source', '')} -> {entity.get('target', '')}"
+
+
+@dataclass
+class ValidationResult:
+    """Issues of one validation run, with the work it took"""
+    nodes: int = 0
+    edges: int = 0
+    checked: int = 0
+    cached: int = 0
+    orphans: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    # Rule results by kind and entity index (the cached tuples themselves, not copies)
+    results: Dict[str, List[RuleResults]] = field(default_factory=lambda: {'node': [], 'edge': []}, repr=False)
+    # Graph check results by kind and entity index
+    graph: Dict[str, Dict[int, List[Tuple[str, str, str]]]] = field(
+        default_factory=lambda: {'node': {}, 'edge': {}}, repr=False)
+    entities: Dict[str, List[Dict]] = field(default_factory=lambda: {'node': [], 'edge': []}, repr=False)
+
+    def entity_issues(self, kind: str, index: int) -> List[Tuple[str, str, str]]:
+        """(rule, severity, message) for every issue of one node or edge"""
+        return [*self.graph[kind].get(index, ()), *self.results[kind][index]]
+
+    @cached_property
+    def issues(self) -> List[Issue]:
+        issues: List[Issue] = []
+        for kind in ('node', 'edge'):
+            graph = self.graph[kind]
+            for index, results in enumerate(self.results[kind]):
+                if results or index in graph:
+                    label = entity_label(kind, self.entities[kind][index])
+                    issues.extend(Issue(severity, rule, kind, index, label, message)
+                                  for rule, severity, message in self.entity_issues(kind, index))
+        return issues
+
+    @property
+    def errors(self) -> List[Issue]:
+        return [issue for issue in self.issues if issue.severity == 'error']
+
+    @property
+    def warnings(self) -> List[Issue]:
+        return [issue for issue in self.issues if issue.severity == 'warning']
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def summary(self) -> str:
+        return (f"{self.nodes:,} nodes, {self.edges:,} edges: {len(self.errors)} errors, "
+                f"{len(self.warnings)} warnings ({self.checked:,} checked, {self.cached:,} cached, "
+                f"{self.seconds:.3f}s)")
+
+
+_worker_rules: Optional[RuleSet] = None
+
+
+def _init_worker(rules: RuleSet) -> None:
+    global _worker_rules
+    _worker_rules = rules
+
+
+def _check_chunk(chunk: List[Tuple[str, str, Dict]]) -> List[Tuple[str, RuleResults]]:
+    assert _worker_rules is not None, "worker started without _init_worker"
+    return [(key, _worker_rules.check(kind, entity)) for key, kind, entity in chunk]
+
+
+class Validator:
+    """Runs a RuleSet over a KG, caching rule results per entity content"""
+
+    def __init__(self, rules: RuleSet, cache_path: Optional[Path] = None, workers: Optional[int] = None):
+        """
+        Args:
+            rules: Rules to dispatch on every node and edge
+            cache_path: Persist rule results here between runs (JSON)
+            workers: Worker processes for large backlogs (default: all cores; 1 = never fork)
+        """
+        self.rules = rules
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.workers = workers
+        self._cache: Dict[str, RuleResults] = {}
+        self._cache_changed = False
+        if self.cache_path:
+            self._load_cache()
+
+    def _load_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get('fingerprint') != self.rules.fingerprint:
+            return
+        self._cache = {key: tuple(tuple(result) for result in results)
+                       for key, results in data.get('entries', {}).items()}
+
+    def save_cache(self) -> None:
+        """Write the cache atomically (only the entries of the last validated KG are kept)"""
+        if not self.cache_path or not self._cache_changed:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': self.rules.fingerprint, 'entries': self._cache},
+                          f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.cache_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self._cache_changed = False
+
+    def _run_rules(self, pending: Dict[str, Tuple[str, Dict]]) -> None:
+        """Fill the cache for entities whose content has not been checked yet"""
+        workers = self.workers or os.cpu_count() or 1
+        if workers > 1 and len(pending) >= PARALLEL_MIN_ENTITIES:
+            tasks = [(key, kind, entity) for key, (kind, entity) in pending.items()]
+            size = -(-len(tasks) // (workers * 4))
+            chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+            with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self.rules,)) as pool:
+                for results in pool.imap_unordered(_check_chunk, chunks):
+                    self._cache.update(results)
+        else:
+            for key, (kind, entity) in pending.items():
+                self._cache[key] = self.rules.check(kind, entity)
+
+    def validate(self, db: Dict) -> ValidationResult:
+        """Validate every node and edge of ``db`` (rules only run on unseen content)"""
+        started = time.perf_counter()
+        nodes = db.get('nodes', [])
+        edges = db.get('edges', [])
+        result = ValidationResult(nodes=len(nodes), edges=len(edges))
+
+        keys = {'node': [content_hash('node', node) for node in nodes],
+                'edge': [content_hash('edge', edge) for edge in edges]}
+        pending: Dict[str, Tuple[str, Dict]] = {}
+        for kind, entities in (('node', nodes), ('edge', edges)):
+            for key, entity in zip(keys[kind], entities):
+                if key not in self._cache and key not in pending:
+                    pending[key] = (kind, entity)
+        result.checked = len(pending)
+        result.cached = len(nodes) + len(edges) - len(pending)
+        if pending:
+            self._run_rules(pending)
+            self._cache_changed = True
+
+        # Single pass: cached rule results plus the graph checks
+        result.entities = {'node': nodes, 'edge': edges}
+        result.results = {kind: [self._cache[key] for key in keys[kind]] for kind in ('node', 'edge')}
+        node_ids: Dict[str, None] = {}
+        duplicates = result.graph['node']
+        for index, node in enumerate(nodes):
+            if 'id' in node:
+                if node['id'] in node_ids:
+                    duplicates[index] = [('unique_ids', 'error', f"has duplicate ID: {node['id']}")]
+                node_ids[node['id']] = None
+
+        connected = set()
+        dangling = result.graph['edge']
+        for index, edge in enumerate(edges):
+            for end in ('source', 'target'):
+                if end in edge:
+                    connected.add(edge[end])
+                    if edge[end] not in node_ids:
+                        dangling.setdefault(index, []).append(
+                            ('edge_references', 'error', f"references non-existent {end} node: {edge[end]}"))
+        result.orphans = [node_id for node_id in node_ids if node_id not in connected]
+
+        # Forget entities that are no longer in the KG, so the cache tracks its current state
+        live = set(keys['node']) | set(keys['edge'])
+        if len(self._cache) > len(live):
+            self._cache = {key: value for key, value in self._cache.items() if key in live}
+            self._cache_changed = True
+
+        result.seconds = time.perf_counter() - started
+        return result
@@ -14,12 +14,13 @@ import json
 import logging
 import sqlite3
 import os
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, Optional
 from dotenv import load_dotenv
 import asyncpg
 
+from bulk_loader import BulkLoader, text_record
+
 # Load environment variables
 load_dotenv()
 
@@ -200,54 +201,15 @@ class SupabaseMigration:
 
         logger.info(f"Found {len(matched_works)} matching works with embeddings to migrate")
 
-        # Migrate texts
-        migrated_count = 0
-        for kg_work_id, text_data in matched_works.items():
-            try:
-                category = self.categorize_text(text_data['title'], text_data['author'])
-
-                # Handle embedding_created_at conversion
-                embedding_created_at = None
-                if text_data['embedding_created_at']:
-                    try:
-                        embedding_created_at = datetime.fromisoformat(
-                            text_data['embedding_created_at'].replace('Z', '+00:00')
-                        )
-                    except (ValueError, AttributeError):
-                        embedding_created_at = None
-
-                # Insert text
-                text_id = await self.pg_conn.fetchval("""
-                    INSERT INTO free_will.texts (
-                        kg_work_id, title, author, category, raw_text, normalized_text,
-                        tei_xml, lemmas, pos_tags, named_entities, embedding,
-                        embedding_model, embedding_dimensions, embedding_hash,
-                        embedding_created_at, language, date_created, source, notes, metadata
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20)
-                    ON CONFLICT (kg_work_id) DO NOTHING
-                    RETURNING id
-                """,
-                kg_work_id, text_data['title'], text_data['author'], category,
-                text_data['raw_text'], text_data['normalized_text'], text_data['tei_xml'],
-                json.dumps(text_data['lemmas']) if text_data['lemmas'] else None,
-                json.dumps(text_data['pos_tags']) if text_data['pos_tags'] else None,
-                json.dumps(text_data['named_entities']) if text_data['named_entities'] else None,
-                text_data['embedding'], text_data['embedding_model'],
-                text_data['embedding_dimensions'], text_data['embedding_hash'],
-                embedding_created_at, text_data['language'], text_data['date_created'],
-                text_data['source'], text_data['notes'],
-                json.dumps(text_data['metadata']) if text_data['metadata'] else None
-                )
-
-                if text_id:
-                    migrated_count += 1
-                    if migrated_count % 10 == 0:
-                        logger.info(f"Migrated {migrated_count} texts...")
-
-            except Exception as e:
-                logger.error(f"Error migrating text '{text_data['title']}': {e}")
-
-        logger.info(f"✅ Migration completed. Migrated {migrated_count} texts with embeddings.")
+        # One COPY round-trip instead of one INSERT per text; works already in Supabase are kept
+        texts = [
+            text_record(kg_work_id, self.categorize_text(text_data['title'], text_data['author']), text_data)
+            for kg_work_id, text_data in matched_works.items()
+        ]
+        stats = await BulkLoader(self.pg_conn).load(texts, skip_existing=True)
+
+        logger.info(f"✅ Migration completed. Migrated {stats.texts} texts with embeddings "
+                    f"({len(texts) - stats.texts} already present, {stats.rows_per_second:,.0f} rows/sec).")
 
     async def run(self) -> None:
         """Run the complete migration process."""
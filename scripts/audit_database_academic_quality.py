@@ -15,13 +15,22 @@ This script generates a comprehensive report identifying:
 - FAIR compliance issues
 - Enhancement opportunities
 
+All audit functions are registered as rules on AUDIT_RULES (see
+kg_validator.py) and dispatched in one pass over the nodes and edges.
+
 Run this script, then work with Claude to address flagged issues systematically.
 """
 
 import json
 import re
+import sys
 from collections import defaultdict, Counter
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from kg_validator import RuleSet, Validator
 
 # ============================================================================
 # CONTROLLED VOCABULARIES (from skill)
@@ -216,19 +225,19 @@ def audit_required_fields(node: Dict) -> List[str]:
 
     return issues
 
-def audit_edge_validity(edge: Dict, node_ids: set) -> List[str]:
-    """Check if edge is valid"""
+def audit_edge_validity(edge: Dict, node_ids: Optional[set] = None) -> List[str]:
+    """Check if edge is valid (endpoints are only looked up when ``node_ids`` is given)"""
     issues = []
 
     # Check required fields
     if 'source' not in edge:
         issues.append("Missing source")
-    elif edge['source'] not in node_ids:
+    elif node_ids is not None and edge['source'] not in node_ids:
         issues.append(f"Source node not found: {edge['source']}")
 
     if 'target' not in edge:
         issues.append("Missing target")
-    elif edge['target'] not in node_ids:
+    elif node_ids is not None and edge['target'] not in node_ids:
         issues.append(f"Target node not found: {edge['target']}")
 
     if 'relation' not in edge:
@@ -289,16 +298,30 @@ def find_enhancement_opportunities(node: Dict) -> List[str]:
 
     return opportunities
 
+# ============================================================================
+# RULES
+# ============================================================================
+
+# Issues are 'warning' rules, enhancement opportunities 'info' rules; edge
+# endpoints are checked by the validator's graph pass
+AUDIT_RULES = RuleSet('academic_audit')
+for _audit in (audit_required_fields, audit_node_id_format, audit_controlled_vocabulary,
+               audit_citations, audit_greek_latin_terminology, audit_person_completeness,
+               audit_concept_completeness, audit_argument_completeness, audit_description_quality):
+    AUDIT_RULES.add('node', _audit, severity='warning')
+AUDIT_RULES.add('node', find_enhancement_opportunities, severity='info')
+AUDIT_RULES.add('edge', audit_edge_validity, severity='warning')
+
 # ============================================================================
 # MAIN AUDIT
 # ============================================================================
 
-def audit_database(db: Dict) -> Dict:
+def audit_database(db: Dict, validator: Optional[Validator] = None) -> Dict:
     """Perform comprehensive database audit"""
 
     nodes = db['nodes']
     edges = db['edges']
-    node_ids = {n['id'] for n in nodes}
+    result = (validator or Validator(AUDIT_RULES)).validate(db)
 
     report = {
         'summary': {},
@@ -310,28 +333,19 @@ def audit_database(db: Dict) -> Dict:
     }
 
     # Audit nodes
-    for node in nodes:
+    with_citations = 0
+    for i, node in enumerate(nodes):
         node_issues = {
-            'node_id': node['id'],
-            'label': node['label'],
-            'type': node['type'],
+            'node_id': node.get('id'),
+            'label': node.get('label'),
+            'type': node.get('type'),
             'issues': [],
             'enhancements': []
         }
 
-        # Run all audit functions
-        node_issues['issues'].extend(audit_required_fields(node))
-        node_issues['issues'].extend(audit_node_id_format(node))
-        node_issues['issues'].extend(audit_controlled_vocabulary(node))
-        node_issues['issues'].extend(audit_citations(node))
-        node_issues['issues'].extend(audit_greek_latin_terminology(node))
-        node_issues['issues'].extend(audit_person_completeness(node))
-        node_issues['issues'].extend(audit_concept_completeness(node))
-        node_issues['issues'].extend(audit_argument_completeness(node))
-        node_issues['issues'].extend(audit_description_quality(node))
-
-        # Find enhancement opportunities
-        node_issues['enhancements'].extend(find_enhancement_opportunities(node))
+        # Results of all audit functions
+        for _, severity, message in result.entity_issues('node', i):
+            node_issues['enhancements' if severity == 'info' else 'issues'].append(message)
 
         # Categorize by severity
         critical_keywords = ['missing required', 'invalid', 'not found']
@@ -346,12 +360,14 @@ def audit_database(db: Dict) -> Dict:
             report['warnings'].append(node_issues)
 
         # Count by type
-        report['node_type_stats'][node['type']] += 1
+        report['node_type_stats'][node.get('type')] += 1
+        if node.get('ancient_sources') or node.get('modern_scholarship'):
+            with_citations += 1
 
     # Audit edges
     edge_issues_count = 0
     for i, edge in enumerate(edges):
-        issues = audit_edge_validity(edge, node_ids)
+        issues = [message for _, _, message in result.entity_issues('edge', i)]
         if issues:
             edge_issues_count += 1
             report['critical_issues'].append({
@@ -381,7 +397,6 @@ def audit_database(db: Dict) -> Dict:
 
     # Calculate academic quality score (0-100)
     total = len(nodes)
-    with_citations = sum(1 for n in nodes if n.get('ancient_sources') or n.get('modern_scholarship'))
     with_complete_info = total - len(report['critical_issues'])
 
     citation_score = (with_citations / total) * 50 if total > 0 else 0
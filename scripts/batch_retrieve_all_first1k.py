@@ -7,23 +7,33 @@ Systematically retrieves ALL available works from First1KGreek that we need.
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import sys
-import time
 from retrieve_first1k_tei import First1KGreekRetriever
-import json
-import requests
+from retrieval_engine import run_batch
+
+# Remaining Origen works (5 more)
+ORIGEN_WORKS = [
+    {
+        'name': f'Origen, {work_code}',
+        'tlg_code': 'tlg2018',
+        'work_code': work_code,
+        'edition': '1st1K-grc1',
+        'author': 'Origen',
+        'work_title': f'Work {work_code}',
+        'citations': 5
+    }
+    for work_code in ['tlg008', 'tlg009', 'tlg010', 'tlg011', 'tlg020']
+]
+
+# Authors whose First1KGreek works are listed and retrieved ('citations' is per work)
+AUTHORS = [
+    # Aristotle works (try first 10)
+    {'author': 'Aristotle', 'tlg_code': 'tlg0086', 'max_works': 10, 'citations': 3},
+    # Gregory of Nyssa works
+    {'author': 'Gregory of Nyssa', 'tlg_code': 'tlg2022', 'max_works': 7, 'citations': 3},
+    # Eusebius works (try first 5)
+    {'author': 'Eusebius', 'tlg_code': 'tlg2042', 'max_works': 5, 'citations': 2},
+]
 
-def get_available_works(tlg_code, max_works=20):
-    """Check what works are actually available for an author"""
-    url = f"https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            works = [item['name'] for item in resp.json() if item['type'] == 'dir']
-            return works[:max_works]  # Limit to avoid overwhelming
-    except:
-        pass
-    return []
 
 def main():
     """Batch retrieve ALL available First1KGreek works"""
@@ -35,154 +45,10 @@ def main():
     print("="*80)
     print("\nRetrieving ALL available works systematically...")
 
-    # Build work list dynamically
-    works = []
-
-    # Remaining Origen works (5 more)
-    print("\nChecking Origen works...")
-    for work_code in ['tlg008', 'tlg009', 'tlg010', 'tlg011', 'tlg020']:
-        works.append({
-            'name': f'Origen, {work_code}',
-            'tlg_code': 'tlg2018',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Origen',
-            'work_title': f'Work {work_code}',
-            'citations': 5
-        })
-
-    # Aristotle works (try first 10)
-    print("Checking Aristotle works...")
-    aristotle_works = get_available_works('tlg0086', max_works=10)
-    for work_code in aristotle_works:
-        works.append({
-            'name': f'Aristotle, {work_code}',
-            'tlg_code': 'tlg0086',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Aristotle',
-            'work_title': f'Work {work_code}',
-            'citations': 3
-        })
-
-    # Gregory of Nyssa works
-    print("Checking Gregory of Nyssa works...")
-    gregory_works = get_available_works('tlg2022', max_works=7)
-    for work_code in gregory_works:
-        works.append({
-            'name': f'Gregory of Nyssa, {work_code}',
-            'tlg_code': 'tlg2022',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Gregory of Nyssa',
-            'work_title': f'Work {work_code}',
-            'citations': 3
-        })
-
-    # Eusebius works (try first 5)
-    print("Checking Eusebius works...")
-    eusebius_works = get_available_works('tlg2042', max_works=5)
-    for work_code in eusebius_works:
-        works.append({
-            'name': f'Eusebius, {work_code}',
-            'tlg_code': 'tlg2042',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Eusebius',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
-    print(f"\n✓ Found {len(works)} works to retrieve")
-
-    results = []
-    total_citations = 0
-    successful_citations = 0
-    total_passages = 0
-
-    for i, work_info in enumerate(works, 1):
-        print(f"\n[{i}/{len(works)}] Processing {work_info['name']}...")
-
-        try:
-            result = retriever.retrieve_work(work_info)
-
-            if result:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'passages': len(result['passages']),
-                    'success': True
-                })
-
-                total_citations += work_info['citations']
-                successful_citations += work_info['citations']
-                total_passages += len(result['passages'])
-
-            else:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'success': False,
-                    'error': 'Retrieval failed (404 or parsing error)'
-                })
-                total_citations += work_info['citations']
-
-        except Exception as e:
-            print(f"✗ ERROR: {e}")
-            results.append({
-                'name': work_info['name'],
-                'citations': work_info['citations'],
-                'success': False,
-                'error': str(e)[:60]
-            })
-            total_citations += work_info['citations']
-
-        time.sleep(0.3)  # Be polite to GitHub
-
-    # Final summary
-    print("\n" + "="*80)
-    print("COMPREHENSIVE RETRIEVAL COMPLETE")
-    print("="*80)
-
-    successful = [r for r in results if r.get('success')]
-    failed = [r for r in results if not r.get('success')]
-
-    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(works)} works")
-    print(f"✓ Citations retrieved: {successful_citations}/{total_citations}")
-    print(f"✓ Total passages extracted: {total_passages}")
-
-    if successful:
-        print(f"\n✅ Successful retrievals: {len(successful)} works")
-        # Group by author
-        by_author = {}
-        for r in successful:
-            author = r['name'].split(',')[0]
-            if author not in by_author:
-                by_author[author] = []
-            by_author[author].append(r)
-
-        for author in sorted(by_author.keys()):
-            works_list = by_author[author]
-            total_cit = sum(w['citations'] for w in works_list)
-            total_pass = sum(w['passages'] for w in works_list)
-            print(f"  {author}: {len(works_list)} works, {total_cit} citations, {total_pass} passages")
-
-    if failed:
-        print(f"\n❌ Failed: {len(failed)} works")
-
-    # Calculate cumulative progress
-    print("\n" + "="*80)
-    print("CUMULATIVE PROGRESS")
-    print("="*80)
-
-    previous = 535  # After previous First1K batch
-    new_total = previous + successful_citations
-
-    print(f"Previous retrievals: {previous} citations")
-    print(f"New retrievals: {successful_citations} citations")
-    print(f"TOTAL: {new_total} / 2494 citations ({new_total/2494*100:.1f}%)")
+    print("\nListing available works...")
+    works = ORIGEN_WORKS + retriever.author_works(AUTHORS)
 
-    print("\n✓ All retrieved texts saved to: retrieved_texts/first1k_tei/")
+    run_batch(retriever, works, "COMPREHENSIVE RETRIEVAL COMPLETE", batch='all_first1k')
 
 
 if __name__ == '__main__':
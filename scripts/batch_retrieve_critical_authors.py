@@ -9,195 +9,38 @@ This is HUGE - Plato (150+ citations) and Proclus (29 citations)!
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import sys
-import time
-sys.path.append('.')
 from retrieve_first1k_tei import First1KGreekRetriever
-import requests
-
-def get_available_works(tlg_code, max_works=10):
-    """Check what works are actually available"""
-    url = f"https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            works = [item['name'] for item in resp.json() if item['type'] == 'dir']
-            return works[:max_works]
-    except:
-        pass
-    return []
-
-def main():
-    """Retrieve critical authors: Plato, Proclus, select Galen/Hippocrates"""
-
-    retriever = First1KGreekRetriever()
-
-    print("="*80)
-    print("CRITICAL AUTHORS RETRIEVAL")
-    print("="*80)
-    print("\nPlato (150+ cit), Proclus (29 cit), Galen, Hippocrates...")
-
-    works = []
+from retrieval_engine import run_batch
 
+# Authors whose First1KGreek works are listed and retrieved ('citations' is per work)
+AUTHORS = [
     # PLATO - 150+ citations! CRITICAL!
-    print("\nChecking Plato works...")
-    plato_works = get_available_works('tlg0059', max_works=1)
-    for work_code in plato_works:
-        works.append({
-            'name': f'Plato, {work_code}',
-            'tlg_code': 'tlg0059',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Plato',
-            'work_title': f'Work {work_code}',
-            'citations': 150  # Plato is HEAVILY cited
-        })
-
+    {'author': 'Plato', 'tlg_code': 'tlg0059', 'max_works': 1, 'citations': 150},
     # PROCLUS - 29 citations! CRITICAL!
-    print("Checking Proclus works...")
-    proclus_works = get_available_works('tlg4036', max_works=1)
-    for work_code in proclus_works:
-        works.append({
-            'name': f'Proclus, {work_code}',
-            'tlg_code': 'tlg4036',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Proclus',
-            'work_title': f'Work {work_code}',
-            'citations': 29
-        })
-
+    {'author': 'Proclus', 'tlg_code': 'tlg4036', 'max_works': 1, 'citations': 29},
     # GALEN - Select 5 most relevant medical/philosophical works
-    print("Checking Galen works (97 available, selecting 5)...")
-    galen_works = get_available_works('tlg0057', max_works=5)
-    for work_code in galen_works:
-        works.append({
-            'name': f'Galen, {work_code}',
-            'tlg_code': 'tlg0057',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Galen',
-            'work_title': f'Work {work_code}',
-            'citations': 2  # Estimated per work
-        })
-
+    {'author': 'Galen', 'tlg_code': 'tlg0057', 'max_works': 5, 'citations': 2},
     # HIPPOCRATES - Select 3 most relevant works
-    print("Checking Hippocrates works (53 available, selecting 3)...")
-    hippocrates_works = get_available_works('tlg0627', max_works=3)
-    for work_code in hippocrates_works:
-        works.append({
-            'name': f'Hippocrates, {work_code}',
-            'tlg_code': 'tlg0627',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Hippocrates',
-            'work_title': f'Work {work_code}',
-            'citations': 1  # Estimated
-        })
-
+    {'author': 'Hippocrates', 'tlg_code': 'tlg0627', 'max_works': 3, 'citations': 1},
     # STRABO
-    print("Checking Strabo works...")
-    strabo_works = get_available_works('tlg0099', max_works=1)
-    for work_code in strabo_works:
-        works.append({
-            'name': f'Strabo, {work_code}',
-            'tlg_code': 'tlg0099',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Strabo',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
-    print(f"\n✓ Found {len(works)} works to retrieve")
+    {'author': 'Strabo', 'tlg_code': 'tlg0099', 'max_works': 1, 'citations': 1},
+]
 
-    results = []
-    total_citations = 0
-    successful_citations = 0
-    total_passages = 0
 
-    for i, work_info in enumerate(works, 1):
-        print(f"\n[{i}/{len(works)}] {work_info['name']}...")
-
-        try:
-            result = retriever.retrieve_work(work_info)
-
-            if result:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'passages': len(result['passages']),
-                    'success': True
-                })
-
-                total_citations += work_info['citations']
-                successful_citations += work_info['citations']
-                total_passages += len(result['passages'])
-            else:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'success': False,
-                    'error': 'Retrieval failed'
-                })
-                total_citations += work_info['citations']
-
-        except Exception as e:
-            print(f"✗ ERROR: {e}")
-            results.append({
-                'name': work_info['name'],
-                'citations': work_info['citations'],
-                'success': False,
-                'error': str(e)[:60]
-            })
-            total_citations += work_info['citations']
+def main():
+    """Retrieve critical authors: Plato, Proclus, select Galen/Hippocrates"""
 
-        time.sleep(0.3)
+    retriever = First1KGreekRetriever()
 
-    # Final summary
-    print("\n" + "="*80)
-    print("CRITICAL RETRIEVAL COMPLETE")
     print("="*80)
-
-    successful = [r for r in results if r.get('success')]
-    failed = [r for r in results if not r.get('success')]
-
-    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(works)} works")
-    print(f"✓ Citations retrieved: {successful_citations}/{total_citations}")
-    print(f"✓ Total passages extracted: {total_passages}")
-
-    if successful:
-        print(f"\n✅ Successful: {len(successful)} works")
-        by_author = {}
-        for r in successful:
-            author = r['name'].split(',')[0]
-            if author not in by_author:
-                by_author[author] = []
-            by_author[author].append(r)
-
-        for author in sorted(by_author.keys()):
-            works_list = by_author[author]
-            total_cit = sum(w['citations'] for w in works_list)
-            total_pass = sum(w['passages'] for w in works_list)
-            print(f"  {author}: {len(works_list)} works, {total_cit} citations, {total_pass} passages")
-
-    # Cumulative progress
-    print("\n" + "="*80)
-    print("CUMULATIVE PROGRESS")
+    print("CRITICAL AUTHORS RETRIEVAL")
     print("="*80)
+    print("\nPlato (150+ cit), Proclus (29 cit), Galen, Hippocrates...")
 
-    previous = 748
-    new_total = previous + successful_citations
-
-    print(f"Previous: {previous} citations")
-    print(f"New: {successful_citations} citations")
-    print(f"TOTAL: {new_total} / 2494 citations ({new_total/2494*100:.1f}%)")
-
-    if 'Plato' in [r['name'].split(',')[0] for r in successful]:
-        print("\n🎉 PLATO RETRIEVED - MAJOR GAP FILLED! 🎉")
+    print("\nListing available works...")
+    works = retriever.author_works(AUTHORS)
 
-    if 'Proclus' in [r['name'].split(',')[0] for r in successful]:
-        print("🎉 PROCLUS RETRIEVED - MAJOR GAP FILLED! 🎉")
+    run_batch(retriever, works, "CRITICAL RETRIEVAL COMPLETE", batch='critical_authors')
 
 
 if __name__ == '__main__':
@@ -13,28 +13,23 @@ Strategy:
 NO HALLUCINATION - Only verified CTS texts.
 """
 
-import requests
-import time
-from xml.etree import ElementTree as ET
 import json
 from typing import Dict, List, Optional
 from pathlib import Path
-import sys
+
+from retrieval_engine import (FetchJob, FetchResult, RetrievalEngine, load_saved,
+                              retrieve_passages, state_file)
+from retrieve_scaife_cts import cts_passage_text
 
 class BatchCTSRetriever:
     """Batch retrieve multiple works via Scaife CTS API"""
 
     BASE_URL = "https://scaife.perseus.org/library"
-    TEI_NS = {'tei': 'http://www.tei-c.org/ns/1.0'}
 
-    def __init__(self, delay=0.3, output_dir='retrieved_texts/scaife_cts'):
-        self.delay = delay
+    def __init__(self, output_dir='retrieved_texts/scaife_cts', engine: Optional[RetrievalEngine] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic Research - Ancient Free Will Database'
-        })
+        self.engine = engine or RetrievalEngine()
         self.stats = {
             'works_attempted': 0,
             'works_succeeded': 0,
@@ -42,123 +37,88 @@ class BatchCTSRetriever:
             'passages_failed': 0,
         }
 
-    def retrieve_passage(self, urn: str) -> Optional[str]:
-        """Retrieve single passage"""
-        api_url = f"{self.BASE_URL}/{urn}/cts-api-xml/"
-
-        try:
-            response = self.session.get(api_url, timeout=15)
-            response.raise_for_status()
-
-            root = ET.fromstring(response.content)
-
-            text_parts = []
-            for selector in ['.//tei:p', './/tei:div', './/tei:l', './/tei:ab']:
-                elements = root.findall(selector, self.TEI_NS)
-                if elements:
-                    for elem in elements:
-                        text = ''.join(elem.itertext()).strip()
-                        if text:
-                            text_parts.append(text)
-                    break
-
-            if not text_parts:
-                text_parts = [''.join(root.itertext()).strip()]
-
-            return ' '.join(text_parts).strip() if text_parts else None
-
-        except Exception as e:
-            return None
-
-    def retrieve_work_sections(self, urn_base: str, sections: List) -> Dict:
-        """Retrieve work by known sections"""
-        results = {}
-        success = 0
-        failed = []
-
-        for section in sections:
-            urn = f"{urn_base}:{section}"
-            sys.stdout.write(f"  {section:>10} ")
-            sys.stdout.flush()
-
-            text = self.retrieve_passage(urn)
-            time.sleep(self.delay)
-
-            if text:
-                results[str(section)] = {
-                    'urn': urn,
-                    'text': text,
-                    'url': f"{self.BASE_URL}/{urn}/",
-                }
-                success += 1
-                self.stats['passages_retrieved'] += 1
-                print(f"✓ ({len(text):5d} chars)")
-            else:
-                failed.append(section)
-                self.stats['passages_failed'] += 1
-                print("✗")
-
-        return results, success, failed
-
-    def retrieve_work(self, work_name: str, urn_base: str, sections: List = None,
-                     author: str = '', language: str = '') -> Dict:
-        """Retrieve complete work"""
-        print(f"\n{'='*80}")
-        print(f"RETRIEVING: {author}, {work_name}")
-        print(f"CTS URN: {urn_base}")
-        print(f"{'='*80}")
-
-        self.stats['works_attempted'] += 1
-
+    def parse_passage(self, result: FetchResult) -> Optional[str]:
+        """Text of a CTS GetPassage response"""
+        return cts_passage_text(result.body)
+
+    def passage_jobs(self, work: Dict) -> List[FetchJob]:
+        """One CTS request per section of a work"""
+        jobs = []
+        for section in work['sections']:
+            urn = f"{work['urn']}:{section}"
+            jobs.append(FetchJob(
+                key=urn,
+                url=f"{self.BASE_URL}/{urn}/cts-api-xml/",
+                meta={'work': work['urn'], 'passage': section,
+                      'entry': {'urn': urn, 'url': f"{self.BASE_URL}/{urn}/"}}
+            ))
+        return jobs
+
+    def output_file(self, work_name: str) -> Path:
+        safe_name = work_name.lower().replace(' ', '_').replace(',', '')
+        return self.output_dir / f"{safe_name}_cts.json"
+
+    def retrieve_works(self, works: List[Dict], batch: str = 'scaife_cts',
+                       retry_failed: bool = False) -> None:
+        """Retrieve every section of every work in one concurrent run, then save per work"""
+        for work in works:
+            if not work.get('sections'):
+                print(f"⚠️  {work['author']}, {work['name']}: no sections specified - trying default range 1-50")
         # If no sections provided, try standard ranges
-        if not sections:
-            print("\n⚠️  No sections specified - trying default range 1-50...")
-            sections = list(range(1, 51))
+        works = [dict(work, sections=list(work.get('sections') or range(1, 51))) for work in works]
+        jobs = [job for work in works for job in self.passage_jobs(work)]
 
-        print(f"\nRetrieving {len(sections)} sections...")
+        print(f"\nRetrieving {len(jobs)} sections from {len(works)} works...")
         print("-"*80)
+        passages, run_stats = retrieve_passages(self.engine, jobs, self.parse_passage, batch, retry_failed)
+
+        for work in works:
+            self.stats['works_attempted'] += 1
+            filename = self.output_file(work['name'])
+            work_passages = load_saved(filename, 'passages')
+            work_passages.update(passages.get(work['urn'], {}))
+            failed = [section for section in work['sections'] if str(section) not in work_passages]
+
+            self.stats['passages_retrieved'] += len(passages.get(work['urn'], {}))
+            self.stats['passages_failed'] += sum(
+                1 for job in self.passage_jobs(work) if job.key in run_stats.failures
+            )
 
-        passages, success, failed = self.retrieve_work_sections(urn_base, sections)
-
-        # Build work data
-        work_data = {
-            'metadata': {
-                'work': work_name,
-                'author': author,
-                'language': language,
-                'urn_base': urn_base,
-                'source': 'Scaife Viewer CTS API',
-                'protocol': 'Canonical Text Services (CTS)',
-                'format': 'TEI-XML',
-                'retrieved_date': '2025-10-25',
-                'sections_retrieved': success,
-                'sections_failed': failed,
-                'verification_status': 'cts_verified'
-            },
-            'passages': passages
-        }
-
-        # Save
-        safe_name = work_name.lower().replace(' ', '_').replace(',', '')
-        filename = self.output_dir / f"{safe_name}_cts.json"
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(work_data, f, indent=2, ensure_ascii=False)
-
-        print(f"\n{'='*80}")
-        print(f"✓ Retrieved {success}/{len(sections)} sections")
-        if failed and len(failed) < 20:
-            print(f"✗ Failed: {failed[:10]}{'...' if len(failed) > 10 else ''}")
-        print(f"✓ Saved to: {filename}")
-        print(f"{'='*80}\n")
-
-        if success > 0:
-            self.stats['works_succeeded'] += 1
-
-        return work_data
+            work_data = {
+                'metadata': {
+                    'work': work['name'],
+                    'author': work['author'],
+                    'language': work['lang'],
+                    'urn_base': work['urn'],
+                    'source': 'Scaife Viewer CTS API',
+                    'protocol': 'Canonical Text Services (CTS)',
+                    'format': 'TEI-XML',
+                    'retrieved_date': '2025-10-25',
+                    'sections_retrieved': len(work_passages),
+                    'sections_failed': failed,
+                    'verification_status': 'cts_verified'
+                },
+                'passages': work_passages
+            }
+
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(work_data, f, indent=2, ensure_ascii=False)
+
+            print(f"\n{work['author']}, {work['name']} ({work['urn']})")
+            print(f"✓ Retrieved {len(work_passages)}/{len(work['sections'])} sections")
+            if failed and len(failed) < 20:
+                print(f"✗ Failed: {failed[:10]}{'...' if len(failed) > 10 else ''}")
+            print(f"✓ Saved to: {filename}")
+
+            if work_passages:
+                self.stats['works_succeeded'] += 1
+
+        print(f"\nJob state: {state_file(batch)} ({run_stats.summary()['elapsed_seconds']}s, "
+              f"{run_stats.retries} retries)")
 
     def print_stats(self):
         """Print retrieval statistics"""
+        attempted = self.stats['passages_retrieved'] + self.stats['passages_failed']
         print("\n" + "="*80)
         print("BATCH RETRIEVAL STATISTICS")
         print("="*80)
@@ -166,73 +126,63 @@ class BatchCTSRetriever:
         print(f"Works succeeded: {self.stats['works_succeeded']}")
         print(f"Passages retrieved: {self.stats['passages_retrieved']}")
         print(f"Passages failed: {self.stats['passages_failed']}")
-        print(f"Success rate: {self.stats['passages_retrieved']/(self.stats['passages_retrieved']+self.stats['passages_failed'])*100:.1f}%")
+        if attempted:
+            print(f"Success rate: {self.stats['passages_retrieved']/attempted*100:.1f}%")
         print("="*80)
 
 
-def main():
-    """Batch retrieve top priority works"""
-    retriever = BatchCTSRetriever(delay=0.3)
+# Priority queue
+WORKS = [
+    # Already done:
+    # {'name': 'De Fato', 'urn': 'urn:cts:latinLit:phi0474.phi054.perseus-lat1',
+    #  'sections': range(1, 49), 'author': 'Cicero', 'lang': 'Latin', 'cites': 83},
 
-    print("\n" + "="*80)
-    print("BATCH CTS RETRIEVAL - ANCIENT FREE WILL DATABASE")
-    print("="*80)
-    print("\nRetrieving top 11 most-cited works...")
+    {'name': 'Nicomachean Ethics', 'urn': 'urn:cts:greekLit:tlg0086.tlg010.perseus-grc1',
+     'sections': None, 'author': 'Aristotle', 'lang': 'Greek', 'cites': 38},
 
-    # Priority queue
-    works = [
-        # Already done:
-        # {'name': 'De Fato', 'urn': 'urn:cts:latinLit:phi0474.phi054.perseus-lat1',
-        #  'sections': range(1, 49), 'author': 'Cicero', 'lang': 'Latin', 'cites': 83},
+    {'name': 'De Fato', 'urn': 'urn:cts:greekLit:tlg0085.tlg014.perseus-grc1',
+     'sections': range(1, 36), 'author': 'Alexander of Aphrodisias', 'lang': 'Greek', 'cites': 35},
 
-        {'name': 'Nicomachean Ethics', 'urn': 'urn:cts:greekLit:tlg0086.tlg010.perseus-grc1',
-         'sections': None, 'author': 'Aristotle', 'lang': 'Greek', 'cites': 38},
+    {'name': 'Noctes Atticae', 'urn': 'urn:cts:latinLit:phi1254.phi001.perseus-lat1',
+     'sections': None, 'author': 'Aulus Gellius', 'lang': 'Latin', 'cites': 27},
 
-        {'name': 'De Fato', 'urn': 'urn:cts:greekLit:tlg0085.tlg014.perseus-grc1',
-         'sections': range(1, 36), 'author': 'Alexander of Aphrodisias', 'lang': 'Greek', 'cites': 35},
+    # Lucretius already done via old Perseus
+    # {'name': 'De Rerum Natura', 'urn': 'urn:cts:latinLit:phi0550.phi001.perseus-lat1',
+    #  'sections': None, 'author': 'Lucretius', 'lang': 'Latin', 'cites': 24},
 
-        {'name': 'Noctes Atticae', 'urn': 'urn:cts:latinLit:phi1254.phi001.perseus-lat1',
-         'sections': None, 'author': 'Aulus Gellius', 'lang': 'Latin', 'cites': 27},
+    {'name': 'Enneads', 'urn': 'urn:cts:greekLit:tlg0062.tlg001.perseus-grc1',
+     'sections': None, 'author': 'Plotinus', 'lang': 'Greek', 'cites': 24},
 
-        # Lucretius already done via old Perseus
-        # {'name': 'De Rerum Natura', 'urn': 'urn:cts:latinLit:phi0550.phi001.perseus-lat1',
-        #  'sections': None, 'author': 'Lucretius', 'lang': 'Latin', 'cites': 24},
+    {'name': 'De Interpretatione', 'urn': 'urn:cts:greekLit:tlg0086.tlg013.perseus-grc1',
+     'sections': None, 'author': 'Aristotle', 'lang': 'Greek', 'cites': 18},
 
-        {'name': 'Enneads', 'urn': 'urn:cts:greekLit:tlg0062.tlg001.perseus-grc1',
-         'sections': None, 'author': 'Plotinus', 'lang': 'Greek', 'cites': 24},
+    {'name': 'De Stoicorum Repugnantiis', 'urn': 'urn:cts:greekLit:tlg0007.tlg096.perseus-grc1',
+     'sections': None, 'author': 'Plutarch', 'lang': 'Greek', 'cites': 16},
 
-        {'name': 'De Interpretatione', 'urn': 'urn:cts:greekLit:tlg0086.tlg013.perseus-grc1',
-         'sections': None, 'author': 'Aristotle', 'lang': 'Greek', 'cites': 18},
+    {'name': 'Eudemian Ethics', 'urn': 'urn:cts:greekLit:tlg0086.tlg011.perseus-grc1',
+     'sections': None, 'author': 'Aristotle', 'lang': 'Greek', 'cites': 15},
 
-        {'name': 'De Stoicorum Repugnantiis', 'urn': 'urn:cts:greekLit:tlg0007.tlg096.perseus-grc1',
-         'sections': None, 'author': 'Plutarch', 'lang': 'Greek', 'cites': 16},
+    {'name': 'Academica', 'urn': 'urn:cts:latinLit:phi0474.phi006.perseus-lat1',
+     'sections': range(1, 148), 'author': 'Cicero', 'lang': 'Latin', 'cites': 13},
 
-        {'name': 'Eudemian Ethics', 'urn': 'urn:cts:greekLit:tlg0086.tlg011.perseus-grc1',
-         'sections': None, 'author': 'Aristotle', 'lang': 'Greek', 'cites': 15},
+    {'name': 'Discourses', 'urn': 'urn:cts:greekLit:tlg0557.tlg001.perseus-grc1',
+     'sections': None, 'author': 'Epictetus', 'lang': 'Greek', 'cites': 13},
+]
 
-        {'name': 'Academica', 'urn': 'urn:cts:latinLit:phi0474.phi006.perseus-lat1',
-         'sections': range(1, 148), 'author': 'Cicero', 'lang': 'Latin', 'cites': 13},
 
-        {'name': 'Discourses', 'urn': 'urn:cts:greekLit:tlg0557.tlg001.perseus-grc1',
-         'sections': None, 'author': 'Epictetus', 'lang': 'Greek', 'cites': 13},
-    ]
+def main():
+    """Batch retrieve top priority works"""
+    retriever = BatchCTSRetriever()
 
-    for work in works:
-        try:
-            retriever.retrieve_work(
-                work_name=work['name'],
-                urn_base=work['urn'],
-                sections=work['sections'],
-                author=work['author'],
-                language=work['lang']
-            )
-            time.sleep(1)  # Pause between works
-        except KeyboardInterrupt:
-            print("\n\n⚠️  Interrupted by user")
-            break
-        except Exception as e:
-            print(f"\n✗ ERROR: {e}\n")
-            continue
+    print("\n" + "="*80)
+    print("BATCH CTS RETRIEVAL - ANCIENT FREE WILL DATABASE")
+    print("="*80)
+    print(f"\nRetrieving top {len(WORKS)} most-cited works...")
+
+    try:
+        retriever.retrieve_works(WORKS)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user - re-run to resume")
 
     retriever.print_stats()
 
@@ -11,215 +11,44 @@ Need: 88 more citations
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import sys
-import time
-sys.path.append('.')
 from retrieve_first1k_tei import First1KGreekRetriever
-import requests
-
-def get_available_works(tlg_code, max_works=20):
-    """Check what works are actually available"""
-    url = f"https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            works = [item['name'] for item in resp.json() if item['type'] == 'dir']
-            return works[:max_works]
-    except:
-        pass
-    return []
-
-def main():
-    """Final push to 40%"""
-
-    retriever = First1KGreekRetriever()
-
-    print("="*80)
-    print("FINAL PUSH TO 40% COVERAGE")
-    print("="*80)
-    print("\nCurrent: 912 citations (36.6%)")
-    print("Target: 1,000 citations (40.0%)")
-    print("Need: 88 more citations\n")
-
-    works = []
+from retrieval_engine import run_batch
 
+# Authors whose First1KGreek works are listed and retrieved ('citations' is per work)
+AUTHORS = [
     # MORE GALEN - 97 works total, we got 5, get 10 more
-    print("Checking more Galen works (getting 10 more)...")
-    galen_works = get_available_works('tlg0057', max_works=15)
-    # Skip first 5 we already got
-    already_got = ['tlg001', 'tlg002', 'tlg003', 'tlg004', 'tlg006']
-    for work_code in galen_works:
-        if work_code not in already_got:
-            works.append({
-                'name': f'Galen, {work_code}',
-                'tlg_code': 'tlg0057',
-                'work_code': work_code,
-                'edition': '1st1K-grc1',
-                'author': 'Galen',
-                'work_title': f'Work {work_code}',
-                'citations': 2
-            })
-
+    {'author': 'Galen', 'tlg_code': 'tlg0057', 'max_works': 15, 'citations': 2,
+     'skip': ['tlg001', 'tlg002', 'tlg003', 'tlg004', 'tlg006']},
     # MORE HIPPOCRATES - 53 works total, we got 3, get 7 more
-    print("Checking more Hippocrates works (getting 7 more)...")
-    hippocrates_works = get_available_works('tlg0627', max_works=10)
-    already_got_hipp = ['tlg001', 'tlg002', 'tlg003']
-    for work_code in hippocrates_works:
-        if work_code not in already_got_hipp:
-            works.append({
-                'name': f'Hippocrates, {work_code}',
-                'tlg_code': 'tlg0627',
-                'work_code': work_code,
-                'edition': '1st1K-grc1',
-                'author': 'Hippocrates',
-                'work_title': f'Work {work_code}',
-                'citations': 1
-            })
-
+    {'author': 'Hippocrates', 'tlg_code': 'tlg0627', 'max_works': 10, 'citations': 1,
+     'skip': ['tlg001', 'tlg002', 'tlg003']},
     # AESCHINES
-    print("Checking Aeschines...")
-    aeschines_works = get_available_works('tlg0026', max_works=1)
-    for work_code in aeschines_works:
-        works.append({
-            'name': f'Aeschines, {work_code}',
-            'tlg_code': 'tlg0026',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Aeschines',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
+    {'author': 'Aeschines', 'tlg_code': 'tlg0026', 'max_works': 1, 'citations': 1},
     # APOLLONIUS DYSCOLUS
-    print("Checking Apollonius Dyscolus...")
-    apollonius_works = get_available_works('tlg0082', max_works=4)
-    for work_code in apollonius_works:
-        works.append({
-            'name': f'Apollonius Dyscolus, {work_code}',
-            'tlg_code': 'tlg0082',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Apollonius Dyscolus',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
+    {'author': 'Apollonius Dyscolus', 'tlg_code': 'tlg0082', 'max_works': 4, 'citations': 1},
     # ARRIAN
-    print("Checking Arrian...")
-    arrian_works = get_available_works('tlg0074', max_works=1)
-    for work_code in arrian_works:
-        works.append({
-            'name': f'Arrian, {work_code}',
-            'tlg_code': 'tlg0074',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Arrian',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'Arrian', 'tlg_code': 'tlg0074', 'max_works': 1, 'citations': 2},
     # HIPPOLYTUS
-    print("Checking Hippolytus...")
-    hippolytus_works = get_available_works('tlg2115', max_works=1)
-    for work_code in hippolytus_works:
-        works.append({
-            'name': f'Hippolytus, {work_code}',
-            'tlg_code': 'tlg2115',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Hippolytus',
-            'work_title': f'Work {work_code}',
-            'citations': 3
-        })
+    {'author': 'Hippolytus', 'tlg_code': 'tlg2115', 'max_works': 1, 'citations': 3},
+]
 
-    print(f"\n✓ Found {len(works)} works to retrieve")
 
-    results = []
-    total_citations = 0
-    successful_citations = 0
-    total_passages = 0
-
-    for i, work_info in enumerate(works, 1):
-        print(f"\n[{i}/{len(works)}] {work_info['name']}...")
-
-        try:
-            result = retriever.retrieve_work(work_info)
-
-            if result:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'passages': len(result['passages']),
-                    'success': True
-                })
-
-                total_citations += work_info['citations']
-                successful_citations += work_info['citations']
-                total_passages += len(result['passages'])
-            else:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'success': False,
-                    'error': 'Retrieval failed'
-                })
-                total_citations += work_info['citations']
-
-        except Exception as e:
-            print(f"✗ ERROR: {e}")
-            results.append({
-                'name': work_info['name'],
-                'citations': work_info['citations'],
-                'success': False,
-                'error': str(e)[:60]
-            })
-            total_citations += work_info['citations']
+def main():
+    """Final push to 40%"""
 
-        time.sleep(0.3)
+    retriever = First1KGreekRetriever()
 
-    # Final summary
-    print("\n" + "="*80)
-    print("FINAL PUSH COMPLETE")
     print("="*80)
-
-    successful = [r for r in results if r.get('success')]
-    failed = [r for r in results if not r.get('success')]
-
-    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(works)} works")
-    print(f"✓ Citations retrieved: {successful_citations}/{total_citations}")
-    print(f"✓ Total passages extracted: {total_passages}")
-
-    if successful:
-        print(f"\n✅ Successful: {len(successful)} works")
-        by_author = {}
-        for r in successful:
-            author = r['name'].split(',')[0]
-            if author not in by_author:
-                by_author[author] = []
-            by_author[author].append(r)
-
-        for author in sorted(by_author.keys()):
-            works_list = by_author[author]
-            total_cit = sum(w['citations'] for w in works_list)
-            total_pass = sum(w['passages'] for w in works_list)
-            print(f"  {author}: {len(works_list)} works, {total_cit} citations, {total_pass} passages")
-
-    # Cumulative progress
-    print("\n" + "="*80)
-    print("CUMULATIVE PROGRESS")
+    print("FINAL PUSH TO 40% COVERAGE")
     print("="*80)
+    print("\nCurrent: 912 citations (36.6%)")
+    print("Target: 1,000 citations (40.0%)")
+    print("Need: 88 more citations\n")
 
-    previous = 912
-    new_total = previous + successful_citations
-
-    print(f"Previous: {previous} citations")
-    print(f"New: {successful_citations} citations")
-    print(f"TOTAL: {new_total} / 2494 citations ({new_total/2494*100:.1f}%)")
+    print("\nListing available works...")
+    works = retriever.author_works(AUTHORS)
 
-    if new_total >= 1000:
-        print("\n🎉🎉🎉 40% MILESTONE REACHED!!! 🎉🎉🎉")
-    elif new_total >= 950:
-        print(f"\n✨ Close! Just {1000 - new_total} citations from 40%!")
+    run_batch(retriever, works, "FINAL PUSH COMPLETE", batch='final_push_40')
 
 
 if __name__ == '__main__':
@@ -14,268 +14,49 @@ Priority HIGH-impact texts (from database needs):
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import sys
-import time
-sys.path.append('.')
 from retrieve_first1k_tei import First1KGreekRetriever
-import requests
-
-def get_available_works(tlg_code, max_works=20):
-    """Check what works are actually available"""
-    url = f"https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            works = [item['name'] for item in resp.json() if item['type'] == 'dir']
-            return works[:max_works]
-    except:
-        pass
-    return []
-
-def main():
-    """Retrieve MISSING critical texts based on database needs"""
-
-    retriever = First1KGreekRetriever()
-
-    print("="*80)
-    print("MISSING CRITICAL TEXTS RETRIEVAL - Database-First Approach")
-    print("="*80)
-    print("\nRetrieving only what we NEED based on critical_citation_gaps.csv\n")
-
-    works = []
+from retrieval_engine import run_batch
 
+# Authors whose First1KGreek works are listed and retrieved ('citations' is per work)
+AUTHORS = [
     # ALEXANDER OF APHRODISIAS - 65 citations! (De Fato)
-    print("Checking Alexander of Aphrodisias (tlg0732 - De Fato)...")
-    alexander_works = get_available_works('tlg0732', max_works=10)
-    for work_code in alexander_works:
-        works.append({
-            'name': f'Alexander of Aphrodisias, {work_code}',
-            'tlg_code': 'tlg0732',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Alexander of Aphrodisias',
-            'work_title': f'Work {work_code}',
-            'citations': 65 if 'fato' in work_code.lower() else 5
-        })
-
+    # (work codes are tlgNNN, so per-work listings carry the general estimate)
+    {'author': 'Alexander of Aphrodisias', 'tlg_code': 'tlg0732', 'max_works': 10, 'citations': 5},
     # DIOGENES LAERTIUS - doxographical source
-    print("Checking Diogenes Laertius (tlg0004)...")
-    diogenes_works = get_available_works('tlg0004', max_works=1)
-    for work_code in diogenes_works:
-        works.append({
-            'name': f'Diogenes Laertius, {work_code}',
-            'tlg_code': 'tlg0004',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Diogenes Laertius',
-            'work_title': f'Work {work_code}',
-            'citations': 15
-        })
-
+    {'author': 'Diogenes Laertius', 'tlg_code': 'tlg0004', 'max_works': 1, 'citations': 15},
     # THEMISTIUS - commentator (likely has relevant material)
-    print("Checking Themistius (tlg2001)...")
-    themistius_works = get_available_works('tlg2001', max_works=5)
-    for work_code in themistius_works:
-        works.append({
-            'name': f'Themistius, {work_code}',
-            'tlg_code': 'tlg2001',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Themistius',
-            'work_title': f'Work {work_code}',
-            'citations': 5
-        })
-
+    {'author': 'Themistius', 'tlg_code': 'tlg2001', 'max_works': 5, 'citations': 5},
     # BASIL OF CAESAREA - patristic source
-    print("Checking Basil of Caesarea (tlg2040)...")
-    basil_works = get_available_works('tlg2040', max_works=10)
-    for work_code in basil_works:
-        works.append({
-            'name': f'Basil of Caesarea, {work_code}',
-            'tlg_code': 'tlg2040',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Basil of Caesarea',
-            'work_title': f'Work {work_code}',
-            'citations': 3
-        })
-
+    {'author': 'Basil of Caesarea', 'tlg_code': 'tlg2040', 'max_works': 10, 'citations': 3},
     # JOHN CHRYSOSTOM - 10 citations needed
-    print("Checking John Chrysostom (tlg2062)...")
-    chrysostom_works = get_available_works('tlg2062', max_works=5)
-    for work_code in chrysostom_works:
-        works.append({
-            'name': f'John Chrysostom, {work_code}',
-            'tlg_code': 'tlg2062',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'John Chrysostom',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'John Chrysostom', 'tlg_code': 'tlg2062', 'max_works': 5, 'citations': 2},
     # MAXIMUS OF TYRE - philosophical source
-    print("Checking Maximus of Tyre (tlg0583)...")
-    maximus_works = get_available_works('tlg0583', max_works=1)
-    for work_code in maximus_works:
-        works.append({
-            'name': f'Maximus of Tyre, {work_code}',
-            'tlg_code': 'tlg0583',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Maximus of Tyre',
-            'work_title': f'Work {work_code}',
-            'citations': 3
-        })
-
+    {'author': 'Maximus of Tyre', 'tlg_code': 'tlg0583', 'max_works': 1, 'citations': 3},
     # DIO CHRYSOSTOM - philosophical source
-    print("Checking Dio Chrysostom (tlg0612)...")
-    dio_works = get_available_works('tlg0612', max_works=5)
-    for work_code in dio_works:
-        works.append({
-            'name': f'Dio Chrysostom, {work_code}',
-            'tlg_code': 'tlg0612',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Dio Chrysostom',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'Dio Chrysostom', 'tlg_code': 'tlg0612', 'max_works': 5, 'citations': 2},
     # LUCIAN - satirical/philosophical source
-    print("Checking Lucian (tlg0062)...")
-    lucian_works = get_available_works('tlg0062', max_works=5)
-    for work_code in lucian_works:
-        works.append({
-            'name': f'Lucian, {work_code}',
-            'tlg_code': 'tlg0062',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Lucian',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'Lucian', 'tlg_code': 'tlg0062', 'max_works': 5, 'citations': 2},
     # MARCUS AURELIUS - Stoic emperor
-    print("Checking Marcus Aurelius (tlg0566)...")
-    marcus_works = get_available_works('tlg0566', max_works=1)
-    for work_code in marcus_works:
-        works.append({
-            'name': f'Marcus Aurelius, {work_code}',
-            'tlg_code': 'tlg0566',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Marcus Aurelius',
-            'work_title': f'Work {work_code}',
-            'citations': 5
-        })
-
+    {'author': 'Marcus Aurelius', 'tlg_code': 'tlg0566', 'max_works': 1, 'citations': 5},
     # CALLIMACHUS - possible citations
-    print("Checking Callimachus (tlg0533)...")
-    callimachus_works = get_available_works('tlg0533', max_works=3)
-    for work_code in callimachus_works:
-        works.append({
-            'name': f'Callimachus, {work_code}',
-            'tlg_code': 'tlg0533',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Callimachus',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
-    print(f"\n✓ Found {len(works)} works to retrieve")
-
-    results = []
-    total_citations = 0
-    successful_citations = 0
-    total_passages = 0
-
-    for i, work_info in enumerate(works, 1):
-        print(f"\n[{i}/{len(works)}] {work_info['name']}...")
+    {'author': 'Callimachus', 'tlg_code': 'tlg0533', 'max_works': 3, 'citations': 1},
+]
 
-        try:
-            result = retriever.retrieve_work(work_info)
 
-            if result:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'passages': len(result['passages']),
-                    'success': True
-                })
-
-                total_citations += work_info['citations']
-                successful_citations += work_info['citations']
-                total_passages += len(result['passages'])
-            else:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'success': False,
-                    'error': 'Retrieval failed'
-                })
-                total_citations += work_info['citations']
-
-        except Exception as e:
-            print(f"✗ ERROR: {e}")
-            results.append({
-                'name': work_info['name'],
-                'citations': work_info['citations'],
-                'success': False,
-                'error': str(e)[:60]
-            })
-            total_citations += work_info['citations']
+def main():
+    """Retrieve MISSING critical texts based on database needs"""
 
-        time.sleep(0.3)
+    retriever = First1KGreekRetriever()
 
-    # Final summary
-    print("\n" + "="*80)
-    print("MISSING CRITICAL TEXTS RETRIEVAL COMPLETE")
     print("="*80)
-
-    successful = [r for r in results if r.get('success')]
-    failed = [r for r in results if not r.get('success')]
-
-    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(works)} works")
-    print(f"✓ Citations retrieved: {successful_citations}/{total_citations}")
-    print(f"✓ Total passages extracted: {total_passages}")
-
-    if successful:
-        print(f"\n✅ Successful: {len(successful)} works")
-        by_author = {}
-        for r in successful:
-            author = r['name'].split(',')[0]
-            if author not in by_author:
-                by_author[author] = []
-            by_author[author].append(r)
-
-        for author in sorted(by_author.keys()):
-            works_list = by_author[author]
-            total_cit = sum(w['citations'] for w in works_list)
-            total_pass = sum(w['passages'] for w in works_list)
-            print(f"  {author}: {len(works_list)} works, {total_cit} citations, {total_pass} passages")
-
-    # Cumulative progress
-    print("\n" + "="*80)
-    print("CUMULATIVE PROGRESS")
+    print("MISSING CRITICAL TEXTS RETRIEVAL - Database-First Approach")
     print("="*80)
+    print("\nRetrieving only what we NEED based on critical_citation_gaps.csv\n")
 
-    previous = 912  # From 36.6% achievement
-    new_total = previous + successful_citations
-
-    print(f"Previous: {previous} citations (36.6%)")
-    print(f"New: {successful_citations} citations")
-    print(f"TOTAL: {new_total} / 2494 citations ({new_total/2494*100:.1f}%)")
-
-    if new_total >= 1000:
-        print("\n🎉🎉🎉 40% MILESTONE REACHED!!! 🎉🎉🎉")
-    elif new_total >= 950:
-        print(f"\n✨ Close! Just {1000 - new_total} citations from 40%!")
+    print("\nListing available works...")
+    works = retriever.author_works(AUTHORS)
 
-    # Highlight critical retrievals
-    if any('Alexander' in r['name'] for r in successful):
-        print("\n🎯 CRITICAL: Alexander of Aphrodisias retrieved! (65 citations)")
+    run_batch(retriever, works, "MISSING CRITICAL TEXTS RETRIEVAL COMPLETE", batch='missing_critical')
 
 
 if __name__ == '__main__':
@@ -7,178 +7,36 @@ Retrieves Epiphanius, Simplicius, Porphyry, Iamblichus from First1KGreek.
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import sys
-import time
 from retrieve_first1k_tei import First1KGreekRetriever
-import json
-import requests
-
-def get_available_works(tlg_code, max_works=10):
-    """Check what works are actually available"""
-    url = f"https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            works = [item['name'] for item in resp.json() if item['type'] == 'dir']
-            return works[:max_works]
-    except:
-        pass
-    return []
-
-def main():
-    """Batch retrieve neoplatonist and late antique authors from First1KGreek"""
-
-    retriever = First1KGreekRetriever()
-
-    print("="*80)
-    print("NEOPLATONIST & LATE ANTIQUE AUTHORS FIRST1KGREEK RETRIEVAL")
-    print("="*80)
-    print("\nRetrieving Epiphanius, Simplicius, Porphyry, Iamblichus...")
-
-    works = []
+from retrieval_engine import run_batch
 
+# Authors whose First1KGreek works are listed and retrieved ('citations' is per work)
+AUTHORS = [
     # EPIPHANIUS - 3 works
-    print("\nChecking Epiphanius works (3 available)...")
-    epiphanius_works = get_available_works('tlg2021', max_works=3)
-    for work_code in epiphanius_works:
-        works.append({
-            'name': f'Epiphanius, {work_code}',
-            'tlg_code': 'tlg2021',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Epiphanius',
-            'work_title': f'Work {work_code}',
-            'citations': 1  # Estimated
-        })
-
+    {'author': 'Epiphanius', 'tlg_code': 'tlg2021', 'max_works': 3, 'citations': 1},
     # SIMPLICIUS - 4 works (6 citations in database!)
-    print("Checking Simplicius works (4 available)...")
-    simplicius_works = get_available_works('tlg4013', max_works=4)
-    for work_code in simplicius_works:
-        works.append({
-            'name': f'Simplicius, {work_code}',
-            'tlg_code': 'tlg4013',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Simplicius',
-            'work_title': f'Work {work_code}',
-            'citations': 2  # Higher estimate for Simplicius
-        })
-
+    {'author': 'Simplicius', 'tlg_code': 'tlg4013', 'max_works': 4, 'citations': 2},
     # PORPHYRY - 8 works (select 5 most relevant)
-    print("Checking Porphyry works (8 available, getting 5)...")
-    porphyry_works = get_available_works('tlg2034', max_works=5)
-    for work_code in porphyry_works:
-        works.append({
-            'name': f'Porphyry, {work_code}',
-            'tlg_code': 'tlg2034',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Porphyry',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'Porphyry', 'tlg_code': 'tlg2034', 'max_works': 5, 'citations': 2},
     # IAMBLICHUS - 1 work
-    print("Checking Iamblichus work (1 available)...")
-    iamblichus_works = get_available_works('tlg2138', max_works=1)
-    for work_code in iamblichus_works:
-        works.append({
-            'name': f'Iamblichus, {work_code}',
-            'tlg_code': 'tlg2138',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Iamblichus',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
-    print(f"\n✓ Found {len(works)} works to retrieve")
+    {'author': 'Iamblichus', 'tlg_code': 'tlg2138', 'max_works': 1, 'citations': 1},
+]
 
-    results = []
-    total_citations = 0
-    successful_citations = 0
-    total_passages = 0
 
-    for i, work_info in enumerate(works, 1):
-        print(f"\n[{i}/{len(works)}] {work_info['name']}...")
-
-        try:
-            result = retriever.retrieve_work(work_info)
-
-            if result:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'passages': len(result['passages']),
-                    'success': True
-                })
-
-                total_citations += work_info['citations']
-                successful_citations += work_info['citations']
-                total_passages += len(result['passages'])
-            else:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'success': False,
-                    'error': 'Retrieval failed'
-                })
-                total_citations += work_info['citations']
-
-        except Exception as e:
-            print(f"✗ ERROR: {e}")
-            results.append({
-                'name': work_info['name'],
-                'citations': work_info['citations'],
-                'success': False,
-                'error': str(e)[:60]
-            })
-            total_citations += work_info['citations']
+def main():
+    """Batch retrieve neoplatonist and late antique authors from First1KGreek"""
 
-        time.sleep(0.3)
+    retriever = First1KGreekRetriever()
 
-    # Final summary
-    print("\n" + "="*80)
-    print("NEOPLATONIST RETRIEVAL COMPLETE")
     print("="*80)
-
-    successful = [r for r in results if r.get('success')]
-    failed = [r for r in results if not r.get('success')]
-
-    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(works)} works")
-    print(f"✓ Citations retrieved: {successful_citations}/{total_citations}")
-    print(f"✓ Total passages extracted: {total_passages}")
-
-    if successful:
-        print(f"\n✅ Successful: {len(successful)} works")
-        by_author = {}
-        for r in successful:
-            author = r['name'].split(',')[0]
-            if author not in by_author:
-                by_author[author] = []
-            by_author[author].append(r)
-
-        for author in sorted(by_author.keys()):
-            works_list = by_author[author]
-            total_cit = sum(w['citations'] for w in works_list)
-            total_pass = sum(w['passages'] for w in works_list)
-            print(f"  {author}: {len(works_list)} works, {total_cit} citations, {total_pass} passages")
-
-    # Cumulative progress
-    print("\n" + "="*80)
-    print("CUMULATIVE PROGRESS")
+    print("NEOPLATONIST & LATE ANTIQUE AUTHORS FIRST1KGREEK RETRIEVAL")
     print("="*80)
+    print("\nRetrieving Epiphanius, Simplicius, Porphyry, Iamblichus...")
 
-    previous = 730
-    new_total = previous + successful_citations
-
-    print(f"Previous: {previous} citations")
-    print(f"New: {successful_citations} citations")
-    print(f"TOTAL: {new_total} / 2494 citations ({new_total/2494*100:.1f}%)")
+    print("\nListing available works...")
+    works = retriever.author_works(AUTHORS)
 
-    if new_total >= 750:
-        print("\n🎉 30% MILESTONE REACHED! 🎉")
+    run_batch(retriever, works, "NEOPLATONIST RETRIEVAL COMPLETE", batch='neoplatonist_first1k')
 
 
 if __name__ == '__main__':
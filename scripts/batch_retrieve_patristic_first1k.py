@@ -8,203 +8,40 @@ Methodius, Cyril, Theodoret from First1KGreek.
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import sys
-import time
 from retrieve_first1k_tei import First1KGreekRetriever
-import json
-import requests
-
-def get_available_works(tlg_code, max_works=15):
-    """Check what works are actually available"""
-    url = f"https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
-    try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            works = [item['name'] for item in resp.json() if item['type'] == 'dir']
-            return works[:max_works]
-    except:
-        pass
-    return []
-
-def main():
-    """Batch retrieve patristic authors from First1KGreek"""
-
-    retriever = First1KGreekRetriever()
-
-    print("="*80)
-    print("PATRISTIC AUTHORS FIRST1KGREEK RETRIEVAL")
-    print("="*80)
-    print("\nRetrieving Justin Martyr, Clement, Irenaeus, Methodius, Cyril, Theodoret...")
-
-    works = []
+from retrieval_engine import run_batch
 
+# Authors whose First1KGreek works are listed and retrieved ('citations' is per work)
+AUTHORS = [
     # JUSTIN MARTYR - 3 works, 5 citations in database
-    print("\nChecking Justin Martyr works (3 available)...")
-    justin_works = get_available_works('tlg0645', max_works=3)
-    for work_code in justin_works:
-        works.append({
-            'name': f'Justin Martyr, {work_code}',
-            'tlg_code': 'tlg0645',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Justin Martyr',
-            'work_title': f'Work {work_code}',
-            'citations': 2  # Estimated per work
-        })
-
+    {'author': 'Justin Martyr', 'tlg_code': 'tlg0645', 'max_works': 3, 'citations': 2},
     # CLEMENT OF ALEXANDRIA - 5 works
-    print("Checking Clement of Alexandria works (5 available)...")
-    clement_works = get_available_works('tlg0555', max_works=5)
-    for work_code in clement_works:
-        works.append({
-            'name': f'Clement of Alexandria, {work_code}',
-            'tlg_code': 'tlg0555',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Clement of Alexandria',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'Clement of Alexandria', 'tlg_code': 'tlg0555', 'max_works': 5, 'citations': 2},
     # IRENAEUS - 2 works
-    print("Checking Irenaeus works (2 available)...")
-    irenaeus_works = get_available_works('tlg1447', max_works=2)
-    for work_code in irenaeus_works:
-        works.append({
-            'name': f'Irenaeus, {work_code}',
-            'tlg_code': 'tlg1447',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Irenaeus',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
+    {'author': 'Irenaeus', 'tlg_code': 'tlg1447', 'max_works': 2, 'citations': 1},
     # METHODIUS OF OLYMPUS - 11 works (get 5 most relevant)
-    print("Checking Methodius of Olympus works (11 available, getting 5)...")
-    methodius_works = get_available_works('tlg2959', max_works=5)
-    for work_code in methodius_works:
-        works.append({
-            'name': f'Methodius of Olympus, {work_code}',
-            'tlg_code': 'tlg2959',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Methodius of Olympus',
-            'work_title': f'Work {work_code}',
-            'citations': 2
-        })
-
+    {'author': 'Methodius of Olympus', 'tlg_code': 'tlg2959', 'max_works': 5, 'citations': 2},
     # CYRIL OF ALEXANDRIA - 1 work
-    print("Checking Cyril of Alexandria work (1 available)...")
-    cyril_works = get_available_works('tlg4090', max_works=1)
-    for work_code in cyril_works:
-        works.append({
-            'name': f'Cyril of Alexandria, {work_code}',
-            'tlg_code': 'tlg4090',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Cyril of Alexandria',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
+    {'author': 'Cyril of Alexandria', 'tlg_code': 'tlg4090', 'max_works': 1, 'citations': 1},
     # THEODORET OF CYRUS - 2 works
-    print("Checking Theodoret of Cyrus works (2 available)...")
-    theodoret_works = get_available_works('tlg4089', max_works=2)
-    for work_code in theodoret_works:
-        works.append({
-            'name': f'Theodoret of Cyrus, {work_code}',
-            'tlg_code': 'tlg4089',
-            'work_code': work_code,
-            'edition': '1st1K-grc1',
-            'author': 'Theodoret of Cyrus',
-            'work_title': f'Work {work_code}',
-            'citations': 1
-        })
-
-    print(f"\n✓ Found {len(works)} works to retrieve")
-
-    results = []
-    total_citations = 0
-    successful_citations = 0
-    total_passages = 0
-
-    for i, work_info in enumerate(works, 1):
-        print(f"\n[{i}/{len(works)}] {work_info['name']}...")
+    {'author': 'Theodoret of Cyrus', 'tlg_code': 'tlg4089', 'max_works': 2, 'citations': 1},
+]
 
-        try:
-            result = retriever.retrieve_work(work_info)
 
-            if result:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'passages': len(result['passages']),
-                    'success': True
-                })
-
-                total_citations += work_info['citations']
-                successful_citations += work_info['citations']
-                total_passages += len(result['passages'])
-            else:
-                results.append({
-                    'name': work_info['name'],
-                    'citations': work_info['citations'],
-                    'success': False,
-                    'error': 'Retrieval failed'
-                })
-                total_citations += work_info['citations']
-
-        except Exception as e:
-            print(f"✗ ERROR: {e}")
-            results.append({
-                'name': work_info['name'],
-                'citations': work_info['citations'],
-                'success': False,
-                'error': str(e)[:60]
-            })
-            total_citations += work_info['citations']
+def main():
+    """Batch retrieve patristic authors from First1KGreek"""
 
-        time.sleep(0.3)
+    retriever = First1KGreekRetriever()
 
-    # Final summary
-    print("\n" + "="*80)
-    print("PATRISTIC RETRIEVAL COMPLETE")
     print("="*80)
-
-    successful = [r for r in results if r.get('success')]
-    failed = [r for r in results if not r.get('success')]
-
-    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(works)} works")
-    print(f"✓ Citations retrieved: {successful_citations}/{total_citations}")
-    print(f"✓ Total passages extracted: {total_passages}")
-
-    if successful:
-        print(f"\n✅ Successful: {len(successful)} works")
-        by_author = {}
-        for r in successful:
-            author = r['name'].split(',')[0]
-            if author not in by_author:
-                by_author[author] = []
-            by_author[author].append(r)
-
-        for author in sorted(by_author.keys()):
-            works_list = by_author[author]
-            total_cit = sum(w['citations'] for w in works_list)
-            total_pass = sum(w['passages'] for w in works_list)
-            print(f"  {author}: {len(works_list)} works, {total_cit} citations, {total_pass} passages")
-
-    # Cumulative progress
-    print("\n" + "="*80)
-    print("CUMULATIVE PROGRESS")
+    print("PATRISTIC AUTHORS FIRST1KGREEK RETRIEVAL")
     print("="*80)
+    print("\nRetrieving Justin Martyr, Clement, Irenaeus, Methodius, Cyril, Theodoret...")
 
-    previous = 713
-    new_total = previous + successful_citations
+    print("\nListing available works...")
+    works = retriever.author_works(AUTHORS)
 
-    print(f"Previous: {previous} citations")
-    print(f"New: {successful_citations} citations")
-    print(f"TOTAL: {new_total} / 2494 citations ({new_total/2494*100:.1f}%)")
+    run_batch(retriever, works, "PATRISTIC RETRIEVAL COMPLETE", batch='patristic_first1k')
 
 
 if __name__ == '__main__':
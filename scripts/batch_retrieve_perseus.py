@@ -8,15 +8,15 @@ Handles different citation systems (sections, Bekker pages, book:line, etc.)
 NO HALLUCINATION - Only verified Perseus texts with full provenance.
 """
 
-import requests
-import time
 from bs4 import BeautifulSoup
 import json
 import re
 from typing import Dict, List, Optional, Tuple
-import sys
 from pathlib import Path
 
+from retrieval_engine import (FetchJob, FetchResult, RetrievalEngine, load_saved,
+                              retrieve_passages, state_file)
+
 class PerseusRetriever:
     """Handles all Perseus Digital Library retrievals"""
 
@@ -151,40 +151,29 @@ class PerseusRetriever:
         },
     }
 
-    def __init__(self, delay=0.5, output_dir='retrieved_texts'):
-        self.delay = delay
+    def __init__(self, output_dir='retrieved_texts', engine: Optional[RetrievalEngine] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic Research - Ancient Free Will Database'
-        })
-
-    def retrieve_text(self, url: str) -> Optional[str]:
-        """Generic text retrieval from Perseus"""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+        self.engine = engine or RetrievalEngine()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            text_div = soup.find('div', class_='text')
+    def parse_passage(self, result: FetchResult) -> Optional[str]:
+        """Text of a Perseus hopper page"""
+        soup = BeautifulSoup(result.body, 'html.parser')
+        text_div = soup.find('div', class_='text')
 
-            if not text_div:
-                return None
-
-            # Remove navigation
-            for elem in text_div.find_all(['div', 'span'], class_=['header', 'context']):
-                elem.decompose()
+        if not text_div:
+            return None
 
-            text = text_div.get_text(separator=' ', strip=True)
-            text = re.sub(r'\s+', ' ', text)
-            text = re.sub(r'\[\s*\d+\s*\]', '', text)
-            text = re.sub(r'\[p\.\s*\d+\]', '', text)
+        # Remove navigation
+        for elem in text_div.find_all(['div', 'span'], class_=['header', 'context']):
+            elem.decompose()
 
-            return text.strip() if text.strip() else None
+        text = text_div.get_text(separator=' ', strip=True)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\[\s*\d+\s*\]', '', text)
+        text = re.sub(r'\[p\.\s*\d+\]', '', text)
 
-        except Exception as e:
-            return None
+        return text.strip() if text.strip() else None
 
     def build_url(self, work_key: str, **kwargs) -> str:
         """Build Perseus URL based on work structure"""
@@ -226,118 +215,87 @@ class PerseusRetriever:
 
         return base
 
-    def retrieve_work(self, work_key: str) -> Dict:
-        """Retrieve complete work"""
+    def passage_jobs(self, work_key: str) -> List[FetchJob]:
+        """One Perseus request per passage of a work, keyed as in the saved content"""
         work_config = self.WORKS[work_key]
-
-        print(f"\n{'='*80}")
-        print(f"RETRIEVING: {work_config['author']}, {work_config['work']}")
-        print(f"Perseus ID: {work_config['perseus_id']}")
-        print(f"Structure: {work_config['structure']}")
-        print(f"{'='*80}\n")
-
-        work_data = {
-            'metadata': {
-                **work_config,
-                'retrieved_date': '2025-10-25',
-                'retrieval_status': 'in_progress'
-            },
-            'content': {}
-        }
-
         structure = work_config['structure']
-        success_count = 0
-        total_count = 0
+        passages = []
 
         if structure == 'sections':
             for section in work_config['sections']:
-                total_count += 1
-                print(f"  Section {section:3d} ", end='', flush=True)
-                url = self.build_url(work_key, section=section)
-                text = self.retrieve_text(url)
-                time.sleep(self.delay)
-
-                if text:
-                    work_data['content'][str(section)] = {
-                        'text': text,
-                        'url': url,
-                        'verification_status': 'perseus_verified'
-                    }
-                    success_count += 1
-                    print(f"✓ ({len(text):5d} chars)")
-                else:
-                    print("✗")
+                passages.append((str(section), self.build_url(work_key, section=section), {}))
 
         elif structure == 'book_lines':
-            for book, passages in work_config['books'].items():
-                print(f"\n  Book {book}:")
-                for passage in passages:
+            for book, spans in work_config['books'].items():
+                for passage in spans:
                     if isinstance(passage, tuple):
                         start, end = passage
-                        total_count += 1
-                        print(f"    Lines {start:4d}-{end:4d} ", end='', flush=True)
                         url = self.build_url(work_key, book=book, line_start=start, line_end=end)
-                        text = self.retrieve_text(url)
-                        time.sleep(self.delay)
-
-                        if text:
-                            key = f"book{book}_{start}_{end}"
-                            work_data['content'][key] = {
-                                'book': book,
-                                'lines': f"{start}-{end}",
-                                'text': text,
-                                'url': url,
-                                'verification_status': 'perseus_verified'
-                            }
-                            success_count += 1
-                            print(f"✓ ({len(text):5d} chars)")
-                        else:
-                            print("✗")
+                        passages.append((f"book{book}_{start}_{end}", url, {'book': book, 'lines': f"{start}-{end}"}))
 
         elif structure == 'book_chapter':
             for book, chapters in work_config['books'].items():
-                print(f"\n  Book {book}:")
                 for chapter in chapters:
-                    total_count += 1
-                    print(f"    Chapter {chapter:2d} ", end='', flush=True)
                     url = self.build_url(work_key, book=book, chapter=chapter)
-                    text = self.retrieve_text(url)
-                    time.sleep(self.delay)
-
-                    if text:
-                        key = f"book{book}_ch{chapter}"
-                        work_data['content'][key] = {
-                            'book': book,
-                            'chapter': chapter,
-                            'text': text,
-                            'url': url,
-                            'verification_status': 'perseus_verified'
-                        }
-                        success_count += 1
-                        print(f"✓ ({len(text):5d} chars)")
-                    else:
-                        print("✗")
-
-        work_data['metadata']['retrieval_status'] = 'completed'
-        work_data['metadata']['sections_retrieved'] = success_count
-        work_data['metadata']['sections_total'] = total_count
-
-        # Save
-        filename = self.output_dir / f"{work_key}.json"
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(work_data, f, indent=2, ensure_ascii=False)
-
-        print(f"\n{'='*80}")
-        print(f"✓ Retrieved {success_count}/{total_count} sections")
-        print(f"✓ Saved to: {filename}")
-        print(f"{'='*80}\n")
-
-        return work_data
+                    passages.append((f"book{book}_ch{chapter}", url, {'book': book, 'chapter': chapter}))
+
+        return [
+            FetchJob(key=f"{work_key}:{key}", url=url,
+                     meta={'work': work_key, 'passage': key,
+                           'entry': {**entry, 'url': url, 'verification_status': 'perseus_verified'}})
+            for key, url, entry in passages
+        ]
+
+    def retrieve_works(self, work_keys: List[str], batch: str = 'perseus',
+                       retry_failed: bool = False) -> Dict[str, Dict]:
+        """Retrieve every passage of the given works in one concurrent run, then save per work"""
+        jobs = {work_key: self.passage_jobs(work_key) for work_key in work_keys}
+        for work_key, work_jobs in jobs.items():
+            if not work_jobs:
+                print(f"⚠️  {work_key}: '{self.WORKS[work_key]['structure']}' structure not supported yet")
+
+        all_jobs = [job for work_jobs in jobs.values() for job in work_jobs]
+        print(f"\nRetrieving {len(all_jobs)} passages from {len(work_keys)} works...")
+        passages, stats = retrieve_passages(self.engine, all_jobs, self.parse_passage, batch, retry_failed)
+
+        saved = {}
+        for work_key in work_keys:
+            work_config = self.WORKS[work_key]
+            filename = self.output_dir / f"{work_key}.json"
+            content = load_saved(filename, 'content')
+            content.update(passages.get(work_key, {}))
+
+            # Citation ranges are work-list configuration, not provenance
+            metadata = {k: v for k, v in work_config.items() if k not in ('sections', 'books', 'bekker_range')}
+            work_data = {
+                'metadata': {
+                    **metadata,
+                    'retrieved_date': '2025-10-25',
+                    'retrieval_status': 'completed',
+                    'sections_retrieved': len(content),
+                    'sections_total': len(jobs[work_key]),
+                },
+                'content': content
+            }
+
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(work_data, f, indent=2, ensure_ascii=False)
+
+            print(f"\n{work_config['author']}, {work_config['work']} ({work_config['perseus_id']})")
+            print(f"✓ Retrieved {len(content)}/{len(jobs[work_key])} sections")
+            print(f"✓ Saved to: {filename}")
+            saved[work_key] = work_data
+
+        summary = stats.summary()
+        print(f"\n✓ {summary['succeeded']} passages fetched, {summary['failed']} failed, "
+              f"{summary['skipped']} from earlier runs ({summary['elapsed_seconds']}s)")
+        print(f"Job state: {state_file(batch)}")
+        return saved
 
 
 def main():
     """Batch retrieve all Perseus works"""
-    retriever = PerseusRetriever(delay=0.4)
+    retriever = PerseusRetriever()
 
     # Priority order
     works_to_retrieve = [
@@ -352,12 +310,7 @@ def main():
         'aristotle_de_interp',  # 18 citations
     ]
 
-    for work_key in works_to_retrieve:
-        try:
-            retriever.retrieve_work(work_key)
-        except Exception as e:
-            print(f"\n✗ ERROR retrieving {work_key}: {e}\n")
-            continue
+    retriever.retrieve_works(works_to_retrieve)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Corpus Build
+============
+Parses and normalises every retrieved text in parallel and writes one
+artefact per work, ready for database ingestion.
+
+- Inputs: the JSON files written by the retrieval scripts (passages,
+  Perseus content and book/chapter layouts) and raw TEI-XML files
+- Fan-out over a process pool, largest files first: workers pull the next
+  file as soon as they finish one, so one huge work cannot leave the other
+  cores idle at the end
+- Incremental: corpus/manifest.json records the sha256 of every input; only
+  new or changed inputs are processed, artefacts of deleted inputs removed
+
+Each artefact holds raw_text, normalized_text (same length, so every char
+offset is valid in both) and division rows with char offsets in the layout of
+free_will.text_divisions.
+
+Usage (from the repository root):
+    python scripts/build_corpus.py                  # incremental, all cores
+    python scripts/build_corpus.py --force          # rebuild everything
+    python scripts/build_corpus.py --workers 4
+
+NO HALLUCINATION - Texts are copied from the retrieved files; normalisation
+only folds case, diacritics and final sigma.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from tei_stream import parse_tei
+
+INPUT_DIR = Path('retrieved_texts')
+OUTPUT_DIR = Path('corpus')
+MANIFEST = 'manifest.json'
+
+# Bump when artefact contents change, so the next run rebuilds everything
+BUILD_VERSION = 1
+
+LANGUAGE_CODES = {'greek': 'grc', 'latin': 'lat', 'english': 'eng'}
+
+PASSAGE_SEP = '\n\n'
+
+# Text fields used by the older per-work layouts, in order of preference
+TEXT_FIELDS = ('text', 'greek', 'latin')
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atomic_write_json(path: Path, data: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            json.dump(data, handle, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+_FOLDED: Dict[str, str] = {}
+
+
+def _fold(char: str) -> str:
+    if char not in _FOLDED:
+        base = ''.join(c for c in unicodedata.normalize('NFD', char) if not unicodedata.combining(c)).lower()
+        base = base.replace('ς', 'σ')
+        # Length-preserving only: anything that would not fold to one char stays as it is
+        _FOLDED[char] = base if len(base) == 1 else char
+    return _FOLDED[char]
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip diacritics, fold final sigma; one output char per input char"""
+    return ''.join(_fold(char) for char in text)
+
+
+def _entry_text(entry) -> Optional[str]:
+    if isinstance(entry, str):
+        return entry
+    if isinstance(entry, dict):
+        for name in TEXT_FIELDS:
+            if isinstance(entry.get(name), str) and entry[name].strip():
+                return entry[name]
+    return None
+
+
+def json_passages(data: Dict) -> Iterator[Tuple[str, Optional[str], str]]:
+    """(reference, level, text) for every passage of a retrieved JSON file"""
+    for section in ('passages', 'content'):
+        for ref, entry in (data.get(section) or {}).items():
+            text = _entry_text(entry)
+            if text:
+                levels = [k for k in ('section', 'chapter', 'lines', 'book') if isinstance(entry, dict) and k in entry]
+                yield str(ref), levels[0] if levels else None, text
+    # {"books": {"II": {"passages" | "chapters": {"1-61": {...}}}}}
+    for book, content in (data.get('books') or {}).items():
+        for level in ('chapters', 'passages'):
+            for ref, entry in ((content or {}).get(level) or {}).items():
+                text = _entry_text(entry)
+                if text:
+                    yield f"{book}.{ref}", level.rstrip('s'), text
+
+
+def build_json(data: Dict) -> Tuple[str, List[Dict]]:
+    """Raw text and one division row per passage"""
+    parts: List[str] = []
+    divisions: List[Dict] = []
+    position = 0
+    for ref, level, text in json_passages(data):
+        text = unicodedata.normalize('NFC', text.strip())
+        if parts:
+            position += len(PASSAGE_SEP)
+        divisions.append({
+            'id': len(divisions), 'parent_id': None, 'type': 'textpart', 'subtype': level,
+            'n': ref.rsplit('.', 1)[-1], 'full_reference': ref, 'heading': None, 'language': None,
+            'speaker': None, 'char_position': position, 'char_length': len(text), 'xml_id': None,
+        })
+        parts.append(text)
+        position += len(text)
+    return PASSAGE_SEP.join(parts), divisions
+
+
+def build_tei(path: Path) -> Tuple[str, List[Dict]]:
+    document = parse_tei(str(path))
+    return document.text, [division.row() for division in document.divisions]
+
+
+def artefact_name(relative: str) -> str:
+    """Flat artefact file name for an input path relative to the input dir"""
+    return relative.replace('/', '__').rsplit('.', 1)[0] + '.json'
+
+
+def process_file(task: Tuple[str, str, str, str]) -> Dict:
+    """
+    Worker: parse and normalise one input and write its artefact
+
+    Args:
+        task: (input path, path relative to the input dir, input sha256, output dir)
+
+    Returns:
+        Manifest record for the input
+    """
+    path, relative, digest, output_dir = task
+    path = Path(path)
+    started = time.perf_counter()
+    record = {'sha256': digest, 'size': path.stat().st_size, 'version': BUILD_VERSION}
+    try:
+        metadata: Dict = {}
+        if path.suffix == '.xml':
+            raw_text, divisions = build_tei(path)
+        else:
+            with open(path, encoding='utf-8') as handle:
+                data = json.load(handle)
+            metadata = data.get('metadata') or {}
+            raw_text, divisions = build_json(data)
+
+        language = LANGUAGE_CODES.get(str(metadata.get('language', '')).lower())
+        if language is None and divisions:
+            language = divisions[0].get('language')
+        artefact = {
+            'source': relative,
+            'source_sha256': digest,
+            'build_version': BUILD_VERSION,
+            'title': metadata.get('work'),
+            'author': metadata.get('author'),
+            'language': language,
+            'metadata': metadata,
+            'raw_text': raw_text,
+            'normalized_text': normalize_text(raw_text),
+            'divisions': divisions,
+        }
+        output = artefact_name(relative)
+        atomic_write_json(Path(output_dir) / 'works' / output, artefact)
+        record.update(output=output, divisions=len(divisions), chars=len(raw_text))
+    except (OSError, ValueError, SyntaxError) as e:
+        # Unreadable file, truncated JSON (ValueError) or malformed XML (ET.ParseError is a SyntaxError)
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['seconds'] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def discover(input_dir: Path, output_dir: Path) -> List[Path]:
+    """Retrieved JSON and TEI files, skipping hidden dirs (job state, HTTP cache) and the output"""
+    found = []
+    for path in sorted(input_dir.rglob('*')):
+        relative = path.relative_to(input_dir)
+        if any(part.startswith('.') for part in relative.parts):
+            continue
+        if path.suffix not in ('.json', '.xml') or not path.is_file():
+            continue
+        if output_dir.resolve() in path.resolve().parents:
+            continue
+        found.append(path)
+    return found
+
+
+def load_manifest(output_dir: Path) -> Dict:
+    try:
+        with open(output_dir / MANIFEST, encoding='utf-8') as handle:
+            manifest = json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'files': {}}
+    return manifest if isinstance(manifest.get('files'), dict) else {'files': {}}
+
+
+def build_corpus(input_dir: Path = INPUT_DIR, output_dir: Path = OUTPUT_DIR,
+                 workers: Optional[int] = None, force: bool = False, verbose: bool = True) -> Dict:
+    """
+    Build (or bring up to date) the corpus artefacts
+
+    Returns:
+        Run summary: inputs, processed, unchanged, removed, failed, seconds
+    """
+    input_dir, output_dir = Path(input_dir), Path(output_dir)
+    started = time.perf_counter()
+    manifest = load_manifest(output_dir)
+    previous: Dict[str, Dict] = manifest['files']
+
+    inputs = {path.relative_to(input_dir).as_posix(): path for path in discover(input_dir, output_dir)}
+    tasks = []
+    files: Dict[str, Dict] = {}
+    for relative, path in inputs.items():
+        digest = file_sha256(path)
+        record = previous.get(relative)
+        fresh = (record and record.get('sha256') == digest and record.get('version') == BUILD_VERSION
+                 and ('error' in record or (output_dir / 'works' / record.get('output', '')).is_file()))
+        if fresh and not force:
+            files[relative] = record
+        else:
+            tasks.append((str(path), relative, digest, str(output_dir)))
+
+    removed = 0
+    for relative, record in previous.items():
+        if relative not in inputs and record.get('output'):
+            (output_dir / 'works' / record['output']).unlink(missing_ok=True)
+            removed += 1
+
+    # Largest first: the long tail is made of small files any idle worker can pick up
+    tasks.sort(key=lambda task: Path(task[0]).stat().st_size, reverse=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    if verbose:
+        print(f"{len(inputs)} inputs: {len(tasks)} to build, {len(files)} unchanged "
+              f"({workers} worker{'s' if workers > 1 else ''})")
+
+    def finished(records: Iterator[Dict]) -> None:
+        for task, record in records:
+            files[task[1]] = record
+            stale = previous.get(task[1], {}).get('output')
+            if 'error' in record and stale:
+                (output_dir / 'works' / stale).unlink(missing_ok=True)
+            if verbose:
+                mark = '✗' if 'error' in record else '✓'
+                detail = record.get('error') or f"{record['divisions']} divisions, {record['chars']:,} chars"
+                print(f"  {mark} {task[1]}: {detail} ({record['seconds']}s)")
+
+    try:
+        if workers == 1:
+            finished((task, process_file(task)) for task in tasks)
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                records = pool.imap_unordered(_process_with_task, tasks, chunksize=1)
+                finished(records)
+    finally:
+        # Save progress even when interrupted: finished inputs are not redone, and
+        # unfinished ones keep their old record so the hash mismatch rebuilds them
+        for task in tasks:
+            if task[1] not in files and task[1] in previous:
+                files[task[1]] = previous[task[1]]
+        manifest = {'build_version': BUILD_VERSION, 'input_dir': str(input_dir),
+                    'built': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'files': {relative: files[relative] for relative in sorted(files)}}
+        atomic_write_json(output_dir / MANIFEST, manifest)
+
+    built = [files[task[1]] for task in tasks if files[task[1]].get('sha256') == task[2]]
+    return {
+        'inputs': len(inputs),
+        'processed': len(built),
+        'unchanged': len(inputs) - len(tasks),
+        'removed': removed,
+        'failed': sum(1 for record in built if 'error' in record),
+        'workers': workers,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def _process_with_task(task: Tuple[str, str, str, str]) -> Tuple[Tuple[str, str, str, str], Dict]:
+    return task, process_file(task)
+
+
+def main():
+    """Build the corpus artefacts from retrieved_texts"""
+    parser = argparse.ArgumentParser(description="Parallel, incremental corpus build over retrieved texts")
+    parser.add_argument('--input', default=str(INPUT_DIR))
+    parser.add_argument('--output', default=str(OUTPUT_DIR))
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--force', action='store_true', help='Rebuild every input')
+    args = parser.parse_args()
+
+    print("="*80)
+    print("CORPUS BUILD")
+    print("="*80)
+    summary = build_corpus(Path(args.input), Path(args.output), args.workers, args.force)
+    print(f"\n✓ {summary['processed']} built, {summary['unchanged']} unchanged, {summary['removed']} removed "
+          f"in {summary['seconds']}s")
+    if summary['failed']:
+        print(f"✗ {summary['failed']} inputs failed (see {args.output}/{MANIFEST})")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,56 +11,38 @@ This creates the master work queue for systematic retrieval.
 """
 
 import json
-import re
-from typing import Dict, List, Optional, Tuple
+import sys
+from typing import Dict, List
 from collections import defaultdict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from services.citation_engine import (  # noqa: E402
+    BIBLICAL_BOOKS, CTS_WORKS, PATRISTIC_AUTHORS, CitationEngine, get_citation_engine
+)
+
+
 class CitationParser:
     """Parse and classify database citations"""
 
-    # Known CTS works
-    CTS_WORKS = {
-        'Cicero, De Fato': 'urn:cts:latinLit:phi0474.phi054',
-        'Cicero, Academica': 'urn:cts:latinLit:phi0474.phi006',
-        'Cicero, De Natura Deorum': 'urn:cts:latinLit:phi0474.phi038',
-        'Cicero, De Divinatione': 'urn:cts:latinLit:phi0474.phi024',
-        'Lucretius, De Rerum Natura': 'urn:cts:latinLit:phi0550.phi001',
-        'Aristotle, Nicomachean Ethics': 'urn:cts:greekLit:tlg0086.tlg010',
-        'Aristotle, De Interpretatione': 'urn:cts:greekLit:tlg0086.tlg013',
-        'Aristotle, Eudemian Ethics': 'urn:cts:greekLit:tlg0086.tlg011',
-        'Alexander of Aphrodisias, De Fato': 'urn:cts:greekLit:tlg0085.tlg014',
-        'Epictetus, Discourses': 'urn:cts:greekLit:tlg0557.tlg001',
-        'Plutarch, De Stoicorum Repugnantiis': 'urn:cts:greekLit:tlg0007.tlg096',
-        'Plotinus, Enneads': 'urn:cts:greekLit:tlg0062.tlg001',
-        'Aulus Gellius, Noctes Atticae': 'urn:cts:latinLit:phi1254.phi001',
-    }
-
-    # Patristic works in OGL
-    PATRISTIC_WORKS = [
-        'Origen', 'Augustine', 'Eusebius', 'Nemesius', 'Justin',
-        'Clement', 'Athanasius', 'Basil', 'Gregory', 'Ambrose',
-        'Jerome', 'Tertullian', 'Cyprian'
-    ]
-
-    # Biblical books
-    BIBLICAL_BOOKS = [
-        'Genesis', 'Exodus', 'Leviticus', 'Numbers', 'Deuteronomy',
-        'Romans', 'Galatians', 'Corinthians', 'Ephesians', 'Philippians',
-        'Colossians', 'Thessalonians', 'Timothy', 'Titus', 'Philemon',
-        'Hebrews', 'James', 'Peter', 'John', 'Jude', 'Revelation',
-        'Matthew', 'Mark', 'Luke', 'Acts',
-        'Sirach', 'Wisdom', 'Ezra', 'Hebrew Bible', 'Septuagint', 'LXX'
-    ]
-
-    def __init__(self, db_path='ancient_free_will_database.json'):
+    # Name lists live in the backend citation engine, shared with the API
+    CTS_WORKS = CTS_WORKS
+    PATRISTIC_WORKS = list(PATRISTIC_AUTHORS)
+    BIBLICAL_BOOKS = list(BIBLICAL_BOOKS)
+
+    def __init__(self, db_path='ancient_free_will_database.json', engine: CitationEngine = None):
         self.db_path = db_path
+        self.engine = engine or get_citation_engine()
         self.citations = []
         self.parsed_citations = []
         self.stats = defaultdict(int)
 
     def load_citations(self):
-        """Extract all citations from database"""
+        """Extract all citations from database (read once per parser)"""
+        if self.citations:
+            return
+
         with open(self.db_path, 'r', encoding='utf-8') as f:
             db = json.load(f)
 
@@ -88,91 +70,14 @@ class CitationParser:
 
     def classify_citation(self, citation_text: str) -> Dict:
         """Classify a single citation"""
-        result = {
-            'citation': citation_text,
-            'work': None,
-            'source_type': 'UNKNOWN',
-            'citation_format': 'UNKNOWN',
-            'retrieval_strategy': 'MANUAL',
-            'cts_urn': None,
-            'passages': [],
-            'confidence': 'low'
-        }
-
-        # Extract work name
-        match = re.match(r'^([^,\(]+(?:,\s*[^,\(]+)?)', citation_text)
-        if match:
-            result['work'] = match.group(1).strip()
-
-        # Check if CTS-available
-        if result['work'] in self.CTS_WORKS:
-            result['source_type'] = 'CTS'
-            result['cts_urn'] = self.CTS_WORKS[result['work']]
-            result['retrieval_strategy'] = 'CTS_AUTO'
-            result['confidence'] = 'high'
-
-        # Check if Patristic
-        elif any(name in citation_text for name in self.PATRISTIC_WORKS):
-            result['source_type'] = 'PATRISTIC'
-            result['retrieval_strategy'] = 'OGL_OR_PG'
-            result['confidence'] = 'medium'
-
-        # Check if Biblical
-        elif any(book in citation_text for book in self.BIBLICAL_BOOKS):
-            result['source_type'] = 'BIBLICAL'
-            result['retrieval_strategy'] = 'BIBLEHUB_OR_SEFARIA'
-            result['confidence'] = 'high'
-
-        # Detect citation format
-        self._detect_format(citation_text, result)
-
-        return result
-
-    def _detect_format(self, text: str, result: Dict):
-        """Detect citation format patterns"""
-
-        # Simple sections: "De Fato 28-33", "De Fato 43"
-        if re.search(r'\b\d+(?:-\d+)?\s*$', text):
-            result['citation_format'] = 'SIMPLE_SECTIONS'
-            matches = re.findall(r'\b(\d+)(?:-(\d+))?', text)
-            if matches:
-                for match in matches:
-                    start = int(match[0])
-                    end = int(match[1]) if match[1] else start
-                    result['passages'].extend(range(start, end+1))
-
-        # Bekker pages: "1113b", "1109b30-1111b3"
-        elif re.search(r'\b\d{4}[ab](?:\d+)?', text):
-            result['citation_format'] = 'BEKKER_PAGES'
-            bekker_refs = re.findall(r'(\d{4}[ab](?:\d+)?)', text)
-            result['passages'] = bekker_refs
-
-        # Book.Chapter: "III.5", "VII.2", "I.1"
-        elif re.search(r'\b[IVX]+\.\d+', text):
-            result['citation_format'] = 'BOOK_CHAPTER'
-            book_chapter = re.findall(r'([IVX]+)\.(\d+)', text)
-            result['passages'] = [f"{b}.{c}" for b, c in book_chapter]
-
-        # Book with line numbers: "Book II, 216-293"
-        elif re.search(r'Book\s+[IVX]+.*?\d+', text, re.IGNORECASE):
-            result['citation_format'] = 'BOOK_LINES'
-
-        # Chapter:Verse (Biblical): "Romans 9:19"
-        elif re.search(r'\b\d+:\d+', text):
-            result['citation_format'] = 'CHAPTER_VERSE'
-            cv_refs = re.findall(r'(\d+):(\d+(?:-\d+)?)', text)
-            result['passages'] = [f"{c}:{v}" for c, v in cv_refs]
-
-        # Generic "(complete text)"
-        elif '(complete' in text.lower():
-            result['citation_format'] = 'COMPLETE_TEXT'
+        return self.engine.classify(citation_text)
 
     def parse_all(self):
         """Parse and classify all citations"""
         print("\nParsing and classifying citations...")
 
-        for item in self.citations:
-            parsed = self.classify_citation(item['citation'])
+        classified = self.engine.classify_many(item['citation'] for item in self.citations)
+        for item, parsed in zip(self.citations, classified):
             parsed.update(item)
             self.parsed_citations.append(parsed)
 
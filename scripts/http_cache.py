@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+HTTP Response Cache
+===================
+Persistent on-disk cache for the retrieval engine.
+
+- Keyed by URL: one small JSON index entry per URL with its validators
+  (ETag / Last-Modified), so re-runs send conditional requests and an
+  unchanged text costs a 304 instead of a download
+- Content-addressed bodies: stored once per sha256, gzip-compressed, so the
+  same TEI file reached through several URLs is kept once
+- Offline mode (see RetrievalEngine): every response is served from the
+  cache and nothing touches the network, for reproducible corpus rebuilds
+
+Layout under the cache root:
+    index/ab/<sha256(url)>.json
+    objects/cd/<sha256(body)>.gz
+
+Usage (from the repository root):
+    python scripts/http_cache.py            # cache statistics
+    python scripts/http_cache.py --gc       # delete bodies no URL refers to
+
+NO HALLUCINATION - Cached bytes are exactly what the server sent.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+CACHE_DIR = Path(os.getenv('RETRIEVAL_CACHE_DIR', 'retrieved_texts/.http_cache'))
+
+# Response headers kept with an entry and replayed on cache hits
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write via a temporary file and rename, so readers never see a partial file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+@dataclass
+class CacheEntry:
+    """Index record for one URL"""
+    url: str
+    sha256: str
+    size: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    stored: str = ''
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        conditional = {}
+        if self.headers.get('ETag'):
+            conditional['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = self.headers['Last-Modified']
+        return conditional
+
+
+class ResponseCache:
+    """URL-keyed index over a content-addressed, compressed body store"""
+
+    def __init__(self, root: Path = CACHE_DIR, compresslevel: int = 6):
+        self.root = Path(root)
+        self.compresslevel = compresslevel
+
+    def _index_path(self, url: str) -> Path:
+        key = _sha256(url.encode('utf-8'))
+        return self.root / 'index' / key[:2] / f"{key}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        return self.root / 'objects' / digest[:2] / f"{digest}.gz"
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Index entry for ``url``, or None if it was never stored (or the entry is unreadable)"""
+        try:
+            with open(self._index_path(url), encoding='utf-8') as handle:
+                entry = CacheEntry(**json.load(handle))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+        return entry if entry.url == url else None
+
+    def read(self, entry: CacheEntry) -> Optional[bytes]:
+        """Body of an entry; None if the object is missing or fails its checksum"""
+        try:
+            with open(self._object_path(entry.sha256), 'rb') as handle:
+                body = gzip.decompress(handle.read())
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+        return body if _sha256(body) == entry.sha256 else None
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Cached body for ``url``"""
+        entry = self.lookup(url)
+        return self.read(entry) if entry else None
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes) -> CacheEntry:
+        """Store a successful response; identical bodies share one object"""
+        digest = _sha256(body)
+        path = self._object_path(digest)
+        if not path.exists():
+            _atomic_write(path, gzip.compress(body, self.compresslevel, mtime=0))
+
+        kept = {}
+        for name, value in headers.items():
+            for wanted in KEPT_HEADERS:
+                if name.lower() == wanted.lower():
+                    kept[wanted] = value
+        entry = CacheEntry(url=url, sha256=digest, size=len(body), headers=kept,
+                           stored=time.strftime('%Y-%m-%dT%H:%M:%S'))
+        _atomic_write(self._index_path(url), json.dumps(asdict(entry), ensure_ascii=False).encode('utf-8'))
+        return entry
+
+    def entries(self) -> Iterator[CacheEntry]:
+        for path in sorted((self.root / 'index').glob('*/*.json')):
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    yield CacheEntry(**json.load(handle))
+            except (json.JSONDecodeError, TypeError):
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        """Entry and object counts with raw and on-disk sizes"""
+        entries = list(self.entries())
+        objects = list((self.root / 'objects').glob('*/*.gz'))
+        unique = {entry.sha256: entry.size for entry in entries}
+        return {
+            'urls': len(entries),
+            'objects': len(objects),
+            'body_bytes': sum(unique.values()),
+            'stored_bytes': sum(path.stat().st_size for path in objects),
+        }
+
+    def gc(self) -> int:
+        """Delete objects no index entry refers to; returns how many were removed"""
+        referenced = {entry.sha256 for entry in self.entries()}
+        removed = 0
+        for path in (self.root / 'objects').glob('*/*.gz'):
+            if path.name[:-len('.gz')] not in referenced:
+                path.unlink()
+                removed += 1
+        return removed
+
+
+def main():
+    """Report on (or garbage-collect) the retrieval cache"""
+    parser = argparse.ArgumentParser(description="Inspect the retrieval HTTP cache")
+    parser.add_argument('--root', default=str(CACHE_DIR))
+    parser.add_argument('--gc', action='store_true', help='Delete bodies no cached URL refers to')
+    args = parser.parse_args()
+
+    cache = ResponseCache(Path(args.root))
+    if args.gc:
+        print(f"✓ Removed {cache.gc()} unreferenced objects")
+
+    stats = cache.stats()
+    ratio = stats['stored_bytes'] / stats['body_bytes'] if stats['body_bytes'] else 0.0
+    print(f"Cache: {cache.root}")
+    print(f"  URLs:    {stats['urls']:,}")
+    print(f"  Objects: {stats['objects']:,}")
+    print(f"  Bodies:  {stats['body_bytes']:,} bytes ({stats['stored_bytes']:,} on disk, {ratio:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+"""
+Async Retrieval Engine
+======================
+Shared fetch engine for the retrieve_* and batch_retrieve_* scripts.
+
+- Per-host concurrency limits and token-bucket rate limiting
+- Retries with jittered exponential backoff (Retry-After is honoured)
+- Resumable job state: an append-only JSONL file, finished jobs are skipped on re-run
+- Persistent response cache (http_cache.py): conditional re-fetches, and an
+  offline mode that serves every job from the cache
+
+Environment:
+    RETRIEVAL_CACHE=off      disable the response cache
+    RETRIEVAL_CACHE_DIR      cache location (default retrieved_texts/.http_cache)
+    RETRIEVAL_OFFLINE=1      serve from the cache only; uncached URLs fail
+
+Scripts describe WHAT to fetch (a list of FetchJob) and how to save each
+response; the engine decides WHEN, so politeness is a per-host budget rather
+than a fixed sleep after every request.
+
+NO HALLUCINATION - The engine only moves bytes; parsing stays in the retrievers.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from http_cache import ResponseCache
+
+USER_AGENT = 'Academic Research - Ancient Free Will Database'
+
+# Job state files live next to the texts they describe
+STATE_DIR = Path('retrieved_texts/.retrieval_state')
+
+# Transient statuses worth another attempt; everything else non-2xx is final
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+CACHE_ENABLED = os.getenv('RETRIEVAL_CACHE', 'on').lower() not in ('off', '0', 'false')
+OFFLINE = os.getenv('RETRIEVAL_OFFLINE', '').lower() in ('1', 'true', 'yes')
+
+# Default for RetrievalEngine(cache=...): the shared cache unless RETRIEVAL_CACHE=off
+_ENV_CACHE = object()
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    """Politeness budget for one host"""
+    concurrency: int = 4     # requests in flight
+    rate: float = 2.0        # sustained requests per second (0 = unlimited)
+    burst: int = 4           # token-bucket capacity
+
+
+DEFAULT_POLICY = HostPolicy()
+
+HOST_POLICIES = {
+    'raw.githubusercontent.com': HostPolicy(concurrency=8, rate=10.0, burst=10),
+    # Unauthenticated GitHub API: 60 requests/hour, so keep directory listings slow
+    'api.github.com': HostPolicy(concurrency=2, rate=1.0, burst=5),
+    'scaife.perseus.org': HostPolicy(concurrency=4, rate=3.0, burst=3),
+    'www.perseus.tufts.edu': HostPolicy(concurrency=2, rate=2.0, burst=2),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket by reservation
+
+    Each caller takes a token immediately and sleeps until the bucket would
+    have refilled to cover it, so waiters are served in arrival order without
+    a lock.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HostLimiter:
+    """Concurrency slots plus a token bucket for one host"""
+
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.semaphore = asyncio.Semaphore(max(1, policy.concurrency))
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random,
+                  retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server's Retry-After is a floor"""
+    delay = rng.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, min(cap, retry_after))
+    return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds (the HTTP-date form is ignored)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+@dataclass
+class FetchJob:
+    """One URL to fetch; ``key`` identifies it in the job state file"""
+    key: str
+    url: str
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).netloc
+
+
+@dataclass
+class FetchResult:
+    """Outcome of a job after all attempts"""
+    job: FetchJob
+    status: Optional[int] = None
+    body: bytes = b''
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+    cached: bool = False     # body came from the response cache (304 or offline)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    def text(self, encoding: str = 'utf-8') -> str:
+        return self.body.decode(encoding, errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class JobState:
+    """
+    Append-only JSONL record of finished jobs
+
+    The latest line per key wins and a truncated last line from an
+    interrupted run is ignored, so the file is safe to append to after a
+    crash.
+    """
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self._handle = None
+        if self.path and self.path.exists():
+            with open(self.path, encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.latest[str(record.get('key'))] = record
+
+    def completed(self, retry_failed: bool = False) -> Set[str]:
+        """Keys not to run again; failures count as done unless ``retry_failed``"""
+        return {key for key, record in self.latest.items() if record.get('success') or not retry_failed}
+
+    def failures(self) -> Dict[str, str]:
+        """Error of every key whose latest record failed"""
+        return {key: record.get('error') or 'Unknown error'
+                for key, record in self.latest.items() if not record.get('success')}
+
+    def record(self, key: str, success: bool, **info: Any) -> None:
+        entry = {'key': key, 'success': success, 'finished': time.strftime('%Y-%m-%dT%H:%M:%S'), **info}
+        self.latest[key] = entry
+        if not self.path:
+            return
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        self._handle.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+@dataclass
+class EngineStats:
+    """Counters for one engine run"""
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    cached: int = 0
+    bytes_fetched: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+    # Skipped jobs whose latest record is a failure, with the stored error
+    earlier_failures: Dict[str, str] = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        done = self.succeeded + self.failed
+        return {
+            'total': self.total,
+            'skipped': self.skipped,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'failed_earlier': len(self.earlier_failures),
+            'retries': self.retries,
+            'cached': self.cached,
+            'bytes_fetched': self.bytes_fetched,
+            'elapsed_seconds': round(elapsed, 1),
+            'jobs_per_second': round(done / elapsed, 2) if elapsed else 0.0,
+        }
+
+
+# Called with each successful FetchResult; may be sync or async. Raising marks the job failed.
+Handler = Callable[[FetchResult], Any]
+
+
+class RetrievalEngine:
+    """
+    Fetch many URLs concurrently within per-host politeness budgets
+
+    With a ``cache``, URLs fetched before are revalidated with conditional
+    requests and successful bodies are stored; ``offline`` serves every job
+    from the cache without a request (a cache miss fails the job).
+    """
+
+    def __init__(self, policies: Optional[Dict[str, HostPolicy]] = None,
+                 default_policy: HostPolicy = DEFAULT_POLICY, max_attempts: int = 4,
+                 backoff: float = 0.5, max_backoff: float = 30.0, timeout: float = 30.0,
+                 user_agent: str = USER_AGENT, seed: Optional[int] = None, verbose: bool = True,
+                 cache: Any = _ENV_CACHE, offline: Optional[bool] = None):
+        self.policies = dict(HOST_POLICIES if policies is None else policies)
+        self.default_policy = default_policy
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.random = random.Random(seed)
+        self.verbose = verbose
+        self.cache: Optional[ResponseCache] = (ResponseCache() if CACHE_ENABLED else None) if cache is _ENV_CACHE else cache
+        self.offline = OFFLINE if offline is None else offline
+        if self.offline and self.cache is None:
+            raise ValueError("offline retrieval needs a response cache")
+        self._limiters: Dict[str, HostLimiter] = {}
+
+    def limiter(self, host: str) -> HostLimiter:
+        if host not in self._limiters:
+            self._limiters[host] = HostLimiter(self.policies.get(host, self.default_policy))
+        return self._limiters[host]
+
+    def session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            headers={'User-Agent': self.user_agent},
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    async def _request(self, session: aiohttp.ClientSession, job: FetchJob,
+                       headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """One HTTP attempt"""
+        async with session.get(job.url, headers=headers) as response:
+            return response.status, dict(response.headers), await response.read()
+
+    async def _cached_request(self, session: aiohttp.ClientSession,
+                              job: FetchJob) -> Tuple[int, Dict[str, str], bytes, bool]:
+        """One HTTP attempt through the cache: conditional if the URL was seen before"""
+        entry = await asyncio.to_thread(self.cache.lookup, job.url)
+        if entry is not None:
+            status, headers, body = await self._request(session, job, entry.validators())
+            if status == 304:
+                cached = await asyncio.to_thread(self.cache.read, entry)
+                if cached is not None:
+                    return 200, dict(entry.headers), cached, True
+                # Body lost from the object store: fetch it in full
+                status, headers, body = await self._request(session, job)
+        else:
+            status, headers, body = await self._request(session, job)
+        if 200 <= status < 300:
+            await asyncio.to_thread(self.cache.store, job.url, headers, body)
+        return status, headers, body, False
+
+    async def _from_cache(self, job: FetchJob) -> FetchResult:
+        """Offline result for a job"""
+        result = FetchResult(job, attempts=1)
+        entry = await asyncio.to_thread(self.cache.lookup, job.url)
+        body = await asyncio.to_thread(self.cache.read, entry) if entry else None
+        if body is None:
+            result.error = 'not in cache (offline)'
+        else:
+            result.status, result.headers, result.body, result.cached = 200, dict(entry.headers), body, True
+        return result
+
+    async def fetch(self, session: aiohttp.ClientSession, job: FetchJob,
+                    stats: Optional[EngineStats] = None) -> FetchResult:
+        """Fetch one job, retrying transient failures with jittered backoff"""
+        if self.offline:
+            return await self._from_cache(job)
+        limiter = self.limiter(job.host)
+        result = FetchResult(job)
+        started = time.monotonic()
+
+        for attempt in range(1, self.max_attempts + 1):
+            result.attempts = attempt
+            retry_after = None
+            async with limiter.semaphore:
+                await limiter.bucket.acquire()
+                try:
+                    if self.cache is None:
+                        result.status, result.headers, result.body = await self._request(session, job)
+                    else:
+                        result.status, result.headers, result.body, result.cached = \
+                            await self._cached_request(session, job)
+                    result.error = None if 200 <= result.status < 300 else f"HTTP {result.status}"
+                    retryable = result.status in RETRY_STATUSES
+                    retry_after = parse_retry_after(result.headers.get('Retry-After'))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result.status, result.body = None, b''
+                    result.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                    retryable = True
+
+            if result.error is None or not retryable or attempt == self.max_attempts:
+                break
+            delay = backoff_delay(attempt, self.backoff, self.max_backoff, self.random, retry_after)
+            if stats is not None:
+                stats.retries += 1
+            if self.verbose:
+                print(f"  ↻ {job.key}: {result.error}, retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        result.elapsed = time.monotonic() - started
+        return result
+
+    async def fetch_all(self, jobs: Iterable[FetchJob]) -> Dict[str, FetchResult]:
+        """Fetch without job state (discovery requests, listings)"""
+        jobs = list(jobs)
+        self._limiters = {}
+        async with self.session() as session:
+            results = await asyncio.gather(*(self.fetch(session, job) for job in jobs))
+        return {result.job.key: result for result in results}
+
+    async def run(self, jobs: Iterable[FetchJob], handler: Optional[Handler] = None,
+                  state_path: Optional[Path] = None, retry_failed: bool = False,
+                  limit: Optional[int] = None) -> EngineStats:
+        """
+        Fetch every job not already finished in ``state_path`` and hand successes to ``handler``
+
+        Args:
+            jobs: Work list; keys must be unique
+            handler: Saves one successful result; raising marks the job failed
+            state_path: JSONL job state (None = no resume)
+            retry_failed: Re-run jobs whose latest record failed
+            limit: Run at most this many new jobs
+
+        Returns:
+            EngineStats for this run
+        """
+        jobs = list(jobs)
+        # Semaphores belong to the loop they were first used on; each run gets fresh ones
+        self._limiters = {}
+        state = JobState(state_path)
+        done = state.completed(retry_failed)
+        pending = [job for job in jobs if job.key not in done]
+        if limit is not None:
+            pending = pending[:limit]
+        stats = EngineStats(total=len(jobs), skipped=len(jobs) - len(pending))
+        earlier = state.failures()
+        stats.earlier_failures = {job.key: earlier[job.key] for job in jobs
+                                  if job.key in done and job.key in earlier}
+        if self.verbose and stats.skipped:
+            print(f"Resuming: {stats.skipped} of {len(jobs)} jobs already finished ({state.path})")
+            if stats.earlier_failures:
+                print(f"  {len(stats.earlier_failures)} of them failed and are not retried")
+
+        async def process(session: aiohttp.ClientSession, job: FetchJob) -> None:
+            result = await self.fetch(session, job, stats)
+            error = result.error
+            if result.ok:
+                if result.cached:
+                    stats.cached += 1
+                else:
+                    stats.bytes_fetched += len(result.body)
+                if handler is not None:
+                    try:
+                        outcome = handler(result)
+                        if inspect.isawaitable(outcome):
+                            await outcome
+                    except Exception as e:
+                        error = f"handler: {e}"
+            if error is None:
+                stats.succeeded += 1
+            else:
+                stats.failed += 1
+                stats.failures[job.key] = error
+                if self.verbose:
+                    print(f"  ✗ {job.key}: {error}")
+            state.record(job.key, error is None, url=job.url, status=result.status,
+                         attempts=result.attempts, error=error)
+
+        try:
+            async with self.session() as session:
+                await asyncio.gather(*(process(session, job) for job in pending))
+        finally:
+            state.close()
+        return stats
+
+    def run_sync(self, jobs: Iterable[FetchJob], handler: Optional[Handler] = None,
+                 state_path: Optional[Path] = None, retry_failed: bool = False,
+                 limit: Optional[int] = None) -> EngineStats:
+        """``run`` for synchronous scripts"""
+        return asyncio.run(self.run(jobs, handler, state_path, retry_failed, limit))
+
+
+def state_file(name: str) -> Path:
+    """Job state path for a named batch"""
+    return STATE_DIR / f"{name}.jsonl"
+
+
+def safe_filename(name: str) -> str:
+    """File stem used by the retrievers for a work name"""
+    for char in (',', '.', '(', ')'):
+        name = name.replace(char, '')
+    return name.lower().replace(' ', '_')
+
+
+class WorkRetriever:
+    """
+    Base for retrievers that download one file per work
+
+    Subclasses turn a work dict into a FetchJob (``job_for``) and a
+    successful response into saved work data (``save_work``); the batch
+    scripts only supply the work lists.
+    """
+
+    # Default job state name for retrieve_works
+    batch_name = 'works'
+
+    def __init__(self, output_dir: str, engine: Optional[RetrievalEngine] = None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.engine = engine or RetrievalEngine()
+
+    def job_for(self, work_info: Dict) -> FetchJob:
+        raise NotImplementedError
+
+    def save_work(self, work_info: Dict, result: FetchResult) -> Dict:
+        raise NotImplementedError
+
+    def retrieve_work(self, work_info: Dict) -> Optional[Dict]:
+        """Retrieve a single work (no job state)"""
+        saved: Dict[str, Dict] = {}
+        self.engine.run_sync([self.job_for(work_info)], lambda result: saved.update(work=self.save_work(work_info, result)))
+        return saved.get('work')
+
+    def retrieve_works(self, works: List[Dict], batch: Optional[str] = None,
+                       retry_failed: bool = False) -> Tuple[List[Dict], EngineStats]:
+        """
+        Retrieve a work list concurrently, resuming from the batch's job state
+
+        Returns:
+            One result row per work (in input order) and the engine stats
+        """
+        jobs = []
+        for work_info in works:
+            job = self.job_for(work_info)
+            job.meta['work'] = work_info
+            jobs.append(job)
+        saved: Dict[str, Dict] = {}
+
+        def handle(result: FetchResult) -> None:
+            saved[result.job.key] = self.save_work(result.job.meta['work'], result)
+
+        stats = self.engine.run_sync(jobs, handle, state_file(batch or self.batch_name), retry_failed)
+
+        rows = []
+        for job in jobs:
+            work_info = job.meta['work']
+            row = {'name': work_info['name'], 'citations': work_info.get('citations', 0)}
+            if job.key in saved:
+                row.update(success=True, passages=len(saved[job.key]['passages']))
+            elif job.key in stats.failures:
+                row.update(success=False, error=stats.failures[job.key][:60])
+            elif job.key in stats.earlier_failures:
+                row.update(success=False, skipped=True, error=stats.earlier_failures[job.key][:60])
+            else:
+                row.update(success=True, skipped=True, passages=0)
+            rows.append(row)
+        return rows, stats
+
+
+def retrieve_passages(engine: RetrievalEngine, jobs: List[FetchJob], parse: Callable[[FetchResult], Optional[str]],
+                      batch: Optional[str] = None, retry_failed: bool = False
+                      ) -> Tuple[Dict[str, Dict[str, Dict]], EngineStats]:
+    """
+    Fetch passage-level jobs and group the parsed texts by work
+
+    Each job's meta holds 'work' and 'passage' keys plus an optional 'entry'
+    dict stored alongside the text. ``parse`` turns a response into text;
+    returning nothing marks the passage failed. With a ``batch`` name,
+    passages finished in earlier runs are skipped, so callers merge the result
+    into what they saved before.
+    """
+    passages: Dict[str, Dict[str, Dict]] = {}
+
+    def handle(result: FetchResult) -> None:
+        text = parse(result)
+        if not text:
+            raise ValueError('no text in response')
+        meta = result.job.meta
+        passages.setdefault(meta['work'], {})[str(meta['passage'])] = {**meta.get('entry', {}), 'text': text}
+        if engine.verbose:
+            print(f"  ✓ {result.job.key} ({len(text):5d} chars)")
+
+    stats = engine.run_sync(jobs, handle, state_file(batch) if batch else None, retry_failed)
+    return passages, stats
+
+
+def load_saved(path: Path, section: str) -> Dict[str, Dict]:
+    """Passages already saved under ``section`` of a work file from an earlier run"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get(section, {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Missing, or truncated by an interrupted save: start the work afresh
+        return {}
+
+
+def print_report(title: str, rows: List[Dict], stats: EngineStats) -> None:
+    """Summary shared by the batch scripts"""
+    print("\n" + "="*80)
+    print(title)
+    print("="*80)
+
+    successful = [r for r in rows if r.get('success')]
+    failed = [r for r in rows if not r.get('success')]
+    fetched = [r for r in successful if not r.get('skipped')]
+    summary = stats.summary()
+
+    print(f"\n✓ Successfully retrieved: {len(successful)}/{len(rows)} works "
+          f"({len(fetched)} this run, {len(successful) - len(fetched)} from earlier runs)")
+    print(f"✓ Citations covered: {sum(r['citations'] for r in successful)}/{sum(r['citations'] for r in rows)}")
+    print(f"✓ Passages extracted this run: {sum(r.get('passages', 0) for r in fetched)}")
+    print(f"✓ {summary['bytes_fetched']:,} bytes in {summary['elapsed_seconds']}s, "
+          f"{summary['cached']} from cache, {summary['retries']} retries")
+
+    if fetched:
+        by_author: Dict[str, List[Dict]] = {}
+        for r in fetched:
+            by_author.setdefault(r['name'].split(',')[0], []).append(r)
+        print("\nRetrieved this run:")
+        for author in sorted(by_author):
+            works_list = by_author[author]
+            print(f"  {author}: {len(works_list)} works, {sum(w['citations'] for w in works_list)} citations, "
+                  f"{sum(w['passages'] for w in works_list)} passages")
+
+    if failed:
+        print(f"\n✗ Failed: {len(failed)} works (re-run with --retry-failed)")
+        for r in failed:
+            print(f"  ✗ {r['name']:50s} {r.get('error', 'Unknown error')}")
+
+
+def add_cache_options(parser: argparse.ArgumentParser) -> None:
+    """--offline / --no-cache flags shared by the retrieval scripts"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--offline', action='store_true', help='Serve every request from the response cache')
+    group.add_argument('--no-cache', action='store_true', help='Bypass the response cache')
+
+
+def apply_cache_options(engine: RetrievalEngine, args: argparse.Namespace) -> None:
+    if args.no_cache:
+        engine.cache, engine.offline = None, False
+    elif args.offline:
+        engine.cache = engine.cache or ResponseCache()
+        engine.offline = True
+
+
+def run_batch(retriever: WorkRetriever, works: List[Dict], title: str, batch: str,
+              argv: Optional[List[str]] = None) -> List[Dict]:
+    """Entry point for the batch_retrieve_* scripts"""
+    parser = argparse.ArgumentParser(description=title)
+    parser.add_argument('--retry-failed', action='store_true', help='Re-run works whose last attempt failed')
+    add_cache_options(parser)
+    args = parser.parse_args(argv)
+    apply_cache_options(retriever.engine, args)
+
+    print(f"\n{len(works)} works queued (job state: {state_file(batch)})")
+    rows, stats = retriever.retrieve_works(works, batch=batch, retry_failed=args.retry_failed)
+    print_report(title, rows, stats)
+    print(f"\n✓ All retrieved texts saved to: {retriever.output_dir}/")
+    return rows
@@ -12,151 +12,118 @@ Sources:
 NO HALLUCINATION - Only verified biblical texts with proper sourcing.
 """
 
-import requests
-import time
 from bs4 import BeautifulSoup
 import json
 import re
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from retrieval_engine import FetchJob, FetchResult, RetrievalEngine, retrieve_passages
+
+BIBLEHUB_METADATA = {
+    'testament': 'New Testament',
+    'language': 'Greek (Koine)',
+    'source': 'BibleHub Berean Interlinear',
+    'greek_base': 'Berean Interlinear Bible',
+    'english_translation': 'Berean Study Bible',
+    'retrieved_date': '2025-10-25',
+    'license': 'Free for academic use, attribution required',
+}
+
 class BiblicalTextRetriever:
     """Retrieve biblical texts from authoritative free sources"""
 
-    def __init__(self, delay=0.5, output_dir='retrieved_texts/biblical'):
-        self.delay = delay
+    # BibleHub interlinear books: chapter count, output file and extra metadata
+    BOOKS = {
+        'romans': {
+            'book': 'Romans',
+            'chapters': 16,
+            'filename': 'romans_greek.json',
+            # BibleHub structure: Greek text in specific divs
+            'require_chap_div': True,
+            'metadata': {'notes': 'Based on critical Greek text'},
+        },
+        'galatians': {
+            'book': 'Galatians',
+            'chapters': 6,
+            'filename': 'galatians_greek.json',
+            'require_chap_div': False,
+            'metadata': {},
+        },
+    }
+
+    def __init__(self, output_dir='retrieved_texts/biblical', engine: Optional[RetrievalEngine] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic Research - Ancient Free Will Database'
-        })
+        self.engine = engine or RetrievalEngine()
+
+    def parse_chapter(self, result: FetchResult) -> Optional[str]:
+        """Chapter status; detailed verse parsing is still manual"""
+        if not self.BOOKS[result.job.meta['work']]['require_chap_div']:
+            return 'retrieved'
+        soup = BeautifulSoup(result.body, 'html.parser')
+        # This is a simplified extraction - would need detailed parsing
+        return 'retrieved' if soup.find('div', class_='chap') else None
+
+    def retrieve_books(self, book_keys: List[str]) -> Dict[str, Dict]:
+        """Retrieve every chapter of the given books in one concurrent run"""
+        jobs = []
+        for key in book_keys:
+            for chapter in range(1, self.BOOKS[key]['chapters'] + 1):
+                url = f"https://biblehub.com/interlinear/{key}/{chapter}.htm"
+                jobs.append(FetchJob(key=f"{key}:{chapter}", url=url,
+                                     meta={'work': key, 'passage': chapter, 'entry': {'url': url}}))
 
-    def retrieve_romans_biblehub(self) -> Dict:
-        """Retrieve complete book of Romans (Greek + English)"""
         print(f"\n{'='*80}")
-        print("RETRIEVING: Romans (New Testament)")
+        print(f"RETRIEVING: {', '.join(self.BOOKS[key]['book'] for key in book_keys)} (New Testament)")
         print("Source: BibleHub Berean Interlinear")
         print(f"{'='*80}\n")
 
-        romans_data = {
-            'metadata': {
-                'book': 'Romans',
-                'testament': 'New Testament',
-                'language': 'Greek (Koine)',
-                'source': 'BibleHub Berean Interlinear',
-                'greek_base': 'Berean Interlinear Bible',
-                'english_translation': 'Berean Study Bible',
-                'url': 'https://biblehub.com/interlinear/romans/',
-                'retrieved_date': '2025-10-25',
-                'license': 'Free for academic use, attribution required',
-                'notes': 'Based on critical Greek text'
-            },
-            'chapters': {}
-        }
-
-        # Romans has 16 chapters
-        for chapter in range(1, 17):
-            print(f"  Chapter {chapter:2d} ", end='', flush=True)
-
-            url = f"https://biblehub.com/interlinear/romans/{chapter}.htm"
-
-            try:
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # BibleHub structure: Greek text in specific divs
-                # This is a simplified extraction - would need detailed parsing
-                text_content = soup.find('div', class_='chap')
-
-                if text_content:
-                    # Extract verse data (simplified)
-                    romans_data['chapters'][str(chapter)] = {
-                        'url': url,
-                        'status': 'retrieved',
-                        'note': 'Detailed verse parsing needed - manual verification required'
-                    }
-                    print("✓ (structure found - needs detailed parsing)")
-                else:
-                    print("✗ (no content)")
-
-                time.sleep(self.delay)
-
-            except Exception as e:
-                print(f"✗ ({str(e)[:30]})")
-
-        # Save
-        filename = self.output_dir / 'romans_greek.json'
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(romans_data, f, indent=2, ensure_ascii=False)
-
-        print(f"\n✓ Saved to: {filename}")
-        print(f"⚠️  NOTE: Detailed verse parsing needs custom implementation")
-        print(f"{'='*80}\n")
-
-        return romans_data
-
-    def retrieve_galatians_biblehub(self) -> Dict:
-        """Retrieve Galatians"""
-        print(f"\n{'='*80}")
-        print("RETRIEVING: Galatians (New Testament)")
-        print("Source: BibleHub Berean Interlinear")
-        print(f"{'='*80}\n")
-
-        galatians_data = {
-            'metadata': {
-                'book': 'Galatians',
-                'testament': 'New Testament',
-                'language': 'Greek (Koine)',
-                'source': 'BibleHub Berean Interlinear',
-                'greek_base': 'Berean Interlinear Bible',
-                'english_translation': 'Berean Study Bible',
-                'url': 'https://biblehub.com/interlinear/galatians/',
-                'retrieved_date': '2025-10-25',
-                'license': 'Free for academic use, attribution required',
-            },
-            'chapters': {}
-        }
-
-        # Galatians has 6 chapters
-        for chapter in range(1, 7):
-            print(f"  Chapter {chapter} ", end='', flush=True)
-
-            url = f"https://biblehub.com/interlinear/galatians/{chapter}.htm"
-
-            try:
-                response = self.session.get(url, timeout=15)
-                response.raise_for_status()
-
-                galatians_data['chapters'][str(chapter)] = {
-                    'url': url,
-                    'status': 'retrieved',
+        chapters, _ = retrieve_passages(self.engine, jobs, self.parse_chapter)
+
+        books = {}
+        for key in book_keys:
+            config = self.BOOKS[key]
+            book_data = {
+                'metadata': {
+                    'book': config['book'],
+                    **BIBLEHUB_METADATA,
+                    'url': f'https://biblehub.com/interlinear/{key}/',
+                    **config['metadata'],
+                },
+                'chapters': {
+                    number: {'url': entry['url'], 'status': entry['text'],
+                             **({'note': 'Detailed verse parsing needed - manual verification required'}
+                                if config['require_chap_div'] else {})}
+                    for number, entry in sorted(chapters.get(key, {}).items(), key=lambda item: int(item[0]))
                 }
-                print("✓")
-                time.sleep(self.delay)
+            }
 
-            except Exception as e:
-                print(f"✗ ({str(e)[:30]})")
+            filename = self.output_dir / config['filename']
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(book_data, f, indent=2, ensure_ascii=False)
 
-        # Save
-        filename = self.output_dir / 'galatians_greek.json'
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(galatians_data, f, indent=2, ensure_ascii=False)
+            print(f"\n✓ {config['book']}: {len(book_data['chapters'])}/{config['chapters']} chapters")
+            print(f"✓ Saved to: {filename}")
+            books[key] = book_data
 
-        print(f"\n✓ Saved to: {filename}")
-        print(f"{'='*80}\n")
+        return books
 
-        return galatians_data
+    def retrieve_romans_biblehub(self) -> Dict:
+        """Retrieve complete book of Romans (Greek + English)"""
+        return self.retrieve_books(['romans'])['romans']
+
+    def retrieve_galatians_biblehub(self) -> Dict:
+        """Retrieve Galatians"""
+        return self.retrieve_books(['galatians'])['galatians']
 
 def main():
     """Retrieve key biblical texts"""
-    retriever = BiblicalTextRetriever(delay=0.5)
+    retriever = BiblicalTextRetriever()
 
     # NT books cited in database
-    retriever.retrieve_romans_biblehub()
-    retriever.retrieve_galatians_biblehub()
+    retriever.retrieve_books(['romans', 'galatians'])
+    print("⚠️  NOTE: Detailed verse parsing needs custom implementation")
 
     print("\n" + "="*80)
     print("BIBLICAL TEXT RETRIEVAL STATUS")
@@ -12,14 +12,13 @@ NO HALLUCINATION POLICY:
 - Flags missing or uncertain texts for manual review
 """
 
-import requests
-import time
 import json
 import re
 from bs4 import BeautifulSoup
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-import sys
+
+from retrieval_engine import FetchJob, FetchResult, RetrievalEngine, retrieve_passages
 
 class PerseuTextRetriever:
     """Retrieve texts from Perseus Digital Library with verification"""
@@ -39,58 +38,44 @@ class PerseuTextRetriever:
         'Plutarch_De_Stoicorum_Repugnantiis': 'Perseus:text:2008.01.0398',
     }
 
-    def __init__(self, delay=0.5):
+    def __init__(self, engine: Optional[RetrievalEngine] = None):
         """
         Initialize retriever
 
         Args:
-            delay: Delay between requests in seconds (be respectful to Perseus)
+            engine: Shared fetch engine (its per-host budget keeps requests respectful to Perseus)
         """
-        self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic Research Bot - Ancient Free Will Database (romain.girardi@univ-cotedazur.fr)'
-        })
+        self.engine = engine or RetrievalEngine(
+            user_agent='Academic Research Bot - Ancient Free Will Database (romain.girardi@univ-cotedazur.fr)'
+        )
 
-    def retrieve_section(self, work_id: str, section: str, lang='original') -> Optional[str]:
-        """
-        Retrieve a single section of a work
+    def section_url(self, work_id: str, section: str, lang='original') -> str:
+        return f"{self.BASE_URL}?doc={work_id}:section={section}&lang={lang}"
 
-        Args:
-            work_id: Perseus text identifier (e.g., 'Perseus:text:2007.01.0035')
-            section: Section number or identifier
-            lang: 'original' for Greek/Latin, 'english' for translation
+    def parse_section(self, result: FetchResult) -> Optional[str]:
+        """
+        Cleaned text of one Perseus section page
 
         Returns:
-            Cleaned text or None if retrieval failed
+            Cleaned text or None if the page has no text
         """
-        url = f"{self.BASE_URL}?doc={work_id}:section={section}&lang={lang}"
+        soup = BeautifulSoup(result.body, 'html.parser')
+        text_div = soup.find('div', class_='text')
 
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            text_div = soup.find('div', class_='text')
-
-            if not text_div:
-                return None
+        if not text_div:
+            return None
 
-            # Remove navigation elements
-            for elem in text_div.find_all(['div', 'span'], class_=['header', 'context']):
-                elem.decompose()
+        # Remove navigation elements
+        for elem in text_div.find_all(['div', 'span'], class_=['header', 'context']):
+            elem.decompose()
 
-            # Extract and clean text
-            text = text_div.get_text(separator=' ', strip=True)
-            text = re.sub(r'\s+', ' ', text)
-            text = re.sub(r'\[\s*\d+\s*\]', '', text)  # Remove section markers
-            text = re.sub(r'\[p\.\s*\d+\]', '', text)  # Remove page markers
+        # Extract and clean text
+        text = text_div.get_text(separator=' ', strip=True)
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'\[\s*\d+\s*\]', '', text)  # Remove section markers
+        text = re.sub(r'\[p\.\s*\d+\]', '', text)  # Remove page markers
 
-            return text.strip() if text.strip() else None
-
-        except Exception as e:
-            print(f"  ERROR retrieving {section}: {e}", file=sys.stderr)
-            return None
+        return text.strip() if text.strip() else None
 
     def retrieve_complete_work(
         self,
@@ -120,6 +105,23 @@ class PerseuTextRetriever:
         print(f"Language: {language} | Sections: {section_range.start}-{section_range.stop-1}")
         print(f"{'='*80}\n")
 
+        jobs = []
+        for section in section_range:
+            url = self.section_url(work_id, section, 'original')
+            jobs.append(FetchJob(key=f"{work_id}:{section}", url=url, meta={
+                'work': work_id,
+                'passage': section,
+                'entry': {'url': url, 'verification_status': 'retrieved_from_perseus', 'needs_review': False},
+            }))
+
+        passages, _ = retrieve_passages(self.engine, jobs, self.parse_section)
+        # Original-language text is stored under the language name
+        sections = {
+            key: {language.lower(): entry.pop('text'), **entry}
+            for key, entry in sorted(passages.get(work_id, {}).items(), key=lambda item: int(item[0]))
+        }
+        failed_sections = [section for section in section_range if str(section) not in sections]
+
         work_data = {
             'metadata': {
                 'work': work_name,
@@ -130,40 +132,15 @@ class PerseuTextRetriever:
                 'edition': edition,
                 'retrieved_date': datetime.now().isoformat(),
                 'total_sections': len(section_range),
-                'retrieval_status': 'in_progress'
+                'retrieval_status': 'completed',
+                'sections_retrieved': len(sections),
+                'sections_failed': failed_sections
             },
-            'sections': {}
+            'sections': sections
         }
 
-        failed_sections = []
-        success_count = 0
-
-        for section in section_range:
-            print(f"Section {section:3d}/{section_range.stop-1} ", end='', flush=True)
-
-            # Get original language
-            original = self.retrieve_section(work_id, section, 'original')
-            time.sleep(self.delay)
-
-            if original:
-                work_data['sections'][str(section)] = {
-                    language.lower(): original,
-                    'url': f"{self.BASE_URL}?doc={work_id}:section={section}&lang=original",
-                    'verification_status': 'retrieved_from_perseus',
-                    'needs_review': False
-                }
-                success_count += 1
-                print(f"✓ ({len(original)} chars)")
-            else:
-                failed_sections.append(section)
-                print("✗ FAILED")
-
-        work_data['metadata']['retrieval_status'] = 'completed'
-        work_data['metadata']['sections_retrieved'] = success_count
-        work_data['metadata']['sections_failed'] = failed_sections
-
         print(f"\n{'='*80}")
-        print(f"✓ Retrieved {success_count}/{len(section_range)} sections")
+        print(f"✓ Retrieved {len(sections)}/{len(section_range)} sections")
         if failed_sections:
             print(f"✗ Failed sections: {failed_sections}")
         print(f"{'='*80}\n")
@@ -179,7 +156,7 @@ class PerseuTextRetriever:
 
 def main():
     """Main retrieval script"""
-    retriever = PerseusTextRetriever(delay=0.4)
+    retriever = PerseuTextRetriever()
 
     # Priority works based on citation frequency
     retrieval_queue = [
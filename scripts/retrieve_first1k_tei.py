@@ -8,171 +8,72 @@ Retrieves texts from OpenGreekAndLatin First1KGreek repository:
 NO HALLUCINATION - Direct TEI-XML parsing from verified sources.
 """
 
-import requests
+import asyncio
 import json
-from xml.etree import ElementTree as ET
-from pathlib import Path
-import time
 from typing import Dict, List, Optional
 
-class First1KGreekRetriever:
-    """Retrieve TEI-XML texts from First1KGreek repository"""
-
-    FIRST1K_BASE = "https://raw.githubusercontent.com/OpenGreekAndLatin/First1KGreek/master/data"
-
-    # TEI namespace (same as Perseus/OGL)
-    TEI_NS = {'tei': 'http://www.tei-c.org/ns/1.0'}
+from retrieval_engine import FetchJob, FetchResult, RetrievalEngine, WorkRetriever, safe_filename
+from tei_stream import Source, extract_passages
 
-    def __init__(self, output_dir='retrieved_texts/first1k_tei'):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic Research - Ancient Free Will Database'
-        })
-
-    def download_work_xml(self, tlg_code: str, work_code: str,
-                          edition: str) -> Optional[ET.Element]:
-        """Download XML file from First1KGreek GitHub"""
-
-        # Construct URL: data/{tlg}/{work}/{tlg}.{work}.{edition}.xml
-        filename = f"{tlg_code}.{work_code}.{edition}.xml"
-        url = f"{self.FIRST1K_BASE}/{tlg_code}/{work_code}/{filename}"
+class First1KGreekRetriever(WorkRetriever):
+    """Retrieve TEI-XML texts from First1KGreek repository"""
 
-        print(f"\nDownloading: {url}")
+    batch_name = 'first1k_tei'
 
-        try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+    FIRST1K_BASE = "https://raw.githubusercontent.com/OpenGreekAndLatin/First1KGreek/master/data"
+    LISTING_URL = "https://api.github.com/repos/OpenGreekAndLatin/First1KGreek/contents/data/{tlg_code}"
 
-            print(f"✓ Downloaded {len(response.content):,} bytes")
+    def __init__(self, output_dir='retrieved_texts/first1k_tei', engine: Optional[RetrievalEngine] = None):
+        super().__init__(output_dir, engine)
 
-            # Parse XML
-            root = ET.fromstring(response.content)
-            return root
+    def job_for(self, work_info: Dict) -> FetchJob:
+        """Raw GitHub URL: data/{tlg_code}/{work_code}/{tlg_code}.{work_code}.{edition}.xml"""
+        stem = f"{work_info['tlg_code']}.{work_info['work_code']}.{work_info['edition']}"
+        return FetchJob(key=stem, url=f"{self.FIRST1K_BASE}/{work_info['tlg_code']}/{work_info['work_code']}/{stem}.xml")
 
-        except Exception as e:
-            print(f"✗ Failed: {e}")
-            return None
+    def author_works(self, authors: List[Dict]) -> List[Dict]:
+        """
+        Work dicts for each author's available works
 
-    def extract_all_books(self, root: ET.Element) -> Dict:
+        Each author entry has 'author', 'tlg_code', 'max_works' and 'citations'
+        (per work), plus an optional 'skip' list of work codes already
+        retrieved. The GitHub directory listings that decide which work codes
+        exist are fetched concurrently.
         """
-        Extract all books/sections from a work
+        jobs = [FetchJob(key=a['tlg_code'], url=self.LISTING_URL.format(tlg_code=a['tlg_code'])) for a in authors]
+        listings = asyncio.run(self.engine.fetch_all(jobs))
+
+        works = []
+        for a in authors:
+            result = listings[a['tlg_code']]
+            available = [item['name'] for item in result.json() if item['type'] == 'dir'] if result.ok else []
+            codes = [code for code in available[:a['max_works']] if code not in a.get('skip', ())]
+            print(f"  {a['author']} ({a['tlg_code']}): {len(codes)} works"
+                  + ("" if result.ok else f" - listing failed: {result.error}"))
+            for work_code in codes:
+                works.append({
+                    'name': f"{a['author']}, {work_code}",
+                    'tlg_code': a['tlg_code'],
+                    'work_code': work_code,
+                    'edition': '1st1K-grc1',
+                    'author': a['author'],
+                    'work_title': f'Work {work_code}',
+                    'citations': a['citations']
+                })
+        return works
+
+    def extract_all_books(self, source: Source) -> Dict:
+        """
+        Extract all books/sections from a work in one streaming pass
         Same structure as Perseus/OGL: <div subtype="book"><div subtype="section">
         """
+        return extract_passages(source)
+
+    def save_work(self, work_info: Dict, result: FetchResult) -> Dict:
+        """Parse a downloaded TEI-XML file, extract its passages and save them"""
+
+        passages = self.extract_all_books(result.body)
 
-        books = {}
-
-        # Find all book divs
-        book_divs = root.findall(".//tei:div[@type='textpart'][@subtype='book']", self.TEI_NS)
-
-        if not book_divs:
-            book_divs = root.findall(".//tei:div[@subtype='book']", self.TEI_NS)
-
-        if not book_divs:
-            # Maybe no book structure - try section divs directly
-            section_divs = root.findall(".//tei:div[@type='textpart'][@subtype='section']", self.TEI_NS)
-            if not section_divs:
-                section_divs = root.findall(".//tei:div[@subtype='section']", self.TEI_NS)
-
-            if not section_divs:
-                # Try chapter
-                section_divs = root.findall(".//tei:div[@subtype='chapter']", self.TEI_NS)
-
-            if section_divs:
-                print(f"  Found {len(section_divs)} sections (no book structure)")
-                for sect_div in section_divs:
-                    sect_n = sect_div.get('n', '')
-                    if sect_n:
-                        text_parts = []
-                        for p in sect_div.findall('.//tei:p', self.TEI_NS):
-                            text = ''.join(p.itertext()).strip()
-                            if text:
-                                text_parts.append(text)
-
-                        books[sect_n] = {
-                            'section': sect_n,
-                            'text': ' '.join(text_parts) if text_parts else ''.join(sect_div.itertext()).strip()
-                        }
-                return books
-
-        print(f"  Found {len(book_divs)} books")
-
-        for book_div in book_divs:
-            book_n = book_div.get('n', '')
-            if not book_n:
-                continue
-
-            # Find sections in this book
-            section_divs = book_div.findall(".//tei:div[@type='textpart'][@subtype='section']", self.TEI_NS)
-            if not section_divs:
-                section_divs = book_div.findall(".//tei:div[@subtype='section']", self.TEI_NS)
-
-            if not section_divs:
-                section_divs = book_div.findall(".//tei:div[@subtype='chapter']", self.TEI_NS)
-
-            if section_divs:
-                for sect_div in section_divs:
-                    sect_n = sect_div.get('n', '')
-                    if sect_n:
-                        key = f"{book_n}.{sect_n}"
-                        text_parts = []
-                        for p in sect_div.findall('.//tei:p', self.TEI_NS):
-                            text = ''.join(p.itertext()).strip()
-                            if text:
-                                text_parts.append(text)
-
-                        books[key] = {
-                            'book': book_n,
-                            'section': sect_n,
-                            'text': ' '.join(text_parts) if text_parts else ''.join(sect_div.itertext()).strip()
-                        }
-            else:
-                # No sections - whole book is one passage
-                text_parts = []
-                for p in book_div.findall('.//tei:p', self.TEI_NS):
-                    text = ''.join(p.itertext()).strip()
-                    if text:
-                        text_parts.append(text)
-
-                books[book_n] = {
-                    'book': book_n,
-                    'text': ' '.join(text_parts) if text_parts else ''.join(book_div.itertext()).strip()
-                }
-
-        return books
-
-    def retrieve_work(self, work_info: Dict) -> Optional[Dict]:
-        """Retrieve a single work from First1KGreek"""
-
-        print(f"\n{'='*80}")
-        print(f"RETRIEVING: {work_info['name']}")
-        print(f"{'='*80}")
-
-        # Download XML
-        root = self.download_work_xml(
-            tlg_code=work_info['tlg_code'],
-            work_code=work_info['work_code'],
-            edition=work_info['edition']
-        )
-
-        if not root:
-            print(f"✗ Failed to download {work_info['name']}")
-            return None
-
-        # Extract passages
-        print("\nExtracting passages...")
-        passages = self.extract_all_books(root)
-
-        print(f"✓ Extracted {len(passages)} passages")
-
-        # Show samples
-        print("\nSample passages:")
-        for key in list(passages.keys())[:3]:
-            text_preview = passages[key].get('text', 'NO TEXT')[:80] if passages[key].get('text') else "NO TEXT"
-            print(f"  {key}: {text_preview}...")
-
-        # Build metadata
         work_data = {
             'metadata': {
                 'work': work_info['work_title'],
@@ -180,10 +81,10 @@ class First1KGreekRetriever:
                 'language': 'Greek',
                 'source': 'OpenGreekAndLatin First1KGreek GitHub',
                 'source_url': 'https://github.com/OpenGreekAndLatin/First1KGreek',
-                'file_url': f"{self.FIRST1K_BASE}/{work_info['tlg_code']}/{work_info['work_code']}/{work_info['tlg_code']}.{work_info['work_code']}.{work_info['edition']}.xml",
+                'file_url': result.job.url,
                 'edition': work_info['edition'],
                 'format': 'TEI-XML',
-                'urn': f"urn:cts:greekLit:{work_info['tlg_code']}.{work_info['work_code']}.{work_info['edition']}",
+                'urn': f"urn:cts:greekLit:{result.job.key}",
                 'retrieved_date': '2025-10-25',
                 'verification_status': 'first1k_github_source',
                 'passages_extracted': len(passages),
@@ -192,15 +93,11 @@ class First1KGreekRetriever:
             'passages': passages
         }
 
-        # Save
-        safe_name = work_info['name'].lower().replace(' ', '_').replace(',', '').replace('.', '').replace('(', '').replace(')', '')
-        output_file = self.output_dir / f'{safe_name}.json'
-
+        output_file = self.output_dir / f"{safe_filename(work_info['name'])}.json"
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(work_data, f, indent=2, ensure_ascii=False)
 
-        print(f"\n✓ Saved to: {output_file}")
-
+        print(f"✓ {work_info['name']}: {len(result.body):,} bytes, {len(passages)} passages → {output_file}")
         return work_data
 
 
@@ -17,19 +17,49 @@ Example: urn:cts:latinLit:phi0474.phi054.perseus-lat1:43
 NO HALLUCINATION - Only verified CTS texts with full provenance.
 """
 
-import requests
-import time
 from xml.etree import ElementTree as ET
 import json
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import re
 
+from retrieval_engine import FetchJob, RetrievalEngine, load_saved, retrieve_passages
+
+TEI_NS = {'tei': 'http://www.tei-c.org/ns/1.0'}
+
+
+def cts_passage_text(body: bytes) -> Optional[str]:
+    """Text of a CTS GetPassage (TEI-XML) response"""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        return None
+
+    # Extract text from TEI elements
+    text_parts = []
+
+    # Try different TEI structures
+    for selector in ['.//tei:p', './/tei:div', './/tei:l', './/tei:ab']:
+        elements = root.findall(selector, TEI_NS)
+        if elements:
+            for elem in elements:
+                text = ''.join(elem.itertext()).strip()
+                if text:
+                    text_parts.append(text)
+            break
+
+    if not text_parts:
+        # Fallback: get all text
+        text_parts = [''.join(root.itertext()).strip()]
+
+    return ' '.join(text_parts).strip() if text_parts else None
+
+
 class ScaifeCTSRetriever:
     """Retrieve classical texts via Scaife CTS API"""
 
     BASE_URL = "https://scaife.perseus.org/library"
-    TEI_NS = {'tei': 'http://www.tei-c.org/ns/1.0'}
+    TEI_NS = TEI_NS
 
     # CTS URN catalog for major works
     CTS_URNS = {
@@ -126,47 +156,10 @@ class ScaifeCTSRetriever:
         },
     }
 
-    def __init__(self, delay=0.5, output_dir='retrieved_texts/scaife_cts'):
-        self.delay = delay
+    def __init__(self, output_dir='retrieved_texts/scaife_cts', engine: Optional[RetrievalEngine] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Academic Research - Ancient Free Will Database'
-        })
-
-    def retrieve_cts_passage(self, urn: str) -> Optional[str]:
-        """Retrieve a passage via CTS URN"""
-        api_url = f"{self.BASE_URL}/{urn}/cts-api-xml/"
-
-        try:
-            response = self.session.get(api_url, timeout=15)
-            response.raise_for_status()
-
-            # Parse TEI XML
-            root = ET.fromstring(response.content)
-
-            # Extract text from TEI elements
-            text_parts = []
-
-            # Try different TEI structures
-            for selector in ['.//tei:p', './/tei:div', './/tei:l', './/tei:ab']:
-                elements = root.findall(selector, self.TEI_NS)
-                if elements:
-                    for elem in elements:
-                        text = ''.join(elem.itertext()).strip()
-                        if text:
-                            text_parts.append(text)
-                    break
-
-            if not text_parts:
-                # Fallback: get all text
-                text_parts = [''.join(root.itertext()).strip()]
-
-            return ' '.join(text_parts).strip() if text_parts else None
-
-        except Exception as e:
-            return None
+        self.engine = engine or RetrievalEngine()
 
     def retrieve_work(self, work_key: str, sections: List[str] = None) -> Dict:
         """Retrieve complete work via CTS API"""
@@ -210,34 +203,30 @@ class ScaifeCTSRetriever:
             print("⚠️  No sections specified - will need manual section list")
             return work_data
 
-        success = 0
-        failed = []
-
+        jobs = []
         for section in sections:
             urn = f"{urn_base}:{section}"
-            print(f"  Section {section:3} ", end='', flush=True)
-
-            text = self.retrieve_cts_passage(urn)
-            time.sleep(self.delay)
-
-            if text:
-                work_data['passages'][str(section)] = {
+            jobs.append(FetchJob(
+                key=urn,
+                url=f"{self.BASE_URL}/{urn}/cts-api-xml/",
+                meta={'work': work_key, 'passage': section, 'entry': {
                     'urn': urn,
-                    'text': text,
                     'url': f"{self.BASE_URL}/{urn}/",
                     'api_url': f"{self.BASE_URL}/{urn}/cts-api-xml/",
-                }
-                success += 1
-                print(f"✓ ({len(text):5d} chars)")
-            else:
-                failed.append(section)
-                print("✗")
+                }}
+            ))
+
+        filename = self.output_dir / f"{work_key}_cts.json"
+        passages, _ = retrieve_passages(self.engine, jobs, lambda result: cts_passage_text(result.body),
+                                        batch=f"scaife_{work_key}")
+        work_data['passages'] = {**load_saved(filename, 'passages'), **passages.get(work_key, {})}
+        success = len(work_data['passages'])
+        failed = [section for section in sections if str(section) not in work_data['passages']]
 
         work_data['metadata']['sections_retrieved'] = success
         work_data['metadata']['sections_failed'] = failed
 
         # Save
-        filename = self.output_dir / f"{work_key}_cts.json"
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(work_data, f, indent=2, ensure_ascii=False)
 
@@ -252,7 +241,7 @@ class ScaifeCTSRetriever:
 
 def main():
     """Test Scaife CTS retrieval"""
-    retriever = ScaifeCTSRetriever(delay=0.5)
+    retriever = ScaifeCTSRetriever()
 
     print("\n" + "="*80)
     print("SCAIFE CTS API RETRIEVAL SYSTEM")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Work-Queue Driven Retrieval
+============================
+Retrieves every automatable work in retrieval_work_queue.json through the
+shared async engine, resuming from the job state of earlier runs.
+
+CTS_AUTO entries carry a CTS work URN; the edition comes from
+cts_urn_catalog.json and the full TEI-XML file is fetched from the Perseus
+canonical GitHub repositories. Other strategies (MANUAL, OGL_OR_PG,
+BIBLEHUB_OR_SEFARIA) need a human-curated work list and are only counted.
+
+Usage (from the repository root):
+    python scripts/retrieve_work_queue.py
+    python scripts/retrieve_work_queue.py --retry-failed
+    python scripts/retrieve_work_queue.py --offline     # rebuild from the response cache
+
+NO HALLUCINATION - Only works with a verified CTS URN are queued.
+"""
+
+import argparse
+import json
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from retrieve_github_tei import GitHubTEIRetriever
+from retrieval_engine import add_cache_options, apply_cache_options, print_report
+
+# Editions tried when the catalog has no versioned URN for a work
+DEFAULT_EDITIONS = {'greekLit': 'perseus-grc2', 'latinLit': 'perseus-lat2'}
+
+
+def queue_works(queue: List[Dict], catalog: Dict[str, str],
+                strategies: Tuple[str, ...] = ('CTS_AUTO',)) -> Tuple[List[Dict], Counter]:
+    """
+    GitHub TEI work dicts for the queue entries an engine can fetch
+
+    Returns:
+        The work list and a count of queue entries left for manual retrieval, by strategy
+    """
+    versioned = {urn.rsplit('.', 1)[0]: urn for urn in catalog.values()}
+    works, manual = [], Counter()
+
+    for entry in queue:
+        urn = entry.get('cts_urn')
+        if entry.get('retrieval_strategy') not in strategies or not urn:
+            manual[entry.get('retrieval_strategy') or 'UNKNOWN'] += 1
+            continue
+
+        # urn:cts:greekLit:tlg0086.tlg010[.perseus-grc1]
+        _, _, lit, work_id = urn.split(':', 3)
+        full = catalog.get(entry['work']) or versioned.get(urn)
+        parts = (full.split(':', 3)[3] if full else work_id).split('.')
+        tlg_code, work_code = parts[0], parts[1]
+        edition = parts[2] if len(parts) > 2 else DEFAULT_EDITIONS[lit]
+        author, _, title = entry['work'].partition(', ')
+
+        works.append({
+            'name': entry['work'],
+            'language': 'greek' if lit == 'greekLit' else 'latin',
+            'tlg_code': tlg_code,
+            'work_code': work_code,
+            'edition': edition,
+            'author': author,
+            'work_title': title or entry['work'],
+            'citations': entry.get('citation_count', 0)
+        })
+    return works, manual
+
+
+def main():
+    """Retrieve the automatable part of the work queue"""
+    parser = argparse.ArgumentParser(description="Retrieve works listed in retrieval_work_queue.json")
+    parser.add_argument('--queue', default='retrieval_work_queue.json')
+    parser.add_argument('--catalog', default='cts_urn_catalog.json')
+    parser.add_argument('--strategy', action='append', help='Queue strategies to fetch (default: CTS_AUTO)')
+    parser.add_argument('--retry-failed', action='store_true', help='Re-run works whose last attempt failed')
+    add_cache_options(parser)
+    args = parser.parse_args()
+
+    with open(args.queue, encoding='utf-8') as f:
+        queue = json.load(f)
+    with open(args.catalog, encoding='utf-8') as f:
+        catalog = json.load(f)
+
+    works, manual = queue_works(queue, catalog, tuple(args.strategy or ['CTS_AUTO']))
+
+    print("="*80)
+    print("WORK QUEUE RETRIEVAL")
+    print("="*80)
+    print(f"\n{len(queue)} queue entries: {len(works)} automatable")
+    for strategy, count in manual.most_common():
+        print(f"  {strategy:25s} {count:5d} entries (manual)")
+
+    retriever = GitHubTEIRetriever()
+    apply_cache_options(retriever.engine, args)
+    rows, stats = retriever.retrieve_works(works, batch='work_queue', retry_failed=args.retry_failed)
+    print_report("WORK QUEUE RETRIEVAL COMPLETE", rows, stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,12 +14,13 @@ import asyncio
 import json
 import logging
 import sqlite3
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 import asyncpg
 
+from bulk_loader import BulkLoader, division_record, section_record, text_record
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -163,6 +164,8 @@ class AncientFreeWillDatabaseSetup:
             USING gin(to_tsvector('greek', raw_text)) WHERE language = 'grc';
         CREATE INDEX idx_texts_fts_latin ON free_will.texts 
             USING gin(to_tsvector('simple', raw_text)) WHERE language = 'lat';
+        CREATE INDEX idx_text_sections_fts ON free_will.text_sections
+            USING gin(to_tsvector('simple', content));
         """
         
         await self.pg_conn.execute(schema_sql)
@@ -421,122 +424,43 @@ class AncientFreeWillDatabaseSetup:
         
         logger.info(f"Found {len(matched_works)} matching works to migrate")
         
-        # Migrate texts
-        migrated_count = 0
-        for kg_work_id, text_data in matched_works.items():
-            try:
-                category = self.categorize_text(text_data['title'], text_data['author'])
-                
-                # Handle embedding_created_at conversion
-                embedding_created_at = None
-                if text_data['embedding_created_at']:
-                    try:
-                        embedding_created_at = datetime.fromisoformat(
-                            text_data['embedding_created_at'].replace('Z', '+00:00')
-                        )
-                    except (ValueError, AttributeError):
-                        embedding_created_at = None
-                
-                # Insert text
-                text_id = await self.pg_conn.fetchval("""
-                    INSERT INTO free_will.texts (
-                        kg_work_id, title, author, category, raw_text, normalized_text,
-                        tei_xml, lemmas, pos_tags, named_entities, embedding,
-                        embedding_model, embedding_dimensions, embedding_hash,
-                        embedding_created_at, language, date_created, source, notes, metadata
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20)
-                    RETURNING id
-                """, 
-                kg_work_id, text_data['title'], text_data['author'], category,
-                text_data['raw_text'], text_data['normalized_text'], text_data['tei_xml'],
-                json.dumps(text_data['lemmas']) if text_data['lemmas'] else None,
-                json.dumps(text_data['pos_tags']) if text_data['pos_tags'] else None,
-                json.dumps(text_data['named_entities']) if text_data['named_entities'] else None,
-                text_data['embedding'], text_data['embedding_model'], 
-                text_data['embedding_dimensions'], text_data['embedding_hash'],
-                embedding_created_at, text_data['language'], text_data['date_created'],
-                text_data['source'], text_data['notes'], 
-                json.dumps(text_data['metadata']) if text_data['metadata'] else None
-                )
-                
-                # Migrate divisions
-                await self._migrate_divisions(text_id, text_data['id'])
-                
-                # Migrate sections
-                await self._migrate_sections(text_id, text_data['id'])
-                
-                migrated_count += 1
-                if migrated_count % 50 == 0:
-                    logger.info(f"Migrated {migrated_count} texts...")
-                    
-            except Exception as e:
-                logger.error(f"Error migrating text '{text_data['title']}': {e}")
-                
-        logger.info(f"Migration completed. Migrated {migrated_count} texts.")
+        texts = [
+            text_record(kg_work_id, self.categorize_text(text_data['title'], text_data['author']), text_data)
+            for kg_work_id, text_data in matched_works.items()
+        ]
+        # A Sematika text matched by several works is loaded once per work; its rows are staged once
+        source_ids = {str(text_data['id']) for text_data in matched_works.values()}
+        
+        stats = await BulkLoader(self.pg_conn).load(
+            texts,
+            self._division_records(source_ids),
+            self._section_records(source_ids)
+        )
+        logger.info(f"Migration completed. {stats.summary()}")
         
-    async def _migrate_divisions(self, new_text_id: str, old_text_id: str) -> None:
-        """Migrate text divisions."""
+    def _division_records(self, source_ids: Set[str]) -> Iterator[Tuple]:
+        """Stream text divisions of the migrated texts from SQLite."""
         cursor = self.sqlite_conn.cursor()
         cursor.execute("""
-            SELECT id, parent_id, type, subtype, n, full_reference, heading,
+            SELECT id, text_id, parent_id, type, subtype, n, full_reference, heading,
                    language, speaker, char_position, char_length, xml_id
-            FROM text_divisions WHERE text_id = ?
-        """, (old_text_id,))
-        
-        divisions = cursor.fetchall()
-        division_id_map = {}
-        
-        # Insert divisions
-        for div_row in divisions:
-            (div_id, parent_id, type, subtype, n, full_reference, heading,
-             language, speaker, char_position, char_length, xml_id) = div_row
-            
-            new_div_id = await self.pg_conn.fetchval("""
-                INSERT INTO free_will.text_divisions (
-                    text_id, parent_id, type, subtype, n, full_reference,
-                    heading, language, speaker, char_position, char_length, xml_id
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                RETURNING id
-            """, 
-            new_text_id, None, type, subtype, n, full_reference, heading,
-            language, speaker, char_position, char_length, xml_id
-            )
-            
-            division_id_map[div_id] = new_div_id
-            
-        # Update parent relationships
-        for div_row in divisions:
-            (div_id, parent_id, _, _, _, _, _, _, _, _, _, _) = div_row
-            if parent_id and parent_id in division_id_map:
-                await self.pg_conn.execute("""
-                    UPDATE free_will.text_divisions 
-                    SET parent_id = $1 WHERE id = $2
-                """, division_id_map[parent_id], division_id_map[div_id])
+            FROM text_divisions
+        """)
+        for row in cursor:
+            if str(row[1]) in source_ids:
+                yield division_record(row)
                 
-    async def _migrate_sections(self, new_text_id: str, old_text_id: str) -> None:
-        """Migrate text sections."""
+    def _section_records(self, source_ids: Set[str]) -> Iterator[Tuple]:
+        """Stream text sections of the migrated texts from SQLite."""
         cursor = self.sqlite_conn.cursor()
         cursor.execute("""
-            SELECT id, division_id, type, subtype, n, content,
+            SELECT text_id, division_id, type, subtype, n, content,
                    language, speaker, char_position, xml_id
-            FROM text_sections WHERE text_id = ?
-        """, (old_text_id,))
-        
-        sections = cursor.fetchall()
-        
-        for sec_row in sections:
-            (sec_id, division_id, type, subtype, n, content,
-             language, speaker, char_position, xml_id) = sec_row
-            
-            await self.pg_conn.execute("""
-                INSERT INTO free_will.text_sections (
-                    text_id, division_id, type, subtype, n, content,
-                    language, speaker, char_position, xml_id
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-            """, 
-            new_text_id, division_id, type, subtype, n, content,
-            language, speaker, char_position, xml_id
-            )
+            FROM text_sections
+        """)
+        for row in cursor:
+            if str(row[0]) in source_ids:
+                yield section_record(row)
             
     async def create_summary_view(self) -> None:
         """Create a summary view for quick database overview."""
@@ -138,6 +138,8 @@ async def setup_schema():
             USING gin(to_tsvector('greek', raw_text)) WHERE language = 'grc';
         CREATE INDEX IF NOT EXISTS idx_texts_fts_latin ON free_will.texts
             USING gin(to_tsvector('simple', raw_text)) WHERE language = 'lat';
+        CREATE INDEX IF NOT EXISTS idx_text_sections_fts ON free_will.text_sections
+            USING gin(to_tsvector('simple', content));
         """
 
         await conn.execute(schema_sql)
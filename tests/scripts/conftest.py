@@ -0,0 +1,11 @@
+"""
+Pytest configuration for the retrieval and maintenance script tests
+The scripts import each other as top-level modules, so scripts/ and the
+repository root (KG maintenance scripts) go on sys.path
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
@@ -0,0 +1,88 @@
+"""
+Unit tests for the corpus build
+Tests passage layouts, offset-preserving normalisation and incremental rebuilds
+"""
+import json
+
+from build_corpus import build_corpus, normalize_text
+
+TEI = b"""<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body><div type="edition" xml:lang="lat">
+  <div type="textpart" subtype="book" n="1">
+    <div type="textpart" subtype="section" n="1"><p>Liberum arbitrium.</p></div>
+  </div>
+</div></body></text></TEI>"""
+
+
+def write_inputs(root):
+    (root / "github_tei").mkdir(parents=True)
+    (root / ".http_cache").mkdir()
+    (root / "github_tei" / "de_fato.json").write_text(json.dumps({
+        "metadata": {"work": "De Fato", "author": "Alexander", "language": "Greek"},
+        "passages": {"1.1": {"book": "1", "chapter": "1", "text": "Περὶ εἱμαρμένης"},
+                     "1.2": {"book": "1", "chapter": "2", "text": "τὸ ἐφ᾽ ἡμῖν"}},
+    }, ensure_ascii=False), encoding="utf-8")
+    (root / "lucretius.json").write_text(json.dumps({
+        "metadata": {"work": "De Rerum Natura", "language": "Latin"},
+        "books": {"II": {"passages": {"216-293": {"lines": "216-293", "latin": "Illud in his rebus"}}}},
+    }), encoding="utf-8")
+    (root / "ogl.xml").write_bytes(TEI)
+    (root / "broken.json").write_text('{"metadata": {"work": ')
+    (root / ".http_cache" / "ignored.json").write_text("{}")
+
+
+def artefact(output, name):
+    return json.loads((output / "works" / name).read_text(encoding="utf-8"))
+
+
+class TestNormalizeText:
+    """Test cases for normalize_text"""
+
+    def test_folds_case_accents_and_final_sigma(self):
+        """Greek and Latin fold to bare lowercase letters without changing length"""
+        text = "Περὶ εἱμαρμένης, Ἀλέξανδρος. Liberum ARBITRIUM"
+        normalized = normalize_text(text)
+        assert normalized == "περι ειμαρμενησ, αλεξανδροσ. liberum arbitrium"
+        assert len(normalized) == len(text)
+
+
+class TestBuildCorpus:
+    """Test cases for build_corpus"""
+
+    def test_builds_every_layout_with_offsets(self, tmp_path):
+        """Each input becomes an artefact whose division offsets slice its raw text"""
+        write_inputs(tmp_path / "in")
+        output = tmp_path / "corpus"
+        summary = build_corpus(tmp_path / "in", output, workers=2, verbose=False)
+
+        assert summary["inputs"] == 4 and summary["processed"] == 4 and summary["failed"] == 1
+        de_fato = artefact(output, "github_tei__de_fato.json")
+        assert de_fato["language"] == "grc" and de_fato["title"] == "De Fato"
+        for division in de_fato["divisions"]:
+            start, end = division["char_position"], division["char_position"] + division["char_length"]
+            assert de_fato["raw_text"][start:end] in ("Περὶ εἱμαρμένης", "τὸ ἐφ᾽ ἡμῖν")
+        assert de_fato["normalized_text"].startswith("περι ειμαρμενησ")
+
+        assert artefact(output, "lucretius.json")["divisions"][0]["full_reference"] == "II.216-293"
+        tei = artefact(output, "ogl.json")
+        assert tei["language"] == "lat" and tei["raw_text"] == "Liberum arbitrium."
+
+        manifest = json.loads((output / "manifest.json").read_text())
+        assert set(manifest["files"]) == {"github_tei/de_fato.json", "lucretius.json", "ogl.xml", "broken.json"}
+        assert manifest["files"]["broken.json"]["error"].startswith("JSONDecodeError")
+
+    def test_incremental_rebuild(self, tmp_path):
+        """Unchanged inputs are skipped, changed ones rebuilt, deleted ones removed"""
+        write_inputs(tmp_path / "in")
+        output = tmp_path / "corpus"
+        build_corpus(tmp_path / "in", output, workers=1, verbose=False)
+
+        assert build_corpus(tmp_path / "in", output, workers=1, verbose=False)["processed"] == 0
+
+        (tmp_path / "in" / "ogl.xml").write_bytes(TEI.replace(b"Liberum", b"Servum"))
+        (tmp_path / "in" / "lucretius.json").unlink()
+        summary = build_corpus(tmp_path / "in", output, workers=1, verbose=False)
+
+        assert summary["processed"] == 1 and summary["unchanged"] == 2 and summary["removed"] == 1
+        assert artefact(output, "ogl.json")["raw_text"] == "Servum arbitrium."
+        assert not (output / "works" / "lucretius.json").exists()
+        assert build_corpus(tmp_path / "in", output, workers=1, force=True, verbose=False)["processed"] == 3
@@ -0,0 +1,231 @@
+"""
+Unit tests for the bulk COPY loader
+Tests the staging record builders, command status parsing and the SQLite
+readers of setup_database.py; the load itself runs against PostgreSQL when
+TEST_DATABASE_URL points at a throwaway database (its free_will schema is dropped)
+"""
+import asyncio
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from bulk_loader import (
+    DIVISION_COLUMNS,
+    SECTION_COLUMNS,
+    TEXT_COLUMNS,
+    BulkLoader,
+    _row_count,
+    division_record,
+    section_record,
+    text_record,
+)
+from setup_database import AncientFreeWillDatabaseSetup
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def make_text(text_id, title="De Fato", **fields):
+    text = {
+        "id": text_id, "title": title, "author": "Cicero", "raw_text": "Fatum est...",
+        "normalized_text": "fatum est", "tei_xml": None, "lemmas": ["fatum", "sum"], "pos_tags": [],
+        "named_entities": None, "embedding": b"\x00\x01", "embedding_model": "test",
+        "embedding_dimensions": 2, "embedding_hash": "abc", "embedding_created_at": "2025-10-01T12:00:00Z",
+        "language": "lat", "date_created": "-44", "source": "Sematika", "notes": None,
+        "metadata": {"pages": 3},
+    }
+    text.update(fields)
+    return text
+
+
+class TestRecords:
+    """Staging rows match the staging table columns"""
+
+    def test_text_record(self):
+        record = text_record("work_de_fato", "original_works", make_text(7))
+
+        assert len(record) == len(TEXT_COLUMNS) + 1
+        row = dict(zip(("source_id",) + TEXT_COLUMNS, record))
+        assert row["source_id"] == "7"
+        assert (row["kg_work_id"], row["category"]) == ("work_de_fato", "original_works")
+        assert row["lemmas"] == '["fatum", "sum"]'
+        assert row["metadata"] == '{"pages": 3}'
+        # Empty JSON values are stored as NULL, not as '[]'
+        assert row["pos_tags"] is None and row["named_entities"] is None
+        assert row["embedding_created_at"] == datetime(2025, 10, 1, 12, tzinfo=timezone.utc)
+
+    def test_text_record_timestamps(self):
+        stamp = datetime(2025, 1, 17)
+        assert text_record("w", "c", make_text(1, embedding_created_at=stamp))[15] is stamp
+        assert text_record("w", "c", make_text(1, embedding_created_at="not a date"))[15] is None
+        assert text_record("w", "c", make_text(1, embedding_created_at=""))[15] is None
+
+    def test_division_record(self):
+        row = (12, 7, None, "textpart", "book", "2", "2", "Book II", "lat", None, 100, 50, "b2")
+        record = division_record(row)
+
+        assert len(record) == len(DIVISION_COLUMNS) + 3
+        assert record[:3] == ("12", "7", None)
+        assert record[3:] == row[3:]
+        assert division_record((13, 7, 12) + row[3:])[:3] == ("13", "7", "12")
+
+    def test_section_record(self):
+        row = (7, None, "p", None, "1", "Fatum est...", "lat", None, 0, None)
+        record = section_record(row)
+
+        assert len(record) == len(SECTION_COLUMNS) + 2
+        assert record[:2] == ("7", None)
+        assert record[2:] == row[2:]
+        assert section_record((7, 12) + row[2:])[:2] == ("7", "12")
+
+    @pytest.mark.parametrize("status, expected", [
+        ("INSERT 0 1234", 1234),
+        ("COPY 3", 3),
+        ("CREATE INDEX", 0),
+        ("", 0),
+        (None, 0),
+    ])
+    def test_row_count(self, status, expected):
+        assert _row_count(status) == expected
+
+
+def make_sqlite():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE text_divisions (
+            id INTEGER, text_id INTEGER, parent_id INTEGER, type TEXT, subtype TEXT, n TEXT,
+            full_reference TEXT, heading TEXT, language TEXT, speaker TEXT,
+            char_position INTEGER, char_length INTEGER, xml_id TEXT);
+        CREATE TABLE text_sections (
+            text_id INTEGER, division_id INTEGER, type TEXT, subtype TEXT, n TEXT, content TEXT,
+            language TEXT, speaker TEXT, char_position INTEGER, xml_id TEXT);
+        INSERT INTO text_divisions VALUES
+            (1, 7, NULL, 'textpart', 'book', '1', '1', 'Book I', 'lat', NULL, 0, 40, NULL),
+            (2, 7, 1, 'textpart', 'chapter', '1', '1.1', NULL, 'lat', NULL, 0, 20, NULL),
+            (3, 8, NULL, 'textpart', 'book', '1', '1', NULL, 'grc', NULL, 0, 10, NULL);
+        INSERT INTO text_sections VALUES
+            (7, 2, 'p', NULL, '1', 'Fatum est ordo seriesque causarum.', 'lat', NULL, 0, NULL),
+            (7, NULL, 'p', NULL, NULL, 'Praefatio.', 'lat', NULL, 35, NULL),
+            (8, 3, 'p', NULL, '1', 'τὸ ἐφ᾽ ἡμῖν', 'grc', NULL, 0, NULL);
+    """)
+    return conn
+
+
+class TestSetupDatabaseRecords:
+    """setup_database.py streams only the rows of the migrated texts"""
+
+    def test_division_and_section_records(self):
+        setup = AncientFreeWillDatabaseSetup()
+        setup.sqlite_conn = make_sqlite()
+
+        divisions = list(setup._division_records({"7"}))
+        sections = list(setup._section_records({"7"}))
+
+        assert [record[:3] for record in divisions] == [("1", "7", None), ("2", "7", "1")]
+        assert [record[:2] for record in sections] == [("7", "2"), ("7", None)]
+        assert sections[0][5] == "Fatum est ordo seriesque causarum."
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set (PostgreSQL load test)")
+class TestBulkLoad:
+    """BulkLoader against a real server, on the schema created by setup_database.py"""
+
+    def run(self, scenario):
+        async def with_schema():
+            import asyncpg
+
+            conn = await asyncpg.connect(TEST_DATABASE_URL)
+            try:
+                setup = AncientFreeWillDatabaseSetup()
+                setup.pg_conn = conn
+                await setup.create_schema()
+                return await scenario(conn)
+            finally:
+                await conn.execute("DROP SCHEMA IF EXISTS free_will CASCADE")
+                await conn.close()
+        return asyncio.run(with_schema())
+
+    def records(self):
+        sqlite_conn = make_sqlite()
+        setup = AncientFreeWillDatabaseSetup()
+        setup.sqlite_conn = sqlite_conn
+        # Text 7 is matched by two works, so it is loaded twice with its own divisions
+        texts = [text_record("work_de_fato", "original_works", make_text(7)),
+                 text_record("work_de_fato_alt", "original_works", make_text(7)),
+                 text_record("work_en", "original_works", make_text(8, title="EN", language="grc"))]
+        return texts, setup._division_records({"7", "8"}), setup._section_records({"7", "8"})
+
+    def test_load_resolves_ids_and_parents(self):
+        async def scenario(conn):
+            stats = await BulkLoader(conn).load(*self.records())
+            rows = await conn.fetch("""
+                SELECT t.kg_work_id, d.full_reference, p.full_reference AS parent,
+                       p.text_id = d.text_id AS same_text
+                FROM free_will.text_divisions d
+                JOIN free_will.texts t ON t.id = d.text_id
+                LEFT JOIN free_will.text_divisions p ON p.id = d.parent_id
+                ORDER BY 1, 2
+            """)
+            sections = await conn.fetch("""
+                SELECT t.kg_work_id, d.full_reference, s.content
+                FROM free_will.text_sections s
+                JOIN free_will.texts t ON t.id = s.text_id
+                LEFT JOIN free_will.text_divisions d ON d.id = s.division_id
+                WHERE d.text_id IS NULL OR d.text_id = s.text_id
+                ORDER BY 1, 2
+            """)
+            indexes = await conn.fetchval(
+                "SELECT count(*) FROM pg_indexes WHERE indexname = 'idx_text_sections_fts'")
+            temp_tables = await conn.fetchval(
+                "SELECT count(*) FROM pg_tables WHERE tablename LIKE 'stage_%'")
+            return stats, rows, sections, indexes, temp_tables
+
+        stats, rows, sections, indexes, temp_tables = self.run(scenario)
+
+        assert (stats.texts, stats.divisions, stats.sections) == (3, 5, 5)
+        assert stats.staged_rows == 3 + 3 + 3
+        assert [tuple(row) for row in rows] == [
+            ("work_de_fato", "1", None, None),
+            ("work_de_fato", "1.1", "1", True),
+            ("work_de_fato_alt", "1", None, None),
+            ("work_de_fato_alt", "1.1", "1", True),
+            ("work_en", "1", None, None),
+        ]
+        assert [(row[0], row[1]) for row in sections] == [
+            ("work_de_fato", "1.1"), ("work_de_fato", None),
+            ("work_de_fato_alt", "1.1"), ("work_de_fato_alt", None),
+            ("work_en", "1"),
+        ]
+        assert indexes == 1
+        # Staging tables are dropped on commit
+        assert temp_tables == 0
+
+    def test_skip_existing_leaves_loaded_works_untouched(self):
+        async def scenario(conn):
+            texts, divisions, sections = self.records()
+            await BulkLoader(conn).load(texts[:1], [d for d in divisions if d[1] == "7"],
+                                        [s for s in sections if s[0] == "7"])
+            texts, divisions, sections = self.records()
+            stats = await BulkLoader(conn).load(texts, divisions, sections, skip_existing=True)
+            counts = await conn.fetchrow("""
+                SELECT (SELECT count(*) FROM free_will.texts) AS texts,
+                       (SELECT count(*) FROM free_will.text_divisions) AS divisions,
+                       (SELECT count(*) FROM free_will.text_sections) AS sections
+            """)
+            return stats, counts
+
+        stats, counts = self.run(scenario)
+
+        assert (stats.texts, stats.divisions, stats.sections) == (2, 3, 3)
+        assert tuple(counts) == (3, 5, 5)
+
+    def test_failed_load_leaves_no_partial_data(self):
+        async def scenario(conn):
+            texts, divisions, sections = self.records()
+            # A duplicate kg_work_id fails the text insert without skip_existing
+            with pytest.raises(Exception):
+                await BulkLoader(conn).load(texts + texts[:1], divisions, sections)
+            return await conn.fetchval("SELECT count(*) FROM free_will.texts")
+
+        assert self.run(scenario) == 0
@@ -0,0 +1,68 @@
+"""
+Unit tests for the comprehensive extraction system
+Tests streamed line contexts, paragraph arguments and parallel extraction with JSONL output
+"""
+import json
+
+from comprehensive_extraction_system import ComprehensiveExtractionSystem, DocumentProcessor
+
+TEXT = "\n".join([
+    "Chrysippus on fate",
+    "EN III.5 and SVF II 975",
+    "τὸ ἐφ' ἡμῖν καὶ εἱμαρμένη",
+    "",
+    "If all is fated, nothing is up to us.",
+    "Therefore free will is lost.",
+    "",
+    "a debate between Stoics and Academics",
+    "Carneades",
+]) + "\n"
+
+LINES = TEXT.splitlines(keepends=True)
+
+
+def write_document(path):
+    path.write_text(TEXT, encoding="utf-8")
+    return path
+
+
+class TestDocumentProcessor:
+    """Test cases for DocumentProcessor"""
+
+    def test_records_and_contexts(self, tmp_path):
+        results = DocumentProcessor(write_document(tmp_path / "doc.txt"), "doc", verbose=False).process()
+
+        assert [(p["name"], p["line_number"]) for p in results["persons"]] == [("Chrysippus", 0), ("Carneades", 8)]
+        # Three lines either side, clipped at the start and end of the document
+        assert results["persons"][0]["context"] == "\n".join(LINES[0:4])
+        assert results["persons"][1]["context"] == "\n".join(LINES[5:9])
+        assert results["debates"][0]["context"] == "\n".join(LINES[2:9])
+        assert [w["citation"]["full"] for w in results["works"]] == ["EN III.5", "SVF II 975"]
+        assert results["works"][1]["context"] == "\n".join(LINES[0:2])
+        assert [g["text"] for g in results["greek_latin"]] == ["τὸ ἐφ", "ἡμῖν καὶ εἱμαρμένη"]
+        assert results["concepts"][0]["concepts"] == {"fate": ["fate"]}
+
+        [argument] = results["arguments"]
+        assert argument["paragraph_number"] == 1
+        assert argument["premises"] == ["If all is fated, nothing is up to us."]
+        assert argument["conclusion"] == "Therefore free will is lost."
+
+
+class TestComprehensiveExtractionSystem:
+    """Parallel extraction matches serial extraction"""
+
+    def test_parallel_results_and_jsonl(self, tmp_path):
+        write_document(tmp_path / "Mémoire M1_text.txt")
+        (tmp_path / "Mémoire M2_text.txt").write_text("Plato\n" + TEXT * 3, encoding="utf-8")
+        system = ComprehensiveExtractionSystem(tmp_path)
+
+        serial = system.process_all(workers=1)
+        parallel = system.process_all(workers=2, jsonl_path=tmp_path / "out.jsonl")
+
+        assert list(parallel["extractions"]) == ["girardi_m1", "girardi_m2"]
+        assert parallel["extractions"] == serial["extractions"]
+        records = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert len(records) == sum(len(items) for doc in serial["extractions"].values() for items in doc.values())
+        assert {record["document"] for record in records} == {"girardi_m1", "girardi_m2"}
+        # Workers' part files are merged and removed
+        assert not list(tmp_path.glob(".extraction-parts-*"))
@@ -0,0 +1,56 @@
+"""
+Unit tests for the retrieval HTTP response cache
+Tests URL-keyed lookups, content-addressed storage and garbage collection
+"""
+import hashlib
+
+from http_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    def test_store_and_lookup(self, tmp_path):
+        """Bodies round-trip and only the validator headers are kept"""
+        cache = ResponseCache(tmp_path)
+        body = b"<TEI>" + b"fate " * 1000 + b"</TEI>"
+        entry = cache.store("https://example.org/a.xml",
+                            {"etag": '"abc"', "Last-Modified": "Sat, 25 Oct 2025 10:00:00 GMT",
+                             "Set-Cookie": "x=1", "Content-Type": "text/xml"}, body)
+
+        assert entry.sha256 == hashlib.sha256(body).hexdigest()
+        assert cache.get("https://example.org/a.xml") == body
+        assert cache.lookup("https://example.org/a.xml").headers == {
+            "ETag": '"abc"', "Last-Modified": "Sat, 25 Oct 2025 10:00:00 GMT", "Content-Type": "text/xml"}
+        assert entry.validators() == {"If-None-Match": '"abc"',
+                                      "If-Modified-Since": "Sat, 25 Oct 2025 10:00:00 GMT"}
+        assert cache.lookup("https://example.org/other.xml") is None
+
+    def test_identical_bodies_share_one_compressed_object(self, tmp_path):
+        """Content addressing stores a body once whatever URL it came from"""
+        cache = ResponseCache(tmp_path)
+        body = b"Assent is in our power. " * 500
+        cache.store("https://example.org/a", {}, body)
+        cache.store("https://mirror.example.org/a", {}, body)
+
+        stats = cache.stats()
+        assert stats["urls"] == 2 and stats["objects"] == 1
+        assert stats["body_bytes"] == len(body) and stats["stored_bytes"] < len(body) // 10
+
+    def test_corrupt_object_is_a_miss(self, tmp_path):
+        """A body that fails its checksum is never served"""
+        cache = ResponseCache(tmp_path)
+        entry = cache.store("https://example.org/a", {}, b"original")
+        (path,) = (tmp_path / "objects").glob("*/*.gz")
+        path.write_bytes(b"not gzip")
+        assert cache.read(entry) is None
+
+    def test_gc_removes_unreferenced_objects(self, tmp_path):
+        """Objects replaced by a newer body for the same URL are collected"""
+        cache = ResponseCache(tmp_path)
+        cache.store("https://example.org/a", {}, b"first version")
+        cache.store("https://example.org/a", {}, b"second version")
+
+        assert cache.gc() == 1
+        assert cache.get("https://example.org/a") == b"second version"
+        assert cache.stats()["objects"] == 1
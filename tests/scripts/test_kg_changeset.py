@@ -0,0 +1,135 @@
+"""
+Unit tests for the KG changeset engine
+Tests staging, validation, atomic saves with the change log and composed runs
+"""
+import json
+import os
+
+import pytest
+
+from kg_changeset import ChangeSetError, ConflictError, KGStore
+from fix_all_periods import fix_periods
+from apply_corrections import apply_corrections
+
+KG = {
+    "metadata": {"title": "test"},
+    "nodes": [
+        {"id": "person_chrysippus_1", "type": "person", "label": "Chrysippus",
+         "description": "Stoic", "period": "Hellenistic"},
+        {"id": "person_pelagius_british_monk_4ba38f92", "type": "person", "label": "Pelagius",
+         "description": "Monk", "ancient_sources": ["Augustine, De Gratia"]},
+        {"id": "concept_fate_1", "type": "concept", "label": "Fate", "description": "Heimarmene"},
+    ],
+    "edges": [
+        {"source": "person_chrysippus_1", "target": "concept_fate_1", "relation": "defended"},
+    ],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "kg.json"
+    path.write_text(json.dumps(KG), encoding="utf-8")
+    return KGStore(path)
+
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def changelog(store):
+    return [json.loads(line) for line in store.changelog.read_text(encoding="utf-8").splitlines()]
+
+
+class TestChangeSet:
+    """Test cases for ChangeSet"""
+
+    def test_staged_edits_are_visible_to_the_changeset_only(self, store):
+        changeset = store.changeset("test")
+        changeset.update_node("person_chrysippus_1", period="Hellenistic Greek")
+
+        assert changeset.node("person_chrysippus_1")["period"] == "Hellenistic Greek"
+        assert store.node("person_chrysippus_1")["period"] == "Hellenistic"
+
+        changeset.commit()
+        assert store.node("person_chrysippus_1")["period"] == "Hellenistic Greek"
+
+    def test_list_helpers(self, store):
+        changeset = store.changeset("test")
+        node_id = "person_pelagius_british_monk_4ba38f92"
+
+        assert changeset.add_to_list(node_id, "ancient_sources", ["A", "Augustine, De Gratia", "B"], index=0) == 2
+        assert changeset.remove_from_list(node_id, "ancient_sources", ["Augustine, De Gratia", "C"]) == 1
+        assert changeset.node(node_id)["ancient_sources"] == ["A", "B"]
+
+    def test_dangling_edge_blocks_commit(self, store):
+        changeset = store.changeset("test")
+        changeset.add_edge({"source": "person_chrysippus_1", "target": "concept_missing", "relation": "defended"})
+
+        with pytest.raises(ChangeSetError) as error:
+            changeset.commit()
+        assert "concept_missing" in error.value.errors[0]
+        assert not store.dirty
+
+    def test_delete_node_cascades_to_edges(self, store):
+        changeset = store.changeset("test")
+        changeset.delete_node("concept_fate_1")
+        counts = changeset.commit()
+
+        assert counts == {"delete_node": 1, "delete_edge": 1}
+        assert store.node("concept_fate_1") is None
+        assert store.edges == []
+
+    def test_duplicate_edge_lookup_ignores_relation_by_default(self, store):
+        changeset = store.changeset("test")
+
+        assert changeset.has_edge("person_chrysippus_1", "concept_fate_1")
+        assert not changeset.has_edge("person_chrysippus_1", "concept_fate_1", "refuted")
+
+
+class TestKGStore:
+    """Test cases for KGStore saves"""
+
+    def test_save_writes_file_and_change_log(self, store, tmp_path):
+        changeset = store.changeset("periods")
+        changeset.update_node("person_chrysippus_1", period="Hellenistic Greek")
+        changeset.commit()
+        backup = store.save(backup_prefix="kg_BACKUP")
+
+        assert read(store.path)["nodes"][0]["period"] == "Hellenistic Greek"
+        assert read(backup)["nodes"][0]["period"] == "Hellenistic"
+        [record] = changelog(store)
+        assert record["name"] == "periods"
+        assert record["op"] == "update_node"
+        assert record["before"] == {"period": "Hellenistic"}
+        assert record["after"] == {"period": "Hellenistic Greek"}
+        assert not store.dirty
+        assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+    def test_save_refuses_file_changed_on_disk(self, store):
+        changeset = store.changeset("test")
+        changeset.update_node("concept_fate_1", label="Fate (heimarmene)")
+        changeset.commit()
+
+        data = read(store.path)
+        data["nodes"].pop()
+        store.path.write_text(json.dumps(data) + "\n", encoding="utf-8")
+
+        with pytest.raises(ConflictError):
+            store.save()
+
+
+class TestComposedRun:
+    """Scripts sharing one store are saved in one write"""
+
+    def test_scripts_share_one_load_and_save(self, store):
+        fix_periods(store)
+        apply_corrections(store)
+        store.save()
+
+        data = read(store.path)
+        nodes = {node["id"]: node for node in data["nodes"]}
+        assert nodes["person_chrysippus_1"]["period"] == "Hellenistic Greek"
+        assert nodes["person_pelagius_british_monk_4ba38f92"]["ancient_sources"][0].startswith("Pelagius, Epistula")
+        assert data["metadata"]["date_modified"] == "2025-10-21"
+        assert {record["name"] for record in changelog(store)} == {"fix_all_periods", "apply_corrections"}
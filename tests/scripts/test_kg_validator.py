@@ -0,0 +1,183 @@
+"""
+Unit tests for the rule-based KG validator
+Tests single-visit rule dispatch, graph checks, the content-hash cache and parallel workers
+"""
+import sys
+from collections import deque
+
+import kg_validator
+from kg_validator import RuleSet, Validator
+from audit_database_academic_quality import audit_database
+
+# A deque rather than a list: rule fingerprints hash the data of globals a rule reads
+CALLS = deque()
+VALID_TYPES = {"person", "concept"}
+
+
+def label_rule(node):
+    CALLS.append(node["id"])
+    return [] if node.get("label") else ["has no label"]
+
+
+def type_rule(node):
+    return ["has no type"] if "type" not in node else []
+
+
+def broken_rule(node):
+    return [node["missing"]]
+
+
+def vocabulary_rule(node):
+    return [] if node.get("type") in VALID_TYPES else ["has an invalid type"]
+
+
+def relation_rule(edge):
+    return [] if edge.get("relation") else ["has no relation"]
+
+
+def make_rules():
+    rules = RuleSet("test")
+    rules.add("node", label_rule)
+    rules.add("node", type_rule, severity="warning")
+    rules.add("edge", relation_rule)
+    return rules
+
+
+def make_db():
+    return {
+        "nodes": [
+            {"id": "person_a", "label": "A", "type": "person"},
+            {"id": "person_b", "label": "", "type": "person"},
+            {"id": "concept_c", "label": "C"},
+            {"id": "person_a", "label": "A again", "type": "person"},
+        ],
+        "edges": [
+            {"source": "person_a", "target": "person_b", "relation": "influenced"},
+            {"source": "person_a", "target": "concept_missing", "relation": ""},
+        ],
+    }
+
+
+def messages(result):
+    return {(issue.kind, issue.position, issue.message) for issue in result.issues}
+
+
+class TestValidator:
+    """Test cases for Validator"""
+
+    def setup_method(self):
+        CALLS.clear()
+
+    def test_single_pass_dispatches_every_rule(self):
+        result = Validator(make_rules(), workers=1).validate(make_db())
+
+        assert list(CALLS) == ["person_a", "person_b", "concept_c", "person_a"]
+        assert messages(result) == {
+            ("node", 1, "has no label"),
+            ("node", 2, "has no type"),
+            ("node", 3, "has duplicate ID: person_a"),
+            ("edge", 1, "references non-existent target node: concept_missing"),
+            ("edge", 1, "has no relation"),
+        }
+        assert [issue.rule for issue in result.warnings] == ["type_rule"]
+        assert result.orphans == ["concept_c"]
+        assert not result.ok
+
+    def test_revalidation_only_checks_changed_entities(self):
+        validator = Validator(make_rules(), workers=1)
+        db = make_db()
+        validator.validate(db)
+        CALLS.clear()
+
+        db["nodes"][1]["label"] = "B"
+        result = validator.validate(db)
+
+        assert list(CALLS) == ["person_b"]
+        assert (result.checked, result.cached) == (1, 5)
+        assert ("node", 1, "has no label") not in messages(result)
+
+    def test_cache_persists_between_runs(self, tmp_path):
+        cache = tmp_path / "cache.json"
+        first = Validator(make_rules(), cache, workers=1)
+        expected = messages(first.validate(make_db()))
+        first.save_cache()
+        CALLS.clear()
+
+        second = Validator(make_rules(), cache, workers=1).validate(make_db())
+        assert list(CALLS) == []
+        assert messages(second) == expected
+
+        # Changed rules invalidate the cache
+        rules = make_rules()
+        rules.add("node", broken_rule)
+        assert Validator(rules, cache, workers=1).validate(make_db()).cached == 0
+
+    def test_rule_code_and_vocabulary_are_fingerprinted(self, tmp_path, monkeypatch):
+        rules = RuleSet("test")
+        rules.add("node", vocabulary_rule)
+        fingerprint = rules.fingerprint
+        assert make_rules().fingerprint == make_rules().fingerprint
+
+        cache = tmp_path / "cache.json"
+        validator = Validator(rules, cache, workers=1)
+        assert len(validator.validate({"nodes": [{"id": "letter_a", "type": "letter"}], "edges": []}).errors) == 1
+        validator.save_cache()
+
+        # A new vocabulary entry must not be answered from the cache
+        monkeypatch.setattr(sys.modules[__name__], "VALID_TYPES", VALID_TYPES | {"letter"})
+        assert rules.fingerprint != fingerprint
+        result = Validator(rules, cache, workers=1).validate({"nodes": [{"id": "letter_a", "type": "letter"}],
+                                                              "edges": []})
+        assert (result.cached, result.ok) == (0, True)
+
+        # So must an edited rule body
+        edited = RuleSet("test")
+        edited.add("node", lambda node: [], name="vocabulary_rule")
+        assert edited.fingerprint != fingerprint
+
+    def test_failing_rule_is_reported_as_error(self):
+        rules = RuleSet("test")
+        rules.add("node", broken_rule)
+        result = Validator(rules, workers=1).validate({"nodes": [{"id": "person_a"}], "edges": []})
+
+        [issue] = result.errors
+        assert issue.message == "broken_rule failed: KeyError: 'missing'"
+
+    def test_parallel_workers_match_serial(self, monkeypatch):
+        db = {"nodes": [{"id": f"person_{i}", "label": "" if i % 3 else "P"} for i in range(40)],
+              "edges": [{"source": "person_0", "target": f"person_{i}", "relation": "x" if i % 2 else ""}
+                        for i in range(40)]}
+        serial = Validator(make_rules(), workers=1).validate(db)
+
+        monkeypatch.setattr(kg_validator, "PARALLEL_MIN_ENTITIES", 10)
+        parallel = Validator(make_rules(), workers=2).validate(db)
+
+        assert parallel.checked == 80
+        assert messages(parallel) == messages(serial)
+
+
+class TestAuditDatabase:
+    """The academic audit runs on the validator"""
+
+    def test_issues_and_enhancements_per_node(self):
+        db = {
+            "nodes": [
+                {"id": "concept_eph_hemin_1", "label": "Eph' hemin", "type": "concept", "category": "free_will",
+                 "description": "x" * 120, "greek_term": "τὸ ἐφ' ἡμῖν", "english_term": "what depends on us",
+                 "formulated_by": "Aristotle", "relation_to_free_will": "central", "related_concepts": ["a"],
+                 "ancient_sources": ["Aristotle, EN III.5"]},
+            ],
+            "edges": [{"source": "concept_eph_hemin_1", "target": "person_missing", "relation": "foo"}],
+        }
+        report = audit_database(db)
+
+        assert report["warnings"][0]["enhancements"] == [
+            "Add modern scholarship references",
+            "Description could be expanded (currently brief)",
+            "Add key concepts array",
+        ]
+        assert report["critical_issues"][0]["issues"] == [
+            "references non-existent target node: person_missing",
+            "Invalid relation: 'foo'",
+        ]
+        assert report["summary"]["edges_with_issues"] == 1
@@ -0,0 +1,326 @@
+"""
+Unit tests for the async retrieval engine
+Runs the engine and a TEI retriever against a local fixture HTTP server
+"""
+import asyncio
+import json
+import random
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+import retrieval_engine
+from http_cache import ResponseCache
+from retrieval_engine import (FetchJob, HostPolicy, RetrievalEngine, TokenBucket,
+                              backoff_delay, retrieve_passages)
+from retrieve_github_tei import GitHubTEIRetriever
+from retrieve_work_queue import queue_works
+
+TEI = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0"><text><body>
+  <div type="textpart" subtype="book" n="1">
+    <div type="textpart" subtype="section" n="1"><p>Fate and what is up to us.</p></div>
+    <div type="textpart" subtype="section" n="2"><p>Assent is in our power.</p></div>
+  </div>
+</body></text></TEI>"""
+
+
+class FixtureServer:
+    """Local HTTP server with well-behaved, flaky, missing and concurrency-tracking routes"""
+
+    def __init__(self):
+        self.hits = {}
+        self.in_flight = 0
+        self.peak = 0
+        self.fail_first = 2
+
+    async def text(self, request):
+        name = request.match_info["name"]
+        self.hits[name] = self.hits.get(name, 0) + 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        return web.Response(body=f"text of {name}".encode())
+
+    async def flaky(self, request):
+        self.hits["flaky"] = self.hits.get("flaky", 0) + 1
+        if self.hits["flaky"] <= self.fail_first:
+            return web.Response(status=503, headers={"Retry-After": "0"})
+        return web.Response(body=b"recovered")
+
+    async def missing(self, request):
+        self.hits["missing"] = self.hits.get("missing", 0) + 1
+        return web.Response(status=404)
+
+    async def tei(self, request):
+        return web.Response(body=TEI, content_type="application/xml")
+
+    async def versioned(self, request):
+        self.hits["versioned"] = self.hits.get("versioned", 0) + 1
+        if request.headers.get("If-None-Match") == '"v1"':
+            self.hits["not_modified"] = self.hits.get("not_modified", 0) + 1
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.Response(body=TEI, content_type="application/xml", headers={"ETag": '"v1"'})
+
+
+@asynccontextmanager
+async def fixture_server():
+    server = FixtureServer()
+    app = web.Application()
+    app.router.add_get("/text/{name}", server.text)
+    app.router.add_get("/flaky", server.flaky)
+    app.router.add_get("/missing", server.missing)
+    app.router.add_get("/data/{tlg}/{work}/{filename}", server.tei)
+    app.router.add_get("/versioned", server.versioned)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    server.base = f"http://127.0.0.1:{port}"
+    server.host = f"127.0.0.1:{port}"
+    try:
+        yield server
+    finally:
+        await runner.cleanup()
+
+
+def make_engine(server, concurrency=8, rate=0.0, cache=None, offline=False):
+    return RetrievalEngine(
+        policies={server.host: HostPolicy(concurrency=concurrency, rate=rate, burst=1)},
+        backoff=0.01,
+        max_backoff=0.05,
+        seed=0,
+        verbose=False,
+        cache=cache,
+        offline=offline
+    )
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket"""
+
+    def test_burst_then_steady_rate(self):
+        """A full bucket admits a burst, then callers are spaced at 1/rate"""
+        now = [0.0]
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+
+        waits = [bucket.reserve() for _ in range(4)]
+        assert waits == [0.0, 0.0, 0.5, 1.0]
+
+        now[0] = 10.0
+        assert bucket.reserve() == 0.0
+
+    def test_zero_rate_is_unlimited(self):
+        """rate=0 disables the bucket"""
+        bucket = TokenBucket(rate=0, capacity=1)
+        assert all(bucket.reserve() == 0.0 for _ in range(100))
+
+
+class TestBackoff:
+    """Test cases for backoff_delay"""
+
+    def test_full_jitter_is_bounded_and_capped(self):
+        """Delays stay within [0, min(cap, base * 2^(attempt-1))]"""
+        rng = random.Random(1)
+        for attempt in range(1, 10):
+            delay = backoff_delay(attempt, base=0.5, cap=4.0, rng=rng)
+            assert 0 <= delay <= min(4.0, 0.5 * 2 ** (attempt - 1))
+
+    def test_retry_after_is_a_floor(self):
+        """A server's Retry-After is honoured up to the cap"""
+        rng = random.Random(1)
+        assert backoff_delay(1, base=0.1, cap=30.0, rng=rng, retry_after=3.0) == 3.0
+        assert backoff_delay(1, base=0.1, cap=2.0, rng=rng, retry_after=60.0) == 2.0
+
+
+class TestRetrievalEngine:
+    """Test cases for RetrievalEngine against the fixture server"""
+
+    def test_per_host_concurrency_limit(self):
+        """No more requests are in flight to one host than its policy allows"""
+        async def scenario():
+            async with fixture_server() as server:
+                jobs = [FetchJob(f"t{i}", f"{server.base}/text/t{i}") for i in range(12)]
+                stats = await make_engine(server, concurrency=3).run(jobs)
+                return server, stats
+
+        server, stats = asyncio.run(scenario())
+        assert stats.succeeded == 12 and stats.failed == 0
+        assert server.peak == 3
+
+    def test_retries_transient_errors_only(self):
+        """503s are retried until they recover; a 404 fails on the first attempt"""
+        async def scenario():
+            async with fixture_server() as server:
+                engine = make_engine(server)
+                results = await engine.fetch_all([
+                    FetchJob("flaky", f"{server.base}/flaky"),
+                    FetchJob("missing", f"{server.base}/missing"),
+                ])
+                return server, results
+
+        server, results = asyncio.run(scenario())
+        assert results["flaky"].ok and results["flaky"].attempts == 3
+        assert results["flaky"].body == b"recovered"
+        assert not results["missing"].ok and results["missing"].error == "HTTP 404"
+        assert server.hits["missing"] == 1
+
+    def test_resume_skips_finished_jobs(self, tmp_path):
+        """A second run only fetches what the first did not finish"""
+        state = tmp_path / "state.jsonl"
+
+        async def scenario():
+            async with fixture_server() as server:
+                engine = make_engine(server)
+                jobs = [FetchJob(f"t{i}", f"{server.base}/text/t{i}") for i in range(5)]
+                jobs.append(FetchJob("missing", f"{server.base}/missing"))
+                first = await engine.run(jobs, state_path=state, limit=3)
+                second = await engine.run(jobs, state_path=state)
+                third = await engine.run(jobs, state_path=state, retry_failed=True)
+                return server, first, second, third
+
+        server, first, second, third = asyncio.run(scenario())
+        assert first.succeeded == 3
+        assert second.skipped == 3 and second.succeeded == 2 and second.failed == 1
+        assert third.skipped == 5 and third.failed == 1
+        assert all(count == 1 for name, count in server.hits.items() if name.startswith("t"))
+        assert server.hits["missing"] == 2
+
+    def test_handler_errors_mark_the_job_failed(self):
+        """A response the handler cannot use is recorded as a failure"""
+        async def scenario():
+            async with fixture_server() as server:
+                engine = make_engine(server)
+                jobs = [FetchJob(f"p{i}", f"{server.base}/text/p{i}", meta={"work": "w", "passage": i})
+                        for i in range(3)]
+                parse = lambda result: None if result.job.key == "p1" else result.text()
+                return await asyncio.to_thread(retrieve_passages, engine, jobs, parse, None)
+
+        passages, stats = asyncio.run(scenario())
+        assert sorted(passages["w"]) == ["0", "2"]
+        assert passages["w"]["2"]["text"] == "text of p2"
+        assert stats.failures == {"p1": "handler: no text in response"}
+
+
+class TestResponseCaching:
+    """Test cases for RetrievalEngine with a ResponseCache"""
+
+    def test_revalidates_with_etag_then_serves_offline(self, tmp_path):
+        """Second fetch is a 304 answered from the cache; offline needs no server at all"""
+        cache = ResponseCache(tmp_path / "cache")
+
+        async def scenario():
+            async with fixture_server() as server:
+                url = f"{server.base}/versioned"
+                engine = make_engine(server, cache=cache)
+                first = await engine.run([FetchJob("v", url)])
+                second_results = await engine.fetch_all([FetchJob("v", url)])
+            # Server is gone: only the cache can answer
+            offline = make_engine(server, cache=cache, offline=True)
+            offline_results = await offline.fetch_all([FetchJob("v", url), FetchJob("x", f"{server.base}/missing")])
+            return server, first, second_results["v"], offline_results
+
+        server, first, second, offline = asyncio.run(scenario())
+        assert first.bytes_fetched == len(TEI) and first.cached == 0
+        assert second.ok and second.cached and second.body == TEI
+        assert second.headers["ETag"] == '"v1"'
+        assert server.hits == {"versioned": 2, "not_modified": 1}
+        assert offline["v"].ok and offline["v"].body == TEI
+        assert offline["x"].error == "not in cache (offline)"
+
+    def test_lost_body_is_fetched_again(self, tmp_path):
+        """A 304 for an entry whose object is gone falls back to an unconditional request"""
+        cache = ResponseCache(tmp_path / "cache")
+
+        async def scenario():
+            async with fixture_server() as server:
+                url = f"{server.base}/versioned"
+                engine = make_engine(server, cache=cache)
+                await engine.fetch_all([FetchJob("v", url)])
+                for path in (tmp_path / "cache" / "objects").glob("*/*.gz"):
+                    path.unlink()
+                results = await engine.fetch_all([FetchJob("v", url)])
+                return server, results["v"]
+
+        server, result = asyncio.run(scenario())
+        assert result.ok and not result.cached and result.body == TEI
+        assert server.hits["versioned"] == 3
+        assert cache.get(result.job.url) == TEI
+
+
+class TestTEIRetrieval:
+    """Test cases for the retrievers as thin work-list definitions"""
+
+    def test_github_tei_work_list(self, tmp_path, monkeypatch):
+        """A work list is fetched, parsed and saved per work"""
+        monkeypatch.setattr(retrieval_engine, "STATE_DIR", tmp_path / "state")
+
+        async def scenario():
+            async with fixture_server() as server:
+                retriever = GitHubTEIRetriever(output_dir=tmp_path / "out", engine=make_engine(server))
+                retriever.GREEK_LIT_BASE = f"{server.base}/data"
+                works = [{
+                    'name': 'Alexander of Aphrodisias, De Fato',
+                    'language': 'greek',
+                    'tlg_code': 'tlg0085',
+                    'work_code': 'tlg014',
+                    'edition': 'perseus-grc2',
+                    'author': 'Alexander of Aphrodisias',
+                    'work_title': 'De Fato',
+                    'citations': 65
+                }]
+                return await asyncio.to_thread(retriever.retrieve_works, works, "fixture")
+
+        rows, stats = asyncio.run(scenario())
+        assert rows == [{'name': 'Alexander of Aphrodisias, De Fato', 'citations': 65,
+                         'success': True, 'passages': 2}]
+        saved = json.loads((tmp_path / "out" / "alexander_of_aphrodisias_de_fato.json").read_text())
+        assert saved["passages"]["1.2"]["text"] == "Assent is in our power."
+        assert saved["metadata"]["urn"] == "urn:cts:greekLit:tlg0085.tlg014.perseus-grc2"
+        assert (tmp_path / "state" / "fixture.jsonl").exists()
+
+    def test_earlier_failures_stay_failed_on_resume(self, tmp_path, monkeypatch):
+        """A work that failed before is reported failed, not retrieved, until it is retried"""
+        monkeypatch.setattr(retrieval_engine, "STATE_DIR", tmp_path / "state")
+        work = {'name': 'Alexander of Aphrodisias, De Fato', 'language': 'greek', 'tlg_code': 'tlg0085',
+                'work_code': 'tlg014', 'edition': 'perseus-grc2', 'author': 'Alexander of Aphrodisias',
+                'work_title': 'De Fato', 'citations': 65}
+
+        async def scenario():
+            async with fixture_server() as server:
+                retriever = GitHubTEIRetriever(output_dir=tmp_path / "out", engine=make_engine(server))
+                retriever.GREEK_LIT_BASE = f"{server.base}/gone"
+                first = await asyncio.to_thread(retriever.retrieve_works, [work], "fixture")
+                retriever.GREEK_LIT_BASE = f"{server.base}/data"
+                second = await asyncio.to_thread(retriever.retrieve_works, [work], "fixture")
+                third = await asyncio.to_thread(retriever.retrieve_works, [work], "fixture", True)
+                return first, second, third
+
+        (first, _), (second, stats), (third, _) = asyncio.run(scenario())
+        assert first[0]['success'] is False and first[0]['error'] == "HTTP 404"
+        assert second[0] == {'name': work['name'], 'citations': 65,
+                             'success': False, 'skipped': True, 'error': "HTTP 404"}
+        assert stats.summary()['failed_earlier'] == 1
+        assert third[0]['success'] is True and third[0]['passages'] == 2
+
+    def test_queue_works_uses_catalog_editions(self):
+        """CTS_AUTO queue entries become GitHub TEI works; the rest are counted as manual"""
+        queue = [
+            {'work': 'Cicero, De Fato', 'citation_count': 6, 'retrieval_strategy': 'CTS_AUTO',
+             'cts_urn': 'urn:cts:latinLit:phi0474.phi054'},
+            {'work': 'Plato, Republic', 'citation_count': 3, 'retrieval_strategy': 'CTS_AUTO',
+             'cts_urn': 'urn:cts:greekLit:tlg0059.tlg030'},
+            {'work': 'Septuagint', 'citation_count': 18, 'retrieval_strategy': 'BIBLEHUB_OR_SEFARIA',
+             'cts_urn': None},
+        ]
+        catalog = {'Cicero, De Fato': 'urn:cts:latinLit:phi0474.phi054.perseus-lat1'}
+
+        works, manual = queue_works(queue, catalog)
+        assert [(w['tlg_code'], w['work_code'], w['edition'], w['language']) for w in works] == [
+            ('phi0474', 'phi054', 'perseus-lat1', 'latin'),
+            ('tlg0059', 'tlg030', 'perseus-grc2', 'greek'),
+        ]
+        assert works[0]['author'] == 'Cicero' and works[0]['work_title'] == 'De Fato'
+        assert manual == {'BIBLEHUB_OR_SEFARIA': 1}
@@ -0,0 +1,86 @@
+"""
+Unit tests for the streaming TEI extractor
+Tests the division hierarchy, char offsets and passage keys
+"""
+from tei_stream import extract_passages, parse_tei
+
+NE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0">
+<teiHeader><fileDesc><publicationStmt><p>Header paragraph, not text.</p></publicationStmt></fileDesc></teiHeader>
+<text><body>
+  <div type="edition" n="urn:cts:greekLit:tlg0086.tlg010.perseus-grc2" xml:lang="grc">
+    <div type="textpart" subtype="book" n="3">
+      <head>Book III</head>
+      <p>Preface to the book.</p>
+      <div type="textpart" subtype="chapter" n="1">
+        <div type="textpart" subtype="section" n="1"><p>Voluntary <hi>actions</hi> are praised.</p></div>
+        <div type="textpart" subtype="section" n="2"><p>Involuntary ones pardoned.</p><p>Second paragraph.</p></div>
+      </div>
+      <div type="textpart" subtype="chapter" n="2">
+        <div type="textpart" subtype="section" n="1"><l>A verse line</l><l>and another</l></div>
+      </div>
+    </div>
+  </div>
+</body></text></TEI>"""
+
+FLAT = b"""<TEI><text><body><div type="edition">
+  <div type="textpart" subtype="section" n="1"><p>Fate.</p></div>
+  <div type="textpart" subtype="section" n="2"><p>What is up to us.</p></div>
+</div></body></text></TEI>"""
+
+
+class TestParseTEI:
+    """Test cases for parse_tei"""
+
+    def test_division_hierarchy(self):
+        """Citable divisions nest under their parents; wrappers and the header are skipped"""
+        document = parse_tei(NE)
+        rows = [division.row() for division in document.divisions]
+
+        assert [row['full_reference'] for row in rows] == ['3', '3.1', '3.1.1', '3.1.2', '3.2', '3.2.1']
+        assert [row['parent_id'] for row in rows] == [None, 0, 1, 1, 0, 4]
+        assert rows[0]['heading'] == 'Book III' and rows[0]['subtype'] == 'book'
+        assert {row['language'] for row in rows} == {'grc'}
+        assert 'Header paragraph' not in document.text
+
+    def test_char_offsets_slice_the_raw_text(self):
+        """raw_text[char_position:char_position + char_length] is each division's text"""
+        document = parse_tei(NE)
+        spans = {division.full_reference: document.span(division) for division in document.divisions}
+
+        assert spans['3.1.1'] == 'Voluntary actions are praised.'
+        assert spans['3.1.2'] == 'Involuntary ones pardoned. Second paragraph.'
+        assert spans['3.1'] == spans['3.1.1'] + '\n\n' + spans['3.1.2']
+        assert spans['3.2.1'] == 'A verse line and another'
+        assert document.text.startswith('Preface to the book.\n\nVoluntary')
+        assert spans['3'] == document.text
+
+    def test_accepts_file_paths(self, tmp_path):
+        """Files are streamed from disk"""
+        path = tmp_path / "work.xml"
+        path.write_bytes(FLAT)
+        assert parse_tei(str(path)).text == 'Fate.\n\nWhat is up to us.'
+
+
+class TestExtractPassages:
+    """Test cases for extract_passages"""
+
+    def test_book_chapter_passages(self):
+        """Deeper levels fold into book.chapter passages; a book preface is its own passage"""
+        passages = extract_passages(NE)
+
+        assert list(passages) == ['3', '3.1', '3.2']
+        assert passages['3']['text'] == 'Preface to the book.'
+        assert passages['3.1'] == {
+            'book': '3', 'chapter': '1',
+            'text': 'Voluntary actions are praised.\n\nInvoluntary ones pardoned. Second paragraph.',
+            'char_position': 22, 'char_length': 76
+        }
+
+    def test_flat_sections(self):
+        """Works without books are keyed by section"""
+        passages = extract_passages(FLAT)
+        assert passages == {
+            '1': {'section': '1', 'text': 'Fate.', 'char_position': 0, 'char_length': 5},
+            '2': {'section': '2', 'text': 'What is up to us.', 'char_position': 7, 'char_length': 17},
+        }